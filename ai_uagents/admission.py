@@ -0,0 +1,150 @@
+"""
+Admission control for the AI Company orchestrator
+Caps concurrent workflows and the queue waiting for them, rejecting overload early with a retry-after hint
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+ORCHESTRATOR_MAX_CONCURRENT_WORKFLOWS = int(os.getenv('ORCHESTRATOR_MAX_CONCURRENT_WORKFLOWS', '8'))
+# Requests allowed to wait for a workflow slot; beyond this they are rejected immediately
+ORCHESTRATOR_MAX_WAITING_WORKFLOWS = int(os.getenv('ORCHESTRATOR_MAX_WAITING_WORKFLOWS', '16'))
+# Longest a request waits for a slot before it is rejected
+ORCHESTRATOR_ADMISSION_WAIT_SECONDS = float(os.getenv('ORCHESTRATOR_ADMISSION_WAIT_SECONDS', '30'))
+# Workflow duration assumed for retry-after hints until one has completed
+ADMISSION_DEFAULT_WORKFLOW_SECONDS = 60.0
+
+
+class OverloadedError(Exception):
+    """Raised when a workflow is not admitted; carries the suggested retry delay in seconds"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded FIFO of workflow slots with a capped wait queue"""
+
+    def __init__(self, max_concurrent: int = ORCHESTRATOR_MAX_CONCURRENT_WORKFLOWS,
+                 max_waiting: int = ORCHESTRATOR_MAX_WAITING_WORKFLOWS,
+                 wait_timeout: float = ORCHESTRATOR_ADMISSION_WAIT_SECONDS):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_waiting = max(0, max_waiting)
+        self.wait_timeout = wait_timeout
+        self.running = 0
+        self._waiters: deque = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.completed = 0
+        self.duration_ewma: Optional[float] = None
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def waiting(self) -> int:
+        """Count requests waiting for a slot"""
+        return sum(1 for future in self._waiters if not future.done())
+
+    def retry_after(self, backlog: Optional[int] = None, slots: Optional[int] = None) -> float:
+        """Estimate seconds until a slot frees up for a request behind the given backlog"""
+        backlog = self.waiting() if backlog is None else backlog
+        duration = self.duration_ewma or ADMISSION_DEFAULT_WORKFLOW_SECONDS
+        # Each wave of slots takes one average workflow duration to drain
+        waves = (backlog // max(1, slots or self.max_concurrent)) + 1
+        return round(max(1.0, duration * waves), 1)
+
+    @asynccontextmanager
+    async def slot(self, bounded: bool = True):
+        """Hold one workflow slot for the block; unbounded callers (already-queued jobs) never get rejected"""
+        await self.acquire(bounded)
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - started_at
+            self.duration_ewma = duration if self.duration_ewma is None else 0.8 * self.duration_ewma + 0.2 * duration
+            self.completed += 1
+            self.release()
+
+    async def acquire(self, bounded: bool = True):
+        """Wait for a slot or raise OverloadedError"""
+        if self.running < self.max_concurrent and not self.waiting():
+            self.running += 1
+            self.admitted += 1
+            return
+
+        if bounded and self.waiting() >= self.max_waiting:
+            self.rejected += 1
+            raise OverloadedError(
+                f"Orchestrator overloaded ({self.running} workflows running, {self.waiting()} waiting)",
+                self.retry_after()
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        started_at = time.monotonic()
+        try:
+            if bounded:
+                await asyncio.wait_for(asyncio.shield(future), timeout=self.wait_timeout)
+            else:
+                await future
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as we gave up; hand it on
+                self.release()
+            else:
+                future.cancel()
+                self._discard(future)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                self.rejected += 1
+                raise OverloadedError(
+                    f"No workflow slot free after {self.wait_timeout:.0f}s ({self.running} running)",
+                    self.retry_after()
+                )
+            raise
+
+        waited = time.monotonic() - started_at
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.admitted += 1
+
+    def release(self):
+        """Return a slot and hand it to the next waiter"""
+        self.running = max(0, self.running - 1)
+        while self._waiters and self.running < self.max_concurrent:
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.running += 1
+            future.set_result(None)
+
+    def _discard(self, future: asyncio.Future):
+        """Remove an abandoned waiter"""
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get admission state and counters"""
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_waiting': self.max_waiting,
+            'wait_timeout_seconds': self.wait_timeout,
+            'running': self.running,
+            'waiting': self.waiting(),
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'completed': self.completed,
+            'avg_wait_seconds': round(self.wait_seconds / self.admitted, 4) if self.admitted else 0.0,
+            'max_wait_seconds': round(self.max_wait_seconds, 4),
+            'avg_workflow_seconds': round(self.duration_ewma, 2) if self.duration_ewma is not None else None,
+            'retry_after_seconds': self.retry_after()
+        }
@@ -0,0 +1,189 @@
+"""
+Message transport for AI Company agents
+Sends workflow steps over the uAgents message protocol and matches replies to callers by correlation ID
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Dict, Any, Optional, Tuple
+from uagents import Context, Model
+
+# 'rest' posts every step to the agent's REST endpoint; 'message' multiplexes steps over ctx.send
+AGENT_TRANSPORT = os.getenv('AGENT_TRANSPORT', 'rest').lower()
+# Agent seeds by name; addresses of every agent are derived from it so no Almanac lookup is needed
+UAGENT_KEYS_FILE = os.getenv('UAGENT_KEYS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'private_keys.json'))
+# Explicit addresses override the keys file, e.g. "cto=agent1q...;cmo=agent1q...";
+# replicas started with their own UAGENT_SEED are listed by port, e.g. "cto@8015=agent1q..."
+AGENT_ADDRESSES = os.getenv('AGENT_ADDRESSES', '')
+AGENT_MESSAGE_TIMEOUT_SECONDS = 90
+
+# Agent names used in the keys file, with their workflow role and default port
+AGENT_DIRECTORY = {
+    'CEO Agent': ('ceo', 8001),
+    'Research Agent': ('research', 8002),
+    'Product Agent': ('product', 8003),
+    'CMO Agent': ('cmo', 8004),
+    'CTO Agent': ('cto', 8005),
+    'Head of Engineering Agent': ('head_engineering', 8006),
+    'Finance Agent': ('finance', 8007),
+    'Workflow Orchestrator': ('orchestrator', 8008),
+    'Research Agent (MeTTa)': ('research_metta', 8009)
+}
+AGENT_PORTS = {role: port for role, port in AGENT_DIRECTORY.values()}
+
+
+class StepMessage(Model):
+    """Model for a REST-equivalent request sent as a uAgents message"""
+    correlation_id: str
+    path: str
+    payload: Dict[str, Any]
+
+
+class StepReply(Model):
+    """Model for the reply to a StepMessage"""
+    correlation_id: str
+    success: bool
+    data: Dict[str, Any] = None
+    error: str = None
+
+
+def load_agent_seeds(path: str = UAGENT_KEYS_FILE) -> Dict[str, str]:
+    """Read identity seeds by agent name"""
+    with open(path, 'r') as f:
+        keys = json.load(f)
+    return {name: agent_keys.get('identity_key') for name, agent_keys in keys.items() if agent_keys.get('identity_key')}
+
+
+def address_from_seed(seed: str) -> str:
+    """Derive the agent address uAgents uses for a seed"""
+    from uagents.crypto import Identity
+    return Identity.from_seed(seed, 0).address
+
+
+def load_agent_addresses() -> Dict[str, str]:
+    """Addresses by workflow role from the keys file and AGENT_ADDRESSES"""
+    addresses = {}
+    try:
+        for name, seed in load_agent_seeds().items():
+            if name in AGENT_DIRECTORY:
+                addresses[AGENT_DIRECTORY[name][0]] = address_from_seed(seed)
+    except Exception:
+        # No keys file: agents get random addresses and only explicit ones are known
+        pass
+    for entry in AGENT_ADDRESSES.split(';'):
+        if '=' in entry:
+            role, address = entry.split('=', 1)
+            addresses[role.strip()] = address.strip()
+    return addresses
+
+
+def build_resolver_rules(addresses: Dict[str, str]) -> Dict[str, str]:
+    """Map each known address straight to its local submit endpoint"""
+    rules = {}
+    for key, address in addresses.items():
+        role, _, port = key.partition('@')
+        if port.isdigit():
+            rules[address] = f"http://localhost:{port}/submit"
+        elif role in AGENT_PORTS:
+            rules.setdefault(address, f"http://localhost:{AGENT_PORTS[role]}/submit")
+    return rules
+
+
+def create_local_resolver():
+    """Resolver that delivers to agents on this host without the Almanac, or None if no addresses are known"""
+    rules = build_resolver_rules(load_agent_addresses())
+    if not rules:
+        return None
+    from uagents.resolver import RulesBasedResolver
+    return RulesBasedResolver(rules)
+
+
+class MessageTransport:
+    """Sends StepMessages and resolves the awaiting futures when replies arrive"""
+
+    def __init__(self, addresses: Dict[str, str]):
+        self.addresses = addresses
+        self.ctx: Optional[Context] = None
+        # Futures awaiting replies, with the address each step was sent to
+        self._pending: Dict[str, Tuple[asyncio.Future, str]] = {}
+        self.sent = 0
+        self.replied = 0
+        self.timeouts = 0
+        self.late_replies = 0
+        self.unexpected_senders = 0
+        self.max_pending = 0
+
+    def attach(self, ctx: Context):
+        """Keep the agent context used to send messages outside handlers"""
+        self.ctx = ctx
+
+    def address_for(self, role: str, port: int) -> Optional[str]:
+        """Address of the replica of a role listening on a port, or None if it can't be called over messages"""
+        if self.ctx is None:
+            return None
+        if f"{role}@{port}" in self.addresses:
+            return self.addresses[f"{role}@{port}"]
+        # Replicas sharing the role's seed share its address, which resolves to the default port
+        if port == AGENT_PORTS.get(role):
+            return self.addresses.get(role)
+        return None
+
+    async def request(self, role: str, path: str, payload: Dict[str, Any],
+                      timeout: float = AGENT_MESSAGE_TIMEOUT_SECONDS, address: str = None) -> Dict[str, Any]:
+        """Send one step to an agent and wait for the reply with the same correlation ID"""
+        correlation_id = uuid.uuid4().hex
+        address = address or self.addresses[role]
+        future = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = (future, address)
+        self.max_pending = max(self.max_pending, len(self._pending))
+        started_at = time.monotonic()
+        try:
+            status = await self.ctx.send(
+                address, StepMessage(correlation_id=correlation_id, path=path, payload=payload)
+            )
+            if getattr(getattr(status, 'status', None), 'value', None) == 'failed':
+                raise Exception(f"Could not deliver {path} to {role} agent: {getattr(status, 'detail', '')}")
+            self.sent += 1
+            reply = await asyncio.wait_for(future, timeout=max(0.0, timeout - (time.monotonic() - started_at)))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise Exception(f"No reply from {role} agent for {path} within {timeout}s")
+        finally:
+            self._pending.pop(correlation_id, None)
+
+        if not reply.success:
+            raise Exception(reply.error or f"{role} agent failed {path}")
+        return reply.data or {}
+
+    def resolve(self, sender: str, reply: StepReply):
+        """Hand a reply to the request waiting for it, if it came from the agent the step was sent to"""
+        pending = self._pending.get(reply.correlation_id)
+        if pending is None or pending[0].done():
+            # The caller already timed out
+            self.late_replies += 1
+            return
+        future, address = pending
+        if sender != address:
+            print(f"⚠️ Dropping reply {reply.correlation_id} from unexpected sender {sender}")
+            self.unexpected_senders += 1
+            return
+        self.replied += 1
+        future.set_result(reply)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get transport state and counters"""
+        return {
+            'transport': AGENT_TRANSPORT,
+            'attached': self.ctx is not None,
+            'roles': sorted(self.addresses),
+            'pending': len(self._pending),
+            'max_pending': self.max_pending,
+            'sent': self.sent,
+            'replied': self.replied,
+            'timeouts': self.timeouts,
+            'late_replies': self.late_replies,
+            'unexpected_senders': self.unexpected_senders
+        }
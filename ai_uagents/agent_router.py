@@ -0,0 +1,166 @@
+"""
+Replica routing for AI Company agents
+Keeps a pool of endpoints per agent role, probes their readiness and routes by least outstanding requests
+"""
+
+import asyncio
+import os
+import time
+import requests
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List
+from urllib.parse import urlparse
+
+# Extra replicas per role, e.g. "research_metta=http://localhost:8009,http://localhost:8019;cto=http://localhost:8005,http://localhost:8015"
+AGENT_ENDPOINTS = os.getenv('AGENT_ENDPOINTS', '')
+AGENT_HEALTH_INTERVAL_SECONDS = float(os.getenv('AGENT_HEALTH_INTERVAL_SECONDS', '5'))
+AGENT_HEALTH_TIMEOUT_SECONDS = 1.0
+# Consecutive failed requests before an endpoint is taken out of rotation until its next good health check
+AGENT_MAX_FAILURES = int(os.getenv('AGENT_MAX_FAILURES', '3'))
+
+
+class AgentUnavailableError(Exception):
+    """Raised without waiting on a timeout when no endpoint of a role is alive"""
+
+
+def parse_agent_endpoints(spec: str) -> Dict[str, List[str]]:
+    """Parse "role=url,url;role=url" into endpoint lists per role"""
+    endpoints = {}
+    for entry in spec.split(';'):
+        if '=' not in entry:
+            continue
+        role, urls = entry.split('=', 1)
+        endpoints[role.strip()] = [url.strip().rstrip('/') for url in urls.split(',') if url.strip()]
+    return endpoints
+
+
+class AgentEndpoint:
+    """One replica of an agent role and its load and health"""
+
+    def __init__(self, url: str):
+        self.url = url
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 80
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        # Alive but still warming up (e.g. loading knowledge graphs); used only when nothing is ready
+        self.ready = True
+        self.checks = {}
+        self.last_checked = None
+        self.latency_ewma = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the endpoint state"""
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'ready': self.ready,
+            'checks': self.checks,
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'errors': self.errors,
+            'latency_ewma_seconds': round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+            'last_checked': self.last_checked
+        }
+
+
+class AgentRouter:
+    """Routes each agent call to the ready replica with the fewest requests in flight"""
+
+    def __init__(self, endpoints: Dict[str, List[str]]):
+        self.pools: Dict[str, List[AgentEndpoint]] = {
+            role: [AgentEndpoint(url) for url in urls] for role, urls in endpoints.items() if urls
+        }
+        self._health_task = None
+
+    def pick(self, role: str) -> AgentEndpoint:
+        """Choose the least-loaded ready endpoint, then any live one; fail fast if none is alive"""
+        pool = self.pools.get(role)
+        if not pool:
+            raise Exception(f"No endpoints configured for agent role: {role}")
+        alive = [endpoint for endpoint in pool if endpoint.healthy]
+        if not alive:
+            raise AgentUnavailableError(f"No live {role} agent ({', '.join(endpoint.url for endpoint in pool)} down)")
+        candidates = [endpoint for endpoint in alive if endpoint.ready] or alive
+        # Ties go to the endpoint that has served the fewest requests so load spreads evenly
+        return min(candidates, key=lambda endpoint: (endpoint.outstanding, endpoint.requests))
+
+    @asynccontextmanager
+    async def endpoint(self, role: str):
+        """Reserve an endpoint for one request and record its outcome"""
+        endpoint = self.pick(role)
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        started_at = time.perf_counter()
+        try:
+            yield endpoint
+        except Exception as e:
+            endpoint.errors += 1
+            endpoint.consecutive_failures += 1
+            # A refused connection means the process is gone; don't wait for more failures
+            refused = isinstance(e, requests.ConnectionError) and not isinstance(e, requests.Timeout)
+            if (refused or endpoint.consecutive_failures >= AGENT_MAX_FAILURES) and endpoint.healthy:
+                endpoint.healthy = False
+                print(f"🚫 Agent endpoint {endpoint.url} ({role}) out of rotation after {endpoint.consecutive_failures} failures")
+            raise
+        else:
+            endpoint.consecutive_failures = 0
+            latency = time.perf_counter() - started_at
+            endpoint.latency_ewma = latency if endpoint.latency_ewma is None else 0.8 * endpoint.latency_ewma + 0.2 * latency
+        finally:
+            endpoint.outstanding -= 1
+
+    async def check_endpoint(self, endpoint: AgentEndpoint) -> bool:
+        """Probe an endpoint's readiness; no answer within the timeout counts as down"""
+        ready = False
+        try:
+            response = await asyncio.to_thread(
+                requests.get, f"{endpoint.url}/ready", timeout=AGENT_HEALTH_TIMEOUT_SECONDS
+            )
+            healthy = True
+            if response.status_code == 200:
+                body = response.json()
+                ready = bool(body.get('ready'))
+                endpoint.checks = body.get('checks') or {}
+            else:
+                # Agents without a readiness endpoint are ready as soon as they answer
+                ready = True
+        except (requests.RequestException, ValueError):
+            healthy = False
+
+        if healthy != endpoint.healthy:
+            print(f"{'💚' if healthy else '🚫'} Agent endpoint {endpoint.url} is {'back up' if healthy else 'down'}")
+        elif healthy and ready != endpoint.ready:
+            print(f"{'🔥' if ready else '🧊'} Agent endpoint {endpoint.url} is {'ready' if ready else 'warming up'}")
+        endpoint.healthy = healthy
+        endpoint.ready = ready
+        if healthy:
+            endpoint.consecutive_failures = 0
+        endpoint.last_checked = time.time()
+        return healthy
+
+    async def check_all(self):
+        """Health-check every endpoint concurrently"""
+        await asyncio.gather(*[
+            self.check_endpoint(endpoint) for pool in self.pools.values() for endpoint in pool
+        ])
+
+    def start_health_checks(self, interval: float = AGENT_HEALTH_INTERVAL_SECONDS):
+        """Health-check endpoints in the background"""
+        if self._health_task is not None:
+            return
+
+        async def loop():
+            while True:
+                await self.check_all()
+                await asyncio.sleep(interval)
+
+        self._health_task = asyncio.create_task(loop())
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the state of every pool"""
+        return {role: [endpoint.snapshot() for endpoint in pool] for role, pool in self.pools.items()}
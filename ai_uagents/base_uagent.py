@@ -5,30 +5,93 @@ Provides common functionality for all agents including ASI:One integration
 
 import os
 import json
+import time
+import asyncio
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Union
 from dotenv import load_dotenv
 from uagents import Agent, Context, Model
+from usage_tracker import UsageTracker
+from token_budget import AdaptiveTokenBudget
+from llm_scheduler import LLMScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BATCH
+from blob_store import BlobStore, is_blob_ref
+from agent_messaging import StepMessage, StepReply, load_agent_seeds, create_local_resolver
+from prompt_templates import PromptRegistry, RenderedPrompt
+from llm_json import clean_llm_json
 
 load_dotenv()
 
+# Deadline-aware calls: below this many seconds the call is skipped so the agent's fallback is used,
+# otherwise max_tokens is capped at what the remaining time can generate
+ASI_ONE_MIN_CALL_SECONDS = float(os.getenv('ASI_ONE_MIN_CALL_SECONDS', '5'))
+ASI_ONE_TOKENS_PER_SECOND = float(os.getenv('ASI_ONE_TOKENS_PER_SECOND', '50'))
+ASI_ONE_REQUEST_OVERHEAD_SECONDS = float(os.getenv('ASI_ONE_REQUEST_OVERHEAD_SECONDS', '2'))
+ASI_ONE_TIMEOUT_SECONDS = 120
+# Templated prompts are sent as a system prefix followed by the request text; backends that
+# accept an explicit prefix cache key get the template's prefix ID when this is enabled
+ASI_ONE_SEND_PROMPT_CACHE_KEY = os.getenv('ASI_ONE_SEND_PROMPT_CACHE_KEY', 'false').lower() == 'true'
+
+# Readiness: the upstream warm-up is retried with backoff until ASI:One answers
+AGENT_WARMUP_RETRY_SECONDS = float(os.getenv('AGENT_WARMUP_RETRY_SECONDS', '5'))
+AGENT_WARMUP_MAX_RETRY_SECONDS = 60
+AGENT_WARMUP_TIMEOUT_SECONDS = 5
+
+class UsageStatsRequest(Model):
+    """Model for token usage stats request"""
+    workflow_id: str = None
+
+class UsageStatsResponse(Model):
+    """Model for token usage stats response"""
+    agent: str
+    stats: Dict[str, Any]
+
+class HealthResponse(Model):
+    """Model for liveness probe response"""
+    agent: str
+    status: str
+    uptime_seconds: float
+    in_flight: int = None
+
+class ReadinessResponse(Model):
+    """Model for readiness probe response"""
+    agent: str
+    ready: bool
+    checks: Dict[str, Any]
+
+class PipelineResponse(Model):
+    """Base model for agent responses; degraded is set when the content is the agent's fallback"""
+    degraded: bool = None
+
 class BaseUAgent:
     """Base class for all AI Company uAgents"""
     
     def __init__(self, name: str, role: str, port: int, seed_phrase: str = None):
+        # UAGENT_PORT lets extra replicas of an agent run alongside the default port
+        port = int(os.getenv('UAGENT_PORT', port))
         self.name = name
         self.role = role
         self.port = port
         self.api_key = os.getenv('ASI_ONE_API_KEY')
-        self.base_url = 'https://api.asi1.ai/v1'
+        self.base_url = os.getenv('ASI_ONE_BASE_URL', 'https://api.asi1.ai/v1').rstrip('/')
+        self.usage_tracker = UsageTracker(name)
+        self.token_budget = AdaptiveTokenBudget()
+        self.llm_scheduler = LLMScheduler()
+        self.blob_store = BlobStore()
+        self.prompts = PromptRegistry()
+        # Pooled so ASI:One calls reuse the connection opened during warm-up
+        self.http_session = requests.Session()
+        self.started_at = time.time()
+        self.readiness = {'upstream': False}
+        self.warm_up_task = None
+        # Per-endpoint counters for run_pipeline, shared by message and REST callers
+        self.pipeline_stats = {}
         
-        # Load seed from private_keys.json if not provided
+        # UAGENT_SEED gives an extra replica its own address (listed as "role@port" in AGENT_ADDRESSES)
+        seed_phrase = seed_phrase or os.getenv('UAGENT_SEED')
+        # Load seed from private_keys.json (or UAGENT_KEYS_FILE) if not provided
         if not seed_phrase:
             try:
-                with open(os.path.join(os.path.dirname(__file__), 'private_keys.json'), 'r') as f:
-                    keys = json.load(f)
-                    agent_keys = keys.get(name, {})
-                    seed_phrase = agent_keys.get('identity_key')
+                seed_phrase = load_agent_seeds().get(name)
             except Exception as e:
                 print(f"⚠️ [{name}] Could not load seed from private_keys.json: {e}")
         
@@ -47,51 +110,295 @@ class BaseUAgent:
         # Enable mailbox for Agentverse connectivity
         agent_config["mailbox"] = True
         
+        # Resolve the other AI Company agents to their localhost endpoints so step messages skip the Almanac
+        try:
+            resolver = create_local_resolver()
+            if resolver is not None:
+                agent_config["resolve"] = resolver
+        except Exception as e:
+            print(f"⚠️ [{name}] Local agent resolver unavailable: {e}")
+        
         self.agent = Agent(**agent_config)
+        # REST handlers by path, so monolith mode can call them in-process
+        self.rest_handlers = {}
+        self.message_tasks = set()
         
         if not self.api_key:
             raise ValueError(f"ASI_ONE_API_KEY not found for {name}")
+        
+        self.setup_base_handlers()
+    
+    def setup_base_handlers(self):
+        """Setup REST endpoints shared by every agent"""
+        
+        @self.agent.on_event("startup")
+        async def warm_up_on_startup(ctx: Context):
+            """Warm up upstream connections and agent state in the background"""
+            self.start_warm_up()
+        
+        @self.agent.on_rest_get("/health", HealthResponse)
+        async def handle_health_rest(ctx: Context) -> HealthResponse:
+            """REST endpoint for liveness"""
+            return HealthResponse(
+                agent=self.name,
+                status='alive',
+                uptime_seconds=round(time.time() - self.started_at, 1),
+                in_flight=self.llm_scheduler.snapshot()['in_flight']
+            )
+        
+        @self.agent.on_rest_get("/ready", ReadinessResponse)
+        async def handle_ready_rest(ctx: Context) -> ReadinessResponse:
+            """REST endpoint for readiness; ready once every warm-up check has passed"""
+            checks = self.readiness_checks()
+            return ReadinessResponse(agent=self.name, ready=all(checks.values()), checks=checks)
+        
+        @self.rest_post("/usage-stats", UsageStatsRequest, UsageStatsResponse)
+        async def handle_usage_stats_rest(ctx: Context, req: UsageStatsRequest) -> UsageStatsResponse:
+            """REST endpoint for token usage and cost stats"""
+            stats = self.usage_tracker.get_stats(req.workflow_id)
+            if not req.workflow_id:
+                stats['token_budget'] = self.token_budget.snapshot()
+                stats['scheduler'] = self.llm_scheduler.snapshot()
+                stats['pipeline'] = self.pipeline_stats
+                stats['prompts'] = self.prompts.snapshot()
+            return UsageStatsResponse(agent=self.name, stats=stats)
+        
+        @self.agent.on_message(model=StepMessage)
+        async def handle_step_message(ctx: Context, sender: str, msg: StepMessage):
+            """Run a REST handler for a step sent as a message and reply with the same correlation ID"""
+            # Reply from a task so a slow step never holds up the agent's message queue
+            task = asyncio.create_task(self.answer_step_message(ctx, sender, msg))
+            self.message_tasks.add(task)
+            task.add_done_callback(self.message_tasks.discard)
+    
+    async def answer_step_message(self, ctx: Context, sender: str, msg: StepMessage):
+        """Run the requested REST handler in-process and send back its response"""
+        try:
+            data = await self.call_rest(msg.path, msg.payload)
+            reply = StepReply(correlation_id=msg.correlation_id, success=True, data=data)
+        except Exception as e:
+            print(f"❌ [{self.name}] Step message {msg.path} failed: {str(e)}")
+            reply = StepReply(correlation_id=msg.correlation_id, success=False, error=str(e))
+        await ctx.send(sender, reply)
     
-    async def call_asi_one(self, prompt: str, max_tokens: int = 1000) -> str:
-        """Call ASI:One API to generate response"""
+    def start_warm_up(self):
+        """Start warming up once"""
+        if self.warm_up_task is None:
+            self.warm_up_task = asyncio.create_task(self.warm_up())
+    
+    async def warm_up(self):
+        """Open the pooled ASI:One connection, retrying with backoff until it succeeds"""
+        delay = AGENT_WARMUP_RETRY_SECONDS
+        while not await self.warm_up_upstream():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, AGENT_WARMUP_MAX_RETRY_SECONDS)
+    
+    async def warm_up_upstream(self) -> bool:
+        """Make one cheap ASI:One request so the connection is open before the first real call"""
+        started_at = time.time()
+        try:
+            # Any HTTP response means DNS, TCP and TLS are done; only connection errors count as failure
+            await asyncio.to_thread(
+                self.http_session.get,
+                f"{self.base_url}/models",
+                headers={'Authorization': f'Bearer {self.api_key}'},
+                timeout=AGENT_WARMUP_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            print(f"⚠️ [{self.name}] ASI:One warm-up failed, not ready yet: {e}")
+            return False
+        self.readiness['upstream'] = True
+        print(f"🔥 [{self.name}] ASI:One connection warmed up in {time.time() - started_at:.2f}s")
+        return True
+    
+    def readiness_checks(self) -> Dict[str, bool]:
+        """Readiness conditions and whether each has passed"""
+        return dict(self.readiness)
+    
+    def rest_post(self, path: str, request_model, response_model):
+        """Register a REST POST handler with uAgents and keep it callable in-process"""
+        def decorator(handler):
+            self.rest_handlers[path] = (handler, request_model)
+            return self.agent.on_rest_post(path, request_model, response_model)(handler)
+        return decorator
+    
+    async def call_rest(self, path: str, payload: Dict[str, Any], timeout: float = None) -> Dict[str, Any]:
+        """Run a REST handler in-process with the same request and response models as over HTTP"""
+        if path not in self.rest_handlers:
+            raise Exception(f"{self.name} has no REST endpoint {path}")
+        handler, request_model = self.rest_handlers[path]
+        # REST handlers never use the context; only message handlers reply through it
+        response = await asyncio.wait_for(handler(None, request_model(**payload)), timeout)
+        return response.model_dump() if hasattr(response, 'model_dump') else response.dict()
+    
+    async def call_asi_one(self, prompt: Union[str, RenderedPrompt], max_tokens: int = 1000, endpoint: str = None,
+                           workflow_id: str = None, priority: int = PRIORITY_INTERACTIVE,
+                           deadline_seconds: float = None) -> str:
+        """Call ASI:One API to generate response, within deadline_seconds when the caller has a budget"""
+        deadline_at = time.time() + deadline_seconds if deadline_seconds is not None else None
+        # The call-site max_tokens is only the starting point; observed lengths take over
+        granted_tokens = self.token_budget.suggest(endpoint, max_tokens)
+        timeout = ASI_ONE_TIMEOUT_SECONDS
+        payload = {'model': 'asi1-mini'}
+        if isinstance(prompt, RenderedPrompt):
+            # Static prefix first, so identical prefixes across requests can hit a provider prompt cache
+            payload['messages'] = [
+                {'role': 'system', 'content': prompt.prefix},
+                {'role': 'user', 'content': prompt.text}
+            ]
+            if ASI_ONE_SEND_PROMPT_CACHE_KEY:
+                payload['prompt_cache_key'] = prompt.prefix_id
+            prompt = prompt.full_text()
+        else:
+            payload['messages'] = [{'role': 'user', 'content': prompt}]
+        # Set once the HTTP request is sent, so failures after that point are counted in usage
+        sent_at = None
+        recorded = False
+        deadline_capped = False
         try:
             print(f"🔑 [{self.name}] Calling ASI:One API...")
             print(f"🔑 [{self.name}] API Key length: {len(self.api_key)}")
             print(f"🔑 [{self.name}] API Key starts with sk_: {self.api_key.startswith('sk_')}")
             
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': 'asi1-mini',
-                    'max_tokens': max_tokens,
-                    'messages': [
-                        {
-                            'role': 'user',
-                            'content': prompt
-                        }
-                    ]
-                },
-                timeout=120
-            )
+            if deadline_seconds is not None and deadline_seconds < ASI_ONE_MIN_CALL_SECONDS:
+                # No point queueing for the scheduler with the budget already spent
+                raise Exception(f"Deadline budget exhausted ({deadline_seconds:.1f}s left)")
+            
+            # Queue behind the agent's scheduler; each workflow is its own fair-queuing flow
+            async with self.llm_scheduler.slot(priority, workflow_id or endpoint):
+                started_at = time.time()
+                if deadline_at is not None:
+                    # Time spent queueing counts against the budget
+                    remaining = deadline_at - started_at
+                    if remaining < ASI_ONE_MIN_CALL_SECONDS:
+                        raise Exception(f"Deadline budget exhausted ({remaining:.1f}s left)")
+                    affordable = int((remaining - ASI_ONE_REQUEST_OVERHEAD_SECONDS) * ASI_ONE_TOKENS_PER_SECOND)
+                    if affordable < granted_tokens:
+                        print(f"⏳ [{self.name}] Reduced-token mode: {granted_tokens} -> {affordable} tokens for {remaining:.1f}s budget")
+                        granted_tokens = max(affordable, 1)
+                        deadline_capped = True
+                    timeout = min(ASI_ONE_TIMEOUT_SECONDS, remaining)
+                sent_at = time.time()
+                response = await asyncio.to_thread(
+                    self.http_session.post,
+                    f"{self.base_url}/chat/completions",
+                    headers={
+                        'Authorization': f'Bearer {self.api_key}',
+                        'Content-Type': 'application/json'
+                    },
+                    json={**payload, 'max_tokens': granted_tokens},
+                    timeout=timeout
+                )
             
             if response.status_code == 200:
                 result = response.json()
-                content = result['choices'][0]['message']['content']
-                print(f"✅ [{self.name}] ASI:One response received ({len(content)} chars)")
+                choice = result['choices'][0]
+                content = choice['message']['content']
+                truncated = choice.get('finish_reason') == 'length'
+                usage = self.usage_tracker.record(
+                    endpoint, result.get('usage'), prompt=prompt, completion=content,
+                    max_tokens=max_tokens, latency=time.time() - started_at, workflow_id=workflow_id,
+                    max_tokens_granted=granted_tokens, truncated=truncated
+                )
+                recorded = True
+                if not (truncated and deadline_capped):
+                    # Truncation under a deadline cap says nothing about the endpoint's demand
+                    self.token_budget.observe(endpoint, usage['completion_tokens'], granted_tokens, truncated)
+                print(f"✅ [{self.name}] ASI:One response received ({len(content)} chars, "
+                      f"{usage['prompt_tokens']}+{usage['completion_tokens']}/{granted_tokens} tokens)")
+                if truncated:
+                    print(f"⚠️  [{self.name}] ASI:One response truncated at max_tokens={granted_tokens} ({endpoint})")
                 return content
             else:
                 print(f"❌ [{self.name}] ASI:One API error: {response.status_code}")
                 print(f"❌ [{self.name}] Error response: {response.text}")
+                self.usage_tracker.record(
+                    endpoint, None, prompt=prompt, max_tokens=max_tokens,
+                    latency=time.time() - started_at, workflow_id=workflow_id, error=True,
+                    max_tokens_granted=granted_tokens
+                )
+                recorded = True
                 raise Exception(f"ASI:One API error: {response.status_code}")
                 
         except Exception as e:
             print(f"❌ [{self.name}] Error calling ASI:One: {str(e)}")
+            if sent_at is not None and not recorded:
+                # Timeouts, connection errors and unreadable responses count as failed calls with their latency
+                self.usage_tracker.record(
+                    endpoint, None, prompt=prompt, max_tokens=max_tokens,
+                    latency=time.time() - sent_at, workflow_id=workflow_id, error=True,
+                    max_tokens_granted=granted_tokens
+                )
             raise e
     
+    async def run_pipeline(self, req: Model, endpoint: str, max_tokens: int,
+                           build_prompt: Callable, build_response: Callable, fallback_response: Callable,
+                           fallback_data: Callable = None, priority: int = PRIORITY_INTERACTIVE,
+                           activity: str = None, summarize: Callable = None, parse_json: bool = True) -> Model:
+        """Handle one request the same way for every transport: build prompt, call LLM, parse, validate, log"""
+        stats = self.pipeline_stats.setdefault(
+            endpoint, {'calls': 0, 'parse_failures': 0, 'fallbacks': 0, 'seconds': 0.0}
+        )
+        stats['calls'] += 1
+        started_at = time.time()
+        # Callers such as batch workflows can lower the scheduler class of their own requests
+        if getattr(req, 'priority', None) is not None:
+            priority = req.priority
+        degraded = False
+        try:
+            self.resolve_blob_refs(req)
+            prompt = build_prompt(req)
+            if asyncio.iscoroutine(prompt):
+                prompt = await prompt
+            
+            response = await self.call_asi_one(
+                prompt, max_tokens, endpoint=endpoint,
+                workflow_id=getattr(req, 'workflow_id', None), priority=priority,
+                deadline_seconds=getattr(req, 'deadline_seconds', None)
+            )
+            
+            data = response
+            if parse_json:
+                try:
+                    data = json.loads(clean_llm_json(response))
+                    if not isinstance(data, dict):
+                        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+                except ValueError:
+                    stats['parse_failures'] += 1
+                    if fallback_data is None:
+                        raise
+                    print(f"❌ [{self.name}] {endpoint}: JSON parsing failed, using fallback data")
+                    data = fallback_data(req)
+                    degraded = True
+            
+            # Building the response models validates the parsed data
+            result = build_response(data, req)
+            if degraded:
+                self.mark_degraded(result)
+            if activity:
+                self.log_activity(activity, summarize(req, result) if summarize else None)
+            return result
+            
+        except Exception as e:
+            stats['fallbacks'] += 1
+            print(f"❌ [{self.name}] {endpoint}: {str(e)}")
+            return self.mark_degraded(fallback_response(req))
+        finally:
+            stats['seconds'] = round(stats['seconds'] + time.time() - started_at, 3)
+    
+    def mark_degraded(self, result: Any) -> Any:
+        """Flag fallback content so callers don't checkpoint or cache it as a real answer"""
+        if isinstance(result, PipelineResponse):
+            result.degraded = True
+        return result
+    
+    def resolve_blob_refs(self, req: Model) -> Model:
+        """Replace {"$ref": hash} request fields with the payloads they point to in the blob store"""
+        for field, value in list(vars(req).items()):
+            if is_blob_ref(value):
+                setattr(req, field, self.blob_store.resolve(value))
+        return req
+    
     def log_activity(self, activity: str, data: Dict[str, Any] = None):
         """Log agent activity"""
         print(f"[{self.name}] {activity}: {data or 'No data'}")
@@ -0,0 +1,4 @@
+"""
+Benchmarks for AI Company uAgents
+Repeatable performance measurements with JSON reports for release-to-release comparison
+"""
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the hot paths of AI Company uAgents
+HTML parsing, trends statistics, LLM JSON cleanup, knowledge graph queries, research memory ingestion
+and inter-agent payload serialization
+
+Usage:
+    python3 benchmarks/micro_benchmarks.py --repeat 20
+    python3 benchmarks/micro_benchmarks.py --html-corpus ./saved_pages --compare results/micro-abc123-1700000000.json
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Any, List, Callable, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.append(AGENTS_DIR)
+sys.path.append(BENCHMARK_DIR)
+
+from report import summarize, save_report, load_report, compare_reports, print_comparison
+
+WORDS = ("market growth customer platform revenue pricing segment automation analytics "
+         "subscription retention enterprise startup funding product launch strategy").split()
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Time repeated calls of a function and summarize seconds per call"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started_at)
+    return summarize(samples)
+
+
+def synthetic_html(rng: random.Random, sections: int) -> str:
+    """Build a deterministic HTML page with scripts, headings, paragraphs and links"""
+    parts = [
+        "<html><head><title>Synthetic market report</title>",
+        '<meta name="description" content="Synthetic page for parser benchmarks">',
+        "<style>body { font-family: sans-serif; }</style></head><body>"
+    ]
+    for index in range(sections):
+        words = ' '.join(rng.choice(WORDS) for _ in range(80))
+        parts.append(f"<h2>Section {index}</h2><p>{words}</p>")
+        parts.append(f'<a href="https://example.com/{index}">Link {index}</a><a href="/relative/{index}">Local</a>')
+        parts.append(f"<script>var section{index} = {index};</script>")
+    parts.append("</body></html>")
+    return ''.join(parts)
+
+
+def load_html_corpus(corpus_dir: Optional[str], rng: random.Random) -> Dict[str, str]:
+    """Load saved HTML pages, or generate small/medium/large synthetic pages"""
+    if corpus_dir:
+        pages = {}
+        for path in sorted(glob.glob(os.path.join(corpus_dir, '*.htm*'))):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages[os.path.basename(path)] = f.read()
+        if pages:
+            return pages
+        print(f"⚠️  No HTML files in {corpus_dir}, using synthetic pages")
+    return {
+        'small': synthetic_html(rng, 10),
+        'medium': synthetic_html(rng, 200),
+        'large': synthetic_html(rng, 2000)
+    }
+
+
+def synthetic_llm_output(rng: random.Random, items: int) -> str:
+    """Build a markdown-wrapped JSON completion with control characters, like real LLM output"""
+    payload = {
+        "competitors": [
+            {
+                "name": f"Competitor {index}",
+                "description": ' '.join(rng.choice(WORDS) for _ in range(40)),
+                "strengths": ' '.join(rng.choice(WORDS) for _ in range(10)),
+                "weaknesses": ' '.join(rng.choice(WORDS) for _ in range(10))
+            }
+            for index in range(items)
+        ]
+    }
+    body = json.dumps(payload, indent=2).replace('Competitor', 'Compet\u0007itor')
+    return f"Here is the analysis you asked for:\n```json\n{body}\n```\nLet me know if you need more."
+
+
+def synthetic_agent_payload(rng: random.Random, items: int) -> Dict[str, Any]:
+    """Build a Head of Engineering request: idea plus four nested upstream outputs"""
+    def text(words: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+    return {
+        "idea": {"title": text(5), "description": text(40)},
+        "research": {"competitors": [{"name": text(2), "description": text(40), "strengths": text(10)} for _ in range(items)]},
+        "product": {"product_name": text(3), "features": [{"name": text(3), "description": text(30)} for _ in range(items)]},
+        "marketing_strategy": {"key_messages": [text(12) for _ in range(items)], "brand_positioning": text(30)},
+        "technical_strategy": {"architecture": text(60), "components": [{"name": text(2), "details": text(25)} for _ in range(items)]},
+        "workflow_id": "benchmark"
+    }
+
+
+def bench_serialization(args, rng: random.Random) -> Dict[str, Any]:
+    """Encode/decode cost and body size of agent payloads per wire format, against requests' default json.dumps"""
+    from blob_store import BlobStore
+    from wire_codec import encode, decode, available_codecs, available_compressions, orjson
+    import tempfile
+
+    results = {}
+    for name, items in (('small', 5), ('large', 200)):
+        payload = synthetic_agent_payload(rng, items)
+        baseline = json.dumps(payload).encode('utf-8')
+        variants = {
+            'json_default': (lambda: json.dumps(payload).encode('utf-8'), lambda data: json.loads(data)),
+            'json_pretty': (lambda: json.dumps(payload, indent=2).encode('utf-8'), lambda data: json.loads(data))
+        }
+        for codec in available_codecs():
+            for compression in available_compressions():
+                variants[f"{'orjson' if codec == 'json' and orjson else codec}_{compression}"] = (
+                    lambda codec=codec, compression=compression: encode(payload, codec, compression, min_bytes=0)[0],
+                    lambda data, codec=codec, compression=compression: decode(data, codec, compression)
+                )
+
+        # Pass-by-reference: upstream outputs written once, each hop only carries {"$ref": hash}
+        with tempfile.TemporaryDirectory() as directory:
+            store = BlobStore(directory, min_bytes=0)
+            referenced = {key: store.put(value) if isinstance(value, dict) else value for key, value in payload.items()}
+            variants['blob_refs'] = (
+                lambda: json.dumps(referenced).encode('utf-8'),
+                lambda data: {key: store.resolve(value) for key, value in json.loads(data).items()}
+            )
+
+            for variant, (encoder, decoder) in variants.items():
+                body = encoder()
+                results[f"{name}/{variant}"] = {
+                    'bytes': len(body),
+                    'bytes_vs_json_default': round(len(body) / len(baseline), 4),
+                    'seconds_per_call': measure(encoder, args.repeat),
+                    'decode_seconds_per_call': measure(lambda: decoder(body), args.repeat)
+                }
+    return results
+
+
+def bench_html_parsing(args, rng: random.Random) -> Dict[str, Any]:
+    """WebScraper.parse_html over the HTML corpus"""
+    from tools.web_scraper import WebScraper
+
+    scraper = WebScraper()
+    results = {}
+    for name, html in load_html_corpus(args.html_corpus, rng).items():
+        results[name] = {
+            'bytes': len(html),
+            'seconds_per_call': measure(lambda: scraper.parse_html(html, name), args.repeat)
+        }
+    return results
+
+
+def bench_trends_stats(args, rng: random.Random) -> Dict[str, Any]:
+    """TrendsAnalyzer.summarize_interest on synthetic interest-over-time DataFrames"""
+    import pandas as pd
+    from tools.trends_analyzer import TrendsAnalyzer
+
+    keywords = ['kw0', 'kw1', 'kw2', 'kw3', 'kw4']
+    results = {}
+    for name, periods in (('weekly_12m', 52), ('daily_5y', 1825)):
+        frame = pd.DataFrame(
+            {keyword: [rng.randint(0, 100) for _ in range(periods)] for keyword in keywords},
+            index=pd.date_range('2020-01-01', periods=periods, freq='D')
+        )
+        frame['isPartial'] = False
+        results[name] = {
+            'rows': periods,
+            'seconds_per_call': measure(lambda: TrendsAnalyzer.summarize_interest(frame, keywords), args.repeat)
+        }
+    return results
+
+
+def bench_json_cleanup(args, rng: random.Random) -> Dict[str, Any]:
+    """clean_llm_json plus json.loads on large completions"""
+    from llm_json import clean_llm_json
+
+    results = {}
+    for items in (10, 200, 2000):
+        output = synthetic_llm_output(rng, items)
+        results[f"{items}_items"] = {
+            'bytes': len(output),
+            'seconds_per_call': measure(lambda: json.loads(clean_llm_json(output)), args.repeat)
+        }
+    return results
+
+
+def bench_knowledge_query(args, rng: random.Random) -> Dict[str, Any]:
+    """BusinessKnowledgeGraph.query_industry_info as the space grows"""
+    from hyperon import S, E, ValueAtom
+    from knowledge.business_knowledge import BusinessKnowledgeGraph
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph = BusinessKnowledgeGraph()
+
+    results = {}
+    added = 0
+    for target in (0, 1000, 10000):
+        space = graph.metta.space()
+        while added < target:
+            space.add_atom(E(S("industry"), S(f"Industry{added}"), S("market_size"), ValueAtom(f"${added}B")))
+            added += 1
+        results[f"{target}_extra_atoms"] = {
+            'extra_atoms': target,
+            'seconds_per_call': measure(lambda: graph.query_industry_info("AI"), args.repeat)
+        }
+    return results
+
+
+def bench_memory_ingestion(args, rng: random.Random) -> Dict[str, Any]:
+    """ResearchMemorySystem.add_research_record ingestion rate"""
+    from knowledge.research_memory import ResearchMemorySystem
+
+    records = args.records
+    with contextlib.redirect_stdout(io.StringIO()):
+        memory = ResearchMemorySystem()
+        samples = []
+        for index in range(records):
+            started_at = time.perf_counter()
+            memory.add_research_record(
+                idea_title=f"Benchmark Idea {index}",
+                industry=rng.choice(['AI', 'SaaS', 'FinTech', 'HealthTech']),
+                business_model=rng.choice(['Subscription', 'Marketplace', 'Freemium']),
+                market_segment='SMB',
+                competitors=[f"Competitor {index}-{n}" for n in range(3)],
+                market_size='$1B',
+                growth_potential='High',
+                key_challenges=['Competition', 'Regulation'],
+                opportunities=['Automation', 'Expansion'],
+                success_rate='70%',
+                timestamp='2024-01-01T00:00:00Z'
+            )
+            samples.append(time.perf_counter() - started_at)
+
+    total = sum(samples)
+    return {
+        'records': {
+            'count': records,
+            'seconds_per_call': summarize(samples),
+            'records_per_second': round(records / total, 2) if total else 0.0
+        }
+    }
+
+
+BENCHMARKS = {
+    'html_parsing': bench_html_parsing,
+    'trends_stats': bench_trends_stats,
+    'json_cleanup': bench_json_cleanup,
+    'knowledge_query': bench_knowledge_query,
+    'memory_ingestion': bench_memory_ingestion,
+    'serialization': bench_serialization
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for tools, parsing and knowledge queries")
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS), help="Run a subset of benchmarks")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed calls per case")
+    parser.add_argument('--records', type=int, default=500, help="Records for the memory ingestion benchmark")
+    parser.add_argument('--html-corpus', default=os.getenv('BENCHMARK_HTML_CORPUS'), help="Directory of saved .html pages")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="Report path (defaults to benchmarks/results/)")
+    parser.add_argument('--compare', default=None, help="Baseline report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed relative slowdown when comparing")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the micro-benchmarks"""
+    args = parse_args(argv)
+    selected = args.only or list(BENCHMARKS)
+
+    print(f"\n{'='*60}")
+    print(f"⏱️  MICRO-BENCHMARKS: {', '.join(selected)}")
+    print(f"{'='*60}\n")
+
+    results = {'config': {'repeat': args.repeat, 'records': args.records, 'seed': args.seed,
+                          'html_corpus': args.html_corpus},
+               'benchmarks': {}, 'skipped': {}}
+    for name in selected:
+        # Each benchmark gets its own RNG so adding one doesn't shift the others' inputs
+        rng = random.Random(f"{args.seed}-{name}")
+        try:
+            results['benchmarks'][name] = BENCHMARKS[name](args, rng)
+            print(f"✅ {name}")
+            for case, data in results['benchmarks'][name].items():
+                stats = data['seconds_per_call']
+                print(f"   {case:<24} p50 {stats['p50'] * 1000:>10.3f} ms   p95 {stats['p95'] * 1000:>10.3f} ms")
+        except ImportError as e:
+            print(f"⚠️  Skipping {name}: {e}")
+            results['skipped'][name] = str(e)
+
+    path = save_report('micro', results, args.output)
+    print(f"\n📄 Report saved to {path}")
+
+    if args.compare:
+        comparison = compare_reports(load_report(args.compare), load_report(path), args.threshold)
+        print_comparison(comparison)
+        if comparison['regressions']:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
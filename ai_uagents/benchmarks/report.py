@@ -0,0 +1,168 @@
+"""
+Benchmark report helpers
+Percentile summaries, JSON result files and release-to-release comparison
+
+Usage:
+    python3 benchmarks/report.py results/micro-abc123.json results/micro-def456.json --threshold 0.1
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(math.ceil(pct / 100.0 * len(ordered))) - 1)
+    return ordered[max(index, 0)]
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    """Summarize samples as count, mean, p50/p95/p99 and extremes"""
+    if not values:
+        return {'count': 0, 'mean': 0.0, 'min': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 6),
+        'min': round(min(values), 6),
+        'p50': round(percentile(values, 50), 6),
+        'p95': round(percentile(values, 95), 6),
+        'p99': round(percentile(values, 99), 6),
+        'max': round(max(values), 6)
+    }
+
+
+def get_git_revision() -> Optional[str]:
+    """Get the current git commit so results can be matched to a release"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    """Describe the machine and interpreter a benchmark ran on"""
+    return {
+        'git_revision': get_git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def save_report(benchmark: str, results: Dict[str, Any], output: str = None) -> str:
+    """Write a benchmark report as JSON and return its path"""
+    report = {
+        'benchmark': benchmark,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'environment': environment_info(),
+        'results': results
+    }
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        revision = report['environment']['git_revision'] or 'unknown'
+        output = os.path.join(RESULTS_DIR, f"{benchmark}-{revision}-{int(time.time())}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    return output
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Load a saved benchmark report"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def collect_metrics(node: Any, prefix: str = '') -> Dict[str, float]:
+    """Flatten a report into comparable metrics (latency summaries and per-second rates)"""
+    metrics = {}
+    if isinstance(node, dict):
+        if 'p50' in node and 'p95' in node:
+            metrics[f"{prefix}.p50"] = node['p50']
+            metrics[f"{prefix}.p95"] = node['p95']
+            return metrics
+        for key, value in node.items():
+            path = f"{prefix}.{key}" if prefix else str(key)
+            if key.endswith('_per_second') and isinstance(value, (int, float)):
+                metrics[path] = value
+            else:
+                metrics.update(collect_metrics(value, path))
+    return metrics
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> Dict[str, Any]:
+    """Compare two reports of the same benchmark and flag metrics that got worse than the threshold"""
+    baseline_metrics = collect_metrics(baseline.get('results', {}))
+    current_metrics = collect_metrics(current.get('results', {}))
+
+    changes = []
+    for name in sorted(set(baseline_metrics) & set(current_metrics)):
+        before = baseline_metrics[name]
+        after = current_metrics[name]
+        if not before:
+            continue
+        change = (after - before) / before
+        # Rates are better when higher, latencies when lower
+        higher_is_better = name.endswith('_per_second')
+        regressed = change < -threshold if higher_is_better else change > threshold
+        changes.append({
+            'metric': name,
+            'baseline': before,
+            'current': after,
+            'change': round(change, 4),
+            'regressed': regressed
+        })
+
+    return {
+        'benchmark': current.get('benchmark'),
+        'baseline_revision': baseline.get('environment', {}).get('git_revision'),
+        'current_revision': current.get('environment', {}).get('git_revision'),
+        'threshold': threshold,
+        'changes': changes,
+        'regressions': [change for change in changes if change['regressed']]
+    }
+
+
+def print_comparison(comparison: Dict[str, Any]):
+    """Print a comparison table"""
+    print(f"\n📊 {comparison['benchmark']}: {comparison['baseline_revision']} -> {comparison['current_revision']} "
+          f"(threshold {comparison['threshold']:.0%})")
+    for change in comparison['changes']:
+        status = '❌' if change['regressed'] else '✅'
+        print(f"   {status} {change['metric']:<50} {change['baseline']:>12.6f} -> {change['current']:>12.6f} ({change['change']:+.1%})")
+    if comparison['regressions']:
+        print(f"\n❌ {len(comparison['regressions'])} regression(s) above threshold")
+    else:
+        print(f"\n✅ No regressions above threshold")
+
+
+def main(argv: List[str] = None):
+    """Compare two saved reports; exits non-zero on regressions so it can gate a deploy"""
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    comparison = compare_reports(load_report(args.baseline), load_report(args.current), args.threshold)
+    print_comparison(comparison)
+    sys.exit(1 if comparison['regressions'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+End-to-end workflow throughput benchmark
+Starts the mock ASI:One server and all workflow agents, drives /process-business-idea
+at a fixed concurrency and reports workflows/sec, per-step percentiles and peak RSS per agent
+
+In monolith mode only the orchestrator is started and it runs the agents in-process;
+--mode both runs the HTTP and monolith deployments back to back and compares them.
+--transport message sends steps as correlated uAgents messages instead of REST calls
+(agents get throwaway seeds so their addresses are known); --transport both compares the two
+
+Usage:
+    python3 benchmarks/workflow_benchmark.py --workflows 40 --concurrency 4 --latency lognormal:-1.5,0.4
+    python3 benchmarks/workflow_benchmark.py --mode both --workflows 40
+    python3 benchmarks/workflow_benchmark.py --transport both --workflows 200 --concurrency 50
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+
+import requests
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.append(BENCHMARK_DIR)
+
+from report import summarize, save_report, load_report, compare_reports, print_comparison
+
+# Agent names as they appear in the keys file
+AGENT_NAMES = [
+    'CEO Agent', 'Research Agent (MeTTa)', 'Product Agent', 'CMO Agent', 'CTO Agent',
+    'Head of Engineering Agent', 'Finance Agent', 'Workflow Orchestrator'
+]
+
+# Agents in the orchestrated workflow, started in dependency order (orchestrator last)
+WORKFLOW_AGENTS = [
+    ('ceo', 'ceo_uagent.py', 8001),
+    ('product', 'product_uagent.py', 8003),
+    ('cmo', 'cmo_uagent.py', 8004),
+    ('cto', 'cto_uagent.py', 8005),
+    ('head_engineering', 'head_engineering_uagent.py', 8006),
+    ('finance', 'finance_uagent.py', 8007),
+    ('research_metta', 'research_metta_uagent.py', 8009),
+    ('orchestrator', 'orchestrator_uagent.py', 8008)
+]
+
+ORCHESTRATOR_PORT = 8008
+
+
+def wait_for_port(port: int, timeout: float) -> bool:
+    """Wait until something accepts TCP connections on a local port"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.25)
+    return False
+
+
+def read_memory_kb(pid: int) -> Dict[str, int]:
+    """Read current and peak resident memory of a process from /proc (Linux only)"""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    key, value = line.split(':', 1)
+                    memory[key] = int(value.strip().split()[0])
+    except (OSError, ValueError):
+        pass
+    return memory
+
+
+class ProcessGroup:
+    """Starts the mock server and agents as child processes and tracks their memory"""
+
+    def __init__(self, log_dir: str, env: Dict[str, str]):
+        self.log_dir = log_dir
+        self.env = env
+        self.processes: Dict[str, subprocess.Popen] = {}
+        self.peak_rss_kb: Dict[str, int] = {}
+        self._log_files = []
+        self._sampling = False
+        self._sampler = None
+
+    def start(self, name: str, args: List[str], port: int, timeout: float = 60.0):
+        """Start one process and wait for its port"""
+        log_file = open(os.path.join(self.log_dir, f"{name}.log"), 'w')
+        self._log_files.append(log_file)
+        process = subprocess.Popen(
+            [sys.executable] + args,
+            cwd=AGENTS_DIR,
+            env=self.env,
+            stdout=log_file,
+            stderr=subprocess.STDOUT
+        )
+        self.processes[name] = process
+        if not wait_for_port(port, timeout):
+            raise RuntimeError(f"{name} did not start on port {port} (see {log_file.name})")
+        print(f"✅ Started {name} on port {port} (pid {process.pid})")
+
+    def start_sampling(self, interval: float = 0.5):
+        """Sample RSS in the background in case VmHWM is unavailable"""
+        self._sampling = True
+
+        def sample():
+            while self._sampling:
+                self.update_peaks()
+                time.sleep(interval)
+
+        self._sampler = threading.Thread(target=sample, daemon=True)
+        self._sampler.start()
+
+    def update_peaks(self):
+        """Record the highest RSS seen for every process"""
+        for name, process in self.processes.items():
+            memory = read_memory_kb(process.pid)
+            peak = max(memory.get('VmHWM', 0), memory.get('VmRSS', 0))
+            if peak:
+                self.peak_rss_kb[name] = max(self.peak_rss_kb.get(name, 0), peak)
+
+    def stop(self):
+        """Stop sampling and terminate all processes"""
+        self._sampling = False
+        if self._sampler:
+            self._sampler.join(timeout=2)
+        self.update_peaks()
+        for process in reversed(list(self.processes.values())):
+            process.terminate()
+        for process in self.processes.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for log_file in self._log_files:
+            log_file.close()
+
+
+def write_benchmark_keys(log_dir: str) -> str:
+    """Write throwaway agent seeds so every agent address is known for the message transport"""
+    path = os.path.join(log_dir, 'benchmark_keys.json')
+    with open(path, 'w') as f:
+        json.dump({name: {'identity_key': f"benchmark-{uuid.uuid4().hex}"} for name in AGENT_NAMES}, f)
+    return path
+
+
+def run_workflow(index: int, timeout: float) -> Dict[str, Any]:
+    """Run one workflow through the orchestrator REST endpoint"""
+    started_at = time.perf_counter()
+    try:
+        response = requests.post(
+            f"http://127.0.0.1:{ORCHESTRATOR_PORT}/process-business-idea",
+            json={"user_input": f"Benchmark business idea #{index}: AI assistant for small teams"},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        body = response.json()
+    except Exception as e:
+        return {'success': False, 'error': str(e), 'latency': time.perf_counter() - started_at}
+
+    summary = (body.get('data') or {}).get('workflow_summary', {})
+    return {
+        'success': bool(body.get('success')),
+        # Turned away by admission control rather than failed
+        'rejected': body.get('retry_after') is not None,
+        'error': body.get('error'),
+        'latency': time.perf_counter() - started_at,
+        'step_timings': summary.get('step_timings', {})
+    }
+
+
+def drive_workflows(count: int, concurrency: int, timeout: float) -> Dict[str, Any]:
+    """Run workflows at a fixed concurrency and aggregate the results"""
+    results = []
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_workflow, index, timeout) for index in range(count)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = '✅' if result['success'] else ('⏳' if result.get('rejected') else '❌')
+            print(f"   {status} workflow {len(results)}/{count} in {result['latency']:.2f}s")
+    elapsed = time.perf_counter() - started_at
+
+    succeeded = [result for result in results if result['success']]
+    rejected = [result for result in results if result.get('rejected')]
+    step_samples: Dict[str, List[float]] = {}
+    for result in succeeded:
+        for step, seconds in result.get('step_timings', {}).items():
+            step_samples.setdefault(step, []).append(seconds)
+
+    errors: Dict[str, int] = {}
+    for result in results:
+        if not result['success'] and not result.get('rejected'):
+            key = (result.get('error') or 'unknown')[:120]
+            errors[key] = errors.get(key, 0) + 1
+
+    return {
+        'workflows': count,
+        'succeeded': len(succeeded),
+        'rejected': len(rejected),
+        'failed': count - len(succeeded) - len(rejected),
+        'elapsed_seconds': round(elapsed, 4),
+        'workflows_per_second': round(len(succeeded) / elapsed, 4) if elapsed else 0.0,
+        'end_to_end_latency': summarize([result['latency'] for result in succeeded]),
+        'steps': {step: summarize(samples) for step, samples in sorted(step_samples.items())},
+        'errors': errors
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="End-to-end workflow throughput benchmark")
+    parser.add_argument('--workflows', type=int, default=20, help="Measured workflows")
+    parser.add_argument('--warmup', type=int, default=2, help="Unmeasured warm-up workflows")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=600.0, help="Per-workflow HTTP timeout in seconds")
+    parser.add_argument('--mock-port', type=int, default=8090)
+    parser.add_argument('--latency', default='fixed:0.05', help="Mock ASI:One latency distribution")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--truncation-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--startup-timeout', type=float, default=90.0)
+    parser.add_argument('--mode', choices=['http', 'monolith', 'both'], default='http',
+                        help="Agents as separate HTTP processes, in-process in the orchestrator, or both")
+    parser.add_argument('--transport', choices=['rest', 'message', 'both'], default='rest',
+                        help="Orchestrator-to-agent calls over REST, uAgents messages, or both compared (http mode)")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed relative slowdown when comparing modes")
+    parser.add_argument('--output', default=None, help="Report path (defaults to benchmarks/results/)")
+    return parser.parse_args(argv)
+
+
+def run_mode(args: argparse.Namespace, mode: str, output: Optional[str] = None, transport: str = 'rest') -> str:
+    """Benchmark one deployment mode and transport and return the report path"""
+    run_id = time.strftime('%Y%m%d-%H%M%S')
+    label = mode if transport == 'rest' else f"{mode}-{transport}"
+    log_dir = os.path.join(BENCHMARK_DIR, 'results', f"logs-{run_id}-{label}")
+    os.makedirs(log_dir, exist_ok=True)
+
+    env = dict(os.environ)
+    env.update({
+        'ASI_ONE_BASE_URL': f"http://127.0.0.1:{args.mock_port}/v1",
+        'ASI_ONE_API_KEY': env.get('BENCHMARK_ASI_ONE_API_KEY', 'sk_mock_benchmark'),
+        'ORCHESTRATOR_MODE': 'monolith' if mode == 'monolith' else 'distributed',
+        # Fresh checkpoints and no cross-workflow step cache so every run does the same work
+        'WORKFLOW_STORE_PATH': os.path.join(log_dir, 'workflow_store.db'),
+        'STEP_CACHE_STEPS': '',
+        'AGENT_TRANSPORT': transport,
+        # Admit every benchmark workflow and give each one its own step slots, so --concurrency is what's measured
+        # (limits exported in the environment still win, to benchmark admission itself)
+        'ORCHESTRATOR_MAX_CONCURRENT_WORKFLOWS': env.get('ORCHESTRATOR_MAX_CONCURRENT_WORKFLOWS', str(args.concurrency)),
+        'ORCHESTRATOR_MAX_WAITING_WORKFLOWS': env.get('ORCHESTRATOR_MAX_WAITING_WORKFLOWS', str(args.concurrency)),
+        'ORCHESTRATOR_AGENT_CONCURRENCY': env.get('ORCHESTRATOR_AGENT_CONCURRENCY', str(args.concurrency)),
+        'PYTHONUNBUFFERED': '1'
+    })
+    if transport == 'message':
+        env['UAGENT_KEYS_FILE'] = write_benchmark_keys(log_dir)
+
+    print(f"\n{'='*60}")
+    print(f"🏁 WORKFLOW BENCHMARK ({label}): {args.workflows} workflows @ concurrency {args.concurrency}")
+    print(f"{'='*60}\n")
+
+    group = ProcessGroup(log_dir, env)
+    try:
+        group.start('mock_asi_one', [
+            'mock_asi_one.py',
+            '--port', str(args.mock_port),
+            '--latency', args.latency,
+            '--error-rate', str(args.error_rate),
+            '--truncation-rate', str(args.truncation_rate),
+            '--seed', str(args.seed)
+        ], args.mock_port, args.startup_timeout)
+        for name, script, port in WORKFLOW_AGENTS:
+            if mode == 'monolith' and name != 'orchestrator':
+                continue
+            group.start(name, [script], port, args.startup_timeout)
+        group.start_sampling()
+
+        if args.warmup:
+            print(f"\n🔥 Warming up with {args.warmup} workflows...")
+            drive_workflows(args.warmup, min(args.concurrency, args.warmup), args.timeout)
+
+        print(f"\n🚀 Running {args.workflows} measured workflows...")
+        results = drive_workflows(args.workflows, args.concurrency, args.timeout)
+
+        try:
+            metrics = requests.get(f"http://127.0.0.1:{ORCHESTRATOR_PORT}/metrics", timeout=5).json()
+            results['transport'] = metrics.get('transport')
+        except Exception as e:
+            print(f"⚠️  Could not read orchestrator metrics: {e}")
+        try:
+            results['mock_asi_one'] = requests.get(f"http://127.0.0.1:{args.mock_port}/mock/stats", timeout=5).json()
+        except Exception as e:
+            print(f"⚠️  Could not read mock stats: {e}")
+    finally:
+        group.stop()
+
+    results['config'] = {
+        'mode': mode,
+        'transport': transport,
+        'workflows': args.workflows,
+        'warmup': args.warmup,
+        'concurrency': args.concurrency,
+        'max_concurrent_workflows': int(env['ORCHESTRATOR_MAX_CONCURRENT_WORKFLOWS']),
+        'agent_concurrency': int(env['ORCHESTRATOR_AGENT_CONCURRENCY']),
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'truncation_rate': args.truncation_rate,
+        'seed': args.seed
+    }
+    results['peak_rss_mb'] = {name: round(kb / 1024.0, 1) for name, kb in sorted(group.peak_rss_kb.items())}
+    results['log_dir'] = log_dir
+
+    path = save_report('workflow', results, output)
+
+    print(f"\n{'='*60}")
+    print(f"📊 {results['succeeded']}/{results['workflows']} workflows succeeded, "
+          f"{results['workflows_per_second']} workflows/sec, {results['rejected']} rejected by admission")
+    print(f"{'step':<20}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for step, stats in results['steps'].items():
+        print(f"{step:<20}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}")
+    print(f"\n💾 Peak RSS (MB): {results['peak_rss_mb']}")
+    print(f"📄 Report saved to {path}")
+    print(f"{'='*60}\n")
+    return path
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the benchmark"""
+    args = parse_args(argv)
+    if args.transport == 'both':
+        rest_path = run_mode(args, 'http', transport='rest')
+        message_path = run_mode(args, 'http', transport='message')
+        print(f"⚖️  Messages vs REST ({os.path.basename(message_path)} vs {os.path.basename(rest_path)})")
+        print_comparison(compare_reports(load_report(rest_path), load_report(message_path), args.threshold))
+        return
+    if args.mode != 'both':
+        run_mode(args, args.mode, args.output, args.transport)
+        return
+
+    http_path = run_mode(args, 'http')
+    monolith_path = run_mode(args, 'monolith')
+    print(f"⚖️  Monolith vs HTTP ({os.path.basename(monolith_path)} vs {os.path.basename(http_path)})")
+    print_comparison(compare_reports(load_report(http_path), load_report(monolith_path), args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Content-addressed blob store for AI Company agents
+Large payloads are written once by SHA-256 and passed between agents as {"$ref": "<hash>"}
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any
+from wire_codec import (
+    dumps, loads, compress, decompress, available_compressions, COMPRESSION_NONE, COMPRESSION_GZIP, COMPRESSION_ZSTD
+)
+
+# Shared memory when available so reads never touch the disk; all agents run on the same host
+BLOB_STORE_DIR = os.getenv(
+    'BLOB_STORE_DIR',
+    '/dev/shm/ai_company_blobs' if os.path.isdir('/dev/shm')
+    else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blobs')
+)
+BLOB_STORE_ENABLED = os.getenv('BLOB_STORE_ENABLED', '1').lower() not in ('0', 'false', 'no')
+# Payloads smaller than this are cheaper to send inline
+BLOB_MIN_BYTES = int(os.getenv('BLOB_MIN_BYTES', '2048'))
+BLOB_TTL_SECONDS = int(os.getenv('BLOB_TTL_SECONDS', '604800'))
+# Cap on blob bytes kept (shared memory is RAM); the least recently used blobs go first (0 disables)
+BLOB_MAX_BYTES = int(os.getenv('BLOB_MAX_BYTES', str(512 * 1024 * 1024)))
+BLOB_PRUNE_INTERVAL_SECONDS = float(os.getenv('BLOB_PRUNE_INTERVAL_SECONDS', '900'))
+# Decoded blobs kept in memory per process
+BLOB_CACHE_ITEMS = int(os.getenv('BLOB_CACHE_ITEMS', '256'))
+# Compression for blobs above BLOB_COMPRESS_MIN_BYTES (none, gzip or zstd); off by default because
+# shared memory reads are cheaper than decompression, see the serialization micro-benchmark
+BLOB_COMPRESSION = os.getenv('BLOB_COMPRESSION', COMPRESSION_NONE)
+BLOB_COMPRESS_MIN_BYTES = int(os.getenv('BLOB_COMPRESS_MIN_BYTES', '65536'))
+
+# File suffix per compression; readers try each so writers can change settings
+BLOB_SUFFIXES = {
+    COMPRESSION_NONE: '.json',
+    COMPRESSION_GZIP: '.json.gz',
+    COMPRESSION_ZSTD: '.json.zst'
+}
+
+REF_KEY = '$ref'
+
+
+def is_blob_ref(value: Any) -> bool:
+    """Check whether a value is a blob reference"""
+    return isinstance(value, dict) and len(value) == 1 and isinstance(value.get(REF_KEY), str)
+
+
+class BlobStore:
+    """Writes JSON values once by content hash and reads them back with an in-process cache"""
+
+    def __init__(self, directory: str = BLOB_STORE_DIR, min_bytes: int = BLOB_MIN_BYTES,
+                 cache_items: int = BLOB_CACHE_ITEMS, enabled: bool = BLOB_STORE_ENABLED,
+                 compression: str = BLOB_COMPRESSION):
+        self.directory = directory
+        self.min_bytes = min_bytes
+        self.compression = compression if compression in available_compressions() else COMPRESSION_NONE
+        self.cache_items = cache_items
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        if self.enabled:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+            except OSError as e:
+                print(f"⚠️  Blob store unavailable at {self.directory}, sending payloads inline: {e}")
+                self.enabled = False
+
+    def _path(self, digest: str, compression: str = COMPRESSION_NONE) -> str:
+        """File path of a blob"""
+        return os.path.join(self.directory, digest[:2], f"{digest}{BLOB_SUFFIXES[compression]}")
+
+    def put(self, value: Any) -> Any:
+        """Store a value and return a reference to it, or the value itself if it is small"""
+        if not self.enabled or value is None or is_blob_ref(value):
+            return value
+        data = dumps(value, sort_keys=True)
+        if len(data) < self.min_bytes:
+            return value
+
+        digest = hashlib.sha256(data).hexdigest()
+        compression = self.compression if len(data) >= BLOB_COMPRESS_MIN_BYTES else COMPRESSION_NONE
+        path = self._path(digest, compression)
+        try:
+            if os.path.exists(path):
+                # Touch so blobs still in use survive pruning
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(compress(data, compression))
+                os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write blob {digest[:12]}, sending inline: {e}")
+            return value
+
+        self._remember(digest, value)
+        return {REF_KEY: digest}
+
+    def get(self, digest: str) -> Any:
+        """Load a value by hash"""
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest]
+        for compression in BLOB_SUFFIXES:
+            try:
+                with open(self._path(digest, compression), 'rb') as f:
+                    value = loads(decompress(f.read(), compression))
+            except FileNotFoundError:
+                continue
+            self._remember(digest, value)
+            return value
+        raise KeyError(f"Blob not found: {digest}")
+
+    def resolve(self, value: Any) -> Any:
+        """Replace a reference with its value; other values pass through"""
+        return self.get(value[REF_KEY]) if is_blob_ref(value) else value
+
+    def _remember(self, digest: str, value: Any):
+        """Keep a decoded blob in the LRU cache"""
+        with self._lock:
+            self._cache[digest] = value
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_items:
+                self._cache.popitem(last=False)
+
+    def prune(self, ttl: int = BLOB_TTL_SECONDS, max_bytes: int = BLOB_MAX_BYTES) -> int:
+        """Delete blobs not written or touched within the TTL, then the least recently used above max_bytes"""
+        if not self.enabled:
+            return 0
+        cutoff = time.time() - ttl
+        removed = 0
+        kept = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime < cutoff:
+                        os.remove(path)
+                        removed += 1
+                    elif not name.endswith('.tmp'):
+                        # Temp files are blobs still being written; they never count towards eviction
+                        kept.append((stat.st_mtime, stat.st_size, path))
+                except OSError:
+                    continue
+
+        total_bytes = sum(size for _, size, _ in kept)
+        if max_bytes > 0 and total_bytes > max_bytes:
+            for _, size, path in sorted(kept):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+                total_bytes -= size
+                if total_bytes <= max_bytes:
+                    break
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get blob count, bytes on disk and cached entries"""
+        blobs = 0
+        total_bytes = 0
+        if self.enabled:
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    blobs += 1
+                    total_bytes += os.path.getsize(os.path.join(root, name))
+        return {
+            'enabled': self.enabled,
+            'directory': self.directory,
+            'compression': self.compression,
+            'blobs': blobs,
+            'bytes': total_bytes,
+            'cached': len(self._cache)
+        }
@@ -3,14 +3,110 @@ CEO uAgent for AI Company
 Generates business ideas and evaluates product concepts
 """
 
+import os
 import json
-from typing import List, Dict, Any
+import random
+import asyncio
+from typing import List, Dict, Any, Callable
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BATCH
+from prompt_templates import RenderedPrompt
+from idea_dedup import normalize_title, is_near_duplicate
+from evaluation_packs import split_packs, match_pack_evaluations
+
+# Parallel idea generation: split the requested count into shards generated concurrently
+CEO_PARALLEL_IDEAS = os.getenv('CEO_PARALLEL_IDEAS', 'false').lower() == 'true'
+CEO_IDEAS_PER_SHARD = max(1, int(os.getenv('CEO_IDEAS_PER_SHARD', '1')))
+# Extra shards launched when ideas are dropped as invalid or duplicate
+CEO_IDEA_EXTRA_SHARDS = int(os.getenv('CEO_IDEA_EXTRA_SHARDS', '2'))
+CEO_IDEA_TOKENS_PER_IDEA = 600
+# Batch evaluation packs this many products into one LLM call; packs run concurrently under the scheduler
+CEO_EVALUATIONS_PER_CALL = max(1, int(os.getenv('CEO_EVALUATIONS_PER_CALL', '5')))
+CEO_EVALUATION_TOKENS_PER_PRODUCT = 250
+
+# Each shard is steered to a different sector so parallel shards don't converge on the same idea
+IDEA_FOCUS_AREAS = [
+    'healthcare', 'financial services', 'education', 'climate and energy', 'retail and e-commerce',
+    'developer tools', 'logistics and supply chain', 'media and entertainment', 'legal and compliance',
+    'real estate', 'agriculture', 'manufacturing'
+]
+
+IDEAS_PROMPT_PREFIX = """You are a visionary CEO of an AI company. Generate innovative business ideas that could potentially generate $1 million in revenue.
+
+For each idea, provide:
+1. A catchy title
+2. A brief description (2-3 sentences)
+3. Potential revenue model
+4. Why it could be successful
+
+Format your response as JSON with this structure:
+{
+  "ideas": [
+    {
+      "title": "Idea Title",
+      "description": "Brief description",
+      "revenue_model": "How it makes money",
+      "success_factors": "Why it could work"
+    }
+  ]
+}"""
+
+IDEAS_PROMPT_BODY = """Generate {count} ideas."""
+
+IDEA_SHARD_PROMPT_BODY = """Generate {count} ideas.
+Focus on {focus}."""
+
+EVALUATION_PROMPT_PREFIX = """As a CEO, evaluate the product concept below for market viability.
+
+Provide your assessment in JSON format:
+{
+  "viability_score": 1-10,
+  "market_potential": "High/Medium/Low",
+  "recommendations": "What to improve",
+  "go_decision": true/false
+}"""
+
+EVALUATION_PROMPT_BODY = """Product: {product_name}
+Description: {product_description}
+Features: {features}
+Target Market: {target_market}"""
+
+BATCH_EVALUATION_PROMPT_PREFIX = """As a CEO, evaluate each product concept below for market viability.
+Products are numbered; evaluate every one of them independently.
+
+Provide your assessments in JSON format, one entry per product with its number as "index":
+{
+  "evaluations": [
+    {
+      "index": 0,
+      "viability_score": 1-10,
+      "market_potential": "High/Medium/Low",
+      "recommendations": "What to improve",
+      "go_decision": true/false
+    }
+  ]
+}"""
+
+BATCH_EVALUATION_PROMPT_BODY = """{products}"""
+
+WELCOME_PROMPT_PREFIX = """You are the CEO of an AI company. Prepare a welcoming message for the person described below
+and explain that you're ready to coordinate the workflow once the agents are built and the company is established.
+
+Keep the response brief and professional. Return a JSON with a welcome message:
+{
+  "message": "Welcome message",
+  "status": "ready_for_workflow",
+  "next_steps": "What happens next"
+}"""
+
+WELCOME_PROMPT_BODY = """A person is coming to build AI agents for the company."""
 
 class GenerateIdeas(Model):
     """Model for generating business ideas"""
     count: int = 3
+    workflow_id: str = None
+    # None uses CEO_PARALLEL_IDEAS
+    parallel: bool = None
 
 class BusinessIdea(Model):
     """Model for business idea structure"""
@@ -23,12 +119,19 @@ class IdeasResponse(Model):
     """Model for ideas response"""
     ideas: List[BusinessIdea]
 
+class IdeaStreamItem(Model):
+    """Model for one idea sent as soon as it validates during parallel generation"""
+    index: int
+    idea: BusinessIdea
+    workflow_id: str = None
+
 class EvaluateProduct(Model):
     """Model for product evaluation request"""
     product_name: str
     product_description: str
     features: List[str]
     target_market: Dict[str, str]
+    workflow_id: str = None
 
 class ProductEvaluation(Model):
     """Model for product evaluation response"""
@@ -37,6 +140,27 @@ class ProductEvaluation(Model):
     recommendations: str
     go_decision: bool
 
+class EvaluateProductsBatch(Model):
+    """Model for evaluating several product concepts in one request"""
+    products: List[EvaluateProduct]
+    workflow_id: str = None
+    # None uses CEO_EVALUATIONS_PER_CALL
+    products_per_call: int = None
+
+class ProductEvaluationResult(Model):
+    """Model for one product's outcome in a batch evaluation"""
+    index: int
+    product_name: str
+    success: bool
+    evaluation: ProductEvaluation = None
+    error: str = None
+
+class BatchEvaluationResponse(Model):
+    """Model for batch product evaluation response"""
+    results: List[ProductEvaluationResult]
+    succeeded: int
+    failed: int
+
 class CEOuAgent(BaseUAgent):
     """CEO uAgent for strategic decision making and idea generation"""
     
@@ -46,6 +170,12 @@ class CEOuAgent(BaseUAgent):
             role="Strategic decision making and idea generation",
             port=8001
         )
+        self.prompts.register('generate_ideas', IDEAS_PROMPT_PREFIX, IDEAS_PROMPT_BODY)
+        # Same prefix as generate_ideas, so shards share its prompt cache entry
+        self.prompts.register('generate_idea_shard', IDEAS_PROMPT_PREFIX, IDEA_SHARD_PROMPT_BODY)
+        self.prompts.register('evaluate_product', EVALUATION_PROMPT_PREFIX, EVALUATION_PROMPT_BODY)
+        self.prompts.register('evaluate_products_batch', BATCH_EVALUATION_PROMPT_PREFIX, BATCH_EVALUATION_PROMPT_BODY)
+        self.prompts.register('wait_for_user', WELCOME_PROMPT_PREFIX, WELCOME_PROMPT_BODY)
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -53,231 +183,295 @@ class CEOuAgent(BaseUAgent):
         
         @self.agent.on_message(model=GenerateIdeas)
         async def handle_generate_ideas(ctx: Context, sender: str, msg: GenerateIdeas):
-            """Generate business ideas"""
-            try:
-                print(f"🧠 [{ceo_agent.name}] Generating {msg.count} business ideas...")
-                
-                prompt = f"""You are a visionary CEO of an AI company. Generate {msg.count} innovative business ideas that could potentially generate $1 million in revenue.
-
-For each idea, provide:
-1. A catchy title
-2. A brief description (2-3 sentences)
-3. Potential revenue model
-4. Why it could be successful
-
-Format your response as JSON with this structure:
-{{
-  "ideas": [
-    {{
-      "title": "Idea Title",
-      "description": "Brief description",
-      "revenue_model": "How it makes money",
-      "success_factors": "Why it could work"
-    }}
-  ]
-}}"""
-
-                response = await ceo_agent.call_asi_one(prompt, 2000)
-                
-                # Parse JSON response
-                try:
-                    ideas_data = json.loads(response)
-                except json.JSONDecodeError:
-                    # Try to extract JSON from response
-                    import re
-                    json_match = re.search(r'\{[\s\S]*\}', response)
-                    if json_match:
-                        ideas_data = json.loads(json_match.group())
-                    else:
-                        raise ValueError("Could not parse JSON from response")
-                
-                ideas = [BusinessIdea(**idea) for idea in ideas_data.get('ideas', [])]
-                
-                ceo_agent.log_activity('Generated business ideas', {
-                    'count': len(ideas),
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, IdeasResponse(ideas=ideas))
-                
-            except Exception as e:
-                print(f"❌ [{ceo_agent.name}] Error generating ideas: {str(e)}")
-                # Send error response
-                await ctx.send(sender, IdeasResponse(ideas=[]))
+            """Generate business ideas, streaming each one first in parallel mode"""
+            async def send_idea(index: int, idea: BusinessIdea):
+                await ctx.send(sender, IdeaStreamItem(index=index, idea=idea, workflow_id=msg.workflow_id))
+            
+            await ctx.send(sender, await self.generate_ideas(msg, priority=PRIORITY_BACKGROUND, on_idea=send_idea))
         
         @self.agent.on_message(model=EvaluateProduct)
         async def handle_evaluate_product(ctx: Context, sender: str, msg: EvaluateProduct):
             """Evaluate product concept for market viability"""
-            try:
-                print(f"🧠 [{ceo_agent.name}] Evaluating product: {msg.product_name}")
-                
-                prompt = f"""As a CEO, evaluate this product concept for market viability:
-
-Product: {msg.product_name}
-Description: {msg.product_description}
-Features: {', '.join(msg.features)}
-Target Market: {json.dumps(msg.target_market)}
-
-Provide your assessment in JSON format:
-{{
-  "viability_score": 1-10,
-  "market_potential": "High/Medium/Low",
-  "recommendations": "What to improve",
-  "go_decision": true/false
-}}"""
-
-                response = await ceo_agent.call_asi_one(prompt, 1000)
-                
-                # Parse JSON response
-                try:
-                    evaluation_data = json.loads(response)
-                except json.JSONDecodeError:
-                    # Try to extract JSON from response
-                    import re
-                    json_match = re.search(r'\{[\s\S]*\}', response)
-                    if json_match:
-                        evaluation_data = json.loads(json_match.group())
-                    else:
-                        raise ValueError("Could not parse JSON from response")
-                
-                evaluation = ProductEvaluation(**evaluation_data)
-                
-                ceo_agent.log_activity('Evaluated product', {
-                    'product_name': msg.product_name,
-                    'viability_score': evaluation.viability_score,
-                    'go_decision': evaluation.go_decision,
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, evaluation)
-                
-            except Exception as e:
-                print(f"❌ [{ceo_agent.name}] Error evaluating product: {str(e)}")
-                # Send error response with default values
-                error_evaluation = ProductEvaluation(
-                    viability_score=0,
-                    market_potential="Low",
-                    recommendations="Evaluation failed",
-                    go_decision=False
-                )
-                await ctx.send(sender, error_evaluation)
+            await ctx.send(sender, await self.evaluate_product(msg, priority=PRIORITY_BACKGROUND))
+        
+        @self.agent.on_message(model=EvaluateProductsBatch)
+        async def handle_evaluate_products_batch(ctx: Context, sender: str, msg: EvaluateProductsBatch):
+            """Evaluate several product concepts"""
+            await ctx.send(sender, await self.evaluate_products_batch(msg))
         
         # REST endpoints for Node.js server integration
-        @self.agent.on_rest_post("/wait-for-user", GenerateIdeas, IdeasResponse)
+        @self.rest_post("/generate-ideas", GenerateIdeas, IdeasResponse)
+        async def handle_generate_ideas_rest(ctx: Context, req: GenerateIdeas) -> IdeasResponse:
+            """REST endpoint for generating business ideas"""
+            return await self.generate_ideas(req)
+        
+        @self.rest_post("/wait-for-user", GenerateIdeas, IdeasResponse)
         async def handle_wait_for_user_rest(ctx: Context, req: GenerateIdeas) -> IdeasResponse:
             """REST endpoint - CEO agent waits for user to build AI agents"""
-            try:
-                print(f"🧠 [{self.name}] REST: Waiting for user to build AI agents...")
-                
-                prompt = f"""You are the CEO of an AI company. A person is coming to build AI agents for the company.
-                Prepare a welcoming message and explain that you're ready to coordinate the workflow
-                once the agents are built and the company is established.
-                
-                Keep the response brief and professional. Return a JSON with a welcome message:
-                {{
-                  "message": "Welcome message",
-                  "status": "ready_for_workflow",
-                  "next_steps": "What happens next"
-                }}"""
-
-                response = await self.call_asi_one(prompt, 500)
-                
-                # Parse JSON response
-                try:
-                    welcome_data = json.loads(response)
-                except json.JSONDecodeError:
-                    # Try to extract JSON from response
-                    import re
-                    json_match = re.search(r'\{[\s\S]*\}', response)
-                    if json_match:
-                        welcome_data = json.loads(json_match.group())
-                    else:
-                        welcome_data = {
-                            "message": "Welcome! I'm ready to coordinate the AI agent workflow once you build the agents.",
-                            "status": "ready_for_workflow",
-                            "next_steps": "Build your AI agents and establish the company workflow."
-                        }
-                
-                # Create a single "idea" representing the user's intention to build agents
-                user_idea = BusinessIdea(
-                    title="User Building AI Agents",
-                    description=welcome_data.get("message", "User is building AI agents for the company."),
-                    revenue_model="AI Agent Services",
-                    success_factors=welcome_data.get("next_steps", "Establish company workflow with built agents.")
-                )
-                
-                self.log_activity('REST: Ready for user workflow', {
-                    'status': welcome_data.get("status", "ready_for_workflow")
-                })
-                
-                return IdeasResponse(ideas=[user_idea])
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] REST: Error in wait endpoint: {str(e)}")
-                # Return a default welcome message
-                default_idea = BusinessIdea(
+            return await self.run_pipeline(
+                req, '/wait-for-user', 500,
+                build_prompt=self.build_welcome_prompt,
+                build_response=self.build_welcome_response,
+                fallback_data=lambda req: {
+                    "message": "Welcome! I'm ready to coordinate the AI agent workflow once you build the agents.",
+                    "status": "ready_for_workflow",
+                    "next_steps": "Build your AI agents and establish the company workflow."
+                },
+                fallback_response=lambda req: IdeasResponse(ideas=[BusinessIdea(
                     title="AI Company Setup",
                     description="Welcome! I'm ready to coordinate the AI agent workflow.",
                     revenue_model="AI Services",
                     success_factors="Build agents and establish company workflow."
-                )
-                return IdeasResponse(ideas=[default_idea])
+                )]),
+                activity='Ready for user workflow'
+            )
         
-        @self.agent.on_rest_post("/evaluate-product", EvaluateProduct, ProductEvaluation)
+        @self.rest_post("/evaluate-product", EvaluateProduct, ProductEvaluation)
         async def handle_evaluate_product_rest(ctx: Context, req: EvaluateProduct) -> ProductEvaluation:
             """REST endpoint for product evaluation"""
-            try:
-                print(f"🧠 [{self.name}] REST: Evaluating product: {req.product_name}")
-                
-                prompt = f"""As a CEO, evaluate this product concept for market viability:
-
-Product: {req.product_name}
-Description: {req.product_description}
-Features: {', '.join(req.features)}
-Target Market: {json.dumps(req.target_market)}
-
-Provide your assessment in JSON format:
-{{
-  "viability_score": 1-10,
-  "market_potential": "High/Medium/Low",
-  "recommendations": "What to improve",
-  "go_decision": true/false
-}}"""
-
-                response = await self.call_asi_one(prompt, 1000)
-                
-                # Parse JSON response
-                try:
-                    evaluation_data = json.loads(response)
-                except json.JSONDecodeError:
-                    # Try to extract JSON from response
-                    import re
-                    json_match = re.search(r'\{[\s\S]*\}', response)
-                    if json_match:
-                        evaluation_data = json.loads(json_match.group())
-                    else:
-                        raise ValueError("Could not parse JSON from response")
-                
-                evaluation = ProductEvaluation(**evaluation_data)
-                
-                self.log_activity('REST: Evaluated product', {
-                    'product_name': req.product_name,
-                    'viability_score': evaluation.viability_score,
-                    'go_decision': evaluation.go_decision
-                })
-                
-                return evaluation
+            return await self.evaluate_product(req)
+        
+        @self.rest_post("/evaluate-products-batch", EvaluateProductsBatch, BatchEvaluationResponse)
+        async def handle_evaluate_products_batch_rest(ctx: Context, req: EvaluateProductsBatch) -> BatchEvaluationResponse:
+            """REST endpoint for batch product evaluation"""
+            return await self.evaluate_products_batch(req)
+    
+    async def generate_ideas(self, req: GenerateIdeas, priority: int = PRIORITY_INTERACTIVE,
+                             on_idea: Callable = None) -> IdeasResponse:
+        """Generate business ideas through the shared request pipeline"""
+        if (req.parallel if req.parallel is not None else CEO_PARALLEL_IDEAS) and req.count > 0:
+            return await self.generate_ideas_parallel(req, priority, on_idea)
+        return await self.run_pipeline(
+            req, '/generate-ideas', 2000,
+            build_prompt=self.build_ideas_prompt,
+            build_response=lambda ideas_data, req: IdeasResponse(
+                ideas=[BusinessIdea(**idea) for idea in ideas_data.get('ideas', [])]
+            ),
+            fallback_response=lambda req: IdeasResponse(ideas=[]),
+            priority=priority,
+            activity='Generated business ideas',
+            summarize=lambda req, res: {'count': len(res.ideas)}
+        )
+    
+    async def generate_ideas_parallel(self, req: GenerateIdeas, priority: int = PRIORITY_INTERACTIVE,
+                                      on_idea: Callable = None) -> IdeasResponse:
+        """Generate ideas in concurrent shards, keeping each valid, distinct idea as soon as its shard returns"""
+        print(f"🧠 [{self.name}] Generating {req.count} business ideas in parallel shards...")
+        stats = self.pipeline_stats.setdefault(
+            '/generate-ideas/parallel', {'calls': 0, 'shards': 0, 'duplicates': 0, 'short': 0, 'seconds': 0.0}
+        )
+        stats['calls'] += 1
+        started_at = asyncio.get_running_loop().time()
+        focus_offset = random.randrange(len(IDEA_FOCUS_AREAS))
+        max_shards = -(-req.count // CEO_IDEAS_PER_SHARD) + CEO_IDEA_EXTRA_SHARDS
+        shards = {}
+        accepted = []
+        seen_titles = []
+        launched = 0
+        
+        def launch_shard(count: int):
+            nonlocal launched
+            focus = IDEA_FOCUS_AREAS[(focus_offset + launched) % len(IDEA_FOCUS_AREAS)]
+            task = asyncio.create_task(self.generate_idea_shard(req, count, focus, priority))
+            shards[task] = count
+            launched += 1
+            stats['shards'] += 1
+        
+        try:
+            for start in range(0, req.count, CEO_IDEAS_PER_SHARD):
+                launch_shard(min(CEO_IDEAS_PER_SHARD, req.count - start))
+            
+            while shards and len(accepted) < req.count:
+                done, _ = await asyncio.wait(shards, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del shards[task]
+                    for idea in task.result():
+                        if len(accepted) >= req.count:
+                            break
+                        if is_near_duplicate(idea.title, seen_titles):
+                            stats['duplicates'] += 1
+                            continue
+                        seen_titles.append(normalize_title(idea.title))
+                        accepted.append(idea)
+                        if len(accepted) == 1:
+                            print(f"⚡ [{self.name}] First idea ready in {asyncio.get_running_loop().time() - started_at:.2f}s")
+                        if on_idea:
+                            await on_idea(len(accepted) - 1, idea)
                 
+                # Replace ideas lost to failed shards or duplicates while the extra shard allowance lasts
+                missing = req.count - len(accepted) - sum(shards.values())
+                while missing > 0 and launched < max_shards:
+                    launch_shard(min(CEO_IDEAS_PER_SHARD, missing))
+                    missing -= CEO_IDEAS_PER_SHARD
+        finally:
+            for task in shards:
+                task.cancel()
+            stats['seconds'] = round(stats['seconds'] + asyncio.get_running_loop().time() - started_at, 3)
+        
+        if len(accepted) < req.count:
+            stats['short'] += 1
+        self.log_activity('Generated business ideas', {'count': len(accepted), 'parallel': True})
+        return IdeasResponse(ideas=accepted)
+    
+    async def generate_idea_shard(self, req: GenerateIdeas, count: int, focus: str,
+                                  priority: int = PRIORITY_INTERACTIVE) -> List[BusinessIdea]:
+        """Generate one shard of ideas; an empty list if the whole shard fails"""
+        return await self.run_pipeline(
+            req, '/generate-ideas/shard', CEO_IDEA_TOKENS_PER_IDEA * count,
+            build_prompt=lambda req: self.prompts.render('generate_idea_shard', count=count, focus=focus),
+            build_response=lambda ideas_data, req: self.validate_ideas(ideas_data.get('ideas', [])),
+            fallback_response=lambda req: [],
+            priority=priority
+        )
+    
+    def validate_ideas(self, ideas_data: List[Any]) -> List[BusinessIdea]:
+        """Keep the ideas that fit the BusinessIdea model, dropping malformed ones individually"""
+        ideas = []
+        for idea in ideas_data if isinstance(ideas_data, list) else []:
+            try:
+                ideas.append(BusinessIdea(**idea))
             except Exception as e:
-                print(f"❌ [{self.name}] REST: Error evaluating product: {str(e)}")
-                return ProductEvaluation(
-                    viability_score=0,
-                    market_potential="Low",
-                    recommendations="Evaluation failed",
-                    go_decision=False
+                print(f"⚠️ [{self.name}] Dropping malformed idea: {e}")
+        return ideas
+    
+    async def evaluate_product(self, req: EvaluateProduct, priority: int = PRIORITY_INTERACTIVE) -> ProductEvaluation:
+        """Evaluate a product concept through the shared request pipeline"""
+        return await self.run_pipeline(
+            req, '/evaluate-product', 1000,
+            build_prompt=self.build_evaluation_prompt,
+            build_response=lambda evaluation_data, req: ProductEvaluation(**evaluation_data),
+            fallback_response=lambda req: ProductEvaluation(
+                viability_score=0,
+                market_potential="Low",
+                recommendations="Evaluation failed",
+                go_decision=False
+            ),
+            priority=priority,
+            activity='Evaluated product',
+            summarize=lambda req, res: {
+                'product_name': req.product_name,
+                'viability_score': res.viability_score,
+                'go_decision': res.go_decision
+            }
+        )
+    
+    async def evaluate_products_batch(self, req: EvaluateProductsBatch,
+                                      priority: int = PRIORITY_BATCH) -> BatchEvaluationResponse:
+        """Evaluate products in packs of several per LLM call, retrying products a pack missed one at a time"""
+        print(f"🧠 [{self.name}] Evaluating {len(req.products)} products in batch...")
+        indexed = list(enumerate(req.products))
+        packs = split_packs(req.products, req.products_per_call or CEO_EVALUATIONS_PER_CALL)
+        pack_results = await asyncio.gather(*(self.evaluate_product_pack(req, pack, priority) for pack in packs))
+        
+        evaluations = {}
+        for evaluated in pack_results:
+            evaluations.update(evaluated)
+        missing = [(index, product) for index, product in indexed if index not in evaluations]
+        if missing:
+            print(f"⚠️ [{self.name}] Batch evaluation missed {len(missing)} products, evaluating them individually")
+            retried = await asyncio.gather(*(self.evaluate_single_product(product, priority) for _, product in missing))
+            evaluations.update(
+                (index, evaluation) for (index, _), evaluation in zip(missing, retried) if evaluation is not None
+            )
+        
+        results = [
+            ProductEvaluationResult(
+                index=index, product_name=product.product_name, success=True, evaluation=evaluations[index]
+            ) if index in evaluations else ProductEvaluationResult(
+                index=index, product_name=product.product_name, success=False, error="Evaluation failed"
+            )
+            for index, product in indexed
+        ]
+        succeeded = sum(1 for result in results if result.success)
+        self.log_activity('Evaluated product batch', {
+            'products': len(results), 'calls': len(packs) + len(missing), 'succeeded': succeeded
+        })
+        return BatchEvaluationResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+    
+    async def evaluate_product_pack(self, req: EvaluateProductsBatch, pack: List[Any],
+                                    priority: int = PRIORITY_BATCH) -> Dict[int, ProductEvaluation]:
+        """Evaluate several products in one LLM call; products without a valid evaluation are left out"""
+        return await self.run_pipeline(
+            req, '/evaluate-products-batch', CEO_EVALUATION_TOKENS_PER_PRODUCT * len(pack),
+            build_prompt=lambda req: self.prompts.render(
+                'evaluate_products_batch',
+                products='\n\n'.join(
+                    f"Product {index}:\n{self.format_product(product)}" for index, product in pack
                 )
+            ),
+            build_response=lambda evaluations_data, req: self.build_pack_evaluations(
+                evaluations_data.get('evaluations', []), [index for index, _ in pack]
+            ),
+            fallback_response=lambda req: {},
+            priority=priority
+        )
+    
+    async def evaluate_single_product(self, product: EvaluateProduct,
+                                      priority: int = PRIORITY_BATCH) -> ProductEvaluation:
+        """Evaluate one product for a batch, returning None instead of the fallback evaluation on failure"""
+        return await self.run_pipeline(
+            product, '/evaluate-product', 1000,
+            build_prompt=self.build_evaluation_prompt,
+            build_response=lambda evaluation_data, req: ProductEvaluation(**evaluation_data),
+            fallback_response=lambda req: None,
+            priority=priority
+        )
+    
+    def build_pack_evaluations(self, evaluations_data: List[Any], indexes: List[int]) -> Dict[int, ProductEvaluation]:
+        """Match a pack's evaluations to product indexes and convert them, dropping malformed ones"""
+        evaluations = {}
+        for index, evaluation in match_pack_evaluations(evaluations_data, indexes).items():
+            try:
+                evaluations[index] = ProductEvaluation(**evaluation)
+            except Exception as e:
+                print(f"⚠️ [{self.name}] Dropping malformed evaluation for product {index}: {e}")
+        return evaluations
+    
+    def build_ideas_prompt(self, req: GenerateIdeas) -> RenderedPrompt:
+        """Build the idea generation prompt"""
+        print(f"🧠 [{self.name}] Generating {req.count} business ideas...")
+        
+        return self.prompts.render(
+            'generate_ideas',
+            count=req.count
+        )
+    
+    def build_evaluation_prompt(self, req: EvaluateProduct) -> RenderedPrompt:
+        """Build the product evaluation prompt"""
+        print(f"🧠 [{self.name}] Evaluating product: {req.product_name}")
+        
+        return self.prompts.render(
+            'evaluate_product',
+            product_name=req.product_name,
+            product_description=req.product_description,
+            features=', '.join(req.features),
+            target_market=json.dumps(req.target_market)
+        )
+    
+    def format_product(self, product: EvaluateProduct) -> str:
+        """Describe one product the same way the single evaluation prompt does"""
+        return self.prompts.templates['evaluate_product'].render(
+            product_name=product.product_name,
+            product_description=product.product_description,
+            features=', '.join(product.features),
+            target_market=json.dumps(product.target_market)
+        ).text
+    
+    def build_welcome_prompt(self, req: GenerateIdeas) -> RenderedPrompt:
+        """Build the welcome prompt for a user about to build agents"""
+        print(f"🧠 [{self.name}] Waiting for user to build AI agents...")
+        
+        return self.prompts.render('wait_for_user')
+    
+    def build_welcome_response(self, welcome_data: Dict[str, Any], req: GenerateIdeas) -> IdeasResponse:
+        """Wrap the welcome message as a single idea representing the user's intention to build agents"""
+        user_idea = BusinessIdea(
+            title="User Building AI Agents",
+            description=welcome_data.get("message", "User is building AI agents for the company."),
+            revenue_model="AI Agent Services",
+            success_factors=welcome_data.get("next_steps", "Establish company workflow with built agents.")
+        )
+        return IdeasResponse(ideas=[user_idea])
 
 # Create the agent instance
 ceo_agent = CEOuAgent()
@@ -4,16 +4,88 @@ Develops marketing strategy and brand development
 """
 
 import json
-import re
 from typing import List, Dict, Any
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, PipelineResponse, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from prompt_templates import RenderedPrompt
+
+MARKETING_PROMPT_PREFIX = """As a Chief Marketing Officer, develop a comprehensive marketing strategy for the product below.
+
+Create a comprehensive marketing strategy including:
+
+1. Brand positioning and messaging
+2. Target audience segmentation
+3. Marketing channels and tactics
+4. Content marketing strategy
+5. Social media strategy
+6. Launch campaign plan
+7. Budget allocation recommendations
+8. Success metrics and KPIs
+
+Format your response as JSON:
+{
+  "brand_positioning": "How the brand should be positioned in the market",
+  "key_messages": ["Message 1", "Message 2", "Message 3"],
+  "target_segments": [
+    {
+      "segment": "Primary target segment",
+      "characteristics": "Key characteristics",
+      "channels": ["Channel 1", "Channel 2"]
+    }
+  ],
+  "marketing_channels": [
+    {
+      "channel": "Channel name",
+      "strategy": "How to use this channel",
+      "budget_allocation": "Percentage of budget"
+    }
+  ],
+  "content_strategy": {
+    "content_types": ["Type 1", "Type 2"],
+    "content_themes": ["Theme 1", "Theme 2"],
+    "publishing_schedule": "How often to publish"
+  },
+  "social_media": {
+    "platforms": ["Platform 1", "Platform 2"],
+    "strategy": "Social media approach",
+    "engagement_tactics": ["Tactic 1", "Tactic 2"]
+  },
+  "launch_campaign": {
+    "pre_launch": "Pre-launch activities",
+    "launch_day": "Launch day strategy",
+    "post_launch": "Post-launch follow-up"
+  },
+  "budget_recommendations": {
+    "total_budget": "Recommended total budget",
+    "allocation": {
+      "digital_ads": "Percentage",
+      "content_creation": "Percentage",
+      "events": "Percentage",
+      "pr": "Percentage"
+    }
+  },
+  "success_metrics": ["Metric 1", "Metric 2", "Metric 3"]
+}"""
+
+MARKETING_PROMPT_BODY = """Product Details:
+Name: {product_name}
+Description: {product_description}
+Target Market: {target_market}
+Value Proposition: {value_proposition}
+
+Research Data:
+Market Size: {market_size}
+Competitors: {competitors}
+Target Audience: {target_audience}"""
 
 class MarketingRequest(Model):
     """Model for marketing strategy request"""
     idea: Dict[str, str]
     product: Dict[str, Any]
     research: Dict[str, Any]
+    workflow_id: str = None
+    deadline_seconds: float = None
+    priority: int = None
 
 class TargetSegment(Model):
     """Model for target segment"""
@@ -50,7 +122,7 @@ class BudgetRecommendations(Model):
     total_budget: str
     allocation: Dict[str, str]
 
-class MarketingResponse(Model):
+class MarketingResponse(PipelineResponse):
     """Model for marketing response"""
     brand_positioning: str
     key_messages: List[str]
@@ -71,6 +143,7 @@ class CMouAgent(BaseUAgent):
             role="Marketing strategy and brand development",
             port=8004
         )
+        self.prompts.register('develop_marketing', MARKETING_PROMPT_PREFIX, MARKETING_PROMPT_BODY)
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -79,257 +152,65 @@ class CMouAgent(BaseUAgent):
         @self.agent.on_message(model=MarketingRequest)
         async def handle_marketing_request(ctx: Context, sender: str, msg: MarketingRequest):
             """Develop marketing strategy for a product"""
-            try:
-                print(f"📢 [{self.name}] Developing marketing strategy for: {msg.product.get('product_name', 'Unknown')}")
-                
-                prompt = f"""As a Chief Marketing Officer, develop a comprehensive marketing strategy for this product:
-
-Product Details:
-Name: {msg.product.get('product_name', 'Unknown')}
-Description: {msg.product.get('product_description', 'No description')}
-Target Market: {json.dumps(msg.product.get('target_market', {}))}
-Value Proposition: {msg.product.get('value_proposition', 'Not specified')}
-
-Research Data:
-Market Size: {msg.research.get('market_analysis', {}).get('market_size', 'Not available')}
-Competitors: {json.dumps(msg.research.get('competitors', []))}
-Target Audience: {msg.research.get('recommendations', {}).get('target_audience', 'Not specified')}
-
-Create a comprehensive marketing strategy including:
-
-1. Brand positioning and messaging
-2. Target audience segmentation
-3. Marketing channels and tactics
-4. Content marketing strategy
-5. Social media strategy
-6. Launch campaign plan
-7. Budget allocation recommendations
-8. Success metrics and KPIs
-
-Format your response as JSON:
-{{
-  "brand_positioning": "How the brand should be positioned in the market",
-  "key_messages": ["Message 1", "Message 2", "Message 3"],
-  "target_segments": [
-    {{
-      "segment": "Primary target segment",
-      "characteristics": "Key characteristics",
-      "channels": ["Channel 1", "Channel 2"]
-    }}
-  ],
-  "marketing_channels": [
-    {{
-      "channel": "Channel name",
-      "strategy": "How to use this channel",
-      "budget_allocation": "Percentage of budget"
-    }}
-  ],
-  "content_strategy": {{
-    "content_types": ["Type 1", "Type 2"],
-    "content_themes": ["Theme 1", "Theme 2"],
-    "publishing_schedule": "How often to publish"
-  }},
-  "social_media": {{
-    "platforms": ["Platform 1", "Platform 2"],
-    "strategy": "Social media approach",
-    "engagement_tactics": ["Tactic 1", "Tactic 2"]
-  }},
-  "launch_campaign": {{
-    "pre_launch": "Pre-launch activities",
-    "launch_day": "Launch day strategy",
-    "post_launch": "Post-launch follow-up"
-  }},
-  "budget_recommendations": {{
-    "total_budget": "Recommended total budget",
-    "allocation": {{
-      "digital_ads": "Percentage",
-      "content_creation": "Percentage",
-      "events": "Percentage",
-      "pr": "Percentage"
-    }}
-  }},
-  "success_metrics": ["Metric 1", "Metric 2", "Metric 3"]
-}}"""
-
-                response = await self.call_asi_one(prompt, 3000)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    strategy_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] JSON parsing failed, using fallback data")
-                    strategy_data = self.get_fallback_strategy_data()
-                
-                # Convert to response models
-                target_segments = [TargetSegment(**seg) for seg in strategy_data.get('target_segments', [])]
-                marketing_channels = [MarketingChannel(**ch) for ch in strategy_data.get('marketing_channels', [])]
-                content_strategy = ContentStrategy(**strategy_data.get('content_strategy', {}))
-                social_media = SocialMedia(**strategy_data.get('social_media', {}))
-                launch_campaign = LaunchCampaign(**strategy_data.get('launch_campaign', {}))
-                budget_recommendations = BudgetRecommendations(**strategy_data.get('budget_recommendations', {}))
-                
-                marketing_response = MarketingResponse(
-                    brand_positioning=strategy_data.get('brand_positioning', 'Innovative solution'),
-                    key_messages=strategy_data.get('key_messages', []),
-                    target_segments=target_segments,
-                    marketing_channels=marketing_channels,
-                    content_strategy=content_strategy,
-                    social_media=social_media,
-                    launch_campaign=launch_campaign,
-                    budget_recommendations=budget_recommendations,
-                    success_metrics=strategy_data.get('success_metrics', [])
-                )
-                
-                self.log_activity('Developed marketing strategy', {
-                    'product_name': msg.product.get('product_name', 'Unknown'),
-                    'channels_count': len(marketing_channels),
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, marketing_response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error developing marketing strategy: {str(e)}")
-                # Send error response with fallback data
-                fallback_response = self.get_fallback_marketing_response()
-                await ctx.send(sender, fallback_response)
+            await ctx.send(sender, await self.develop_marketing(msg, priority=PRIORITY_BACKGROUND))
         
         # REST endpoints for Node.js server integration
-        @self.agent.on_rest_post("/develop-marketing", MarketingRequest, MarketingResponse)
+        @self.rest_post("/develop-marketing", MarketingRequest, MarketingResponse)
         async def handle_develop_marketing_rest(ctx: Context, req: MarketingRequest) -> MarketingResponse:
             """REST endpoint for developing marketing strategies"""
-            try:
-                print(f"📢 [{self.name}] REST: Developing marketing strategy for: {req.product.get('product_name', 'Unknown')}")
-                
-                prompt = f"""As a Chief Marketing Officer, develop a comprehensive marketing strategy for this product:
-
-Product Details:
-Name: {req.product.get('product_name', 'Unknown')}
-Description: {req.product.get('product_description', 'No description')}
-Target Market: {json.dumps(req.product.get('target_market', {}))}
-Value Proposition: {req.product.get('value_proposition', 'Not specified')}
-
-Research Data:
-Market Size: {req.research.get('market_analysis', {}).get('market_size', 'Not available')}
-Competitors: {json.dumps(req.research.get('competitors', []))}
-Target Audience: {req.research.get('recommendations', {}).get('target_audience', 'Not specified')}
-
-Create a comprehensive marketing strategy including:
-
-1. Brand positioning and messaging
-2. Target audience segmentation
-3. Marketing channels and tactics
-4. Content marketing strategy
-5. Social media strategy
-6. Launch campaign plan
-7. Budget allocation recommendations
-8. Success metrics and KPIs
-
-Format your response as JSON:
-{{
-  "brand_positioning": "How the brand should be positioned in the market",
-  "key_messages": ["Message 1", "Message 2", "Message 3"],
-  "target_segments": [
-    {{
-      "segment": "Primary target segment",
-      "characteristics": "Key characteristics",
-      "channels": ["Channel 1", "Channel 2"]
-    }}
-  ],
-  "marketing_channels": [
-    {{
-      "channel": "Channel name",
-      "strategy": "How to use this channel",
-      "budget_allocation": "Percentage of budget"
-    }}
-  ],
-  "content_strategy": {{
-    "content_types": ["Type 1", "Type 2"],
-    "content_themes": ["Theme 1", "Theme 2"],
-    "publishing_schedule": "How often to publish"
-  }},
-  "social_media": {{
-    "platforms": ["Platform 1", "Platform 2"],
-    "strategy": "Social media approach",
-    "engagement_tactics": ["Tactic 1", "Tactic 2"]
-  }},
-  "launch_campaign": {{
-    "pre_launch": "Pre-launch activities",
-    "launch_day": "Launch day strategy",
-    "post_launch": "Post-launch follow-up"
-  }},
-  "budget_recommendations": {{
-    "total_budget": "Recommended total budget",
-    "allocation": {{
-      "digital_ads": "Percentage",
-      "content_creation": "Percentage",
-      "events": "Percentage",
-      "pr": "Percentage"
-    }}
-  }},
-  "success_metrics": ["Metric 1", "Metric 2", "Metric 3"]
-}}"""
-
-                response = await self.call_asi_one(prompt, 3000)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    strategy_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] REST: JSON parsing failed, using fallback data")
-                    strategy_data = self.get_fallback_strategy_data()
-                
-                # Convert to response models
-                target_segments = [TargetSegment(**seg) for seg in strategy_data.get('target_segments', [])]
-                marketing_channels = [MarketingChannel(**ch) for ch in strategy_data.get('marketing_channels', [])]
-                content_strategy = ContentStrategy(**strategy_data.get('content_strategy', {}))
-                social_media = SocialMedia(**strategy_data.get('social_media', {}))
-                launch_campaign = LaunchCampaign(**strategy_data.get('launch_campaign', {}))
-                budget_recommendations = BudgetRecommendations(**strategy_data.get('budget_recommendations', {}))
-                
-                marketing_response = MarketingResponse(
-                    brand_positioning=strategy_data.get('brand_positioning', 'Innovative solution'),
-                    key_messages=strategy_data.get('key_messages', []),
-                    target_segments=target_segments,
-                    marketing_channels=marketing_channels,
-                    content_strategy=content_strategy,
-                    social_media=social_media,
-                    launch_campaign=launch_campaign,
-                    budget_recommendations=budget_recommendations,
-                    success_metrics=strategy_data.get('success_metrics', [])
-                )
-                
-                self.log_activity('REST: Developed marketing strategy', {
-                    'product_name': req.product.get('product_name', 'Unknown'),
-                    'channels_count': len(marketing_channels)
-                })
-                
-                return marketing_response
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] REST: Error developing marketing strategy: {str(e)}")
-                return self.get_fallback_marketing_response()
+            return await self.develop_marketing(req)
+    
+    async def develop_marketing(self, req: MarketingRequest, priority: int = PRIORITY_INTERACTIVE) -> MarketingResponse:
+        """Develop a marketing strategy through the shared request pipeline"""
+        return await self.run_pipeline(
+            req, '/develop-marketing', 3000,
+            build_prompt=self.build_marketing_prompt,
+            build_response=self.build_marketing_response,
+            fallback_data=lambda req: self.get_fallback_strategy_data(),
+            fallback_response=lambda req: self.get_fallback_marketing_response(),
+            priority=priority,
+            activity='Developed marketing strategy',
+            summarize=lambda req, res: {
+                'product_name': req.product.get('product_name', 'Unknown'),
+                'channels_count': len(res.marketing_channels)
+            }
+        )
+    
+    def build_marketing_prompt(self, req: MarketingRequest) -> RenderedPrompt:
+        """Build the marketing strategy prompt"""
+        print(f"📢 [{self.name}] Developing marketing strategy for: {req.product.get('product_name', 'Unknown')}")
+        
+        return self.prompts.render(
+            'develop_marketing',
+            product_name=req.product.get('product_name', 'Unknown'),
+            product_description=req.product.get('product_description', 'No description'),
+            target_market=json.dumps(req.product.get('target_market', {})),
+            value_proposition=req.product.get('value_proposition', 'Not specified'),
+            market_size=req.research.get('market_analysis', {}).get('market_size', 'Not available'),
+            competitors=json.dumps(req.research.get('competitors', [])),
+            target_audience=req.research.get('recommendations', {}).get('target_audience', 'Not specified')
+        )
+    
+    def build_marketing_response(self, strategy_data: Dict[str, Any], req: MarketingRequest) -> MarketingResponse:
+        """Convert parsed strategy data to response models"""
+        target_segments = [TargetSegment(**seg) for seg in strategy_data.get('target_segments', [])]
+        marketing_channels = [MarketingChannel(**ch) for ch in strategy_data.get('marketing_channels', [])]
+        content_strategy = ContentStrategy(**strategy_data.get('content_strategy', {}))
+        social_media = SocialMedia(**strategy_data.get('social_media', {}))
+        launch_campaign = LaunchCampaign(**strategy_data.get('launch_campaign', {}))
+        budget_recommendations = BudgetRecommendations(**strategy_data.get('budget_recommendations', {}))
+        
+        return MarketingResponse(
+            brand_positioning=strategy_data.get('brand_positioning', 'Innovative solution'),
+            key_messages=strategy_data.get('key_messages', []),
+            target_segments=target_segments,
+            marketing_channels=marketing_channels,
+            content_strategy=content_strategy,
+            social_media=social_media,
+            launch_campaign=launch_campaign,
+            budget_recommendations=budget_recommendations,
+            success_metrics=strategy_data.get('success_metrics', [])
+        )
     
     def get_fallback_strategy_data(self) -> Dict[str, Any]:
         """Get fallback strategy data when API fails"""
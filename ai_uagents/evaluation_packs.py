@@ -0,0 +1,29 @@
+"""
+Batch evaluation packing for the AI Company CEO agent
+Splits products into packs evaluated in one LLM call and matches the answers back to product indexes
+"""
+
+from typing import Dict, Any, List, Tuple
+
+
+def split_packs(items: List[Any], per_call: int) -> List[List[Tuple[int, Any]]]:
+    """Number the items and split them into packs of at most per_call"""
+    per_call = max(1, per_call)
+    indexed = list(enumerate(items))
+    return [indexed[start:start + per_call] for start in range(0, len(indexed), per_call)]
+
+
+def match_pack_evaluations(evaluations_data: Any, indexes: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Map a pack's evaluations to product indexes, by their "index" field or else by position"""
+    evaluations = {}
+    for position, evaluation in enumerate(evaluations_data if isinstance(evaluations_data, list) else []):
+        if not isinstance(evaluation, dict):
+            continue
+        fields = {key: value for key, value in evaluation.items() if key != 'index'}
+        index = evaluation.get('index')
+        if index not in indexes:
+            index = indexes[position] if position < len(indexes) else None
+        if index is None or index in evaluations:
+            continue
+        evaluations[index] = fields
+    return evaluations
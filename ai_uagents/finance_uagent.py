@@ -4,15 +4,59 @@ Handles financial analysis and revenue distribution
 """
 
 import json
-import re
 from typing import List, Dict, Any
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, PipelineResponse, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from prompt_templates import RenderedPrompt
+from revenue_model import RevenueProjectionEngine
+
+REVENUE_PROMPT_PREFIX = """As the Finance Agent for an AI company, analyze the revenue potential for the project below.
+
+The revenue projection has already been computed by a Monte Carlo model from the pricing, funnel and growth
+assumptions listed with it. Do not estimate different numbers; explain the projection instead.
+
+Please provide:
+1. Revenue timeline (when revenue might be generated)
+2. Revenue sources (how money would be made)
+3. Risk factors that could impact revenue, including the assumptions the projection depends on most
+4. Recommended pricing strategy
+
+Format your response as JSON with these fields:
+{
+  "timeline": "string describing when revenue is expected",
+  "revenue_sources": ["source1", "source2"],
+  "risk_factors": ["risk1", "risk2"],
+  "pricing_strategy": "description"
+}"""
+
+REVENUE_PROMPT_BODY = """IDEA: {idea}
+{product}
+PROJECTION: {projection}"""
+
+REPORT_PROMPT_PREFIX = """As the Finance Agent, create a comprehensive financial report based on the data below.
+
+Generate a professional financial report including:
+1. Total revenue generated
+2. Total dividends distributed
+3. Token holder performance
+4. Growth metrics
+5. Recommendations for improvement
+
+Format as a markdown report."""
+
+REPORT_PROMPT_BODY = """REVENUE HISTORY: {revenue_data}
+TOKEN HOLDERS: {token_holder_data}
+CONTRACT INFO: {contract_info}"""
 
 class RevenueAnalysisRequest(Model):
     """Model for revenue analysis request"""
     idea_data: Dict[str, Any]
     product_data: Dict[str, Any] = None
+    workflow_id: str = None
+    deadline_seconds: float = None
+    priority: int = None
+    # None derives the Monte Carlo seed from the idea and product, so repeat requests match
+    seed: int = None
 
 class RevenueProjection(Model):
     """Model for revenue projection"""
@@ -21,7 +65,7 @@ class RevenueProjection(Model):
     most_likely: float
     currency: str
 
-class RevenueAnalysisResponse(Model):
+class RevenueAnalysisResponse(PipelineResponse):
     """Model for revenue analysis response"""
     revenue_projection: RevenueProjection
     timeline: str
@@ -29,12 +73,14 @@ class RevenueAnalysisResponse(Model):
     risk_factors: List[str]
     pricing_strategy: str
     confidence_level: str
+    simulation: Dict[str, Any] = None
 
 class FinancialReportRequest(Model):
     """Model for financial report request"""
     revenue_data: Dict[str, Any] = None
     token_holder_data: Dict[str, Any] = None
     contract_info: Dict[str, Any] = None
+    workflow_id: str = None
 
 class FinancialReportResponse(Model):
     """Model for financial report response"""
@@ -50,6 +96,9 @@ class FinanceuAgent(BaseUAgent):
             role="Financial analysis and revenue distribution",
             port=8007
         )
+        self.prompts.register('analyze_revenue', REVENUE_PROMPT_PREFIX, REVENUE_PROMPT_BODY)
+        self.prompts.register('generate_report', REPORT_PROMPT_PREFIX, REPORT_PROMPT_BODY)
+        self.revenue_engine = RevenueProjectionEngine()
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -58,267 +107,141 @@ class FinanceuAgent(BaseUAgent):
         @self.agent.on_message(model=RevenueAnalysisRequest)
         async def handle_revenue_analysis(ctx: Context, sender: str, msg: RevenueAnalysisRequest):
             """Analyze revenue potential for a project"""
-            try:
-                print(f"💰 [{self.name}] Analyzing revenue potential for: {msg.idea_data.get('title', 'Unknown')}")
-                
-                prompt = f"""As the Finance Agent for an AI company, analyze the revenue potential for this project:
-        
-IDEA: {json.dumps(msg.idea_data, indent=2)}
-{json.dumps(msg.product_data, indent=2) if msg.product_data else ''}
-
-Please provide:
-1. Estimated revenue range (minimum, maximum, most likely)
-2. Revenue timeline (when revenue might be generated)
-3. Revenue sources (how money would be made)
-4. Risk factors that could impact revenue
-5. Recommended pricing strategy
-
-Format your response as JSON with these fields:
-{{
-  "revenue_projection": {{
-    "minimum": number,
-    "maximum": number,
-    "most_likely": number,
-    "currency": "USD"
-  }},
-  "timeline": "string describing when revenue is expected",
-  "revenue_sources": ["source1", "source2"],
-  "risk_factors": ["risk1", "risk2"],
-  "pricing_strategy": "description",
-  "confidence_level": "high/medium/low"
-}}"""
-
-                response = await self.call_asi_one(prompt, 2000)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    analysis_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] JSON parsing failed, using fallback data")
-                    analysis_data = self.get_fallback_analysis_data()
-                
-                # Convert to response models
-                revenue_projection = RevenueProjection(**analysis_data.get('revenue_projection', {}))
-                
-                analysis_response = RevenueAnalysisResponse(
-                    revenue_projection=revenue_projection,
-                    timeline=analysis_data.get('timeline', '6-12 months'),
-                    revenue_sources=analysis_data.get('revenue_sources', []),
-                    risk_factors=analysis_data.get('risk_factors', []),
-                    pricing_strategy=analysis_data.get('pricing_strategy', 'Subscription model'),
-                    confidence_level=analysis_data.get('confidence_level', 'medium')
-                )
-                
-                self.log_activity('Revenue Analysis', {
-                    'idea_title': msg.idea_data.get('title', 'Unknown'),
-                    'most_likely_revenue': analysis_response.revenue_projection.most_likely,
-                    'confidence_level': analysis_response.confidence_level,
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, analysis_response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error analyzing revenue: {str(e)}")
-                # Send error response with fallback data
-                fallback_response = self.get_fallback_analysis_response()
-                await ctx.send(sender, fallback_response)
+            await ctx.send(sender, await self.analyze_revenue(msg, priority=PRIORITY_BACKGROUND))
         
         @self.agent.on_message(model=FinancialReportRequest)
         async def handle_financial_report(ctx: Context, sender: str, msg: FinancialReportRequest):
             """Generate financial report"""
-            try:
-                print(f"💰 [{self.name}] Generating financial report")
-                
-                prompt = f"""As the Finance Agent, create a comprehensive financial report based on this data:
-        
-REVENUE HISTORY: {json.dumps(msg.revenue_data or {}, indent=2)}
-TOKEN HOLDERS: {json.dumps(msg.token_holder_data or {}, indent=2)}
-CONTRACT INFO: {json.dumps(msg.contract_info or {}, indent=2)}
-
-Generate a professional financial report including:
-1. Total revenue generated
-2. Total dividends distributed
-3. Token holder performance
-4. Growth metrics
-5. Recommendations for improvement
-
-Format as a markdown report."""
-
-                response = await self.call_asi_one(prompt, 3000)
-                
-                # Create summary from the data
-                summary = {
-                    'total_revenue': msg.revenue_data.get('total_revenue', 0) if msg.revenue_data else 0,
-                    'total_dividends': msg.revenue_data.get('total_dividends', 0) if msg.revenue_data else 0,
-                    'token_holders': msg.token_holder_data.get('count', 0) if msg.token_holder_data else 0,
-                    'report_date': '2024-01-01'
-                }
-                
-                report_response = FinancialReportResponse(
-                    report=response,
-                    summary=summary
-                )
-                
-                self.log_activity('Financial Report Generated', {
-                    'report_date': summary['report_date'],
-                    'total_revenue': summary['total_revenue'],
-                    'total_dividends': summary['total_dividends'],
-                    'token_holders': summary['token_holders'],
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, report_response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error generating financial report: {str(e)}")
-                # Send error response with fallback data
-                fallback_response = FinancialReportResponse(
-                    report="Financial report generation failed. Please try again later.",
-                    summary={'error': str(e)}
-                )
-                await ctx.send(sender, fallback_response)
+            await ctx.send(sender, await self.generate_report(msg, priority=PRIORITY_BACKGROUND))
         
         # REST endpoints for Node.js server integration
-        @self.agent.on_rest_post("/analyze-revenue", RevenueAnalysisRequest, RevenueAnalysisResponse)
+        @self.rest_post("/analyze-revenue", RevenueAnalysisRequest, RevenueAnalysisResponse)
         async def handle_analyze_revenue_rest(ctx: Context, req: RevenueAnalysisRequest) -> RevenueAnalysisResponse:
             """REST endpoint for revenue analysis"""
-            try:
-                print(f"💰 [{self.name}] REST: Analyzing revenue potential for: {req.idea_data.get('title', 'Unknown')}")
-                
-                prompt = f"""As the Finance Agent for an AI company, analyze the revenue potential for this project:
-        
-IDEA: {json.dumps(req.idea_data, indent=2)}
-{json.dumps(req.product_data, indent=2) if req.product_data else ''}
-
-Please provide:
-1. Estimated revenue range (minimum, maximum, most likely)
-2. Revenue timeline (when revenue might be generated)
-3. Revenue sources (how money would be made)
-4. Risk factors that could impact revenue
-5. Recommended pricing strategy
-
-Format your response as JSON with these fields:
-{{
-  "revenue_projection": {{
-    "minimum": number,
-    "maximum": number,
-    "most_likely": number,
-    "currency": "USD"
-  }},
-  "timeline": "string describing when revenue is expected",
-  "revenue_sources": ["source1", "source2"],
-  "risk_factors": ["risk1", "risk2"],
-  "pricing_strategy": "description",
-  "confidence_level": "high/medium/low"
-}}"""
-
-                response = await self.call_asi_one(prompt, 2000)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    analysis_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] REST: JSON parsing failed, using fallback data")
-                    analysis_data = self.get_fallback_analysis_data()
-                
-                # Convert to response models
-                revenue_projection = RevenueProjection(**analysis_data.get('revenue_projection', {}))
-                
-                analysis_response = RevenueAnalysisResponse(
-                    revenue_projection=revenue_projection,
-                    timeline=analysis_data.get('timeline', '6-12 months'),
-                    revenue_sources=analysis_data.get('revenue_sources', []),
-                    risk_factors=analysis_data.get('risk_factors', []),
-                    pricing_strategy=analysis_data.get('pricing_strategy', 'Subscription model'),
-                    confidence_level=analysis_data.get('confidence_level', 'medium')
-                )
-                
-                self.log_activity('REST: Revenue Analysis', {
-                    'idea_title': req.idea_data.get('title', 'Unknown'),
-                    'most_likely_revenue': analysis_response.revenue_projection.most_likely,
-                    'confidence_level': analysis_response.confidence_level
-                })
-                
-                return analysis_response
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] REST: Error analyzing revenue: {str(e)}")
-                return self.get_fallback_analysis_response()
+            return await self.analyze_revenue(req)
         
-        @self.agent.on_rest_post("/generate-report", FinancialReportRequest, FinancialReportResponse)
+        @self.rest_post("/generate-report", FinancialReportRequest, FinancialReportResponse)
         async def handle_generate_report_rest(ctx: Context, req: FinancialReportRequest) -> FinancialReportResponse:
             """REST endpoint for financial report generation"""
-            try:
-                print(f"💰 [{self.name}] REST: Generating financial report")
-                
-                prompt = f"""As the Finance Agent, create a comprehensive financial report based on this data:
+            return await self.generate_report(req)
+    
+    async def analyze_revenue(self, req: RevenueAnalysisRequest, priority: int = PRIORITY_INTERACTIVE) -> RevenueAnalysisResponse:
+        """Project revenue numerically, then have the shared request pipeline write the narrative around it"""
+        try:
+            # Product data may arrive as a blob reference; the projection needs the payload itself
+            self.resolve_blob_refs(req)
+            projection = self.revenue_engine.project(req.idea_data, req.product_data, seed=req.seed)
+            print(f"📈 [{self.name}] Monte Carlo projection: {projection['runs']} runs in {projection['elapsed_ms']}ms, "
+                  f"p50 ${projection['most_likely']:,.0f}")
+        except Exception as e:
+            print(f"❌ [{self.name}] Revenue projection failed, using fallback figures: {str(e)}")
+            projection = None
         
-REVENUE HISTORY: {json.dumps(req.revenue_data or {}, indent=2)}
-TOKEN HOLDERS: {json.dumps(req.token_holder_data or {}, indent=2)}
-CONTRACT INFO: {json.dumps(req.contract_info or {}, indent=2)}
-
-Generate a professional financial report including:
-1. Total revenue generated
-2. Total dividends distributed
-3. Token holder performance
-4. Growth metrics
-5. Recommendations for improvement
-
-Format as a markdown report."""
-
-                response = await self.call_asi_one(prompt, 3000)
-                
-                # Create summary from the data
-                summary = {
-                    'total_revenue': req.revenue_data.get('total_revenue', 0) if req.revenue_data else 0,
-                    'total_dividends': req.revenue_data.get('total_dividends', 0) if req.revenue_data else 0,
-                    'token_holders': req.token_holder_data.get('count', 0) if req.token_holder_data else 0,
-                    'report_date': '2024-01-01'
-                }
-                
-                report_response = FinancialReportResponse(
-                    report=response,
-                    summary=summary
-                )
-                
-                self.log_activity('REST: Financial Report Generated', {
-                    'report_date': summary['report_date'],
-                    'total_revenue': summary['total_revenue'],
-                    'total_dividends': summary['total_dividends'],
-                    'token_holders': summary['token_holders']
-                })
-                
-                return report_response
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] REST: Error generating financial report: {str(e)}")
-                return FinancialReportResponse(
-                    report="Financial report generation failed. Please try again later.",
-                    summary={'error': str(e)}
-                )
+        return await self.run_pipeline(
+            req, '/analyze-revenue', 1200,
+            build_prompt=lambda req: self.build_revenue_prompt(req, projection),
+            build_response=lambda analysis_data, req: self.build_revenue_response(analysis_data, req, projection),
+            fallback_data=lambda req: self.get_fallback_analysis_data(),
+            fallback_response=lambda req: self.build_revenue_response(self.get_fallback_analysis_data(), req, projection),
+            priority=priority,
+            activity='Revenue Analysis',
+            summarize=lambda req, res: {
+                'idea_title': req.idea_data.get('title', 'Unknown'),
+                'most_likely_revenue': res.revenue_projection.most_likely,
+                'confidence_level': res.confidence_level
+            }
+        )
+    
+    def build_revenue_prompt(self, req: RevenueAnalysisRequest, projection: Dict[str, Any] = None) -> RenderedPrompt:
+        """Build the revenue analysis prompt around the computed projection"""
+        print(f"💰 [{self.name}] Analyzing revenue potential for: {req.idea_data.get('title', 'Unknown')}")
+        
+        return self.prompts.render(
+            'analyze_revenue',
+            idea=json.dumps(req.idea_data, indent=2),
+            product=json.dumps(req.product_data, indent=2) if req.product_data else '',
+            projection=json.dumps(
+                {key: value for key, value in projection.items() if key != 'elapsed_ms'} if projection
+                else self.get_fallback_analysis_data()['revenue_projection']
+            )
+        )
+    
+    def build_revenue_response(self, analysis_data: Dict[str, Any], req: RevenueAnalysisRequest,
+                               projection: Dict[str, Any] = None) -> RevenueAnalysisResponse:
+        """Combine the computed projection with the parsed narrative"""
+        if projection is None:
+            # Keep the narrative but flag the canned figures so they aren't checkpointed or cached as real
+            fallback_data = self.get_fallback_analysis_data()
+            return self.mark_degraded(RevenueAnalysisResponse(
+                revenue_projection=RevenueProjection(**fallback_data['revenue_projection']),
+                timeline=analysis_data.get('timeline', fallback_data['timeline']),
+                revenue_sources=analysis_data.get('revenue_sources', fallback_data['revenue_sources']),
+                risk_factors=analysis_data.get('risk_factors', fallback_data['risk_factors']),
+                pricing_strategy=analysis_data.get('pricing_strategy', fallback_data['pricing_strategy']),
+                confidence_level=fallback_data['confidence_level']
+            ))
+        revenue_projection = RevenueProjection(
+            minimum=projection['minimum'],
+            maximum=projection['maximum'],
+            most_likely=projection['most_likely'],
+            currency=projection['currency']
+        )
+        
+        return RevenueAnalysisResponse(
+            revenue_projection=revenue_projection,
+            timeline=analysis_data.get('timeline', '6-12 months'),
+            revenue_sources=analysis_data.get('revenue_sources', []),
+            risk_factors=analysis_data.get('risk_factors', []),
+            pricing_strategy=analysis_data.get('pricing_strategy', 'Subscription model'),
+            confidence_level=projection['confidence_level'],
+            simulation=projection
+        )
+    
+    async def generate_report(self, req: FinancialReportRequest, priority: int = PRIORITY_INTERACTIVE) -> FinancialReportResponse:
+        """Generate a markdown financial report through the shared request pipeline"""
+        return await self.run_pipeline(
+            req, '/generate-report', 3000,
+            build_prompt=self.build_report_prompt,
+            build_response=self.build_report_response,
+            fallback_response=lambda req: FinancialReportResponse(
+                report="Financial report generation failed. Please try again later.",
+                summary={'error': 'Report generation failed'}
+            ),
+            priority=priority,
+            activity='Financial Report Generated',
+            summarize=lambda req, res: {
+                'report_date': res.summary['report_date'],
+                'total_revenue': res.summary['total_revenue'],
+                'total_dividends': res.summary['total_dividends'],
+                'token_holders': res.summary['token_holders']
+            },
+            parse_json=False
+        )
+    
+    def build_report_prompt(self, req: FinancialReportRequest) -> RenderedPrompt:
+        """Build the financial report prompt"""
+        print(f"💰 [{self.name}] Generating financial report")
+        
+        return self.prompts.render(
+            'generate_report',
+            revenue_data=json.dumps(req.revenue_data or {}, indent=2),
+            token_holder_data=json.dumps(req.token_holder_data or {}, indent=2),
+            contract_info=json.dumps(req.contract_info or {}, indent=2)
+        )
+    
+    def build_report_response(self, report: str, req: FinancialReportRequest) -> FinancialReportResponse:
+        """Attach a summary of the input data to the generated report"""
+        summary = {
+            'total_revenue': req.revenue_data.get('total_revenue', 0) if req.revenue_data else 0,
+            'total_dividends': req.revenue_data.get('total_dividends', 0) if req.revenue_data else 0,
+            'token_holders': req.token_holder_data.get('count', 0) if req.token_holder_data else 0,
+            'report_date': '2024-01-01'
+        }
+        
+        return FinancialReportResponse(
+            report=report,
+            summary=summary
+        )
     
     def get_fallback_analysis_data(self) -> Dict[str, Any]:
         """Get fallback analysis data when API fails"""
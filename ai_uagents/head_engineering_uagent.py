@@ -4,10 +4,87 @@ Creates technical implementation and website development strategy
 """
 
 import json
-import re
 from typing import List, Dict, Any
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, PipelineResponse, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from prompt_templates import RenderedPrompt
+
+BOLT_PROMPT_PREFIX = """As a Head of Engineering, create a comprehensive Bolt prompt for building a website based on the project below.
+
+Create a detailed Bolt prompt that includes:
+1. Website structure and pages needed
+2. Design requirements and UI/UX specifications
+3. Functional requirements and features
+4. Content strategy and messaging
+5. Technical specifications
+6. Integration requirements
+7. Performance and scalability needs
+8. SEO and marketing considerations
+
+Format your response as JSON:
+{
+  "website_title": "Website Title",
+  "website_description": "Brief description of the website",
+  "pages_required": ["Page 1", "Page 2", "Page 3"],
+  "design_specifications": {
+    "color_scheme": "Primary and secondary colors",
+    "typography": "Font specifications",
+    "layout_style": "Layout approach",
+    "responsive_design": "Mobile-first requirements"
+  },
+  "functional_requirements": [
+    "Feature 1",
+    "Feature 2",
+    "Feature 3"
+  ],
+  "content_strategy": {
+    "homepage_content": "Homepage content requirements",
+    "about_page": "About page content",
+    "features_page": "Features page content",
+    "pricing_page": "Pricing page content",
+    "contact_page": "Contact page content"
+  },
+  "technical_specifications": {
+    "performance_requirements": "Performance targets",
+    "seo_requirements": "SEO specifications",
+    "analytics_setup": "Analytics requirements",
+    "security_requirements": "Security measures"
+  },
+  "integration_requirements": [
+    "Integration 1",
+    "Integration 2"
+  ],
+  "bolt_prompt": "Complete Bolt prompt for website generation"
+}"""
+
+BOLT_PROMPT_BODY = """Product Idea:
+Title: {title}
+Description: {description}
+
+Product Concept:
+Name: {product_name}
+Description: {product_description}
+Core Features: {core_features}
+Target Market: {target_market}
+Value Proposition: {value_proposition}
+Revenue Model: {revenue_model}
+
+Market Research Summary:
+Market Size: {market_size}
+Growth Potential: {growth_potential}
+Competitors: {competitors}
+Target Audience: {target_audience}
+
+Marketing Strategy:
+Brand Positioning: {brand_positioning}
+Key Messages: {key_messages}
+Target Segments: {target_segments}
+Marketing Channels: {marketing_channels}
+
+Technical Strategy:
+Technology Stack: {technology_stack}
+Architecture: {architecture}
+Development Timeline: {timeline}"""
 
 class BoltPromptRequest(Model):
     """Model for Bolt prompt request"""
@@ -16,6 +93,9 @@ class BoltPromptRequest(Model):
     research: Dict[str, Any]
     marketing_strategy: Dict[str, Any]
     technical_strategy: Dict[str, Any]
+    workflow_id: str = None
+    deadline_seconds: float = None
+    priority: int = None
 
 class DesignSpecifications(Model):
     """Model for design specifications"""
@@ -39,7 +119,7 @@ class TechnicalSpecifications(Model):
     analytics_setup: str
     security_requirements: str
 
-class BoltPromptResponse(Model):
+class BoltPromptResponse(PipelineResponse):
     """Model for Bolt prompt response"""
     website_title: str
     website_description: str
@@ -60,6 +140,7 @@ class HeadOfEngineeringuAgent(BaseUAgent):
             role="Technical implementation and website development strategy",
             port=8006
         )
+        self.prompts.register('create_bolt_prompt', BOLT_PROMPT_PREFIX, BOLT_PROMPT_BODY)
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -68,269 +149,75 @@ class HeadOfEngineeringuAgent(BaseUAgent):
         @self.agent.on_message(model=BoltPromptRequest)
         async def handle_bolt_prompt_request(ctx: Context, sender: str, msg: BoltPromptRequest):
             """Create Bolt prompt for website development"""
-            try:
-                print(f"🔧 [{self.name}] Creating Bolt prompt for: {msg.product.get('product_name', 'Unknown')}")
-                
-                prompt = f"""As a Head of Engineering, create a comprehensive Bolt prompt for building a website based on the following project:
-
-Product Idea:
-Title: {msg.idea.get('title', 'Unknown')}
-Description: {msg.idea.get('description', 'No description')}
-
-Product Concept:
-Name: {msg.product.get('product_name', 'Unknown')}
-Description: {msg.product.get('product_description', 'No description')}
-Core Features: {json.dumps(msg.product.get('core_features', []))}
-Target Market: {json.dumps(msg.product.get('target_market', {}))}
-Value Proposition: {msg.product.get('value_proposition', 'Not specified')}
-Revenue Model: {msg.product.get('revenue_model', 'Not specified')}
-
-Market Research Summary:
-Market Size: {msg.research.get('market_analysis', {}).get('market_size', 'N/A')}
-Growth Potential: {msg.research.get('market_analysis', {}).get('growth_potential', 'N/A')}
-Competitors: {json.dumps(msg.research.get('competitors', []))}
-Target Audience: {msg.research.get('recommendations', {}).get('target_audience', 'N/A')}
-
-Marketing Strategy:
-Brand Positioning: {msg.marketing_strategy.get('brand_positioning', 'N/A')}
-Key Messages: {json.dumps(msg.marketing_strategy.get('key_messages', []))}
-Target Segments: {json.dumps(msg.marketing_strategy.get('target_segments', []))}
-Marketing Channels: {json.dumps(msg.marketing_strategy.get('marketing_channels', []))}
-
-Technical Strategy:
-Technology Stack: {json.dumps(msg.technical_strategy.get('technology_stack', {}))}
-Architecture: {msg.technical_strategy.get('architecture', {}).get('overview', 'N/A')}
-Development Timeline: {json.dumps(msg.technical_strategy.get('timeline', {}))}
-
-Create a detailed Bolt prompt that includes:
-1. Website structure and pages needed
-2. Design requirements and UI/UX specifications
-3. Functional requirements and features
-4. Content strategy and messaging
-5. Technical specifications
-6. Integration requirements
-7. Performance and scalability needs
-8. SEO and marketing considerations
-
-Format your response as JSON:
-{{
-  "website_title": "Website Title",
-  "website_description": "Brief description of the website",
-  "pages_required": ["Page 1", "Page 2", "Page 3"],
-  "design_specifications": {{
-    "color_scheme": "Primary and secondary colors",
-    "typography": "Font specifications",
-    "layout_style": "Layout approach",
-    "responsive_design": "Mobile-first requirements"
-  }},
-  "functional_requirements": [
-    "Feature 1",
-    "Feature 2",
-    "Feature 3"
-  ],
-  "content_strategy": {{
-    "homepage_content": "Homepage content requirements",
-    "about_page": "About page content",
-    "features_page": "Features page content",
-    "pricing_page": "Pricing page content",
-    "contact_page": "Contact page content"
-  }},
-  "technical_specifications": {{
-    "performance_requirements": "Performance targets",
-    "seo_requirements": "SEO specifications",
-    "analytics_setup": "Analytics requirements",
-    "security_requirements": "Security measures"
-  }},
-  "integration_requirements": [
-    "Integration 1",
-    "Integration 2"
-  ],
-  "bolt_prompt": "Complete Bolt prompt for website generation"
-}}"""
-
-                response = await self.call_asi_one(prompt, 4000)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    bolt_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] JSON parsing failed, using fallback data")
-                    bolt_data = self.get_fallback_bolt_data(msg.product)
-                
-                # Convert to response models
-                design_specifications = DesignSpecifications(**bolt_data.get('design_specifications', {}))
-                content_strategy = ContentStrategy(**bolt_data.get('content_strategy', {}))
-                technical_specifications = TechnicalSpecifications(**bolt_data.get('technical_specifications', {}))
-                
-                bolt_response = BoltPromptResponse(
-                    website_title=bolt_data.get('website_title', f"{msg.product.get('product_name', 'Product')} Website"),
-                    website_description=bolt_data.get('website_description', msg.product.get('product_description', 'Website description')),
-                    pages_required=bolt_data.get('pages_required', []),
-                    design_specifications=design_specifications,
-                    functional_requirements=bolt_data.get('functional_requirements', []),
-                    content_strategy=content_strategy,
-                    technical_specifications=technical_specifications,
-                    integration_requirements=bolt_data.get('integration_requirements', []),
-                    bolt_prompt=bolt_data.get('bolt_prompt', '')
-                )
-                
-                self.log_activity('Created Bolt prompt for website development', {
-                    'product_name': msg.product.get('product_name', 'Unknown'),
-                    'pages_count': len(bolt_response.pages_required),
-                    'features_count': len(bolt_response.functional_requirements),
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, bolt_response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error creating Bolt prompt: {str(e)}")
-                # Send error response with fallback data
-                fallback_response = self.get_fallback_bolt_response(msg.product)
-                await ctx.send(sender, fallback_response)
+            await ctx.send(sender, await self.create_bolt_prompt(msg, priority=PRIORITY_BACKGROUND))
         
         # REST endpoints for Node.js server integration
-        @self.agent.on_rest_post("/create-bolt-prompt", BoltPromptRequest, BoltPromptResponse)
+        @self.rest_post("/create-bolt-prompt", BoltPromptRequest, BoltPromptResponse)
         async def handle_create_bolt_prompt_rest(ctx: Context, req: BoltPromptRequest) -> BoltPromptResponse:
             """REST endpoint for creating Bolt prompts"""
-            try:
-                print(f"🔧 [{self.name}] REST: Creating Bolt prompt for: {req.product.get('product_name', 'Unknown')}")
-                
-                prompt = f"""As a Head of Engineering, create a comprehensive Bolt prompt for building a website based on the following project:
-
-Product Idea:
-Title: {req.idea.get('title', 'Unknown')}
-Description: {req.idea.get('description', 'No description')}
-
-Product Concept:
-Name: {req.product.get('product_name', 'Unknown')}
-Description: {req.product.get('product_description', 'No description')}
-Core Features: {json.dumps(req.product.get('core_features', []))}
-Target Market: {json.dumps(req.product.get('target_market', {}))}
-Value Proposition: {req.product.get('value_proposition', 'Not specified')}
-Revenue Model: {req.product.get('revenue_model', 'Not specified')}
-
-Market Research Summary:
-Market Size: {req.research.get('market_analysis', {}).get('market_size', 'N/A')}
-Growth Potential: {req.research.get('market_analysis', {}).get('growth_potential', 'N/A')}
-Competitors: {json.dumps(req.research.get('competitors', []))}
-Target Audience: {req.research.get('recommendations', {}).get('target_audience', 'N/A')}
-
-Marketing Strategy:
-Brand Positioning: {req.marketing_strategy.get('brand_positioning', 'N/A')}
-Key Messages: {json.dumps(req.marketing_strategy.get('key_messages', []))}
-Target Segments: {json.dumps(req.marketing_strategy.get('target_segments', []))}
-Marketing Channels: {json.dumps(req.marketing_strategy.get('marketing_channels', []))}
-
-Technical Strategy:
-Technology Stack: {json.dumps(req.technical_strategy.get('technology_stack', {}))}
-Architecture: {req.technical_strategy.get('architecture', {}).get('overview', 'N/A')}
-Development Timeline: {json.dumps(req.technical_strategy.get('timeline', {}))}
-
-Create a detailed Bolt prompt that includes:
-1. Website structure and pages needed
-2. Design requirements and UI/UX specifications
-3. Functional requirements and features
-4. Content strategy and messaging
-5. Technical specifications
-6. Integration requirements
-7. Performance and scalability needs
-8. SEO and marketing considerations
-
-Format your response as JSON:
-{{
-  "website_title": "Website Title",
-  "website_description": "Brief description of the website",
-  "pages_required": ["Page 1", "Page 2", "Page 3"],
-  "design_specifications": {{
-    "color_scheme": "Primary and secondary colors",
-    "typography": "Font specifications",
-    "layout_style": "Layout approach",
-    "responsive_design": "Mobile-first requirements"
-  }},
-  "functional_requirements": [
-    "Feature 1",
-    "Feature 2",
-    "Feature 3"
-  ],
-  "content_strategy": {{
-    "homepage_content": "Homepage content requirements",
-    "about_page": "About page content",
-    "features_page": "Features page content",
-    "pricing_page": "Pricing page content",
-    "contact_page": "Contact page content"
-  }},
-  "technical_specifications": {{
-    "performance_requirements": "Performance targets",
-    "seo_requirements": "SEO specifications",
-    "analytics_setup": "Analytics requirements",
-    "security_requirements": "Security measures"
-  }},
-  "integration_requirements": [
-    "Integration 1",
-    "Integration 2"
-  ],
-  "bolt_prompt": "Complete Bolt prompt for website generation"
-}}"""
-
-                response = await self.call_asi_one(prompt, 4000)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    bolt_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] REST: JSON parsing failed, using fallback data")
-                    bolt_data = self.get_fallback_bolt_data(req.product)
-                
-                # Convert to response models
-                design_specifications = DesignSpecifications(**bolt_data.get('design_specifications', {}))
-                content_strategy = ContentStrategy(**bolt_data.get('content_strategy', {}))
-                technical_specifications = TechnicalSpecifications(**bolt_data.get('technical_specifications', {}))
-                
-                bolt_response = BoltPromptResponse(
-                    website_title=bolt_data.get('website_title', f"{req.product.get('product_name', 'Product')} Website"),
-                    website_description=bolt_data.get('website_description', req.product.get('product_description', 'Website description')),
-                    pages_required=bolt_data.get('pages_required', []),
-                    design_specifications=design_specifications,
-                    functional_requirements=bolt_data.get('functional_requirements', []),
-                    content_strategy=content_strategy,
-                    technical_specifications=technical_specifications,
-                    integration_requirements=bolt_data.get('integration_requirements', []),
-                    bolt_prompt=bolt_data.get('bolt_prompt', '')
-                )
-                
-                self.log_activity('REST: Created Bolt prompt for website development', {
-                    'product_name': req.product.get('product_name', 'Unknown'),
-                    'pages_count': len(bolt_response.pages_required),
-                    'features_count': len(bolt_response.functional_requirements)
-                })
-                
-                return bolt_response
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] REST: Error creating Bolt prompt: {str(e)}")
-                return self.get_fallback_bolt_response(req.product)
+            return await self.create_bolt_prompt(req)
+    
+    async def create_bolt_prompt(self, req: BoltPromptRequest, priority: int = PRIORITY_INTERACTIVE) -> BoltPromptResponse:
+        """Create a Bolt prompt through the shared request pipeline"""
+        return await self.run_pipeline(
+            req, '/create-bolt-prompt', 4000,
+            build_prompt=self.build_bolt_prompt,
+            build_response=self.build_bolt_response,
+            fallback_data=lambda req: self.get_fallback_bolt_data(req.product),
+            fallback_response=lambda req: self.get_fallback_bolt_response(req.product),
+            priority=priority,
+            activity='Created Bolt prompt for website development',
+            summarize=lambda req, res: {
+                'product_name': req.product.get('product_name', 'Unknown'),
+                'pages_count': len(res.pages_required),
+                'features_count': len(res.functional_requirements)
+            }
+        )
+    
+    def build_bolt_prompt(self, req: BoltPromptRequest) -> RenderedPrompt:
+        """Build the Bolt prompt request for the LLM"""
+        print(f"🔧 [{self.name}] Creating Bolt prompt for: {req.product.get('product_name', 'Unknown')}")
+        
+        return self.prompts.render(
+            'create_bolt_prompt',
+            title=req.idea.get('title', 'Unknown'),
+            description=req.idea.get('description', 'No description'),
+            product_name=req.product.get('product_name', 'Unknown'),
+            product_description=req.product.get('product_description', 'No description'),
+            core_features=json.dumps(req.product.get('core_features', [])),
+            target_market=json.dumps(req.product.get('target_market', {})),
+            value_proposition=req.product.get('value_proposition', 'Not specified'),
+            revenue_model=req.product.get('revenue_model', 'Not specified'),
+            market_size=req.research.get('market_analysis', {}).get('market_size', 'N/A'),
+            growth_potential=req.research.get('market_analysis', {}).get('growth_potential', 'N/A'),
+            competitors=json.dumps(req.research.get('competitors', [])),
+            target_audience=req.research.get('recommendations', {}).get('target_audience', 'N/A'),
+            brand_positioning=req.marketing_strategy.get('brand_positioning', 'N/A'),
+            key_messages=json.dumps(req.marketing_strategy.get('key_messages', [])),
+            target_segments=json.dumps(req.marketing_strategy.get('target_segments', [])),
+            marketing_channels=json.dumps(req.marketing_strategy.get('marketing_channels', [])),
+            technology_stack=json.dumps(req.technical_strategy.get('technology_stack', {})),
+            architecture=req.technical_strategy.get('architecture', {}).get('overview', 'N/A'),
+            timeline=json.dumps(req.technical_strategy.get('timeline', {}))
+        )
+    
+    def build_bolt_response(self, bolt_data: Dict[str, Any], req: BoltPromptRequest) -> BoltPromptResponse:
+        """Convert parsed Bolt data to response models"""
+        design_specifications = DesignSpecifications(**bolt_data.get('design_specifications', {}))
+        content_strategy = ContentStrategy(**bolt_data.get('content_strategy', {}))
+        technical_specifications = TechnicalSpecifications(**bolt_data.get('technical_specifications', {}))
+        
+        return BoltPromptResponse(
+            website_title=bolt_data.get('website_title', f"{req.product.get('product_name', 'Product')} Website"),
+            website_description=bolt_data.get('website_description', req.product.get('product_description', 'Website description')),
+            pages_required=bolt_data.get('pages_required', []),
+            design_specifications=design_specifications,
+            functional_requirements=bolt_data.get('functional_requirements', []),
+            content_strategy=content_strategy,
+            technical_specifications=technical_specifications,
+            integration_requirements=bolt_data.get('integration_requirements', []),
+            bolt_prompt=bolt_data.get('bolt_prompt', '')
+        )
     
     def get_fallback_bolt_data(self, product: Dict[str, Any]) -> Dict[str, Any]:
         """Get fallback Bolt data when API fails"""
@@ -0,0 +1,31 @@
+"""
+Idea title deduplication for the AI Company CEO agent
+Detects ideas whose titles match an already accepted idea by characters or by words
+"""
+
+import difflib
+import re
+from typing import List
+
+# Titles at or above either similarity are treated as the same idea
+IDEA_TITLE_SEQUENCE_SIMILARITY = 0.9
+IDEA_TITLE_WORD_OVERLAP = 0.75
+IDEA_TITLE_STOPWORDS = {'a', 'an', 'the', 'for', 'of', 'and', 'to', 'in', 'on', 'with', 'by', 'ai'}
+
+
+def normalize_title(title: str) -> List[str]:
+    """Lowercase title words without punctuation or filler words"""
+    words = re.findall(r'[a-z0-9]+', title.lower())
+    return [word for word in words if word not in IDEA_TITLE_STOPWORDS] or words
+
+
+def is_near_duplicate(title: str, seen_titles: List[List[str]]) -> bool:
+    """Check whether a title matches an already accepted title by characters or by words"""
+    words = normalize_title(title)
+    for seen in seen_titles:
+        if difflib.SequenceMatcher(None, ' '.join(words), ' '.join(seen)).ratio() >= IDEA_TITLE_SEQUENCE_SIMILARITY:
+            return True
+        union = set(words) | set(seen)
+        if union and len(set(words) & set(seen)) / len(union) >= IDEA_TITLE_WORD_OVERLAP:
+            return True
+    return False
@@ -0,0 +1,17 @@
+"""
+JSON extraction from LLM completions for AI Company uAgents
+Kept free of agent dependencies so benchmarks and tests can import it directly
+"""
+
+# Control characters stripped from LLM output before JSON parsing
+CONTROL_CHAR_TABLE = dict.fromkeys(list(range(0x00, 0x20)) + list(range(0x7F, 0xA0)))
+
+
+def clean_llm_json(response: str) -> str:
+    """Strip control characters and extract the outermost {...} block from an LLM response"""
+    cleaned_response = (response or '').translate(CONTROL_CHAR_TABLE)
+    start = cleaned_response.find('{')
+    end = cleaned_response.rfind('}')
+    if start != -1 and end > start:
+        return cleaned_response[start:end + 1]
+    return cleaned_response
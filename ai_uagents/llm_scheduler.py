@@ -0,0 +1,160 @@
+"""
+Priority-aware LLM request scheduler for AI Company uAgents
+Bounds upstream concurrency per agent and keeps interactive calls ahead of bulk work
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+# Priority classes (lower value is served first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_BATCH = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_BACKGROUND: 'background',
+    PRIORITY_BATCH: 'batch'
+}
+
+LLM_MAX_IN_FLIGHT = int(os.getenv('LLM_MAX_IN_FLIGHT', '4'))
+# After this many consecutive grants to a higher class, a waiting lower class gets one slot
+LLM_STARVATION_LIMIT = int(os.getenv('LLM_STARVATION_LIMIT', '8'))
+
+
+class LLMScheduler:
+    """Bounded async scheduler with strict priority classes and round-robin flows"""
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, starvation_limit: int = LLM_STARVATION_LIMIT):
+        self.max_in_flight = max(1, max_in_flight)
+        self.starvation_limit = starvation_limit
+        self._in_flight = 0
+        self._consecutive_high = 0
+        # priority -> flow key -> waiting futures; flows are rotated for fair queuing
+        self._queues: Dict[int, "OrderedDict[str, deque]"] = {
+            priority: OrderedDict() for priority in PRIORITY_NAMES
+        }
+        self._stats = {
+            priority: {'granted': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+            for priority in PRIORITY_NAMES
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE, flow: Optional[str] = None):
+        """Hold one upstream slot for the duration of the block"""
+        await self.acquire(priority, flow)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE, flow: Optional[str] = None):
+        """Wait until a slot is granted"""
+        priority = priority if priority in self._queues else PRIORITY_BACKGROUND
+        started_at = time.monotonic()
+
+        if self._in_flight < self.max_in_flight and not self.queued():
+            self._in_flight += 1
+            self._record_grant(priority, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        flow_key = flow or 'default'
+        self._queues[priority].setdefault(flow_key, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as we were cancelled; hand it on
+                self.release()
+            else:
+                self._discard(priority, flow_key, future)
+            raise
+        self._record_grant(priority, time.monotonic() - started_at)
+
+    def release(self):
+        """Return a slot and wake the next waiter"""
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    def queued(self, priority: Optional[int] = None) -> int:
+        """Count waiting requests, optionally for one priority class"""
+        priorities = [priority] if priority is not None else list(self._queues)
+        return sum(len(queue) for p in priorities for queue in self._queues[p].values())
+
+    def _dispatch(self):
+        """Grant free slots to waiters in priority order"""
+        while self._in_flight < self.max_in_flight:
+            future = self._next_waiter()
+            if future is None:
+                return
+            if future.done():
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pick the next waiter: highest priority first, round-robin across flows"""
+        waiting = [priority for priority in sorted(self._queues) if self._queues[priority]]
+        if not waiting:
+            return None
+
+        priority = waiting[0]
+        if len(waiting) > 1:
+            if self._consecutive_high >= self.starvation_limit:
+                priority = waiting[-1]
+                self._consecutive_high = 0
+            else:
+                self._consecutive_high += 1
+        else:
+            self._consecutive_high = 0
+
+        flows = self._queues[priority]
+        flow_key, queue = next(iter(flows.items()))
+        future = queue.popleft()
+        del flows[flow_key]
+        if queue:
+            flows[flow_key] = queue
+        return future
+
+    def _discard(self, priority: int, flow_key: str, future: asyncio.Future):
+        """Remove a cancelled waiter from its queue"""
+        queue = self._queues[priority].get(flow_key)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[priority][flow_key]
+
+    def _record_grant(self, priority: int, waited: float):
+        """Update wait-time statistics"""
+        stats = self._stats[priority]
+        stats['granted'] += 1
+        stats['wait_seconds'] += waited
+        stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get current scheduler state and wait-time statistics"""
+        classes = {}
+        for priority, name in PRIORITY_NAMES.items():
+            stats = self._stats[priority]
+            classes[name] = {
+                'queued': self.queued(priority),
+                'flows_waiting': len(self._queues[priority]),
+                'granted': stats['granted'],
+                'avg_wait_seconds': round(stats['wait_seconds'] / stats['granted'], 4) if stats['granted'] else 0.0,
+                'max_wait_seconds': round(stats['max_wait_seconds'], 4)
+            }
+        return {
+            'max_in_flight': self.max_in_flight,
+            'in_flight': self._in_flight,
+            'queued': self.queued(),
+            'classes': classes
+        }
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Local mock ASI:One server for AI Company uAgents
+OpenAI-compatible /v1/chat/completions stand-in for offline and load testing
+
+Usage:
+    python3 mock_asi_one.py --port 8090 --latency lognormal:-0.5,0.4 --error-rate 0.02 --seed 7
+
+Point the agents at it with:
+    ASI_ONE_BASE_URL=http://localhost:8090/v1 ASI_ONE_API_KEY=sk_mock python3 ceo_uagent.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+from aiohttp import web
+
+# Canned, schema-valid payloads per agent type (match the uAgent response models)
+CANNED_RESPONSES: Dict[str, Dict[str, Any]] = {
+    "ceo_ideas_item": {
+        "title": "AI Bookkeeping Copilot",
+        "description": "An assistant that reconciles small-business books automatically. It flags anomalies and prepares tax-ready reports.",
+        "revenue_model": "Monthly subscription per business entity",
+        "success_factors": "Large underserved SMB market with painful manual workflows"
+    },
+    "ceo_evaluation": {
+        "viability_score": 7,
+        "market_potential": "High",
+        "recommendations": "Narrow the launch segment and validate pricing with design partners",
+        "go_decision": True
+    },
+    "ceo_welcome": {
+        "message": "Welcome! I'm ready to coordinate the AI agent workflow once you build the agents.",
+        "status": "ready_for_workflow",
+        "next_steps": "Build your AI agents and establish the company workflow."
+    },
+    "research": {
+        "competitors": [
+            {"name": "Incumbent Suite", "description": "Established all-in-one platform", "strengths": "Brand and distribution", "weaknesses": "Slow product iteration"},
+            {"name": "Niche Startup", "description": "Focused point solution", "strengths": "Modern UX", "weaknesses": "Limited integrations"},
+            {"name": "Open Source Stack", "description": "Self-hosted alternative", "strengths": "Free and flexible", "weaknesses": "High setup cost"}
+        ],
+        "market_analysis": {
+            "market_size": "$4.2B serviceable market",
+            "growth_potential": "High",
+            "key_challenges": ["Customer acquisition cost", "Data integration", "Trust in automation"],
+            "opportunities": ["AI-native workflows", "SMB digitization", "Embedded partnerships"]
+        },
+        "recommendations": {
+            "positioning": "The fastest way for small teams to automate the workflow end to end",
+            "differentiation": "Agentic automation with transparent audit trails",
+            "target_audience": "Owner-operated businesses with 5-50 employees"
+        }
+    },
+    "product": {
+        "product_name": "FlowPilot",
+        "product_description": "An AI workspace that automates the core workflow and reports outcomes in plain language.",
+        "core_features": ["Automated intake", "Anomaly detection", "One-click reporting", "Team approvals"],
+        "target_market": {"primary": "Small business owners", "secondary": "Fractional consultants"},
+        "value_proposition": "Save ten hours a week with automation you can audit",
+        "go_to_market": {
+            "channels": ["Content marketing", "Partner integrations", "Product-led trials"],
+            "pricing_strategy": "Freemium with $29/month Pro and $99/month Team tiers",
+            "launch_plan": "Private beta with 50 design partners, then public launch"
+        },
+        "revenue_model": "Tiered monthly subscriptions",
+        "success_metrics": ["Weekly active teams", "Trial-to-paid conversion", "Net revenue retention"]
+    },
+    "cmo": {
+        "brand_positioning": "The calm, trustworthy autopilot for busy small teams",
+        "key_messages": ["Automate the busywork", "Every action is auditable", "Set up in minutes"],
+        "target_segments": [
+            {"segment": "Owner-operators", "characteristics": "Time-poor, cost-sensitive", "channels": ["LinkedIn", "Podcasts"]},
+            {"segment": "Consultants", "characteristics": "Manage many clients", "channels": ["Communities", "Webinars"]}
+        ],
+        "marketing_channels": [
+            {"channel": "Content marketing", "strategy": "Weekly workflow teardown articles", "budget_allocation": "30%"},
+            {"channel": "Paid social", "strategy": "Retarget trial visitors", "budget_allocation": "25%"},
+            {"channel": "Partnerships", "strategy": "Integration marketplace listings", "budget_allocation": "45%"}
+        ],
+        "content_strategy": {
+            "content_types": ["Blog posts", "Short videos", "Templates"],
+            "content_themes": ["Time savings", "Trust and control"],
+            "publishing_schedule": "Two pieces per week"
+        },
+        "social_media": {
+            "platforms": ["LinkedIn", "X"],
+            "strategy": "Founder-led storytelling with customer proof",
+            "engagement_tactics": ["Weekly AMA", "Customer spotlights"]
+        },
+        "launch_campaign": {
+            "pre_launch": "Waitlist with referral rewards",
+            "launch_day": "Product Hunt launch and live demo",
+            "post_launch": "Case studies from beta customers"
+        },
+        "budget_recommendations": {
+            "total_budget": "$60,000 for the first two quarters",
+            "allocation": {"content": "30%", "paid": "25%", "partnerships": "45%"}
+        },
+        "success_metrics": ["Waitlist signups", "Trial starts", "CAC payback"]
+    },
+    "cto": {
+        "technology_stack": {
+            "frontend": ["React", "TypeScript"],
+            "backend": ["Python", "FastAPI"],
+            "database": "PostgreSQL",
+            "cloud_platform": "AWS",
+            "ai_ml": ["Hosted LLM API", "Embeddings"]
+        },
+        "architecture": {
+            "overview": "Modular monolith with background workers",
+            "components": ["Web app", "API", "Worker queue", "LLM gateway"],
+            "data_flow": "Events flow from integrations into workers and on to the API",
+            "api_design": "REST with OpenAPI schema"
+        },
+        "development_methodology": {
+            "approach": "Agile",
+            "sprints": "Two-week sprints",
+            "tools": ["GitHub", "Linear", "Docker"],
+            "version_control": "Trunk-based development"
+        },
+        "security_compliance": {
+            "security_measures": ["Encryption at rest", "SSO", "Audit logging"],
+            "compliance_requirements": ["GDPR", "SOC 2"],
+            "data_protection": "Per-tenant encryption keys",
+            "authentication": "OAuth 2.0 with short-lived tokens"
+        },
+        "scalability": {
+            "performance_targets": "p95 API latency under 300ms",
+            "scaling_strategy": "Horizontal workers behind a queue",
+            "monitoring": "OpenTelemetry traces and metrics",
+            "load_balancing": "Managed application load balancer"
+        },
+        "integrations": {
+            "third_party": ["Stripe", "QuickBooks", "Slack"],
+            "apis": "Webhook-first integration layer",
+            "data_sources": "Customer SaaS tools via OAuth"
+        },
+        "timeline": {
+            "phases": [
+                {"phase": "MVP", "duration": "10 weeks", "deliverables": ["Core workflow", "Billing"]},
+                {"phase": "Scale", "duration": "8 weeks", "deliverables": ["Integrations", "Team features"]}
+            ],
+            "total_duration": "18 weeks",
+            "milestones": ["Private beta", "Public launch"]
+        },
+        "team_structure": {
+            "roles_needed": ["Full-stack engineer", "ML engineer", "Designer"],
+            "team_size": "4-5 people",
+            "hiring_priority": ["Full-stack engineer", "ML engineer"]
+        },
+        "infrastructure": {
+            "hosting": "AWS ECS",
+            "cdn": "CloudFront",
+            "backup": "Daily snapshots with point-in-time recovery",
+            "monitoring": "CloudWatch and Grafana"
+        },
+        "quality_assurance": {
+            "testing_strategy": "Unit and contract tests with nightly end-to-end runs",
+            "automation": "CI on every pull request",
+            "performance_testing": "Weekly load tests",
+            "security_testing": "Quarterly penetration tests"
+        }
+    },
+    "head_engineering": {
+        "website_title": "FlowPilot - Automate the busywork",
+        "website_description": "Marketing site and signup flow for FlowPilot",
+        "pages_required": ["Home", "Features", "Pricing", "About", "Contact"],
+        "design_specifications": {
+            "color_scheme": "Deep navy with mint accents",
+            "typography": "Inter for UI, Source Serif for headlines",
+            "layout_style": "Spacious single-column sections",
+            "responsive_design": "Mobile-first with fluid grids"
+        },
+        "functional_requirements": ["Signup form", "Pricing toggle", "Demo booking"],
+        "content_strategy": {
+            "homepage_content": "Hero with value proposition and product screenshot",
+            "about_page": "Founding story and mission",
+            "features_page": "Feature grid with short demos",
+            "pricing_page": "Three tiers with FAQ",
+            "contact_page": "Contact form and support links"
+        },
+        "technical_specifications": {
+            "performance_requirements": "Lighthouse score above 90",
+            "seo_requirements": "Semantic HTML and meta tags",
+            "analytics_setup": "Privacy-friendly analytics",
+            "security_requirements": "HTTPS and form spam protection"
+        },
+        "integration_requirements": ["Stripe checkout", "Calendly embed"],
+        "bolt_prompt": "Build a responsive marketing website for FlowPilot with home, features, pricing, about and contact pages."
+    },
+    "finance": {
+        "timeline": "First revenue within 3 months of launch, break-even in 18 months",
+        "revenue_sources": ["Pro subscriptions", "Team subscriptions", "Implementation services"],
+        "risk_factors": ["Slower trial conversion", "Competitive pricing pressure"],
+        "pricing_strategy": "Freemium with annual discounts"
+    },
+    "generic": {
+        "message": "Mock ASI:One response",
+        "status": "ok"
+    }
+}
+
+FINANCE_REPORT_MARKDOWN = """# Financial Report
+
+## Summary
+- Total revenue generated: see revenue history
+- Dividends distributed: see contract info
+
+## Recommendations
+1. Keep reserves above three months of operating costs.
+2. Review token holder distribution quarterly.
+"""
+
+# Prompt fingerprints used to decide which agent is calling
+AGENT_FINGERPRINTS: List[Tuple[str, str]] = [
+    ("ceo_welcome", r"Prepare a welcoming message"),
+    ("ceo_ideas", r"Generate (?:\d+ )?innovative business ideas"),
+    ("ceo_evaluation", r"evaluate (?:this|the) product concept"),
+    ("ceo_evaluation_batch", r"evaluate each product concept"),
+    ("research", r"market research specialist"),
+    ("product", r"As a product strategist"),
+    ("cmo", r"Chief Marketing Officer"),
+    ("cto", r"Chief Technology Officer"),
+    ("head_engineering", r"Head of Engineering"),
+    ("finance_report", r"create a comprehensive financial report"),
+    ("finance", r"analyze the revenue potential"),
+]
+
+
+class MockConfig:
+    """Runtime configuration for the mock server"""
+
+    def __init__(self, latency: str = 'fixed:0.2', error_rate: float = 0.0, error_codes: str = '500,503,429',
+                 truncation_rate: float = 0.0, stream_chunks: int = 8, seed: Optional[int] = None,
+                 model: str = 'asi1-mini'):
+        self.latency_kind, self.latency_params = self.parse_latency(latency)
+        self.latency_spec = latency
+        self.error_rate = error_rate
+        self.error_codes = [int(code) for code in error_codes.split(',') if code.strip()]
+        self.truncation_rate = truncation_rate
+        self.stream_chunks = max(1, stream_chunks)
+        self.seed = seed
+        self.model = model
+        self.rng = random.Random(seed)
+
+    @staticmethod
+    def parse_latency(spec: str) -> Tuple[str, List[float]]:
+        """Parse latency specs like fixed:0.2, uniform:0.1,0.5, normal:0.4,0.1, lognormal:-1,0.5"""
+        kind, _, params = spec.partition(':')
+        values = [float(value) for value in params.split(',') if value.strip()] if params else []
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if kind not in expected or len(values) != expected[kind]:
+            raise ValueError(f"Invalid latency spec '{spec}'")
+        return kind, values
+
+    def sample_latency(self) -> float:
+        """Draw one response latency in seconds"""
+        params = self.latency_params
+        if self.latency_kind == 'fixed':
+            value = params[0]
+        elif self.latency_kind == 'uniform':
+            value = self.rng.uniform(params[0], params[1])
+        elif self.latency_kind == 'normal':
+            value = self.rng.gauss(params[0], params[1])
+        else:
+            value = self.rng.lognormvariate(params[0], params[1])
+        return max(0.0, value)
+
+
+def detect_agent_type(prompt: str) -> str:
+    """Work out which agent sent a prompt from its opening lines"""
+    opening = prompt[:400]
+    for agent_type, pattern in AGENT_FINGERPRINTS:
+        if re.search(pattern, opening, re.IGNORECASE):
+            return agent_type
+    return 'generic'
+
+
+def build_completion_text(agent_type: str, prompt: str) -> str:
+    """Build the canned completion body for an agent type"""
+    if agent_type == 'finance_report':
+        return FINANCE_REPORT_MARKDOWN
+    if agent_type == 'ceo_ideas':
+        match = re.search(r"Generate (\d+) (?:innovative|ideas)", prompt)
+        count = int(match.group(1)) if match else 3
+        base = CANNED_RESPONSES['ceo_ideas_item']
+        # Parallel shards name a focus area, which keeps their titles distinct after de-duplication
+        focus = re.search(r"Focus on ([^.\n]+)", prompt)
+        label = f" for {focus.group(1)}" if focus else ''
+        ideas = [dict(base, title=f"{base['title']}{label} #{index + 1}") for index in range(max(1, count))]
+        return json.dumps({"ideas": ideas}, indent=2)
+    if agent_type == 'ceo_evaluation_batch':
+        indexes = [int(index) for index in re.findall(r"^Product (\d+):", prompt, re.MULTILINE)]
+        evaluations = [dict(CANNED_RESPONSES['ceo_evaluation'], index=index) for index in indexes]
+        return json.dumps({"evaluations": evaluations}, indent=2)
+    if agent_type == 'ceo_evaluation':
+        return json.dumps(CANNED_RESPONSES['ceo_evaluation'], indent=2)
+    return json.dumps(CANNED_RESPONSES.get(agent_type, CANNED_RESPONSES['generic']), indent=2)
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class MockASIOneServer:
+    """aiohttp application serving OpenAI-compatible chat completions"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.stats = {'requests': 0, 'errors_injected': 0, 'truncations': 0, 'streams': 0,
+                      'cached_prompt_tokens': 0, 'by_agent': {}}
+        # System prefixes seen so far, to report prefix-cache hits like a caching provider would
+        self.seen_prefixes = set()
+
+    def create_app(self) -> web.Application:
+        """Create the aiohttp application"""
+        app = web.Application(client_max_size=32 * 1024 * 1024)
+        app.router.add_post('/v1/chat/completions', self.handle_chat_completions)
+        app.router.add_get('/v1/models', self.handle_models)
+        app.router.add_get('/mock/stats', self.handle_stats)
+        return app
+
+    async def handle_models(self, request: web.Request) -> web.Response:
+        """List the mock model"""
+        return web.json_response({"object": "list", "data": [{"id": self.config.model, "object": "model"}]})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """Report what the mock has served"""
+        return web.json_response(dict(self.stats, latency=self.config.latency_spec, seed=self.config.seed))
+
+    async def handle_chat_completions(self, request: web.Request) -> web.StreamResponse:
+        """Serve one chat completion, optionally streamed"""
+        body = await request.json()
+        messages = body.get('messages', [])
+        prompt = "\n".join(str(message.get('content', '')) for message in messages)
+        max_tokens = int(body.get('max_tokens') or 1000)
+        agent_type = detect_agent_type(prompt)
+
+        self.stats['requests'] += 1
+        self.stats['by_agent'][agent_type] = self.stats['by_agent'].get(agent_type, 0) + 1
+
+        latency = self.config.sample_latency()
+        rng = self.config.rng
+
+        if self.config.error_rate and rng.random() < self.config.error_rate:
+            self.stats['errors_injected'] += 1
+            await asyncio.sleep(latency / 2)
+            status = rng.choice(self.config.error_codes) if self.config.error_codes else 500
+            return web.json_response(
+                {"error": {"message": "Injected mock failure", "type": "mock_error", "code": status}},
+                status=status
+            )
+
+        content = build_completion_text(agent_type, prompt)
+        finish_reason = 'stop'
+        force_truncation = self.config.truncation_rate and rng.random() < self.config.truncation_rate
+        if count_tokens(content) > max_tokens or force_truncation:
+            limit = max_tokens if count_tokens(content) > max_tokens else count_tokens(content) // 2
+            content = content[:limit * 4]
+            finish_reason = 'length'
+            self.stats['truncations'] += 1
+
+        usage = {
+            "prompt_tokens": count_tokens(prompt),
+            "completion_tokens": count_tokens(content),
+            "total_tokens": count_tokens(prompt) + count_tokens(content)
+        }
+        if messages and messages[0].get('role') == 'system':
+            prefix = str(messages[0].get('content', ''))
+            if prefix in self.seen_prefixes:
+                usage["prompt_tokens_details"] = {"cached_tokens": count_tokens(prefix)}
+                self.stats['cached_prompt_tokens'] += count_tokens(prefix)
+            self.seen_prefixes.add(prefix)
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+
+        if body.get('stream'):
+            self.stats['streams'] += 1
+            return await self.stream_completion(request, completion_id, content, finish_reason, usage, latency)
+
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get('model', self.config.model),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }],
+            "usage": usage
+        })
+
+    async def stream_completion(self, request: web.Request, completion_id: str, content: str,
+                                finish_reason: str, usage: Dict[str, int], latency: float) -> web.StreamResponse:
+        """Stream a completion as server-sent events spread across the sampled latency"""
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+
+        chunks = self.config.stream_chunks
+        size = max(1, -(-len(content) // chunks))
+        pieces = [content[index:index + size] for index in range(0, len(content), size)] or ['']
+        delay = latency / len(pieces)
+
+        for index, piece in enumerate(pieces):
+            await asyncio.sleep(delay)
+            delta = {"content": piece}
+            if index == 0:
+                delta["role"] = "assistant"
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": self.config.model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}]
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        final_chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": self.config.model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+            "usage": usage
+        }
+        await response.write(f"data: {json.dumps(final_chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options (environment variables provide defaults)"""
+    parser = argparse.ArgumentParser(description="Local mock ASI:One / OpenAI-compatible server")
+    parser.add_argument('--host', default=os.getenv('MOCK_ASI_ONE_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('MOCK_ASI_ONE_PORT', '8090')))
+    parser.add_argument('--latency', default=os.getenv('MOCK_ASI_ONE_LATENCY', 'fixed:0.2'),
+                        help="fixed:S | uniform:MIN,MAX | normal:MEAN,STD | lognormal:MU,SIGMA (seconds)")
+    parser.add_argument('--error-rate', type=float, default=float(os.getenv('MOCK_ASI_ONE_ERROR_RATE', '0')))
+    parser.add_argument('--error-codes', default=os.getenv('MOCK_ASI_ONE_ERROR_CODES', '500,503,429'))
+    parser.add_argument('--truncation-rate', type=float, default=float(os.getenv('MOCK_ASI_ONE_TRUNCATION_RATE', '0')))
+    parser.add_argument('--stream-chunks', type=int, default=int(os.getenv('MOCK_ASI_ONE_STREAM_CHUNKS', '8')))
+    parser.add_argument('--seed', type=int, default=int(os.getenv('MOCK_ASI_ONE_SEED')) if os.getenv('MOCK_ASI_ONE_SEED') else None)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the mock server"""
+    args = parse_args(argv)
+    config = MockConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_codes=args.error_codes,
+        truncation_rate=args.truncation_rate,
+        stream_chunks=args.stream_chunks,
+        seed=args.seed
+    )
+    server = MockASIOneServer(config)
+    print(f"🧪 Starting mock ASI:One server on http://{args.host}:{args.port}/v1")
+    print(f"   Latency: {args.latency} | Error rate: {args.error_rate} | Truncation rate: {args.truncation_rate} | Seed: {args.seed}")
+    web.run_app(server.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,182 @@ Coordinates the complete business workflow across all agents
 """
 
 import asyncio
+import importlib
 import json
+import os
+import time
+import uuid
 import requests
+from collections import OrderedDict
 from typing import Dict, Any, List
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, UsageStatsResponse
+from usage_tracker import empty_usage_bucket, merge_usage_buckets
+from agent_router import AgentRouter, parse_agent_endpoints, AGENT_ENDPOINTS
+from admission import AdmissionController, OverloadedError
+from llm_scheduler import PRIORITY_BATCH
+from agent_messaging import MessageTransport, StepReply, load_agent_addresses, AGENT_TRANSPORT
+from wire_codec import dumps, loads, JSON_HEADERS
+from blob_store import BLOB_PRUNE_INTERVAL_SECONDS
+from workflow_store import (
+    WorkflowStore, STEP_DEGRADED, STEP_CACHE_STALE_SECONDS, PDR_PENDING, PDR_SENDING, PDR_DELIVERED, PDR_FAILED, hash_step_input
+)
+from workflow_events import (
+    WorkflowEventBus, WorkflowEventServer,
+    WORKFLOW_STARTED, WORKFLOW_COMPLETED, WORKFLOW_FAILED,
+    STEP_STARTED, STEP_COMPLETED, STEP_FAILED, STEP_PARTIAL,
+    BATCH_STARTED, BATCH_ITEM_COMPLETED, BATCH_ITEM_FAILED, BATCH_COMPLETED
+)
+
+# 'distributed' calls every agent over localhost HTTP; 'monolith' loads the agents into this
+# process and calls their REST handlers directly as coroutines
+ORCHESTRATOR_MODE = os.getenv('ORCHESTRATOR_MODE', 'distributed').lower()
+MONOLITH_AGENTS = {
+    'ceo': ('ceo_uagent', 'ceo_agent'),
+    'research_metta': ('research_metta_uagent', 'research_metta_agent'),
+    'product': ('product_uagent', 'product_agent'),
+    'cmo': ('cmo_uagent', 'cmo_agent'),
+    'cto': ('cto_uagent', 'cto_agent'),
+    'head_engineering': ('head_engineering_uagent', 'head_engineering_agent'),
+    'finance': ('finance_uagent', 'finance_agent')
+}
+
+# Steps whose outputs are served from the cross-workflow cache when their input hash repeats
+STEP_CACHE_STEPS = [
+    step.strip() for step in os.getenv('STEP_CACHE_STEPS', 'product,cmo,cto,finance').split(',') if step.strip()
+]
+
+# Per-replica timeout when collecting token usage at the end of a workflow
+USAGE_COLLECT_TIMEOUT_SECONDS = float(os.getenv('USAGE_COLLECT_TIMEOUT_SECONDS', '2'))
+
+# Background job pool for /submit-workflow
+ORCHESTRATOR_WORKERS = int(os.getenv('ORCHESTRATOR_WORKERS', '4'))
+ORCHESTRATOR_MAX_QUEUED_JOBS = int(os.getenv('ORCHESTRATOR_MAX_QUEUED_JOBS', '100'))
+
+# PDR outbox: Node API that creates/approves PDRs and how deliveries are retried
+PDR_API_URL = os.getenv('PDR_API_URL', 'http://localhost:5070').rstrip('/')
+PDR_MAX_ATTEMPTS = int(os.getenv('PDR_MAX_ATTEMPTS', '8'))
+PDR_RETRY_BASE_SECONDS = float(os.getenv('PDR_RETRY_BASE_SECONDS', '5'))
+PDR_RETRY_MAX_SECONDS = float(os.getenv('PDR_RETRY_MAX_SECONDS', '600'))
+PDR_OUTBOX_POLL_SECONDS = float(os.getenv('PDR_OUTBOX_POLL_SECONDS', '2'))
+
+# Batch workflows: in-flight calls allowed per agent replica (ORCHESTRATOR_STEP_CONCURRENCY="cto=1,research=4"
+# overrides individual steps), batch workflows in flight across all batches and concepts per batch
+ORCHESTRATOR_AGENT_CONCURRENCY = int(os.getenv('ORCHESTRATOR_AGENT_CONCURRENCY', '2'))
+ORCHESTRATOR_STEP_CONCURRENCY = os.getenv('ORCHESTRATOR_STEP_CONCURRENCY', '')
+ORCHESTRATOR_BATCH_IN_FLIGHT = int(os.getenv('ORCHESTRATOR_BATCH_IN_FLIGHT', '16'))
+ORCHESTRATOR_MAX_BATCH_SIZE = int(os.getenv('ORCHESTRATOR_MAX_BATCH_SIZE', '500'))
+# Finished batches kept in memory; /batch-status answers older ones from the workflow store
+ORCHESTRATOR_BATCH_HISTORY = int(os.getenv('ORCHESTRATOR_BATCH_HISTORY', '20'))
+# Nobody waits on a batch item, so by default it has no deadline and never degrades (0 disables)
+BATCH_WORKFLOW_DEADLINE_SECONDS = float(os.getenv('BATCH_WORKFLOW_DEADLINE_SECONDS', '0'))
+
+# Workflow deadline split across agent steps by weight; steps left with less than
+# STEP_MIN_BUDGET_SECONDS degrade to a stale cached output or the agent's fallback (0 disables)
+WORKFLOW_DEADLINE_SECONDS = float(os.getenv('WORKFLOW_DEADLINE_SECONDS', '300'))
+STEP_MIN_BUDGET_SECONDS = float(os.getenv('STEP_MIN_BUDGET_SECONDS', '5'))
+STEP_TIMEOUT_GRACE_SECONDS = 5
+STEP_BUDGET_WEIGHTS = {
+    'research': 0.25,
+    'product': 0.15,
+    'cmo': 0.15,
+    'cto': 0.15,
+    'head_engineering': 0.2,
+    'finance': 0.1
+}
+
+# Workflow steps in execution order and the upstream steps each one consumes
+WORKFLOW_STEPS = ['research', 'product', 'cmo', 'cto', 'head_engineering', 'finance']
+STEP_DEPENDENCIES = {
+    'research': [],
+    'product': ['research'],
+    'cmo': ['research', 'product'],
+    'cto': ['research', 'product'],
+    'head_engineering': ['research', 'product', 'cmo', 'cto'],
+    'finance': ['product']
+}
+# Agent role serving each step
+STEP_ROLES = {
+    'research': 'research_metta',
+    'product': 'product',
+    'cmo': 'cmo',
+    'cto': 'cto',
+    'head_engineering': 'head_engineering',
+    'finance': 'finance'
+}
+STEP_DESCRIPTIONS = {
+    'research': "Step 2: Research analyzing market...",
+    'product': "Step 3: Product developing concept...",
+    'cmo': "Step 4: CMO creating marketing strategy...",
+    'cto': "Step 5: CTO creating technical strategy...",
+    'head_engineering': "Step 6: Head of Engineering creating Bolt prompt...",
+    'finance': "Step 7: Finance analyzing revenue..."
+}
+STEP_ERRORS = {
+    'research': "Research agent failed to analyze market",
+    'product': "Product agent failed to develop concept",
+    'cmo': "CMO agent failed to create marketing strategy",
+    'cto': "CTO agent failed to create technical strategy",
+    'head_engineering': "Head of Engineering agent failed to create Bolt prompt",
+    'finance': "Finance agent failed to analyze revenue"
+}
 
 class WorkflowRequest(Model):
     """Model for workflow request"""
     user_input: str
     idea_count: int = 3
+    workflow_id: str = None
+    deadline_seconds: float = None
+
+class BatchWorkflowRequest(Model):
+    """Model for running many business concepts as one batch"""
+    user_inputs: List[str]
+    idea_count: int = 3
+    batch_id: str = None
+    # Each PDR approval posts to social media, so batch items only create PDRs when asked to
+    create_pdr: bool = None
+
+class ResumeWorkflowRequest(Model):
+    """Model for resuming a checkpointed workflow"""
+    workflow_id: str
+    from_step: str = None
+
+class RerunWorkflowRequest(Model):
+    """Model for re-running a workflow with edited step inputs"""
+    workflow_id: str
+    step_inputs: Dict[str, Dict[str, Any]] = None
+
+class WorkflowStatusRequest(Model):
+    """Model for workflow checkpoint status request"""
+    workflow_id: str
+    include_outputs: bool = False
+
+class JobRequest(Model):
+    """Model for job status/result request"""
+    job_id: str
+
+class JobResponse(Model):
+    """Model for job submission, status and result responses"""
+    success: bool
+    job_id: str = None
+    status: str = None
+    message: str = None
+    data: Dict[str, Any] = None
+    error: str = None
+    retry_after: float = None
+
+class OrchestratorMetricsResponse(Model):
+    """Model for orchestrator load metrics"""
+    admission: Dict[str, Any]
+    job_queue: Dict[str, Any]
+    batches: Dict[str, Any]
+    transport: Dict[str, Any] = None
+    step_cache: Dict[str, Any] = None
+
+class AgentPoolResponse(Model):
+    """Model for agent replica pool state"""
+    mode: str
+    pools: Dict[str, Any]
 
 class WorkflowResponse(Model):
     """Model for workflow response"""
@@ -21,6 +187,7 @@ class WorkflowResponse(Model):
     message: str
     data: Dict[str, Any] = None
     error: str = None
+    retry_after: float = None
 
 class OrchestratoruAgent(BaseUAgent):
     """Workflow Orchestrator uAgent for coordinating complete business workflow"""
@@ -38,45 +205,77 @@ class OrchestratoruAgent(BaseUAgent):
             'cmo': 8004,
             'cto': 8005,
             'head_engineering': 8006,
-            'finance': 8007
+            'finance': 8007,
+            'research_metta': 8009
         }
+        # One endpoint per role by default; AGENT_ENDPOINTS adds replicas
+        endpoints = {role: [f"http://localhost:{port}"] for role, port in self.agent_ports.items()}
+        endpoints.update(parse_agent_endpoints(AGENT_ENDPOINTS))
+        self.router = AgentRouter(endpoints)
+        # AGENT_TRANSPORT=message sends steps as uAgents messages to agents with known addresses
+        self.messenger = MessageTransport(load_agent_addresses() if AGENT_TRANSPORT == 'message' else {})
+        self.workflow_store = WorkflowStore()
+        self.job_queue = None
+        self.job_workers = []
+        self.admission = AdmissionController()
+        # Batch workflows have their own slots so a large batch cannot crowd out interactive workflows
+        self.batch_admission = AdmissionController(max_concurrent=ORCHESTRATOR_BATCH_IN_FLIGHT, max_waiting=0)
+        self.event_bus = WorkflowEventBus()
+        self.event_server = WorkflowEventServer(self.event_bus)
+        self.step_slots = self.create_step_slots()
+        self.batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.batch_tasks = set()
+        self.pdr_worker = None
+        self.pdr_wakeup = None
+        self.local_agents = self.load_local_agents() if ORCHESTRATOR_MODE == 'monolith' else {}
         self.setup_handlers()
     
+    def load_local_agents(self) -> Dict[str, BaseUAgent]:
+        """Import the workflow agents into this process for monolith mode"""
+        local_agents = {}
+        for role, (module_name, attribute) in MONOLITH_AGENTS.items():
+            try:
+                local_agents[role] = getattr(importlib.import_module(module_name), attribute)
+            except Exception as e:
+                print(f"⚠️  [{self.name}] Could not load {role} agent in-process, calling it over HTTP: {e}")
+        print(f"🧩 [{self.name}] Monolith mode: {len(local_agents)} agent(s) running in-process")
+        return local_agents
+    
     def setup_handlers(self):
         """Setup message handlers for the agent"""
         
+        @self.agent.on_event("startup")
+        async def start_job_workers(ctx: Context):
+            """Start the background workflow job pool, the PDR outbox and the progress event stream"""
+            await self.start_job_workers()
+            await self.start_pdr_outbox()
+            self.router.start_health_checks()
+            if AGENT_TRANSPORT == 'message':
+                self.messenger.attach(ctx)
+                print(f"✉️  [{self.name}] Sending steps as messages to: {', '.join(sorted(self.messenger.addresses)) or 'no agents (no addresses known)'}")
+            await self.prune_blobs()
+            try:
+                await self.event_server.start()
+            except Exception as e:
+                print(f"⚠️  [{self.name}] Workflow event stream unavailable on port {self.event_server.port}: {e}")
+        
+        @self.agent.on_interval(period=BLOB_PRUNE_INTERVAL_SECONDS)
+        async def prune_blobs_periodically(ctx: Context):
+            """Keep the payload blob store within its TTL and size cap while the orchestrator runs"""
+            await self.prune_blobs()
+        
         @self.agent.on_message(model=WorkflowRequest)
         async def handle_workflow_request(ctx: Context, sender: str, msg: WorkflowRequest):
             """Handle complete workflow request"""
-            try:
-                print(f"🎯 [{self.name}] Starting complete workflow for: {msg.user_input}")
-                
-                # Run the complete workflow
-                workflow_result = await self.run_complete_workflow(msg.user_input, msg.idea_count)
-                
-                response = WorkflowResponse(
-                    success=True,
-                    message="Complete workflow executed successfully",
-                    data=workflow_result
-                )
-                
-                self.log_activity('Complete workflow executed', {
-                    'user_input': msg.user_input,
-                    'idea_count': msg.idea_count,
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error in workflow: {str(e)}")
-                error_response = WorkflowResponse(
-                    success=False,
-                    message="Workflow execution failed",
-                    error=str(e)
-                )
-                await ctx.send(sender, error_response)
+            # Run the workflow in a task so StepReply messages for in-flight steps keep being handled
+            task = asyncio.create_task(self.answer_workflow_message(ctx, sender, msg))
+            self.message_tasks.add(task)
+            task.add_done_callback(self.message_tasks.discard)
+        
+        @self.agent.on_message(model=StepReply)
+        async def handle_step_reply(ctx: Context, sender: str, msg: StepReply):
+            """Wake the workflow step waiting for this reply"""
+            self.messenger.resolve(sender, msg)
         
         # REST endpoints for Node.js server integration
         @self.agent.on_rest_post("/process-business-idea", WorkflowRequest, WorkflowResponse)
@@ -85,8 +284,11 @@ class OrchestratoruAgent(BaseUAgent):
             try:
                 print(f"🎯 [{self.name}] REST: Starting complete workflow for: {req.user_input}")
                 
-                # Run the complete workflow
-                workflow_result = await self.run_complete_workflow(req.user_input, req.idea_count)
+                # Run the complete workflow once a workflow slot is free
+                async with self.admission.slot():
+                    workflow_result = await self.run_complete_workflow(
+                        req.user_input, req.idea_count, req.workflow_id, deadline_seconds=req.deadline_seconds
+                    )
                 
                 response = WorkflowResponse(
                     success=True,
@@ -101,6 +303,8 @@ class OrchestratoruAgent(BaseUAgent):
                 
                 return response
                 
+            except OverloadedError as e:
+                return self.overloaded_response(e)
             except Exception as e:
                 print(f"❌ [{self.name}] REST: Error in workflow: {str(e)}")
                 return WorkflowResponse(
@@ -108,10 +312,261 @@ class OrchestratoruAgent(BaseUAgent):
                     message="Workflow execution failed",
                     error=str(e)
                 )
+        
+        @self.agent.on_rest_post("/submit-workflow", WorkflowRequest, JobResponse)
+        async def handle_submit_workflow_rest(ctx: Context, req: WorkflowRequest) -> JobResponse:
+            """REST endpoint for queueing a workflow job; returns immediately with a job ID"""
+            try:
+                job_id = await self.submit_job(req.user_input, req.idea_count, req.workflow_id, req.deadline_seconds)
+                return JobResponse(
+                    success=True,
+                    job_id=job_id,
+                    status='queued',
+                    message=f"Workflow queued ({self.job_queue.qsize()} job(s) waiting)",
+                    data={"events_url": self.get_events_url(job_id)}
+                )
+            except OverloadedError as e:
+                print(f"⏳ [{self.name}] REST: Rejected workflow submission: {str(e)}")
+                return JobResponse(success=False, message="Orchestrator overloaded, retry later", error=str(e), retry_after=e.retry_after)
+            except Exception as e:
+                print(f"❌ [{self.name}] REST: Could not queue workflow: {str(e)}")
+                return JobResponse(success=False, message="Workflow submission failed", error=str(e))
+        
+        @self.agent.on_rest_post("/submit-batch", BatchWorkflowRequest, JobResponse)
+        async def handle_submit_batch_rest(ctx: Context, req: BatchWorkflowRequest) -> JobResponse:
+            """REST endpoint for starting a batch of workflows; results stream from the returned events URL"""
+            try:
+                batch_id = await self.submit_batch(req.user_inputs, req.idea_count, req.batch_id, bool(req.create_pdr))
+                return JobResponse(
+                    success=True,
+                    job_id=batch_id,
+                    status='running',
+                    message=f"Batch of {len(req.user_inputs)} workflow(s) started",
+                    data={
+                        "events_url": self.get_events_url(batch_id),
+                        "workflow_ids": self.batches[batch_id]['workflow_ids']
+                    }
+                )
+            except Exception as e:
+                print(f"❌ [{self.name}] REST: Could not start batch: {str(e)}")
+                return JobResponse(success=False, message="Batch submission failed", error=str(e))
+        
+        @self.agent.on_rest_post("/batch-status", JobRequest, JobResponse)
+        async def handle_batch_status_rest(ctx: Context, req: JobRequest) -> JobResponse:
+            """REST endpoint for batch progress counts"""
+            batch = self.batches.get(req.job_id)
+            if batch is None:
+                batch = await asyncio.to_thread(self.workflow_store.get_batch, req.job_id)
+            if batch is None:
+                return JobResponse(success=False, job_id=req.job_id, message="Batch not found", error=f"Unknown batch: {req.job_id}")
+            return JobResponse(
+                success=True,
+                job_id=req.job_id,
+                status=batch['status'],
+                message=f"{batch['completed']} completed, {batch['failed']} failed of {batch['total']}",
+                data=batch
+            )
+        
+        @self.agent.on_rest_post("/job-status", JobRequest, JobResponse)
+        async def handle_job_status_rest(ctx: Context, req: JobRequest) -> JobResponse:
+            """REST endpoint for job status including per-step progress"""
+            workflow = await asyncio.to_thread(self.workflow_store.get_workflow, req.job_id)
+            if workflow is None:
+                return JobResponse(success=False, job_id=req.job_id, message="Job not found", error=f"Unknown job: {req.job_id}")
+            return JobResponse(
+                success=True,
+                job_id=req.job_id,
+                status=workflow['status'],
+                message=workflow.get('error') or f"Job {workflow['status']}",
+                data=workflow
+            )
+        
+        @self.agent.on_rest_post("/job-result", JobRequest, JobResponse)
+        async def handle_job_result_rest(ctx: Context, req: JobRequest) -> JobResponse:
+            """REST endpoint for the business plan of a finished job"""
+            workflow = await asyncio.to_thread(self.workflow_store.get_workflow, req.job_id)
+            if workflow is None:
+                return JobResponse(success=False, job_id=req.job_id, message="Job not found", error=f"Unknown job: {req.job_id}")
+            result = await asyncio.to_thread(self.workflow_store.get_result, req.job_id)
+            if result is None:
+                return JobResponse(
+                    success=False,
+                    job_id=req.job_id,
+                    status=workflow['status'],
+                    message="Job has no result yet" if workflow['status'] in ('queued', 'running') else "Job failed",
+                    error=workflow.get('error')
+                )
+            return JobResponse(success=True, job_id=req.job_id, status=workflow['status'], message="Job completed", data=result)
+        
+        @self.agent.on_rest_post("/pdr-status", JobRequest, JobResponse)
+        async def handle_pdr_status_rest(ctx: Context, req: JobRequest) -> JobResponse:
+            """REST endpoint for the PDR delivery status of a workflow"""
+            pdr = await asyncio.to_thread(self.workflow_store.get_pdr, req.job_id)
+            if pdr is None:
+                return JobResponse(success=False, job_id=req.job_id, message="No PDR queued", error=f"No PDR for workflow: {req.job_id}")
+            return JobResponse(
+                success=pdr['status'] != PDR_FAILED,
+                job_id=req.job_id,
+                status=pdr['status'],
+                message=f"PDR {pdr['status']} after {pdr['attempts']} attempt(s)",
+                data={
+                    "pdr_id": pdr['pdr_id'],
+                    "attempts": pdr['attempts'],
+                    "approval_requested_at": pdr['approval_requested_at'],
+                    "next_attempt_at": pdr['next_attempt_at'] if pdr['status'] == PDR_PENDING else None,
+                    "marketing_posts": (pdr['result'] or {}).get("marketing_result")
+                },
+                error=pdr['error']
+            )
+        
+        @self.agent.on_rest_post("/resume-workflow", ResumeWorkflowRequest, WorkflowResponse)
+        async def handle_resume_workflow_rest(ctx: Context, req: ResumeWorkflowRequest) -> WorkflowResponse:
+            """REST endpoint for resuming a failed workflow from its checkpoints"""
+            try:
+                print(f"♻️  [{self.name}] REST: Resuming workflow {req.workflow_id}")
+                async with self.admission.slot():
+                    workflow_result = await self.resume_workflow(req.workflow_id, req.from_step)
+                return WorkflowResponse(
+                    success=True,
+                    message="Workflow resumed successfully",
+                    data=workflow_result
+                )
+            except OverloadedError as e:
+                return self.overloaded_response(e)
+            except Exception as e:
+                print(f"❌ [{self.name}] REST: Error resuming workflow: {str(e)}")
+                return WorkflowResponse(
+                    success=False,
+                    message="Workflow resume failed",
+                    error=str(e)
+                )
+        
+        @self.agent.on_rest_post("/rerun-workflow", RerunWorkflowRequest, WorkflowResponse)
+        async def handle_rerun_workflow_rest(ctx: Context, req: RerunWorkflowRequest) -> WorkflowResponse:
+            """REST endpoint for re-running a workflow with edited step inputs"""
+            try:
+                print(f"✏️  [{self.name}] REST: Re-running workflow {req.workflow_id} with edits to {list((req.step_inputs or {}).keys())}")
+                async with self.admission.slot():
+                    workflow_result = await self.rerun_workflow(req.workflow_id, req.step_inputs)
+                return WorkflowResponse(
+                    success=True,
+                    message="Workflow re-run successfully",
+                    data=workflow_result
+                )
+            except OverloadedError as e:
+                return self.overloaded_response(e)
+            except Exception as e:
+                print(f"❌ [{self.name}] REST: Error re-running workflow: {str(e)}")
+                return WorkflowResponse(
+                    success=False,
+                    message="Workflow re-run failed",
+                    error=str(e)
+                )
+        
+        @self.agent.on_rest_post("/workflow-status", WorkflowStatusRequest, WorkflowResponse)
+        async def handle_workflow_status_rest(ctx: Context, req: WorkflowStatusRequest) -> WorkflowResponse:
+            """REST endpoint for checkpointed workflow status"""
+            workflow = await asyncio.to_thread(self.workflow_store.get_workflow, req.workflow_id, req.include_outputs)
+            if workflow is None:
+                return WorkflowResponse(success=False, message="Workflow not found", error=f"Unknown workflow: {req.workflow_id}")
+            return WorkflowResponse(success=True, message=f"Workflow {workflow['status']}", data=workflow)
+        
+        @self.agent.on_rest_get("/metrics", OrchestratorMetricsResponse)
+        async def handle_metrics_rest(ctx: Context) -> OrchestratorMetricsResponse:
+            """REST endpoint for admission, job queue, batch load and step cache hits"""
+            return OrchestratorMetricsResponse(**await self.get_load_metrics())
+        
+        @self.agent.on_rest_get("/agent-pool", AgentPoolResponse)
+        async def handle_agent_pool_rest(ctx: Context) -> AgentPoolResponse:
+            """REST endpoint for replica health and load per agent role"""
+            pools = self.router.snapshot()
+            for role in self.local_agents:
+                checks = self.local_agents[role].readiness_checks()
+                pools[role] = [{'url': 'in-process', 'healthy': True, 'ready': all(checks.values()), 'checks': checks}]
+            return AgentPoolResponse(mode=ORCHESTRATOR_MODE, pools=pools)
+        
+        @self.agent.on_rest_get("/usage-summary", UsageStatsResponse)
+        async def handle_usage_summary_rest(ctx: Context) -> UsageStatsResponse:
+            """REST endpoint for token usage across all agents"""
+            summary = await self.collect_usage()
+            
+            # Rank agent endpoints by tokens so the hot spenders are easy to spot
+            hot_spenders = []
+            for role, stats in summary['by_agent'].items():
+                for endpoint, endpoint_stats in stats.get('by_endpoint', {}).items():
+                    hot_spenders.append({
+                        'agent': role,
+                        'endpoint': endpoint,
+                        'total_tokens': endpoint_stats.get('total_tokens', 0),
+                        'cost_usd': endpoint_stats.get('cost_usd', 0.0),
+                        'calls': endpoint_stats.get('calls', 0),
+                        'max_tokens_requested': endpoint_stats.get('max_tokens_requested', 0),
+                        'max_tokens_granted': endpoint_stats.get('max_tokens_granted', 0),
+                        'truncations': endpoint_stats.get('truncations', 0)
+                    })
+            summary['hot_spenders'] = sorted(hot_spenders, key=lambda item: item['total_tokens'], reverse=True)
+            
+            return UsageStatsResponse(agent=self.name, stats=summary)
+    
+    async def collect_usage(self, workflow_id: str = None) -> Dict[str, Any]:
+        """Collect token usage from every agent, optionally for a single workflow"""
+        usage = {
+            "workflow_id": workflow_id,
+            "totals": empty_usage_bucket(),
+            "by_agent": {}
+        }
+        
+        # In monolith mode only the in-process agents exist; otherwise each live replica tracks its own usage
+        if self.local_agents:
+            sources = [(role, role, None) for role in self.local_agents]
+        else:
+            sources = [
+                (role if len(pool) == 1 else f"{role}@{endpoint.port}", role, endpoint.url)
+                for role, pool in self.router.pools.items() for endpoint in pool
+                if endpoint.healthy and endpoint.ready
+            ]
+        
+        async def fetch(name: str, role: str, url: str) -> Dict[str, Any]:
+            payload = {"workflow_id": workflow_id}
+            try:
+                if url is None:
+                    response = await self._post_agent(role, '/usage-stats', payload, timeout=USAGE_COLLECT_TIMEOUT_SECONDS)
+                else:
+                    response = await self._post_url(url, '/usage-stats', payload, timeout=USAGE_COLLECT_TIMEOUT_SECONDS)
+                return response.get('stats', {})
+            except Exception as e:
+                print(f"⚠️  [{self.name}] Could not collect usage from {name} agent: {e}")
+                return {}
+        
+        # All replicas at once, so the slowest one bounds the wait instead of the sum of them
+        results = await asyncio.gather(*(fetch(name, role, url) for name, role, url in sources))
+        for (name, _, _), stats in zip(sources, results):
+            if not stats.get('totals', {}).get('calls'):
+                continue
+            usage['by_agent'][name] = stats
+            merge_usage_buckets(usage['totals'], stats['totals'])
+        
+        return usage
     
-    async def run_complete_workflow(self, user_input: str, idea_count: int = 3) -> Dict[str, Any]:
-        """Run the complete business workflow"""
-        print(f"🎯 [{self.name}] Starting complete workflow...")
+    async def run_complete_workflow(self, user_input: str, idea_count: int = 3, workflow_id: str = None,
+                                    resume: bool = False, step_inputs: Dict[str, Dict[str, Any]] = None,
+                                    force_steps: List[str] = (), deadline_seconds: float = None,
+                                    priority: int = None, create_pdr: bool = True) -> Dict[str, Any]:
+        """Run the complete business workflow, reusing checkpointed and cached steps whose inputs are unchanged"""
+        workflow_id = workflow_id or uuid.uuid4().hex
+        workflow_started = time.perf_counter()
+        step_timings = {}
+        deadline_seconds = WORKFLOW_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+        deadline_at = workflow_started + deadline_seconds if deadline_seconds > 0 else None
+        step_budgets = {}
+        slot_waits = {}
+        degraded_steps = {}
+        print(f"🎯 [{self.name}] {'Resuming' if resume else 'Starting'} complete workflow {workflow_id}...")
+        
+        await asyncio.to_thread(self.workflow_store.create_workflow, workflow_id, user_input, idea_count)
+        checkpoints = await asyncio.to_thread(self.workflow_store.get_step_checkpoints, workflow_id) if resume else {}
+        current_step = None
+        self.event_bus.publish(workflow_id, WORKFLOW_STARTED, user_input=user_input, resume=resume)
         
         try:
             # Step 1: Use user input as business concept (no automatic idea generation)
@@ -127,114 +582,633 @@ class OrchestratoruAgent(BaseUAgent):
             
             print(f"🎯 [{self.name}] Using user business concept: {selected_idea.get('title', 'Unknown')}")
             
-            # Step 2: Research analyzes the idea
-            print(f"🎯 [{self.name}] Step 2: Research analyzing market...")
-            research_response = await self.call_research_agent(selected_idea)
-            if not research_response:
-                raise Exception("Research agent failed to analyze market")
-            
-            # Step 3: Product develops the concept
-            print(f"🎯 [{self.name}] Step 3: Product developing concept...")
-            product_response = await self.call_product_agent(selected_idea, research_response)
-            if not product_response:
-                raise Exception("Product agent failed to develop concept")
-            
-            # Step 4: CMO creates marketing strategy
-            print(f"🎯 [{self.name}] Step 4: CMO creating marketing strategy...")
-            marketing_response = await self.call_cmo_agent(selected_idea, product_response, research_response)
-            if not marketing_response:
-                raise Exception("CMO agent failed to create marketing strategy")
-            
-            # Step 5: CTO creates technical strategy
-            print(f"🎯 [{self.name}] Step 5: CTO creating technical strategy...")
-            technical_response = await self.call_cto_agent(selected_idea, product_response, research_response)
-            if not technical_response:
-                raise Exception("CTO agent failed to create technical strategy")
-            
-            # Step 6: Head of Engineering creates Bolt prompt
-            print(f"🎯 [{self.name}] Step 6: Head of Engineering creating Bolt prompt...")
-            bolt_response = await self.call_head_engineering_agent(
-                selected_idea, product_response, research_response, 
-                marketing_response, technical_response
-            )
-            if not bolt_response:
-                raise Exception("Head of Engineering agent failed to create Bolt prompt")
-            
-            # Step 7: Finance analyzes revenue (optional - won't block workflow)
-            print(f"🎯 [{self.name}] Step 7: Finance analyzing revenue...")
-            finance_response = await self.call_finance_agent(selected_idea, product_response)
-            if not finance_response:
-                print(f"⚠️  [{self.name}] Finance agent not available, continuing without financial analysis...")
-                finance_response = {
-                    "warning": "Finance agent not available",
-                    "estimated_revenue": "To be determined"
-                }
+            # Steps 2-7: run each agent step unless a checkpoint or cached output matches its input
+            step_inputs = step_inputs or {}
+            outputs = {}
+            output_refs = {}
+            executed = []
+            for current_step in WORKFLOW_STEPS:
+                inputs = self.build_step_inputs(current_step, selected_idea, outputs, step_inputs.get(current_step))
+                input_hash = hash_step_input(current_step, inputs)
+                forced = current_step in force_steps
+                
+                checkpoint = checkpoints.get(current_step)
+                if checkpoint and checkpoint['input_hash'] == input_hash and not forced:
+                    print(f"♻️  [{self.name}] Reusing checkpointed {current_step} output")
+                    outputs[current_step] = checkpoint['output']
+                    self.event_bus.publish(workflow_id, STEP_COMPLETED, current_step, outputs[current_step], reused=True)
+                    continue
+                
+                cached = None
+                if current_step in STEP_CACHE_STEPS and not forced:
+                    cached = await asyncio.to_thread(self.workflow_store.get_cached_step, current_step, input_hash)
+                if cached is not None:
+                    print(f"⚡ [{self.name}] Serving {current_step} from step cache ({input_hash[:12]})")
+                    outputs[current_step] = cached
+                    await asyncio.to_thread(
+                        self.workflow_store.save_step, workflow_id, current_step, cached, input_hash=input_hash
+                    )
+                    self.event_bus.publish(workflow_id, STEP_COMPLETED, current_step, cached, cached=True)
+                    continue
+                
+                executed.append(current_step)
+                # Bounded per-agent concurrency lets concurrent workflows pipeline through the agents;
+                # queueing counts against the deadline, and once it passes the step stops waiting and degrades
+                slot_requested_at = time.perf_counter()
+                acquired = await self.acquire_step_slot(current_step, deadline_at)
+                slot_wait = time.perf_counter() - slot_requested_at
+                if deadline_at is not None:
+                    slot_waits[current_step] = round(slot_wait, 4)
+                try:
+                    budget = self.step_budget(current_step, deadline_at)
+                    if budget is not None:
+                        step_budgets[current_step] = round(budget, 2)
+                        if budget < STEP_MIN_BUDGET_SECONDS:
+                            # Too little time for a real LLM call: the agent answers with its fallback
+                            degraded_steps[current_step] = 'fallback'
+                    
+                    stale = None
+                    if current_step in degraded_steps:
+                        stale = await asyncio.to_thread(
+                            self.workflow_store.get_cached_step, current_step, input_hash, ttl=STEP_CACHE_STALE_SECONDS
+                        )
+                    if stale is not None:
+                        degraded_steps[current_step] = 'stale_cache'
+                        result = stale
+                    else:
+                        await asyncio.to_thread(self.workflow_store.mark_step_running, workflow_id, current_step)
+                        self.event_bus.publish(workflow_id, STEP_STARTED, current_step, budget_seconds=budget)
+                        print(f"🎯 [{self.name}] {STEP_DESCRIPTIONS[current_step]}")
+                        result = await self.run_timed_step(
+                            step_timings, current_step,
+                            self.call_workflow_step(
+                                current_step, self.reference_inputs(inputs, outputs, output_refs), workflow_id, budget,
+                                priority
+                            )
+                        )
+                        if isinstance(result, dict) and result.pop('degraded', None):
+                            # The agent answered with its fallback content instead of an LLM result
+                            degraded_steps.setdefault(current_step, 'agent_fallback')
+                finally:
+                    if acquired:
+                        self.step_slots[current_step].release()
+                
+                if (not result and budget is not None) or degraded_steps.get(current_step) == 'agent_fallback':
+                    # The agent call ran out of time or fell back; an older output for the same input is better
+                    stale = await asyncio.to_thread(
+                        self.workflow_store.get_cached_step, current_step, input_hash, ttl=STEP_CACHE_STALE_SECONDS
+                    )
+                    if stale is not None:
+                        result = stale
+                        degraded_steps[current_step] = 'stale_cache'
+                
+                if result and current_step in degraded_steps:
+                    print(f"⏳ [{self.name}] {current_step} degraded to {degraded_steps[current_step]} "
+                          f"(budget {step_budgets.get(current_step)}s)")
+                    await asyncio.to_thread(
+                        self.workflow_store.save_step, workflow_id, current_step, result, status=STEP_DEGRADED,
+                        duration=step_timings.get(current_step), input_hash=input_hash
+                    )
+                    self.event_bus.publish(
+                        workflow_id, STEP_PARTIAL, current_step, result,
+                        reason=degraded_steps[current_step], budget_seconds=step_budgets.get(current_step)
+                    )
+                elif not result and current_step == 'finance':
+                    # Finance is optional - won't block workflow
+                    print(f"⚠️  [{self.name}] Finance agent not available, continuing without financial analysis...")
+                    result = {
+                        "warning": "Finance agent not available",
+                        "estimated_revenue": "To be determined"
+                    }
+                    await asyncio.to_thread(
+                        self.workflow_store.save_step, workflow_id, current_step, result, status=STEP_DEGRADED,
+                        duration=step_timings.get(current_step), input_hash=input_hash
+                    )
+                    self.event_bus.publish(
+                        workflow_id, STEP_PARTIAL, current_step, result,
+                        duration_seconds=step_timings.get(current_step)
+                    )
+                elif not result:
+                    raise Exception(STEP_ERRORS[current_step])
+                else:
+                    await asyncio.to_thread(
+                        self.workflow_store.save_step, workflow_id, current_step, result,
+                        duration=step_timings.get(current_step), input_hash=input_hash
+                    )
+                    # Every step is cached as a deadline last resort; only STEP_CACHE_STEPS are served while fresh
+                    await asyncio.to_thread(self.workflow_store.cache_step, current_step, input_hash, result)
+                    self.event_bus.publish(
+                        workflow_id, STEP_COMPLETED, current_step, result,
+                        duration_seconds=step_timings.get(current_step)
+                    )
+                outputs[current_step] = result
+            current_step = None
             
             # Compile complete business plan
             complete_business_plan = {
                 "workflow_summary": {
+                    "workflow_id": workflow_id,
                     "user_input": user_input,
                     "selected_idea": selected_idea.get('title', 'Unknown'),
                     "workflow_status": "completed",
-                    "timestamp": "2024-01-01T00:00:00Z"
+                    "timestamp": "2024-01-01T00:00:00Z",
+                    "step_timings": step_timings,
+                    "resumed": resume,
+                    "executed_steps": executed,
+                    "reused_steps": [step for step in WORKFLOW_STEPS if step not in executed],
+                    "deadline": {
+                        "seconds": deadline_seconds or None,
+                        "step_budgets": step_budgets,
+                        "slot_wait_seconds": slot_waits,
+                        "degraded_steps": degraded_steps
+                    }
                 },
                 "idea": selected_idea,
-                "research": research_response,
-                "product": product_response,
-                "marketing": marketing_response,
-                "technical": technical_response,
-                "bolt_prompt": bolt_response,
-                "finance": finance_response,
-                "all_ideas": [selected_idea]
+                "research": outputs['research'],
+                "product": outputs['product'],
+                "marketing": outputs['cmo'],
+                "technical": outputs['cto'],
+                "bolt_prompt": outputs['head_engineering'],
+                "finance": outputs['finance'],
+                "all_ideas": [selected_idea],
+                "usage": await self.run_timed_step(step_timings, 'usage', self.collect_usage(workflow_id))
             }
             
-            print(f"🎯 [{self.name}] Workflow complete! Now creating PDR and triggering marketing...")
-            
-            # Step 8: Create PDR and auto-approve to trigger marketing posting
-            try:
-                pdr_result = await self.create_and_approve_pdr(selected_idea, product_response)
-                complete_business_plan["pdr_id"] = pdr_result.get("pdr_id")
-                complete_business_plan["marketing_posts"] = pdr_result.get("marketing_result")
-                print(f"✅ [{self.name}] PDR created and marketing posted! PDR ID: {pdr_result.get('pdr_id')}")
-            except Exception as e:
-                print(f"⚠️  [{self.name}] PDR creation/marketing failed (workflow still succeeded): {str(e)}")
-                complete_business_plan["pdr_warning"] = str(e)
+            if create_pdr:
+                print(f"🎯 [{self.name}] Workflow complete! Queueing PDR and marketing...")
+                
+                # Step 8: Queue PDR creation and approval; the outbox worker delivers it off the critical path
+                pdr_hash = hash_step_input('pdr', {'idea': selected_idea, 'product': outputs['product']})
+                queued = await asyncio.to_thread(
+                    self.workflow_store.enqueue_pdr, workflow_id, selected_idea, outputs['product'], pdr_hash
+                )
+                if queued:
+                    print(f"📮 [{self.name}] PDR queued for delivery")
+                    if self.pdr_wakeup is not None:
+                        self.pdr_wakeup.set()
+                pdr = await asyncio.to_thread(self.workflow_store.get_pdr, workflow_id)
+                complete_business_plan["pdr_status"] = pdr['status']
+                if pdr['pdr_id']:
+                    complete_business_plan["pdr_id"] = pdr['pdr_id']
+                if pdr['result']:
+                    complete_business_plan["marketing_posts"] = pdr['result'].get("marketing_result")
+            else:
+                print(f"🎯 [{self.name}] Workflow complete! PDR and marketing skipped")
+                complete_business_plan["pdr_status"] = "skipped"
             
-            print(f"🎯 [{self.name}] Complete workflow finished successfully!")
+            step_timings['total'] = round(time.perf_counter() - workflow_started, 4)
+            await asyncio.to_thread(self.workflow_store.save_result, workflow_id, complete_business_plan)
+            await asyncio.to_thread(self.workflow_store.set_workflow_status, workflow_id, 'completed')
+            self.event_bus.publish(workflow_id, WORKFLOW_COMPLETED, payload=complete_business_plan['workflow_summary'])
+            print(f"🎯 [{self.name}] Complete workflow finished successfully in {step_timings['total']}s!")
             return complete_business_plan
             
         except Exception as e:
             print(f"❌ [{self.name}] Workflow failed at step: {str(e)}")
+            if current_step:
+                await asyncio.to_thread(
+                    self.workflow_store.fail_step, workflow_id, current_step, str(e), duration=step_timings.get(current_step)
+                )
+                self.event_bus.publish(workflow_id, STEP_FAILED, current_step, error=str(e))
+            await asyncio.to_thread(
+                self.workflow_store.set_workflow_status, workflow_id, 'failed', failed_step=current_step, error=str(e)
+            )
+            self.event_bus.publish(workflow_id, WORKFLOW_FAILED, current_step, error=str(e))
             raise e
     
+    async def answer_workflow_message(self, ctx: Context, sender: str, msg: WorkflowRequest):
+        """Run a workflow requested by message and send the result back to the sender"""
+        try:
+            print(f"🎯 [{self.name}] Starting complete workflow for: {msg.user_input}")
+            
+            # Run the complete workflow once a workflow slot is free
+            async with self.admission.slot():
+                workflow_result = await self.run_complete_workflow(
+                    msg.user_input, msg.idea_count, msg.workflow_id, deadline_seconds=msg.deadline_seconds
+                )
+            
+            response = WorkflowResponse(
+                success=True,
+                message="Complete workflow executed successfully",
+                data=workflow_result
+            )
+            
+            self.log_activity('Complete workflow executed', {
+                'user_input': msg.user_input,
+                'idea_count': msg.idea_count,
+                'sender': sender
+            })
+            
+            # Send response back
+            await ctx.send(sender, response)
+            
+        except OverloadedError as e:
+            await ctx.send(sender, self.overloaded_response(e))
+        except Exception as e:
+            print(f"❌ [{self.name}] Error in workflow: {str(e)}")
+            error_response = WorkflowResponse(
+                success=False,
+                message="Workflow execution failed",
+                error=str(e)
+            )
+            await ctx.send(sender, error_response)
+    
+    async def prune_blobs(self):
+        """Delete expired and over-cap payload blobs off the event loop"""
+        try:
+            pruned = await asyncio.to_thread(self.blob_store.prune)
+        except Exception as e:
+            print(f"⚠️  [{self.name}] Could not prune payload blobs: {e}")
+            return
+        if pruned:
+            print(f"🧹 [{self.name}] Pruned {pruned} payload blob(s)")
+    
+    async def warm_up(self):
+        """Warm up in-process agents; the orchestrator itself never calls ASI:One"""
+        await asyncio.gather(*[agent.warm_up() for agent in self.local_agents.values()])
+    
+    def readiness_checks(self) -> Dict[str, bool]:
+        """Ready once the job pool runs and every workflow step has a live agent"""
+        agents_live = True
+        for role in set(STEP_ROLES.values()):
+            if role in self.local_agents:
+                continue
+            if not any(endpoint.healthy for endpoint in self.router.pools.get(role, [])):
+                agents_live = False
+        return {'job_workers': self.job_queue is not None, 'agents': agents_live}
+    
+    def overloaded_response(self, error: OverloadedError) -> WorkflowResponse:
+        """Build the fast rejection returned when a workflow is not admitted"""
+        print(f"⏳ [{self.name}] Rejected workflow: {str(error)} (retry after {error.retry_after}s)")
+        return WorkflowResponse(
+            success=False,
+            message="Orchestrator overloaded, retry later",
+            error=str(error),
+            retry_after=error.retry_after
+        )
+    
+    async def get_load_metrics(self) -> Dict[str, Any]:
+        """Get admission state, job queue depth, running batches and step cache usage"""
+        queued_jobs = self.job_queue.qsize() if self.job_queue is not None else 0
+        running_batches = [batch for batch in self.batches.values() if batch['status'] == 'running']
+        return {
+            'admission': self.admission.snapshot(),
+            'job_queue': {
+                'depth': queued_jobs,
+                'capacity': ORCHESTRATOR_MAX_QUEUED_JOBS,
+                'workers': ORCHESTRATOR_WORKERS,
+                'retry_after_seconds': self.admission.retry_after(queued_jobs, slots=ORCHESTRATOR_WORKERS)
+            },
+            'batches': {
+                'running': len(running_batches),
+                'workflows_pending': sum(
+                    batch['total'] - batch['completed'] - batch['failed'] for batch in running_batches
+                ),
+                'admission': self.batch_admission.snapshot()
+            },
+            'transport': self.messenger.snapshot(),
+            'step_cache': await asyncio.to_thread(self.workflow_store.cache_stats)
+        }
+    
+    async def start_job_workers(self):
+        """Create the job queue, start the worker pool and re-queue unfinished jobs"""
+        if self.job_queue is not None:
+            return
+        self.job_queue = asyncio.Queue(maxsize=ORCHESTRATOR_MAX_QUEUED_JOBS)
+        self.job_workers = [
+            asyncio.create_task(self.job_worker(worker_id)) for worker_id in range(ORCHESTRATOR_WORKERS)
+        ]
+        
+        # Jobs left queued or running by a previous process resume from their checkpoints
+        for workflow in await asyncio.to_thread(self.workflow_store.list_workflows, ['queued', 'running']):
+            try:
+                self.job_queue.put_nowait((workflow['workflow_id'], workflow['user_input'], workflow['idea_count'], True, None))
+            except asyncio.QueueFull:
+                await asyncio.to_thread(
+                    self.workflow_store.set_workflow_status, workflow['workflow_id'], 'failed', error="Job queue full on restart"
+                )
+        print(f"👷 [{self.name}] Started {ORCHESTRATOR_WORKERS} workflow workers ({self.job_queue.qsize()} job(s) recovered)")
+    
+    def create_step_slots(self) -> Dict[str, asyncio.Semaphore]:
+        """Create one concurrency limiter per agent step, scaled by the role's replica count"""
+        limits = {
+            step: ORCHESTRATOR_AGENT_CONCURRENCY * len(self.router.pools.get(STEP_ROLES[step], [None]))
+            for step in WORKFLOW_STEPS
+        }
+        for item in ORCHESTRATOR_STEP_CONCURRENCY.split(','):
+            if '=' not in item:
+                continue
+            step, limit = item.split('=', 1)
+            if step.strip() in limits:
+                limits[step.strip()] = max(1, int(limit))
+        return {step: asyncio.Semaphore(limit) for step, limit in limits.items()}
+    
+    async def submit_batch(self, user_inputs: List[str], idea_count: int = 3, batch_id: str = None,
+                           create_pdr: bool = False) -> str:
+        """Start a batch of workflows in the background and return its ID; items create PDRs only if create_pdr"""
+        if not user_inputs:
+            raise Exception("Batch has no business concepts")
+        if len(user_inputs) > ORCHESTRATOR_MAX_BATCH_SIZE:
+            raise Exception(f"Batch too large ({len(user_inputs)} > {ORCHESTRATOR_MAX_BATCH_SIZE} concepts)")
+        
+        batch_id = batch_id or uuid.uuid4().hex
+        if self.batches.get(batch_id, {}).get('status') == 'running':
+            raise Exception(f"Batch {batch_id} is already running")
+        
+        workflow_ids = [f"{batch_id}-{index}" for index in range(len(user_inputs))]
+        # Registered before the store writes so a second submission with this ID is rejected meanwhile
+        self.batches.pop(batch_id, None)
+        self.batches[batch_id] = {
+            'batch_id': batch_id,
+            'status': 'running',
+            'total': len(user_inputs),
+            'completed': 0,
+            'failed': 0,
+            'create_pdr': create_pdr,
+            'workflow_ids': workflow_ids
+        }
+        try:
+            for workflow_id, user_input in zip(workflow_ids, user_inputs):
+                await asyncio.to_thread(
+                    self.workflow_store.create_workflow, workflow_id, user_input, idea_count,
+                    status='queued', batch_id=batch_id
+                )
+        except Exception:
+            self.batches.pop(batch_id, None)
+            raise
+        
+        task = asyncio.create_task(self.run_batch(batch_id, user_inputs, idea_count))
+        self.batch_tasks.add(task)
+        task.add_done_callback(self.batch_tasks.discard)
+        print(f"📦 [{self.name}] Started batch {batch_id} with {len(user_inputs)} workflow(s)")
+        return batch_id
+    
+    async def run_batch(self, batch_id: str, user_inputs: List[str], idea_count: int = 3):
+        """Run a batch of workflows concurrently, publishing each result on the batch's event stream"""
+        batch = self.batches[batch_id]
+        batch_started = time.perf_counter()
+        self.event_bus.publish(batch_id, BATCH_STARTED, total=batch['total'], workflow_ids=batch['workflow_ids'])
+        
+        async def run_item(index: int, workflow_id: str, user_input: str):
+            # Already accepted, so items wait for a batch slot instead of being rejected
+            async with self.batch_admission.slot(bounded=False):
+                try:
+                    result = await self.run_complete_workflow(
+                        user_input, idea_count, workflow_id,
+                        deadline_seconds=BATCH_WORKFLOW_DEADLINE_SECONDS, priority=PRIORITY_BATCH,
+                        create_pdr=batch['create_pdr']
+                    )
+                except Exception as e:
+                    batch['failed'] += 1
+                    self.event_bus.publish(
+                        batch_id, BATCH_ITEM_FAILED, index=index, item_workflow_id=workflow_id,
+                        user_input=user_input, error=str(e)
+                    )
+                    return
+                batch['completed'] += 1
+                self.event_bus.publish(
+                    batch_id, BATCH_ITEM_COMPLETED, payload=result, index=index,
+                    item_workflow_id=workflow_id, user_input=user_input
+                )
+        
+        await asyncio.gather(*[
+            run_item(index, workflow_id, user_input)
+            for index, (workflow_id, user_input) in enumerate(zip(batch['workflow_ids'], user_inputs))
+        ])
+        
+        batch['status'] = 'completed'
+        batch['duration_seconds'] = round(time.perf_counter() - batch_started, 4)
+        self.event_bus.publish(
+            batch_id, BATCH_COMPLETED, completed=batch['completed'], failed=batch['failed'],
+            duration_seconds=batch['duration_seconds']
+        )
+        print(f"📦 [{self.name}] Batch {batch_id} finished: {batch['completed']} completed, "
+              f"{batch['failed']} failed in {batch['duration_seconds']}s")
+        self.evict_finished_batches()
+    
+    def evict_finished_batches(self):
+        """Drop the oldest finished batches beyond ORCHESTRATOR_BATCH_HISTORY; running batches are always kept"""
+        finished = [batch_id for batch_id, batch in self.batches.items() if batch['status'] != 'running']
+        for batch_id in finished[:max(0, len(finished) - ORCHESTRATOR_BATCH_HISTORY)]:
+            del self.batches[batch_id]
+    
+    def get_events_url(self, workflow_id: str) -> str:
+        """URL of the server-sent progress stream for a workflow"""
+        return f"http://localhost:{self.event_server.port}/workflow-events/{workflow_id}"
+    
+    async def submit_job(self, user_input: str, idea_count: int = 3, workflow_id: str = None,
+                   deadline_seconds: float = None) -> str:
+        """Queue a workflow job and return its ID"""
+        if self.job_queue is None:
+            raise Exception("Workflow workers are not running yet")
+        if self.job_queue.full():
+            raise OverloadedError(
+                f"Job queue is full ({ORCHESTRATOR_MAX_QUEUED_JOBS} jobs waiting)",
+                self.admission.retry_after(self.job_queue.qsize(), slots=ORCHESTRATOR_WORKERS)
+            )
+        
+        job_id = workflow_id or uuid.uuid4().hex
+        await asyncio.to_thread(self.workflow_store.create_workflow, job_id, user_input, idea_count, status='queued')
+        try:
+            self.job_queue.put_nowait((job_id, user_input, idea_count, False, deadline_seconds))
+        except asyncio.QueueFull:
+            # Other submissions filled the queue while the job was being stored
+            await asyncio.to_thread(self.workflow_store.set_workflow_status, job_id, 'failed', error="Job queue full")
+            raise OverloadedError(
+                f"Job queue is full ({ORCHESTRATOR_MAX_QUEUED_JOBS} jobs waiting)",
+                self.admission.retry_after(self.job_queue.qsize(), slots=ORCHESTRATOR_WORKERS)
+            )
+        print(f"📥 [{self.name}] Queued workflow job {job_id}")
+        return job_id
+    
+    async def job_worker(self, worker_id: int):
+        """Run queued workflow jobs one at a time"""
+        while True:
+            job_id, user_input, idea_count, resume, deadline_seconds = await self.job_queue.get()
+            try:
+                # Queued jobs were already admitted, so they wait for a slot instead of being rejected
+                async with self.admission.slot(bounded=False):
+                    print(f"👷 [{self.name}] Worker {worker_id} running job {job_id}")
+                    await self.run_complete_workflow(
+                        user_input, idea_count, job_id, resume=resume, deadline_seconds=deadline_seconds
+                    )
+            except Exception as e:
+                # run_complete_workflow already recorded the failed step
+                print(f"❌ [{self.name}] Worker {worker_id} job {job_id} failed: {str(e)}")
+            finally:
+                self.job_queue.task_done()
+    
+    async def resume_workflow(self, workflow_id: str, from_step: str = None) -> Dict[str, Any]:
+        """Resume a workflow, re-running only failed steps and the steps downstream of them"""
+        workflow = await asyncio.to_thread(self.workflow_store.get_workflow, workflow_id)
+        if workflow is None:
+            raise Exception(f"Unknown workflow: {workflow_id}")
+        
+        force_steps = []
+        if from_step:
+            if from_step not in STEP_DEPENDENCIES:
+                raise Exception(f"Unknown workflow step: {from_step}")
+            # Force this step to run again; steps that depend on it re-run if its output changes
+            force_steps.append(from_step)
+        
+        return await self.run_complete_workflow(
+            workflow['user_input'], workflow['idea_count'], workflow_id, resume=True,
+            step_inputs=workflow['step_inputs'], force_steps=force_steps
+        )
+    
+    async def rerun_workflow(self, workflow_id: str, step_inputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Re-run a workflow with edited step inputs; only steps whose inputs change call their agents"""
+        workflow = await asyncio.to_thread(self.workflow_store.get_workflow, workflow_id)
+        if workflow is None:
+            raise Exception(f"Unknown workflow: {workflow_id}")
+        
+        unknown = [step for step in (step_inputs or {}) if step not in STEP_DEPENDENCIES]
+        if unknown:
+            raise Exception(f"Unknown workflow step(s): {', '.join(unknown)}")
+        
+        # Edits accumulate so later resumes keep applying them
+        merged_inputs = dict(workflow['step_inputs'])
+        for step, edits in (step_inputs or {}).items():
+            merged_inputs[step] = dict(merged_inputs.get(step, {}), **edits)
+        await asyncio.to_thread(self.workflow_store.save_step_inputs, workflow_id, merged_inputs)
+        
+        return await self.run_complete_workflow(
+            workflow['user_input'], workflow['idea_count'], workflow_id, resume=True, step_inputs=merged_inputs
+        )
+    
+    def build_step_inputs(self, step: str, idea: Dict[str, Any], outputs: Dict[str, Any],
+                          edits: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Collect the idea and upstream outputs a step consumes, with any user edits applied"""
+        inputs = {'idea': idea}
+        for dependency in STEP_DEPENDENCIES[step]:
+            inputs[dependency] = outputs[dependency]
+        if edits:
+            inputs.update(edits)
+        return inputs
+    
+    def reference_inputs(self, inputs: Dict[str, Any], outputs: Dict[str, Any],
+                         output_refs: Dict[str, Any]) -> Dict[str, Any]:
+        """Swap upstream outputs for blob references so each one is serialized once per workflow"""
+        if self.local_agents:
+            # In-process agents get the objects themselves
+            return inputs
+        call_inputs = dict(inputs)
+        for name, value in inputs.items():
+            # User edits replace an upstream output and are sent inline
+            if name in outputs and value is outputs[name]:
+                if name not in output_refs:
+                    output_refs[name] = self.blob_store.put(value)
+                call_inputs[name] = output_refs[name]
+        return call_inputs
+    
+    async def acquire_step_slot(self, step: str, deadline_at: float = None) -> bool:
+        """Wait for a slot on the step's agent until the workflow deadline; returns whether one was acquired"""
+        slot = self.step_slots[step]
+        if deadline_at is None:
+            await slot.acquire()
+            return True
+        try:
+            await asyncio.wait_for(slot.acquire(), timeout=max(0.0, deadline_at - time.perf_counter()))
+            return True
+        except asyncio.TimeoutError:
+            # Out of time: the step's stale cache or the agent's (LLM-free) fallback answers without a slot
+            return False
+    
+    def step_budget(self, step: str, deadline_at: float = None) -> float:
+        """Share of the remaining workflow time for a step, weighted against the steps still to run"""
+        if deadline_at is None:
+            return None
+        remaining_steps = WORKFLOW_STEPS[WORKFLOW_STEPS.index(step):]
+        share = STEP_BUDGET_WEIGHTS[step] / sum(STEP_BUDGET_WEIGHTS[name] for name in remaining_steps)
+        return max(0.0, (deadline_at - time.perf_counter()) * share)
+    
+    def step_timeout(self, default: int, deadline_seconds: float = None) -> float:
+        """HTTP timeout for an agent call: its usual timeout, or the step budget plus a grace period"""
+        if deadline_seconds is None:
+            return default
+        return min(default, deadline_seconds + STEP_TIMEOUT_GRACE_SECONDS)
+    
+    async def call_workflow_step(self, step: str, inputs: Dict[str, Any], workflow_id: str = None,
+                                 deadline_seconds: float = None, priority: int = None) -> Dict[str, Any]:
+        """Call the agent for one workflow step with its inputs, time budget and LLM scheduling priority"""
+        idea = inputs['idea']
+        if step == 'research':
+            return await self.call_research_agent(idea, workflow_id, deadline_seconds, priority)
+        if step == 'product':
+            return await self.call_product_agent(idea, inputs['research'], workflow_id, deadline_seconds, priority)
+        if step == 'cmo':
+            return await self.call_cmo_agent(
+                idea, inputs['product'], inputs['research'], workflow_id, deadline_seconds, priority
+            )
+        if step == 'cto':
+            return await self.call_cto_agent(
+                idea, inputs['product'], inputs['research'], workflow_id, deadline_seconds, priority
+            )
+        if step == 'head_engineering':
+            return await self.call_head_engineering_agent(
+                idea, inputs['product'], inputs['research'],
+                inputs['cmo'], inputs['cto'], workflow_id, deadline_seconds, priority
+            )
+        if step == 'finance':
+            return await self.call_finance_agent(idea, inputs['product'], workflow_id, deadline_seconds, priority)
+        raise Exception(f"Unknown workflow step: {step}")
+    
+    async def run_timed_step(self, step_timings: Dict[str, float], step: str, coroutine) -> Any:
+        """Await one workflow step and record its wall-clock duration in seconds"""
+        started_at = time.perf_counter()
+        try:
+            return await coroutine
+        finally:
+            step_timings[step] = round(time.perf_counter() - started_at, 4)
+    
+    async def _post_agent(self, role: str, path: str, payload: Dict[str, Any], timeout: int = 90) -> Dict[str, Any]:
+        """Call an agent in-process, over uAgents messages or by POSTing to its REST endpoint"""
+        local_agent = self.local_agents.get(role)
+        if local_agent is not None:
+            return await local_agent.call_rest(path, payload, timeout)
+        
+        # Least-outstanding ready replica of the role, over messages when its address is known
+        async with self.router.endpoint(role) as endpoint:
+            address = self.messenger.address_for(role, endpoint.port)
+            if address is not None:
+                return await self.messenger.request(role, path, payload, timeout, address=address)
+            return await self._post_url(endpoint.url, path, payload, timeout)
+    
+    async def _post_url(self, url: str, path: str, payload: Dict[str, Any], timeout: int = 90) -> Dict[str, Any]:
+        """POST JSON to one agent endpoint in a worker thread"""
+        # Compact (orjson when installed) encoding instead of requests' default json.dumps
+        response = await asyncio.to_thread(
+            requests.post,
+            f"{url}{path}",
+            data=dumps(payload),
+            headers=JSON_HEADERS,
+            timeout=timeout
+        )
+        response.raise_for_status()
+        return loads(response.content)
+    
     async def call_ceo_agent(self, idea_count: int) -> Dict[str, Any]:
         """Call CEO agent to generate business ideas"""
         try:
-            response = requests.post(
-                f"http://localhost:{self.agent_ports['ceo']}/generate-ideas",
-                json={"count": idea_count},
-                timeout=90
-            )
-            response.raise_for_status()
-            return response.json()
+            return await self._post_agent('ceo', '/generate-ideas', {"count": idea_count}, timeout=90)
         except Exception as e:
             print(f"❌ [{self.name}] CEO agent call failed: {e}")
             return None
     
-    async def call_research_agent(self, idea: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_research_agent(self, idea: Dict[str, Any], workflow_id: str = None,
+                                  deadline_seconds: float = None, priority: int = None) -> Dict[str, Any]:
         """Call MeTTa-enhanced Research agent to analyze market"""
         try:
             print(f"🧠 [{self.name}] Calling MeTTa-enhanced Research agent...")
-            response = requests.post(
-                "http://localhost:8009/research-idea-metta",
-                json={"idea": idea},
-                timeout=120
+            metta_response = await self._post_agent(
+                'research_metta', '/research-idea-metta',
+                {"idea": idea, "workflow_id": workflow_id, "deadline_seconds": deadline_seconds, "priority": priority},
+                timeout=self.step_timeout(120, deadline_seconds)
             )
-            response.raise_for_status()
-            metta_response = response.json()
             
             # Extract the core research data from MeTTa response
             research_data = {
+                "degraded": metta_response.get("degraded"),
                 "competitors": metta_response.get("competitors", []),
                 "market_analysis": metta_response.get("market_analysis", {}),
                 "recommendations": metta_response.get("recommendations", {}),
@@ -253,126 +1227,194 @@ class OrchestratoruAgent(BaseUAgent):
             print(f"❌ [{self.name}] MeTTa Research agent call failed: {e}")
             return None
     
-    async def call_product_agent(self, idea: Dict[str, Any], research: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_product_agent(self, idea: Dict[str, Any], research: Dict[str, Any], workflow_id: str = None,
+                                 deadline_seconds: float = None, priority: int = None) -> Dict[str, Any]:
         """Call Product agent to develop concept"""
         try:
-            response = requests.post(
-                f"http://localhost:{self.agent_ports['product']}/develop-product",
-                json={"idea": idea, "research": research},
-                timeout=90
+            return await self._post_agent(
+                'product', '/develop-product',
+                {"idea": idea, "research": research, "workflow_id": workflow_id, "deadline_seconds": deadline_seconds,
+                 "priority": priority},
+                timeout=self.step_timeout(90, deadline_seconds)
             )
-            response.raise_for_status()
-            return response.json()
         except Exception as e:
             print(f"❌ [{self.name}] Product agent call failed: {e}")
             return None
     
-    async def call_cmo_agent(self, idea: Dict[str, Any], product: Dict[str, Any], research: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_cmo_agent(self, idea: Dict[str, Any], product: Dict[str, Any], research: Dict[str, Any],
+                             workflow_id: str = None, deadline_seconds: float = None, priority: int = None) -> Dict[str, Any]:
         """Call CMO agent to create marketing strategy"""
         try:
-            response = requests.post(
-                f"http://localhost:{self.agent_ports['cmo']}/develop-marketing",
-                json={"idea": idea, "product": product, "research": research},
-                timeout=90
+            return await self._post_agent(
+                'cmo', '/develop-marketing',
+                {"idea": idea, "product": product, "research": research, "workflow_id": workflow_id,
+                 "deadline_seconds": deadline_seconds, "priority": priority},
+                timeout=self.step_timeout(90, deadline_seconds)
             )
-            response.raise_for_status()
-            return response.json()
         except Exception as e:
             print(f"❌ [{self.name}] CMO agent call failed: {e}")
             return None
     
-    async def call_cto_agent(self, idea: Dict[str, Any], product: Dict[str, Any], research: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_cto_agent(self, idea: Dict[str, Any], product: Dict[str, Any], research: Dict[str, Any],
+                             workflow_id: str = None, deadline_seconds: float = None, priority: int = None) -> Dict[str, Any]:
         """Call CTO agent to create technical strategy"""
         try:
-            response = requests.post(
-                f"http://localhost:{self.agent_ports['cto']}/develop-technical",
-                json={"idea": idea, "product": product, "research": research},
-                timeout=120
+            return await self._post_agent(
+                'cto', '/develop-technical',
+                {"idea": idea, "product": product, "research": research, "workflow_id": workflow_id,
+                 "deadline_seconds": deadline_seconds, "priority": priority},
+                timeout=self.step_timeout(120, deadline_seconds)
             )
-            response.raise_for_status()
-            return response.json()
         except Exception as e:
             print(f"❌ [{self.name}] CTO agent call failed: {e}")
             return None
     
     async def call_head_engineering_agent(self, idea: Dict[str, Any], product: Dict[str, Any], 
                                         research: Dict[str, Any], marketing: Dict[str, Any], 
-                                        technical: Dict[str, Any]) -> Dict[str, Any]:
+                                        technical: Dict[str, Any], workflow_id: str = None,
+                                        deadline_seconds: float = None, priority: int = None) -> Dict[str, Any]:
         """Call Head of Engineering agent to create Bolt prompt"""
         try:
-            response = requests.post(
-                f"http://localhost:{self.agent_ports['head_engineering']}/create-bolt-prompt",
-                json={
-                    "idea": idea, 
-                    "product": product, 
-                    "research": research, 
-                    "marketing_strategy": marketing, 
-                    "technical_strategy": technical
-                },
-                timeout=120
-            )
-            response.raise_for_status()
-            return response.json()
+            return await self._post_agent('head_engineering', '/create-bolt-prompt', {
+                "idea": idea, 
+                "product": product, 
+                "research": research, 
+                "marketing_strategy": marketing, 
+                "technical_strategy": technical,
+                "workflow_id": workflow_id,
+                "deadline_seconds": deadline_seconds,
+                "priority": priority
+            }, timeout=self.step_timeout(120, deadline_seconds))
         except Exception as e:
             print(f"❌ [{self.name}] Head of Engineering agent call failed: {e}")
             return None
     
-    async def call_finance_agent(self, idea: Dict[str, Any], product: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_finance_agent(self, idea: Dict[str, Any], product: Dict[str, Any], workflow_id: str = None,
+                                 deadline_seconds: float = None, priority: int = None) -> Dict[str, Any]:
         """Call Finance agent to analyze revenue"""
         try:
-            response = requests.post(
-                f"http://localhost:{self.agent_ports['finance']}/analyze-revenue",
-                json={"idea": idea, "product": product},
-                timeout=90
+            return await self._post_agent(
+                'finance', '/analyze-revenue',
+                {"idea_data": idea, "product_data": product, "workflow_id": workflow_id,
+                 "deadline_seconds": deadline_seconds, "priority": priority},
+                timeout=self.step_timeout(90, deadline_seconds)
             )
-            response.raise_for_status()
-            return response.json()
         except Exception as e:
             print(f"❌ [{self.name}] Finance agent call failed: {e}")
             return None
     
-    async def create_and_approve_pdr(self, idea: Dict[str, Any], product: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a PDR and auto-approve it to trigger marketing posting"""
+    async def start_pdr_outbox(self):
+        """Start the background worker that delivers queued PDRs"""
+        if self.pdr_worker is not None:
+            return
+        requeued = await asyncio.to_thread(self.workflow_store.requeue_sending_pdrs)
+        self.pdr_wakeup = asyncio.Event()
+        self.pdr_worker = asyncio.create_task(self.pdr_outbox_worker())
+        print(f"📮 [{self.name}] PDR outbox worker started ({requeued} interrupted delivery(ies) requeued)")
+    
+    async def pdr_outbox_worker(self):
+        """Deliver due PDRs, sleeping until new work is queued or a retry comes due"""
+        while True:
+            for pdr in await asyncio.to_thread(self.workflow_store.due_pdrs):
+                await self.deliver_pdr(pdr)
+            try:
+                await asyncio.wait_for(self.pdr_wakeup.wait(), timeout=PDR_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self.pdr_wakeup.clear()
+    
+    async def deliver_pdr(self, pdr: Dict[str, Any]):
+        """Create and approve one queued PDR, scheduling a retry with backoff on failure"""
+        workflow_id = pdr['workflow_id']
+        attempts = pdr['attempts'] + 1
+        await asyncio.to_thread(self.workflow_store.update_pdr, workflow_id, status=PDR_SENDING, attempts=attempts)
+        pdr_id = pdr['pdr_id']
         try:
-            # Default API URL - adjust if needed
-            api_url = "http://localhost:5070"
-            
-            print(f"📝 [{self.name}] Creating PDR for product: {product.get('product_name', 'Unknown')}")
-            
-            # Step 1: Create PDR
-            create_response = requests.post(
-                f"{api_url}/api/agents/pdrs",
-                json={"idea": idea, "product": product},
-                timeout=30
-            )
-            create_response.raise_for_status()
-            pdr_data = create_response.json()
-            pdr_id = pdr_data.get("pdrId")
-            
-            print(f"✅ [{self.name}] PDR created with ID: {pdr_id}")
-            
-            # Step 2: Auto-approve PDR (this triggers marketing posting)
-            print(f"✅ [{self.name}] Auto-approving PDR {pdr_id} to trigger marketing...")
-            approve_response = requests.post(
-                f"{api_url}/api/agents/pdrs/{pdr_id}/approve",
-                timeout=180  # Marketing can take time
-            )
-            approve_response.raise_for_status()
-            approve_data = approve_response.json()
-            
-            print(f"🎉 [{self.name}] PDR approved! Marketing posts:")
-            print(f"   🐦 Twitter: {approve_data.get('postResp', {}).get('twitter', {}).get('status', 'N/A')}")
-            print(f"   💼 LinkedIn: {approve_data.get('postResp', {}).get('linkedin', {}).get('status', 'N/A')}")
-            
-            return {
-                "pdr_id": pdr_id,
-                "marketing_result": approve_data.get("postResp", {}),
-                "strategy": approve_data.get("strategy", {})
-            }
-            
+            # A PDR created on an earlier attempt is approved, not created twice
+            if not pdr_id:
+                # Keyed by workflow and product so a create that timed out after Node saved it returns that PDR
+                pdr_id = await self.create_pdr(pdr['idea'], pdr['product'], f"{workflow_id}:{pdr['input_hash']}")
+                await asyncio.to_thread(self.workflow_store.update_pdr, workflow_id, pdr_id=pdr_id)
+            # Record the approval before sending it; the API approves each PDR once and answers
+            # repeats with the stored marketing results, so a retry after a timeout never posts twice
+            if pdr['approval_requested_at']:
+                print(f"♻️  [{self.name}] PDR {pdr_id} approval already sent, checking its outcome")
+            else:
+                await asyncio.to_thread(self.workflow_store.update_pdr, workflow_id, approval_requested_at=time.time())
+            result = await self.approve_pdr(pdr_id)
         except Exception as e:
-            print(f"❌ [{self.name}] PDR creation/approval failed: {str(e)}")
-            raise e
+            if attempts >= PDR_MAX_ATTEMPTS:
+                print(f"❌ [{self.name}] PDR delivery for {workflow_id} failed after {attempts} attempts: {str(e)}")
+                await asyncio.to_thread(self.workflow_store.update_pdr, workflow_id, status=PDR_FAILED, error=str(e))
+                await self.update_pdr_result(workflow_id, PDR_FAILED, pdr_id, {}, error=str(e))
+            else:
+                delay = min(PDR_RETRY_BASE_SECONDS * 2 ** (attempts - 1), PDR_RETRY_MAX_SECONDS)
+                print(f"⚠️  [{self.name}] PDR delivery for {workflow_id} failed (attempt {attempts}), retrying in {delay}s: {str(e)}")
+                await asyncio.to_thread(
+                    self.workflow_store.update_pdr, workflow_id,
+                    status=PDR_PENDING, error=str(e), next_attempt_at=time.time() + delay
+                )
+            return
+        
+        await asyncio.to_thread(self.workflow_store.update_pdr, workflow_id, status=PDR_DELIVERED, result=result, error=None)
+        await self.update_pdr_result(workflow_id, PDR_DELIVERED, pdr_id, result)
+        print(f"✅ [{self.name}] PDR {pdr_id} delivered for workflow {workflow_id}")
+    
+    async def update_pdr_result(self, workflow_id: str, status: str, pdr_id: str, result: Dict[str, Any],
+                          error: str = None):
+        """Record PDR delivery on the stored business plan so /job-result reflects it"""
+        plan = await asyncio.to_thread(self.workflow_store.get_result, workflow_id)
+        if plan is None:
+            return
+        plan["pdr_status"] = status
+        plan["pdr_id"] = pdr_id
+        plan["marketing_posts"] = result.get("marketing_result")
+        if error:
+            plan["pdr_warning"] = error
+        await asyncio.to_thread(self.workflow_store.save_result, workflow_id, plan)
+    
+    async def create_pdr(self, idea: Dict[str, Any], product: Dict[str, Any], idempotency_key: str = None) -> str:
+        """Create a PDR and return its ID; the API returns the existing PDR for an idempotency key it has seen"""
+        print(f"📝 [{self.name}] Creating PDR for product: {product.get('product_name', 'Unknown')}")
+        create_response = await asyncio.to_thread(
+            requests.post,
+            f"{PDR_API_URL}/api/agents/pdrs",
+            json={"idea": idea, "product": product, "idempotencyKey": idempotency_key},
+            timeout=30
+        )
+        create_response.raise_for_status()
+        pdr_id = create_response.json().get("pdrId")
+        if not pdr_id:
+            raise Exception("PDR API returned no pdrId")
+        print(f"✅ [{self.name}] PDR created with ID: {pdr_id}")
+        return pdr_id
+    
+    async def approve_pdr(self, pdr_id: str) -> Dict[str, Any]:
+        """Auto-approve a PDR, which triggers marketing posting"""
+        print(f"✅ [{self.name}] Auto-approving PDR {pdr_id} to trigger marketing...")
+        approve_response = await asyncio.to_thread(
+            requests.post,
+            f"{PDR_API_URL}/api/agents/pdrs/{pdr_id}/approve",
+            timeout=180  # Marketing can take time
+        )
+        if approve_response.status_code == 409:
+            # An earlier attempt's approval is still posting; retry later rather than approve again
+            raise Exception(f"PDR {pdr_id} approval still in progress")
+        approve_response.raise_for_status()
+        approve_data = approve_response.json()
+        
+        if approve_data.get("alreadyApproved"):
+            print(f"♻️  [{self.name}] PDR {pdr_id} was already approved; using its stored marketing posts:")
+        else:
+            print(f"🎉 [{self.name}] PDR approved! Marketing posts:")
+        print(f"   🐦 Twitter: {approve_data.get('postResp', {}).get('twitter', {}).get('status', 'N/A')}")
+        print(f"   💼 LinkedIn: {approve_data.get('postResp', {}).get('linkedin', {}).get('status', 'N/A')}")
+        
+        return {
+            "pdr_id": pdr_id,
+            "marketing_result": approve_data.get("postResp", {}),
+            "strategy": approve_data.get("strategy", {})
+        }
 
 # Create the agent instance
 orchestrator_agent = OrchestratoruAgent()
@@ -4,15 +4,64 @@ Develops product strategy and concepts
 """
 
 import json
-import re
 from typing import List, Dict, Any
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, PipelineResponse, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from prompt_templates import RenderedPrompt
+
+# Instructions and JSON schema form the cacheable prefix; only the body changes per request
+PRODUCT_PROMPT_PREFIX = """As a product strategist, develop a detailed product concept based on the business idea and research below.
+
+Create a comprehensive product concept that includes:
+
+1. Product name and positioning
+2. Core features and functionality
+3. Target market segments
+4. Value proposition
+5. Go-to-market strategy
+6. Revenue model refinement
+7. Success metrics
+
+Format your response as JSON:
+{
+  "product_name": "Final Product Name",
+  "product_description": "Detailed product description",
+  "core_features": [
+    "Feature 1",
+    "Feature 2",
+    "Feature 3"
+  ],
+  "target_market": {
+    "primary": "Primary target audience",
+    "secondary": "Secondary target audience"
+  },
+  "value_proposition": "Why customers will choose this product",
+  "go_to_market": {
+    "channels": ["Channel 1", "Channel 2"],
+    "pricing_strategy": "Pricing approach",
+    "launch_plan": "Launch strategy"
+  },
+  "revenue_model": "How the product generates revenue",
+  "success_metrics": ["Metric 1", "Metric 2", "Metric 3"]
+}"""
+
+PRODUCT_PROMPT_BODY = """Original Idea:
+Title: {title}
+Description: {description}
+Revenue Model: {revenue_model}
+
+Research Data:
+Competitors: {competitors}
+Market Analysis: {market_analysis}
+Recommendations: {recommendations}"""
 
 class ProductRequest(Model):
     """Model for product development request"""
     idea: Dict[str, str]
     research: Dict[str, Any]
+    workflow_id: str = None
+    deadline_seconds: float = None
+    priority: int = None
 
 class TargetMarket(Model):
     """Model for target market"""
@@ -25,7 +74,7 @@ class GoToMarket(Model):
     pricing_strategy: str
     launch_plan: str
 
-class ProductResponse(Model):
+class ProductResponse(PipelineResponse):
     """Model for product response"""
     product_name: str
     product_description: str
@@ -45,6 +94,7 @@ class ProductuAgent(BaseUAgent):
             role="Product strategy and concept development",
             port=8003
         )
+        self.prompts.register('develop_product', PRODUCT_PROMPT_PREFIX, PRODUCT_PROMPT_BODY)
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -53,199 +103,59 @@ class ProductuAgent(BaseUAgent):
         @self.agent.on_message(model=ProductRequest)
         async def handle_product_request(ctx: Context, sender: str, msg: ProductRequest):
             """Develop product concept based on idea and research"""
-            try:
-                print(f"🔧 [{self.name}] Developing product concept for: {msg.idea.get('title', 'Unknown')}")
-                
-                prompt = f"""As a product strategist, develop a detailed product concept based on this business idea and research:
-
-Original Idea:
-Title: {msg.idea.get('title', 'Unknown')}
-Description: {msg.idea.get('description', 'No description')}
-Revenue Model: {msg.idea.get('revenue_model', 'No revenue model')}
-
-Research Data:
-Competitors: {json.dumps(msg.research.get('competitors', []))}
-Market Analysis: {json.dumps(msg.research.get('market_analysis', {}))}
-Recommendations: {json.dumps(msg.research.get('recommendations', {}))}
-
-Create a comprehensive product concept that includes:
-
-1. Product name and positioning
-2. Core features and functionality
-3. Target market segments
-4. Value proposition
-5. Go-to-market strategy
-6. Revenue model refinement
-7. Success metrics
-
-Format your response as JSON:
-{{
-  "product_name": "Final Product Name",
-  "product_description": "Detailed product description",
-  "core_features": [
-    "Feature 1",
-    "Feature 2",
-    "Feature 3"
-  ],
-  "target_market": {{
-    "primary": "Primary target audience",
-    "secondary": "Secondary target audience"
-  }},
-  "value_proposition": "Why customers will choose this product",
-  "go_to_market": {{
-    "channels": ["Channel 1", "Channel 2"],
-    "pricing_strategy": "Pricing approach",
-    "launch_plan": "Launch strategy"
-  }},
-  "revenue_model": "How the product generates revenue",
-  "success_metrics": ["Metric 1", "Metric 2", "Metric 3"]
-}}"""
-
-                response = await self.call_asi_one(prompt, 3000)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    product_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] JSON parsing failed, using fallback data")
-                    product_data = self.get_fallback_product_data()
-                
-                # Convert to response models
-                target_market = TargetMarket(**product_data.get('target_market', {}))
-                go_to_market = GoToMarket(**product_data.get('go_to_market', {}))
-                
-                product_response = ProductResponse(
-                    product_name=product_data.get('product_name', 'AI Product Concept'),
-                    product_description=product_data.get('product_description', 'A comprehensive product concept'),
-                    core_features=product_data.get('core_features', []),
-                    target_market=target_market,
-                    value_proposition=product_data.get('value_proposition', 'Innovative solution'),
-                    go_to_market=go_to_market,
-                    revenue_model=product_data.get('revenue_model', 'Subscription model'),
-                    success_metrics=product_data.get('success_metrics', [])
-                )
-                
-                self.log_activity('Developed product concept', {
-                    'product_name': product_response.product_name,
-                    'features_count': len(product_response.core_features),
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, product_response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error developing product: {str(e)}")
-                # Send error response with fallback data
-                fallback_response = self.get_fallback_product_response()
-                await ctx.send(sender, fallback_response)
+            await ctx.send(sender, await self.develop_product(msg, priority=PRIORITY_BACKGROUND))
         
         # REST endpoints for Node.js server integration
-        @self.agent.on_rest_post("/develop-product", ProductRequest, ProductResponse)
+        @self.rest_post("/develop-product", ProductRequest, ProductResponse)
         async def handle_develop_product_rest(ctx: Context, req: ProductRequest) -> ProductResponse:
             """REST endpoint for developing product concepts"""
-            try:
-                print(f"🔧 [{self.name}] REST: Developing product concept for: {req.idea.get('title', 'Unknown')}")
-                
-                prompt = f"""As a product strategist, develop a detailed product concept based on this business idea and research:
-
-Original Idea:
-Title: {req.idea.get('title', 'Unknown')}
-Description: {req.idea.get('description', 'No description')}
-Revenue Model: {req.idea.get('revenue_model', 'No revenue model')}
-
-Research Data:
-Competitors: {json.dumps(req.research.get('competitors', []))}
-Market Analysis: {json.dumps(req.research.get('market_analysis', {}))}
-Recommendations: {json.dumps(req.research.get('recommendations', {}))}
-
-Create a comprehensive product concept that includes:
-
-1. Product name and positioning
-2. Core features and functionality
-3. Target market segments
-4. Value proposition
-5. Go-to-market strategy
-6. Revenue model refinement
-7. Success metrics
-
-Format your response as JSON:
-{{
-  "product_name": "Final Product Name",
-  "product_description": "Detailed product description",
-  "core_features": [
-    "Feature 1",
-    "Feature 2",
-    "Feature 3"
-  ],
-  "target_market": {{
-    "primary": "Primary target audience",
-    "secondary": "Secondary target audience"
-  }},
-  "value_proposition": "Why customers will choose this product",
-  "go_to_market": {{
-    "channels": ["Channel 1", "Channel 2"],
-    "pricing_strategy": "Pricing approach",
-    "launch_plan": "Launch strategy"
-  }},
-  "revenue_model": "How the product generates revenue",
-  "success_metrics": ["Metric 1", "Metric 2", "Metric 3"]
-}}"""
-
-                response = await self.call_asi_one(prompt, 3000)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    product_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] REST: JSON parsing failed, using fallback data")
-                    product_data = self.get_fallback_product_data()
-                
-                # Convert to response models
-                target_market = TargetMarket(**product_data.get('target_market', {}))
-                go_to_market = GoToMarket(**product_data.get('go_to_market', {}))
-                
-                product_response = ProductResponse(
-                    product_name=product_data.get('product_name', 'AI Product Concept'),
-                    product_description=product_data.get('product_description', 'A comprehensive product concept'),
-                    core_features=product_data.get('core_features', []),
-                    target_market=target_market,
-                    value_proposition=product_data.get('value_proposition', 'Innovative solution'),
-                    go_to_market=go_to_market,
-                    revenue_model=product_data.get('revenue_model', 'Subscription model'),
-                    success_metrics=product_data.get('success_metrics', [])
-                )
-                
-                self.log_activity('REST: Developed product concept', {
-                    'product_name': product_response.product_name,
-                    'features_count': len(product_response.core_features)
-                })
-                
-                return product_response
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] REST: Error developing product: {str(e)}")
-                return self.get_fallback_product_response()
+            return await self.develop_product(req)
+    
+    async def develop_product(self, req: ProductRequest, priority: int = PRIORITY_INTERACTIVE) -> ProductResponse:
+        """Develop a product concept through the shared request pipeline"""
+        return await self.run_pipeline(
+            req, '/develop-product', 3000,
+            build_prompt=self.build_product_prompt,
+            build_response=self.build_product_response,
+            fallback_data=lambda req: self.get_fallback_product_data(),
+            fallback_response=lambda req: self.get_fallback_product_response(),
+            priority=priority,
+            activity='Developed product concept',
+            summarize=lambda req, res: {
+                'product_name': res.product_name,
+                'features_count': len(res.core_features)
+            }
+        )
+    
+    def build_product_prompt(self, req: ProductRequest) -> RenderedPrompt:
+        """Build the product strategy prompt"""
+        print(f"🔧 [{self.name}] Developing product concept for: {req.idea.get('title', 'Unknown')}")
+        
+        return self.prompts.render(
+            'develop_product',
+            title=req.idea.get('title', 'Unknown'),
+            description=req.idea.get('description', 'No description'),
+            revenue_model=req.idea.get('revenue_model', 'No revenue model'),
+            competitors=json.dumps(req.research.get('competitors', [])),
+            market_analysis=json.dumps(req.research.get('market_analysis', {})),
+            recommendations=json.dumps(req.research.get('recommendations', {}))
+        )
+    
+    def build_product_response(self, product_data: Dict[str, Any], req: ProductRequest) -> ProductResponse:
+        """Convert parsed product data to response models"""
+        target_market = TargetMarket(**product_data.get('target_market', {}))
+        go_to_market = GoToMarket(**product_data.get('go_to_market', {}))
+        
+        return ProductResponse(
+            product_name=product_data.get('product_name', 'AI Product Concept'),
+            product_description=product_data.get('product_description', 'A comprehensive product concept'),
+            core_features=product_data.get('core_features', []),
+            target_market=target_market,
+            value_proposition=product_data.get('value_proposition', 'Innovative solution'),
+            go_to_market=go_to_market,
+            revenue_model=product_data.get('revenue_model', 'Subscription model'),
+            success_metrics=product_data.get('success_metrics', [])
+        )
     
     def get_fallback_product_data(self) -> Dict[str, Any]:
         """Get fallback product data when API fails"""
@@ -0,0 +1,78 @@
+"""
+Prompt templates for AI Company agents
+Compiles each agent's static prompt skeleton once and fills only the per-request slots
+"""
+
+import hashlib
+import string
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+
+class RenderedPrompt(NamedTuple):
+    """A prompt split into its static prefix and the text filled in for one request"""
+    prefix: str
+    text: str
+    prefix_id: str
+
+    def full_text(self) -> str:
+        """Prefix and request text as one string, for token estimates and logging"""
+        return f"{self.prefix}\n\n{self.text}"
+
+
+class PromptTemplate:
+    """Static prefix plus a body whose {slot} fields are parsed once at registration"""
+
+    def __init__(self, name: str, prefix: str, body: str):
+        self.name = name
+        # The prefix is sent verbatim ahead of every request so provider-side prefix caches can reuse it
+        self.prefix = prefix.strip()
+        self.prefix_id = hashlib.sha256(self.prefix.encode('utf-8')).hexdigest()[:12]
+        self._parts: List[Tuple[str, Optional[str]]] = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(body.strip()):
+            if field is not None and (not field.isidentifier() or format_spec or conversion):
+                raise ValueError(f"Prompt template {name} has unsupported slot {{{field}}}")
+            self._parts.append((literal, field))
+        self.slots = {field for _, field in self._parts if field is not None}
+
+    def render(self, **values: Any) -> RenderedPrompt:
+        """Fill the slots; every slot must be given"""
+        missing = self.slots - values.keys()
+        if missing:
+            raise KeyError(f"Prompt template {self.name} is missing slots: {', '.join(sorted(missing))}")
+        text = ''.join(
+            literal + (str(values[field]) if field is not None else '') for literal, field in self._parts
+        )
+        return RenderedPrompt(self.prefix, text, self.prefix_id)
+
+
+class PromptRegistry:
+    """An agent's prompt templates by name"""
+
+    def __init__(self):
+        self.templates: Dict[str, PromptTemplate] = {}
+        self.renders: Dict[str, int] = {}
+
+    def register(self, name: str, prefix: str, body: str) -> PromptTemplate:
+        """Compile and store a template"""
+        template = PromptTemplate(name, prefix, body)
+        self.templates[name] = template
+        self.renders.setdefault(name, 0)
+        return template
+
+    def render(self, name: str, **values: Any) -> RenderedPrompt:
+        """Render a registered template"""
+        rendered = self.templates[name].render(**values)
+        self.renders[name] += 1
+        return rendered
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get template prefixes and render counts"""
+        return {
+            name: {
+                'prefix_id': template.prefix_id,
+                'prefix_chars': len(template.prefix),
+                'slots': sorted(template.slots),
+                'renders': self.renders.get(name, 0)
+            }
+            for name, template in self.templates.items()
+        }
@@ -3,18 +3,72 @@ Enhanced Research uAgent with MeTTa Knowledge Graphs
 Conducts intelligent market research with structured reasoning
 """
 
-import json
-import re
+import asyncio
 from typing import List, Dict, Any
 from datetime import datetime
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, PipelineResponse, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from base_uagent import AGENT_WARMUP_RETRY_SECONDS, AGENT_WARMUP_MAX_RETRY_SECONDS
+from prompt_templates import RenderedPrompt
 from knowledge.business_knowledge import BusinessKnowledgeGraph
 from knowledge.research_memory import ResearchMemorySystem
 
+METTA_RESEARCH_PROMPT_PREFIX = """As an expert market research specialist with access to structured business knowledge, analyze the business idea below.
+
+**ENHANCED ANALYSIS REQUIRED:**
+Based on the historical context and industry insights given with the idea, provide a comprehensive analysis:
+
+1. **Competitive Landscape Analysis** - Identify existing competitors and their positioning
+2. **Market Opportunity Assessment** - Evaluate market size, growth potential, and barriers
+3. **Success Pattern Recognition** - Apply historical success patterns to this idea
+4. **Risk Assessment** - Identify key challenges and mitigation strategies
+5. **Strategic Recommendations** - Provide positioning and differentiation strategies
+
+**FORMAT YOUR RESPONSE AS JSON:**
+{
+  "competitors": [
+    {
+      "name": "Competitor Name",
+      "description": "What they do",
+      "strengths": "Their advantages",
+      "weaknesses": "Their limitations"
+    }
+  ],
+  "market_analysis": {
+    "market_size": "Estimated market size with context",
+    "growth_potential": "High/Medium/Low with reasoning",
+    "key_challenges": ["Challenge 1 with context", "Challenge 2 with context"],
+    "opportunities": ["Opportunity 1 with context", "Opportunity 2 with context"]
+  },
+  "recommendations": {
+    "positioning": "How to position based on historical patterns",
+    "differentiation": "How to stand out using success factors",
+    "target_audience": "Primary target market with reasoning"
+  }
+}
+
+**IMPORTANT:** Use the MeTTa knowledge context to provide more accurate and contextual analysis. Reference historical patterns and industry insights in your recommendations."""
+
+METTA_RESEARCH_PROMPT_BODY = """**BUSINESS IDEA:**
+Title: {title}
+Description: {description}
+Revenue Model: {revenue_model}
+
+**METTA KNOWLEDGE CONTEXT:**
+{historical_context}
+
+**INDUSTRY INSIGHTS:**
+Market Size: {market_size}
+Growth Rate: {growth_rate}
+Key Players: {key_players}
+Trends: {trends}"""
+
 class ResearchRequest(Model):
     """Model for research request"""
     idea: Dict[str, str]
+    workflow_id: str = None
+    deadline_seconds: float = None
+    priority: int = None
 
 class Competitor(Model):
     """Model for competitor information"""
@@ -54,7 +108,7 @@ class MarketTrendResponse(Model):
     market_patterns: Dict[str, Any]
     trends: str
 
-class MettaResearchResponse(Model):
+class MettaResearchResponse(PipelineResponse):
     """Enhanced research response with MeTTa insights"""
     competitors: List[Competitor]
     market_analysis: MarketAnalysis
@@ -74,9 +128,14 @@ class ResearchMettauAgent(BaseUAgent):
             port=8009  # Different port to avoid conflict
         )
         
-        # Initialize MeTTa knowledge systems
-        self.business_knowledge = BusinessKnowledgeGraph()
-        self.research_memory = ResearchMemorySystem()
+        # MeTTa knowledge systems load during warm-up so the agent is live while they build
+        self.business_knowledge = None
+        self.research_memory = None
+        self.knowledge_loaded = asyncio.Event()
+        # Set once the first load attempt has finished, whether or not it succeeded
+        self.knowledge_attempted = asyncio.Event()
+        self.readiness['knowledge_graph'] = False
+        self.prompts.register('research_idea_metta', METTA_RESEARCH_PROMPT_PREFIX, METTA_RESEARCH_PROMPT_BODY)
         
         self.setup_handlers()
         print("🧠 [RESEARCH MeTTa] Enhanced Research Agent with MeTTa Knowledge Graphs initialized")
@@ -87,115 +146,21 @@ class ResearchMettauAgent(BaseUAgent):
         @self.agent.on_message(model=ResearchRequest)
         async def handle_enhanced_research_request(ctx: Context, sender: str, msg: ResearchRequest):
             """Conduct enhanced market research with MeTTa knowledge"""
-            try:
-                print(f"🧠 [{self.name}] Starting MeTTa-enhanced research for: {msg.idea.get('title', 'Unknown')}")
-                
-                # Step 1: Extract business context from idea
-                business_context = self.extract_business_context(msg.idea)
-                
-                # Step 2: Query MeTTa knowledge graphs
-                industry_insights = self.get_industry_insights(business_context)
-                historical_context = self.get_historical_context(business_context)
-                similar_research = self.find_similar_research(business_context)
-                
-                # Step 3: Enhanced ASI:One analysis with MeTTa context
-                enhanced_prompt = self.create_enhanced_prompt(msg.idea, industry_insights, historical_context)
-                
-                print(f"🧠 [{self.name}] Calling ASI:One with MeTTa context...")
-                response = await self.call_asi_one(enhanced_prompt, 3000)
-                
-                # Step 4: Parse and enhance response
-                research_data = self.parse_research_response(response)
-                
-                # Step 5: Add MeTTa insights
-                research_data = self.enhance_with_metta_insights(research_data, business_context)
-                
-                # Step 6: Store new research in memory
-                self.store_research_findings(msg.idea, research_data)
-                
-                # Step 7: Create enhanced response
-                enhanced_response = MettaResearchResponse(
-                    competitors=[Competitor(**comp) for comp in research_data.get('competitors', [])],
-                    market_analysis=MarketAnalysis(**research_data.get('market_analysis', {})),
-                    recommendations=Recommendations(**research_data.get('recommendations', {})),
-                    historical_context=historical_context,
-                    similar_research=similar_research,
-                    market_patterns=self.analyze_market_patterns(business_context),
-                    success_factors=self.get_success_factors(business_context)
-                )
-                
-                self.log_activity('Conducted MeTTa-enhanced research', {
-                    'idea_title': msg.idea.get('title', 'Unknown'),
-                    'industry': business_context.get('industry', 'Unknown'),
-                    'similar_research_found': len(similar_research),
-                    'sender': sender
-                })
-                
-                # Send enhanced response back
-                await ctx.send(sender, enhanced_response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error in MeTTa-enhanced research: {str(e)}")
-                # Send fallback response
-                fallback_response = self.create_fallback_response()
-                await ctx.send(sender, fallback_response)
+            await ctx.send(sender, await self.research_idea_metta(msg, priority=PRIORITY_BACKGROUND))
         
         # REST endpoints for Node.js server integration
-        @self.agent.on_rest_post("/research-idea-metta", ResearchRequest, MettaResearchResponse)
+        @self.rest_post("/research-idea-metta", ResearchRequest, MettaResearchResponse)
         async def handle_research_idea_metta_rest(ctx: Context, req: ResearchRequest) -> MettaResearchResponse:
             """REST endpoint for MeTTa-enhanced research"""
-            try:
-                print(f"🧠 [{self.name}] REST: MeTTa-enhanced research for: {req.idea.get('title', 'Unknown')}")
-                
-                # Extract business context
-                business_context = self.extract_business_context(req.idea)
-                
-                # Get MeTTa insights
-                industry_insights = self.get_industry_insights(business_context)
-                historical_context = self.get_historical_context(business_context)
-                similar_research = self.find_similar_research(business_context)
-                
-                # Create enhanced prompt
-                enhanced_prompt = self.create_enhanced_prompt(req.idea, industry_insights, historical_context)
-                
-                print(f"🧠 [{self.name}] REST: Calling ASI:One with MeTTa context...")
-                response = await self.call_asi_one(enhanced_prompt, 3000)
-                
-                # Parse and enhance response
-                research_data = self.parse_research_response(response)
-                research_data = self.enhance_with_metta_insights(research_data, business_context)
-                
-                # Store research findings
-                self.store_research_findings(req.idea, research_data)
-                
-                # Create enhanced response
-                enhanced_response = MettaResearchResponse(
-                    competitors=[Competitor(**comp) for comp in research_data.get('competitors', [])],
-                    market_analysis=MarketAnalysis(**research_data.get('market_analysis', {})),
-                    recommendations=Recommendations(**research_data.get('recommendations', {})),
-                    historical_context=historical_context,
-                    similar_research=similar_research,
-                    market_patterns=self.analyze_market_patterns(business_context),
-                    success_factors=self.get_success_factors(business_context)
-                )
-                
-                self.log_activity('REST: MeTTa-enhanced research completed', {
-                    'idea_title': req.idea.get('title', 'Unknown'),
-                    'industry': business_context.get('industry', 'Unknown'),
-                    'similar_research_found': len(similar_research)
-                })
-                
-                return enhanced_response
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] REST: Error in MeTTa-enhanced research: {str(e)}")
-                return self.create_fallback_response()
+            return await self.research_idea_metta(req)
         
         # Additional MeTTa-specific endpoints
-        @self.agent.on_rest_post("/find-similar-research", ResearchRequest, SimilarResearchResponse)
+        @self.rest_post("/find-similar-research", ResearchRequest, SimilarResearchResponse)
         async def handle_find_similar_research_rest(ctx: Context, req: ResearchRequest) -> SimilarResearchResponse:
             """Find similar research using MeTTa knowledge"""
             try:
+                if not await self.knowledge_ready():
+                    raise Exception("MeTTa knowledge graphs are not loaded")
                 business_context = self.extract_business_context(req.idea)
                 similar_research = self.find_similar_research(business_context)
                 market_patterns = self.analyze_market_patterns(business_context)
@@ -213,10 +178,12 @@ class ResearchMettauAgent(BaseUAgent):
                     business_context={}
                 )
         
-        @self.agent.on_rest_post("/market-trend-analysis", ResearchRequest, MarketTrendResponse)
+        @self.rest_post("/market-trend-analysis", ResearchRequest, MarketTrendResponse)
         async def handle_market_trend_analysis_rest(ctx: Context, req: ResearchRequest) -> MarketTrendResponse:
             """Analyze market trends using MeTTa knowledge"""
             try:
+                if not await self.knowledge_ready():
+                    raise Exception("MeTTa knowledge graphs are not loaded")
                 business_context = self.extract_business_context(req.idea)
                 industry_insights = self.get_industry_insights(business_context)
                 market_patterns = self.analyze_market_patterns(business_context)
@@ -234,6 +201,88 @@ class ResearchMettauAgent(BaseUAgent):
                     trends="Error retrieving trends"
                 )
     
+    async def research_idea_metta(self, req: ResearchRequest, priority: int = PRIORITY_INTERACTIVE) -> MettaResearchResponse:
+        """Research an idea with MeTTa knowledge through the shared request pipeline"""
+        if not await self.knowledge_ready():
+            print(f"⚠️ [{self.name}] MeTTa knowledge graphs not loaded, using fallback research")
+            return self.mark_degraded(self.create_fallback_response())
+        # Knowledge graph results shared between building the prompt and the response
+        metta_context = {}
+        return await self.run_pipeline(
+            req, '/research-idea-metta', 3000,
+            build_prompt=lambda req: self.build_metta_prompt(req, metta_context),
+            build_response=lambda research_data, req: self.build_metta_response(research_data, req, metta_context),
+            fallback_data=lambda req: self.get_fallback_research_data(),
+            fallback_response=lambda req: self.create_fallback_response(),
+            priority=priority,
+            activity='Conducted MeTTa-enhanced research',
+            summarize=lambda req, res: {
+                'idea_title': req.idea.get('title', 'Unknown'),
+                'industry': metta_context['business_context'].get('industry', 'Unknown'),
+                'similar_research_found': len(res.similar_research)
+            }
+        )
+    
+    def build_metta_prompt(self, req: ResearchRequest, metta_context: Dict[str, Any]) -> RenderedPrompt:
+        """Query the knowledge graphs for the idea and build the enhanced prompt"""
+        print(f"🧠 [{self.name}] Starting MeTTa-enhanced research for: {req.idea.get('title', 'Unknown')}")
+        
+        # Extract business context and query MeTTa knowledge graphs
+        business_context = self.extract_business_context(req.idea)
+        industry_insights = self.get_industry_insights(business_context)
+        historical_context = self.get_historical_context(business_context)
+        metta_context.update({
+            'business_context': business_context,
+            'historical_context': historical_context,
+            'similar_research': self.find_similar_research(business_context)
+        })
+        
+        print(f"🧠 [{self.name}] Calling ASI:One with MeTTa context...")
+        return self.create_enhanced_prompt(req.idea, industry_insights, historical_context)
+    
+    def build_metta_response(self, research_data: Dict[str, Any], req: ResearchRequest,
+                             metta_context: Dict[str, Any]) -> MettaResearchResponse:
+        """Add MeTTa insights, store the findings and convert to response models"""
+        business_context = metta_context['business_context']
+        research_data = self.enhance_with_metta_insights(research_data, business_context)
+        self.store_research_findings(req.idea, research_data)
+        
+        return MettaResearchResponse(
+            competitors=[Competitor(**comp) for comp in research_data.get('competitors', [])],
+            market_analysis=MarketAnalysis(**research_data.get('market_analysis', {})),
+            recommendations=Recommendations(**research_data.get('recommendations', {})),
+            historical_context=metta_context['historical_context'],
+            similar_research=metta_context['similar_research'],
+            market_patterns=self.analyze_market_patterns(business_context),
+            success_factors=self.get_success_factors(business_context)
+        )
+    
+    async def warm_up(self):
+        """Load the MeTTa knowledge graphs alongside the upstream warm-up"""
+        await asyncio.gather(self.load_knowledge(), super().warm_up())
+    
+    async def load_knowledge(self):
+        """Build the knowledge graph and research memory off the event loop, retrying with backoff until it succeeds"""
+        delay = AGENT_WARMUP_RETRY_SECONDS
+        while True:
+            try:
+                self.business_knowledge = await asyncio.to_thread(BusinessKnowledgeGraph)
+                self.research_memory = await asyncio.to_thread(ResearchMemorySystem)
+                self.readiness['knowledge_graph'] = True
+                self.knowledge_loaded.set()
+                return
+            except Exception as e:
+                print(f"❌ [{self.name}] Could not load MeTTa knowledge graphs, retrying in {delay}s: {e}")
+            finally:
+                self.knowledge_attempted.set()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, AGENT_WARMUP_MAX_RETRY_SECONDS)
+    
+    async def knowledge_ready(self) -> bool:
+        """Wait for the first load attempt and report whether the graphs are loaded; requests fall back when not"""
+        await self.knowledge_attempted.wait()
+        return self.knowledge_loaded.is_set()
+    
     def extract_business_context(self, idea: Dict[str, str]) -> Dict[str, str]:
         """Extract business context from idea for MeTTa queries"""
         title = idea.get('title', '').lower()
@@ -302,81 +351,19 @@ class ResearchMettauAgent(BaseUAgent):
         return self.business_knowledge.query_success_factors(f"{industry}_company")
     
     def create_enhanced_prompt(self, idea: Dict[str, str], industry_insights: Dict[str, str], 
-                             historical_context: str) -> str:
+                             historical_context: str) -> RenderedPrompt:
         """Create enhanced prompt with MeTTa context"""
-        
-        prompt = f"""As an expert market research specialist with access to structured business knowledge, analyze this business idea:
-
-**BUSINESS IDEA:**
-Title: {idea.get('title', 'Unknown')}
-Description: {idea.get('description', 'No description')}
-Revenue Model: {idea.get('revenue_model', 'No revenue model')}
-
-**METTA KNOWLEDGE CONTEXT:**
-{historical_context}
-
-**INDUSTRY INSIGHTS:**
-Market Size: {industry_insights.get('market_size', 'Unknown')}
-Growth Rate: {industry_insights.get('growth_rate', 'Unknown')}
-Key Players: {industry_insights.get('key_players', 'Unknown')}
-Trends: {industry_insights.get('trends', 'Unknown')}
-
-**ENHANCED ANALYSIS REQUIRED:**
-Based on the historical context and industry insights above, provide a comprehensive analysis:
-
-1. **Competitive Landscape Analysis** - Identify existing competitors and their positioning
-2. **Market Opportunity Assessment** - Evaluate market size, growth potential, and barriers
-3. **Success Pattern Recognition** - Apply historical success patterns to this idea
-4. **Risk Assessment** - Identify key challenges and mitigation strategies
-5. **Strategic Recommendations** - Provide positioning and differentiation strategies
-
-**FORMAT YOUR RESPONSE AS JSON:**
-{{
-  "competitors": [
-    {{
-      "name": "Competitor Name",
-      "description": "What they do",
-      "strengths": "Their advantages",
-      "weaknesses": "Their limitations"
-    }}
-  ],
-  "market_analysis": {{
-    "market_size": "Estimated market size with context",
-    "growth_potential": "High/Medium/Low with reasoning",
-    "key_challenges": ["Challenge 1 with context", "Challenge 2 with context"],
-    "opportunities": ["Opportunity 1 with context", "Opportunity 2 with context"]
-  }},
-  "recommendations": {{
-    "positioning": "How to position based on historical patterns",
-    "differentiation": "How to stand out using success factors",
-    "target_audience": "Primary target market with reasoning"
-  }}
-}}
-
-**IMPORTANT:** Use the MeTTa knowledge context to provide more accurate and contextual analysis. Reference historical patterns and industry insights in your recommendations."""
-
-        return prompt
-    
-    def parse_research_response(self, response: str) -> Dict[str, Any]:
-        """Parse research response from ASI:One"""
-        try:
-            # Clean the response
-            cleaned_response = response
-            cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)
-            cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-            if json_match:
-                cleaned_response = json_match.group(0)
-            
-            # Parse JSON
-            research_data = json.loads(cleaned_response)
-            return research_data
-            
-        except json.JSONDecodeError:
-            print(f"❌ [{self.name}] JSON parsing failed, using fallback data")
-            return self.get_fallback_research_data()
+        return self.prompts.render(
+            'research_idea_metta',
+            title=idea.get('title', 'Unknown'),
+            description=idea.get('description', 'No description'),
+            revenue_model=idea.get('revenue_model', 'No revenue model'),
+            historical_context=historical_context,
+            market_size=industry_insights.get('market_size', 'Unknown'),
+            growth_rate=industry_insights.get('growth_rate', 'Unknown'),
+            key_players=industry_insights.get('key_players', 'Unknown'),
+            trends=industry_insights.get('trends', 'Unknown')
+        )
     
     def enhance_with_metta_insights(self, research_data: Dict[str, Any], business_context: Dict[str, str]) -> Dict[str, Any]:
         """Enhance research data with MeTTa insights"""
@@ -7,17 +7,79 @@ Conducts market research and competitive analysis with real tools:
 """
 
 import json
-import re
+import asyncio
 from typing import List, Dict, Any
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, PipelineResponse, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from prompt_templates import RenderedPrompt
 from tools.web_scraper import WebScraper
 from tools.trends_analyzer import TrendsAnalyzer
 from tools.search_tool import SearchTool
 
+RESEARCH_PROMPT_PREFIX = """As a market research specialist, analyze the business idea below using the REAL DATA collected from web searches, trends analysis, and news. Base your analysis on this real data from actual web sources and trends.
+
+Conduct thorough research and provide:
+
+1. Existing competitors in this space
+2. Market size and opportunity
+3. Key challenges and barriers
+4. Success factors for this type of business
+5. Recommended positioning strategy
+
+Format your response as JSON:
+{
+  "competitors": [
+    {
+      "name": "Competitor Name",
+      "description": "What they do",
+      "strengths": "Their advantages",
+      "weaknesses": "Their limitations"
+    }
+  ],
+  "market_analysis": {
+    "market_size": "Estimated market size",
+    "growth_potential": "High/Medium/Low",
+    "key_challenges": ["Challenge 1", "Challenge 2"],
+    "opportunities": ["Opportunity 1", "Opportunity 2"]
+  },
+  "recommendations": {
+    "positioning": "How to position this product",
+    "differentiation": "How to stand out",
+    "target_audience": "Primary target market"
+  }
+}"""
+
+RESEARCH_PROMPT_BODY = """BUSINESS IDEA:
+Title: {title}
+Description: {description}
+Revenue Model: {revenue_model}
+
+REAL DATA COLLECTED FROM TOOLS:
+1. Competitor Search Results ({competitors_found} found):
+{competitors}
+
+2. Google Trends Analysis:
+- Status: {trends_status}
+- Trend Data: {trends_data}
+
+3. Related Rising Queries:
+{related_queries_rising}
+
+4. Related Top Queries:
+{related_queries_top}
+
+5. Market Size Insights Found:
+{market_insights}
+
+6. Recent Industry News:
+{recent_news}"""
+
 class ResearchRequest(Model):
     """Model for research request"""
     idea: Dict[str, str]
+    workflow_id: str = None
+    deadline_seconds: float = None
+    priority: int = None
 
 class Competitor(Model):
     """Model for competitor information"""
@@ -39,7 +101,7 @@ class Recommendations(Model):
     differentiation: str
     target_audience: str
 
-class ResearchResponse(Model):
+class ResearchResponse(PipelineResponse):
     """Model for research response"""
     competitors: List[Competitor]
     market_analysis: MarketAnalysis
@@ -54,6 +116,7 @@ class ResearchuAgent(BaseUAgent):
             role="Market research and competitive analysis",
             port=8002
         )
+        self.prompts.register('research_idea', RESEARCH_PROMPT_PREFIX, RESEARCH_PROMPT_BODY)
         # Initialize tools
         self.web_scraper = WebScraper()
         self.trends_analyzer = TrendsAnalyzer()
@@ -67,258 +130,110 @@ class ResearchuAgent(BaseUAgent):
         @self.agent.on_message(model=ResearchRequest)
         async def handle_research_request(ctx: Context, sender: str, msg: ResearchRequest):
             """Conduct market research for a business idea using real tools"""
-            try:
-                print(f"🔍 [{self.name}] Starting research for idea: {msg.idea.get('title', 'Unknown')}")
-                
-                # Step 1: Use real tools to gather data
-                idea_title = msg.idea.get('title', 'Unknown')
-                idea_desc = msg.idea.get('description', 'No description')
-                
-                print(f"🔍 [{self.name}] Step 1: Searching for competitors...")
-                competitors_results = self.search_tool.search_competitors(
-                    industry=idea_title.split()[0] if idea_title else "tech",
-                    product_type=idea_title
-                )
-                
-                print(f"🔍 [{self.name}] Step 2: Analyzing market trends...")
-                trends_data = self.trends_analyzer.get_interest_over_time(
-                    keywords=[idea_title[:50]] if idea_title else ["technology"],
-                    timeframe='today 12-m'
-                )
-                
-                print(f"🔍 [{self.name}] Step 3: Getting related trends...")
-                related_queries = self.trends_analyzer.get_related_queries(
-                    keyword=idea_title[:50] if idea_title else "technology"
-                )
-                
-                print(f"🔍 [{self.name}] Step 4: Searching market size data...")
-                market_results = self.search_tool.search_market_size(
-                    industry=idea_title.split()[0] if idea_title else "tech"
-                )
-                
-                print(f"🔍 [{self.name}] Step 5: Searching industry news...")
-                news_results = self.search_tool.search_news(
-                    query=f"{idea_title} industry news",
-                    max_results=5
-                )
-                
-                # Step 2: Use LLM to analyze the collected data
-                tool_data = {
-                    'competitors_found': len(competitors_results),
-                    'competitor_urls': [r['url'] for r in competitors_results[:5]],
-                    'trends_status': trends_data.get('status'),
-                    'trends_data': trends_data.get('trends', {}),
-                    'related_queries_top': related_queries.get('top', [])[:5],
-                    'related_queries_rising': related_queries.get('rising', [])[:5],
-                    'market_insights': [r['title'] for r in market_results[:5]],
-                    'recent_news': [{'title': n['title'], 'date': n.get('date', 'N/A')} for n in news_results]
-                }
-                
-                print(f"🔍 [{self.name}] Step 6: Analyzing collected data with LLM...")
-                
-                prompt = f"""As a market research specialist, analyze this business idea using the REAL DATA collected from web searches, trends analysis, and news:
-
-BUSINESS IDEA:
-Title: {idea_title}
-Description: {idea_desc}
-Revenue Model: {msg.idea.get('revenue_model', 'No revenue model')}
-
-REAL DATA COLLECTED FROM TOOLS:
-1. Competitor Search Results ({tool_data['competitors_found']} found):
-{json.dumps(competitors_results[:5], indent=2)}
-
-2. Google Trends Analysis:
-- Status: {tool_data['trends_status']}
-- Trend Data: {json.dumps(tool_data['trends_data'], indent=2)}
-
-3. Related Rising Queries:
-{json.dumps(tool_data['related_queries_rising'], indent=2)}
-
-4. Related Top Queries:
-{json.dumps(tool_data['related_queries_top'], indent=2)}
-
-5. Market Size Insights Found:
-{json.dumps(tool_data['market_insights'], indent=2)}
-
-6. Recent Industry News:
-{json.dumps(tool_data['recent_news'], indent=2)}
-
-Based on this REAL DATA from actual web sources and trends, provide:
-
-Title: {msg.idea.get('title', 'Unknown')}
-Description: {msg.idea.get('description', 'No description')}
-Revenue Model: {msg.idea.get('revenue_model', 'No revenue model')}
-
-Conduct thorough research and provide:
-
-1. Existing competitors in this space
-2. Market size and opportunity
-3. Key challenges and barriers
-4. Success factors for this type of business
-5. Recommended positioning strategy
-
-Format your response as JSON:
-{{
-  "competitors": [
-    {{
-      "name": "Competitor Name",
-      "description": "What they do",
-      "strengths": "Their advantages",
-      "weaknesses": "Their limitations"
-    }}
-  ],
-  "market_analysis": {{
-    "market_size": "Estimated market size",
-    "growth_potential": "High/Medium/Low",
-    "key_challenges": ["Challenge 1", "Challenge 2"],
-    "opportunities": ["Opportunity 1", "Opportunity 2"]
-  }},
-  "recommendations": {{
-    "positioning": "How to position this product",
-    "differentiation": "How to stand out",
-    "target_audience": "Primary target market"
-  }}
-}}"""
-
-                response = await self.call_asi_one(prompt, 2500)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    research_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] JSON parsing failed, using fallback data")
-                    research_data = self.get_fallback_research_data()
-                
-                # Convert to response models
-                competitors = [Competitor(**comp) for comp in research_data.get('competitors', [])]
-                market_analysis = MarketAnalysis(**research_data.get('market_analysis', {}))
-                recommendations = Recommendations(**research_data.get('recommendations', {}))
-                
-                research_response = ResearchResponse(
-                    competitors=competitors,
-                    market_analysis=market_analysis,
-                    recommendations=recommendations
-                )
-                
-                self.log_activity('Conducted market research', {
-                    'idea_title': msg.idea.get('title', 'Unknown'),
-                    'competitors_found': len(competitors),
-                    'sender': sender
-                })
-                
-                # Send response back
-                await ctx.send(sender, research_response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error conducting research: {str(e)}")
-                # Send error response with fallback data
-                fallback_response = ResearchResponse(
-                    competitors=[Competitor(**comp) for comp in self.get_fallback_research_data()['competitors']],
-                    market_analysis=MarketAnalysis(**self.get_fallback_research_data()['market_analysis']),
-                    recommendations=Recommendations(**self.get_fallback_research_data()['recommendations'])
-                )
-                await ctx.send(sender, fallback_response)
+            await ctx.send(sender, await self.research_idea(msg, priority=PRIORITY_BACKGROUND))
         
         # REST endpoints for Node.js server integration
-        @self.agent.on_rest_post("/research-idea", ResearchRequest, ResearchResponse)
+        @self.rest_post("/research-idea", ResearchRequest, ResearchResponse)
         async def handle_research_idea_rest(ctx: Context, req: ResearchRequest) -> ResearchResponse:
             """REST endpoint for researching business ideas"""
-            try:
-                print(f"🔍 [{self.name}] REST: Researching idea: {req.idea.get('title', 'Unknown')}")
-                
-                prompt = f"""As a market research specialist, analyze this business idea:
-
-Title: {req.idea.get('title', 'Unknown')}
-Description: {req.idea.get('description', 'No description')}
-Revenue Model: {req.idea.get('revenue_model', 'No revenue model')}
-
-Conduct thorough research and provide:
-
-1. Existing competitors in this space
-2. Market size and opportunity
-3. Key challenges and barriers
-4. Success factors for this type of business
-5. Recommended positioning strategy
-
-Format your response as JSON:
-{{
-  "competitors": [
-    {{
-      "name": "Competitor Name",
-      "description": "What they do",
-      "strengths": "Their advantages",
-      "weaknesses": "Their limitations"
-    }}
-  ],
-  "market_analysis": {{
-    "market_size": "Estimated market size",
-    "growth_potential": "High/Medium/Low",
-    "key_challenges": ["Challenge 1", "Challenge 2"],
-    "opportunities": ["Opportunity 1", "Opportunity 2"]
-  }},
-  "recommendations": {{
-    "positioning": "How to position this product",
-    "differentiation": "How to stand out",
-    "target_audience": "Primary target market"
-  }}
-}}"""
-
-                response = await self.call_asi_one(prompt, 2500)
-                
-                # Clean the response to handle JSON parsing issues
-                cleaned_response = response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', cleaned_response)  # Remove control characters
-                cleaned_response = cleaned_response.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                # Parse JSON response
-                try:
-                    research_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] REST: JSON parsing failed, using fallback data")
-                    research_data = self.get_fallback_research_data()
-                
-                # Convert to response models
-                competitors = [Competitor(**comp) for comp in research_data.get('competitors', [])]
-                market_analysis = MarketAnalysis(**research_data.get('market_analysis', {}))
-                recommendations = Recommendations(**research_data.get('recommendations', {}))
-                
-                research_response = ResearchResponse(
-                    competitors=competitors,
-                    market_analysis=market_analysis,
-                    recommendations=recommendations
-                )
-                
-                self.log_activity('REST: Conducted market research', {
-                    'idea_title': req.idea.get('title', 'Unknown'),
-                    'competitors_found': len(competitors)
-                })
-                
-                return research_response
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] REST: Error conducting research: {str(e)}")
-                # Return fallback response
-                fallback_data = self.get_fallback_research_data()
-                return ResearchResponse(
-                    competitors=[Competitor(**comp) for comp in fallback_data['competitors']],
-                    market_analysis=MarketAnalysis(**fallback_data['market_analysis']),
-                    recommendations=Recommendations(**fallback_data['recommendations'])
-                )
+            return await self.research_idea(req)
+    
+    async def research_idea(self, req: ResearchRequest, priority: int = PRIORITY_INTERACTIVE) -> ResearchResponse:
+        """Research an idea with the tools and the LLM through the shared request pipeline"""
+        return await self.run_pipeline(
+            req, '/research-idea', 2500,
+            build_prompt=self.build_research_prompt,
+            build_response=self.build_research_response,
+            fallback_data=lambda req: self.get_fallback_research_data(),
+            fallback_response=lambda req: self.build_research_response(self.get_fallback_research_data(), req),
+            priority=priority,
+            activity='Conducted market research',
+            summarize=lambda req, res: {
+                'idea_title': req.idea.get('title', 'Unknown'),
+                'competitors_found': len(res.competitors)
+            }
+        )
+    
+    def gather_tool_data(self, idea_title: str) -> tuple:
+        """Collect competitor, trend, market and news data with the real tools (blocking)"""
+        print(f"🔍 [{self.name}] Step 1: Searching for competitors...")
+        competitors_results = self.search_tool.search_competitors(
+            industry=idea_title.split()[0] if idea_title else "tech",
+            product_type=idea_title
+        )
+        
+        print(f"🔍 [{self.name}] Step 2: Analyzing market trends...")
+        trends_data = self.trends_analyzer.get_interest_over_time(
+            keywords=[idea_title[:50]] if idea_title else ["technology"],
+            timeframe='today 12-m'
+        )
+        
+        print(f"🔍 [{self.name}] Step 3: Getting related trends...")
+        related_queries = self.trends_analyzer.get_related_queries(
+            keyword=idea_title[:50] if idea_title else "technology"
+        )
+        
+        print(f"🔍 [{self.name}] Step 4: Searching market size data...")
+        market_results = self.search_tool.search_market_size(
+            industry=idea_title.split()[0] if idea_title else "tech"
+        )
+        
+        print(f"🔍 [{self.name}] Step 5: Searching industry news...")
+        news_results = self.search_tool.search_news(
+            query=f"{idea_title} industry news",
+            max_results=5
+        )
+        
+        # Summarize the tool results for the LLM
+        tool_data = {
+            'competitors_found': len(competitors_results),
+            'competitor_urls': [r['url'] for r in competitors_results[:5]],
+            'trends_status': trends_data.get('status'),
+            'trends_data': trends_data.get('trends', {}),
+            'related_queries_top': related_queries.get('top', [])[:5],
+            'related_queries_rising': related_queries.get('rising', [])[:5],
+            'market_insights': [r['title'] for r in market_results[:5]],
+            'recent_news': [{'title': n['title'], 'date': n.get('date', 'N/A')} for n in news_results]
+        }
+        
+        return competitors_results, tool_data
+    
+    async def build_research_prompt(self, req: ResearchRequest) -> RenderedPrompt:
+        """Gather tool data off the event loop and build the analysis prompt around it"""
+        print(f"🔍 [{self.name}] Starting research for idea: {req.idea.get('title', 'Unknown')}")
+        
+        idea_title = req.idea.get('title', 'Unknown')
+        idea_desc = req.idea.get('description', 'No description')
+        competitors_results, tool_data = await asyncio.to_thread(self.gather_tool_data, idea_title)
+        
+        print(f"🔍 [{self.name}] Step 6: Analyzing collected data with LLM...")
+        
+        return self.prompts.render(
+            'research_idea',
+            title=idea_title,
+            description=idea_desc,
+            revenue_model=req.idea.get('revenue_model', 'No revenue model'),
+            competitors_found=tool_data['competitors_found'],
+            competitors=json.dumps(competitors_results[:5], indent=2),
+            trends_status=tool_data['trends_status'],
+            trends_data=json.dumps(tool_data['trends_data'], indent=2),
+            related_queries_rising=json.dumps(tool_data['related_queries_rising'], indent=2),
+            related_queries_top=json.dumps(tool_data['related_queries_top'], indent=2),
+            market_insights=json.dumps(tool_data['market_insights'], indent=2),
+            recent_news=json.dumps(tool_data['recent_news'], indent=2)
+        )
+    
+    def build_research_response(self, research_data: Dict[str, Any], req: ResearchRequest) -> ResearchResponse:
+        """Convert parsed research data to response models"""
+        competitors = [Competitor(**comp) for comp in research_data.get('competitors', [])]
+        market_analysis = MarketAnalysis(**research_data.get('market_analysis', {}))
+        recommendations = Recommendations(**research_data.get('recommendations', {}))
+        
+        return ResearchResponse(
+            competitors=competitors,
+            market_analysis=market_analysis,
+            recommendations=recommendations
+        )
     
     def get_fallback_research_data(self) -> Dict[str, Any]:
         """Get fallback research data when API fails"""
@@ -16,17 +16,54 @@ Test:
 """
 
 import json
-import re
+import asyncio
 from typing import List, Dict, Any
 from uagents import Context, Model
-from base_uagent import BaseUAgent
+from base_uagent import BaseUAgent, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from prompt_templates import RenderedPrompt
 from tools.web_scraper import WebScraper
 from tools.trends_analyzer import TrendsAnalyzer
 from tools.search_tool import SearchTool
 
+RESEARCH_PROMPT_PREFIX = """As a market research specialist, analyze the business idea below using REAL DATA collected from web searches, Google Trends, and news sources.
+
+Based on this REAL DATA from actual sources, provide a comprehensive analysis.
+
+Format your response as JSON:
+{
+  "competitors": [
+    {
+      "name": "Competitor Name",
+      "description": "What they do",
+      "strengths": "Their advantages",
+      "weaknesses": "Their limitations"
+    }
+  ],
+  "market_analysis": {
+    "market_size": "Estimated market size based on research",
+    "growth_potential": "High/Medium/Low with explanation",
+    "key_challenges": ["Challenge 1", "Challenge 2"],
+    "opportunities": ["Opportunity 1", "Opportunity 2"]
+  },
+  "recommendations": {
+    "positioning": "How to position this product",
+    "differentiation": "How to stand out from competitors found",
+    "target_audience": "Primary target market"
+  }
+}"""
+
+RESEARCH_PROMPT_BODY = """BUSINESS IDEA:
+Title: {title}
+Description: {description}
+Revenue Model: {revenue_model}
+
+{real_data_context}"""
+
 class ResearchRequest(Model):
     """Model for research request"""
     idea: Dict[str, str]
+    workflow_id: str = None
+    deadline_seconds: float = None
 
 class Competitor(Model):
     """Model for competitor information"""
@@ -64,6 +101,7 @@ class ResearchuAgent(BaseUAgent):
             role="Market research with real tools (Web Scraping, Trends, Search)",
             port=8002
         )
+        self.prompts.register('research_idea', RESEARCH_PROMPT_PREFIX, RESEARCH_PROMPT_BODY)
         # Initialize agentic tools
         try:
             self.web_scraper = WebScraper()
@@ -88,96 +126,118 @@ class ResearchuAgent(BaseUAgent):
         @self.agent.on_message(model=ResearchRequest)
         async def handle_research_request(ctx: Context, sender: str, msg: ResearchRequest):
             """Conduct market research using real tools"""
+            await ctx.send(sender, await self.research_idea(msg, priority=PRIORITY_BACKGROUND))
+        
+        # REST endpoint with same tool-based approach
+        @self.rest_post("/research-idea", ResearchRequest, ResearchResponse)
+        async def handle_research_idea_rest(ctx: Context, req: ResearchRequest) -> ResearchResponse:
+            """REST endpoint - uses same tool-based research"""
+            return await self.research_idea(req)
+    
+    async def research_idea(self, req: ResearchRequest, priority: int = PRIORITY_INTERACTIVE) -> ResearchResponse:
+        """Research an idea with the tools and the LLM through the shared request pipeline"""
+        # Tool usage recorded while building the prompt and reported in the response
+        tool_context = {}
+        return await self.run_pipeline(
+            req, '/research-idea', 2500,
+            build_prompt=lambda req: self.build_research_prompt(req, tool_context),
+            build_response=lambda research_data, req: self.build_research_response(
+                research_data, tool_context.get('tools_data', {})
+            ),
+            fallback_data=lambda req: self.get_fallback_research_data(),
+            fallback_response=lambda req: self.build_research_response(
+                self.get_fallback_research_data(), {'error': 'Research failed'}
+            ),
+            priority=priority,
+            activity='Completed research with real tools',
+            summarize=lambda req, res: {
+                'idea_title': req.idea.get('title', 'Unknown'),
+                'tools_used': res.tools_used
+            }
+        )
+    
+    def gather_tool_data(self, idea_title: str) -> tuple:
+        """Run every available tool, skipping any that fail (blocking)"""
+        tools_data = {
+            'web_search_used': False,
+            'trends_analysis_used': False,
+            'news_search_used': False,
+            'results_summary': {}
+        }
+        
+        # TOOL 1: Web Search for Competitors
+        competitors_results = []
+        if self.search_tool:
             try:
-                print(f"\n{'='*60}")
-                print(f"🔍 [{self.name}] NEW RESEARCH REQUEST")
-                print(f"{'='*60}")
-                print(f"Idea: {msg.idea.get('title', 'Unknown')}")
-                print(f"{'='*60}\n")
-                
-                idea_title = msg.idea.get('title', 'Unknown')
-                idea_desc = msg.idea.get('description', 'No description')
-                
-                tools_data = {
-                    'web_search_used': False,
-                    'trends_analysis_used': False,
-                    'news_search_used': False,
-                    'results_summary': {}
-                }
-                
-                # TOOL 1: Web Search for Competitors
-                competitors_results = []
-                if self.search_tool:
-                    try:
-                        print(f"🔍 TOOL 1: Searching for competitors...")
-                        competitors_results = self.search_tool.search_competitors(
-                            industry=idea_title.split()[0] if idea_title else "tech",
-                            product_type=idea_title
-                        )
-                        tools_data['web_search_used'] = True
-                        tools_data['results_summary']['competitors_found'] = len(competitors_results)
-                        print(f"   ✅ Found {len(competitors_results)} competitor references")
-                    except Exception as e:
-                        print(f"   ⚠️  Competitor search failed: {e}")
-                
-                # TOOL 2: Google Trends Analysis
-                trends_data = {}
-                if self.trends_analyzer:
-                    try:
-                        print(f"📈 TOOL 2: Analyzing Google Trends...")
-                        trends_data = self.trends_analyzer.get_interest_over_time(
-                            keywords=[idea_title[:50]] if idea_title else ["technology"],
-                            timeframe='today 12-m'
-                        )
-                        tools_data['trends_analysis_used'] = True
-                        tools_data['results_summary']['trends_status'] = trends_data.get('status')
-                        print(f"   ✅ Trends analysis: {trends_data.get('status')}")
-                    except Exception as e:
-                        print(f"   ⚠️  Trends analysis failed: {e}")
-                
-                # TOOL 3: Related Queries
-                related_queries = {}
-                if self.trends_analyzer:
-                    try:
-                        print(f"🔗 TOOL 3: Getting related search queries...")
-                        related_queries = self.trends_analyzer.get_related_queries(
-                            keyword=idea_title[:50] if idea_title else "technology"
-                        )
-                        tools_data['results_summary']['related_queries'] = len(related_queries.get('top', []))
-                        print(f"   ✅ Found {len(related_queries.get('top', []))} related queries")
-                    except Exception as e:
-                        print(f"   ⚠️  Related queries failed: {e}")
-                
-                # TOOL 4: Market Size Research
-                market_results = []
-                if self.search_tool:
-                    try:
-                        print(f"💰 TOOL 4: Researching market size...")
-                        market_results = self.search_tool.search_market_size(
-                            industry=idea_title.split()[0] if idea_title else "tech"
-                        )
-                        tools_data['results_summary']['market_articles'] = len(market_results)
-                        print(f"   ✅ Found {len(market_results)} market insights")
-                    except Exception as e:
-                        print(f"   ⚠️  Market search failed: {e}")
-                
-                # TOOL 5: News Search
-                news_results = []
-                if self.search_tool:
-                    try:
-                        print(f"📰 TOOL 5: Searching recent news...")
-                        news_results = self.search_tool.search_news(
-                            query=f"{idea_title} industry news",
-                            max_results=5
-                        )
-                        tools_data['news_search_used'] = True
-                        tools_data['results_summary']['news_articles'] = len(news_results)
-                        print(f"   ✅ Found {len(news_results)} news articles\n")
-                    except Exception as e:
-                        print(f"   ⚠️  News search failed: {e}\n")
-                
-                # Compile real data for LLM analysis
-                real_data_context = f"""
+                print(f"🔍 TOOL 1: Searching for competitors...")
+                competitors_results = self.search_tool.search_competitors(
+                    industry=idea_title.split()[0] if idea_title else "tech",
+                    product_type=idea_title
+                )
+                tools_data['web_search_used'] = True
+                tools_data['results_summary']['competitors_found'] = len(competitors_results)
+                print(f"   ✅ Found {len(competitors_results)} competitor references")
+            except Exception as e:
+                print(f"   ⚠️  Competitor search failed: {e}")
+        
+        # TOOL 2: Google Trends Analysis
+        trends_data = {}
+        if self.trends_analyzer:
+            try:
+                print(f"📈 TOOL 2: Analyzing Google Trends...")
+                trends_data = self.trends_analyzer.get_interest_over_time(
+                    keywords=[idea_title[:50]] if idea_title else ["technology"],
+                    timeframe='today 12-m'
+                )
+                tools_data['trends_analysis_used'] = True
+                tools_data['results_summary']['trends_status'] = trends_data.get('status')
+                print(f"   ✅ Trends analysis: {trends_data.get('status')}")
+            except Exception as e:
+                print(f"   ⚠️  Trends analysis failed: {e}")
+        
+        # TOOL 3: Related Queries
+        related_queries = {}
+        if self.trends_analyzer:
+            try:
+                print(f"🔗 TOOL 3: Getting related search queries...")
+                related_queries = self.trends_analyzer.get_related_queries(
+                    keyword=idea_title[:50] if idea_title else "technology"
+                )
+                tools_data['results_summary']['related_queries'] = len(related_queries.get('top', []))
+                print(f"   ✅ Found {len(related_queries.get('top', []))} related queries")
+            except Exception as e:
+                print(f"   ⚠️  Related queries failed: {e}")
+        
+        # TOOL 4: Market Size Research
+        market_results = []
+        if self.search_tool:
+            try:
+                print(f"💰 TOOL 4: Researching market size...")
+                market_results = self.search_tool.search_market_size(
+                    industry=idea_title.split()[0] if idea_title else "tech"
+                )
+                tools_data['results_summary']['market_articles'] = len(market_results)
+                print(f"   ✅ Found {len(market_results)} market insights")
+            except Exception as e:
+                print(f"   ⚠️  Market search failed: {e}")
+        
+        # TOOL 5: News Search
+        news_results = []
+        if self.search_tool:
+            try:
+                print(f"📰 TOOL 5: Searching recent news...")
+                news_results = self.search_tool.search_news(
+                    query=f"{idea_title} industry news",
+                    max_results=5
+                )
+                tools_data['news_search_used'] = True
+                tools_data['results_summary']['news_articles'] = len(news_results)
+                print(f"   ✅ Found {len(news_results)} news articles\n")
+            except Exception as e:
+                print(f"   ⚠️  News search failed: {e}\n")
+        
+        # Compile real data for LLM analysis
+        real_data_context = f"""
 REAL DATA FROM TOOLS:
 
 1. COMPETITOR SEARCH ({len(competitors_results)} results):
@@ -197,96 +257,45 @@ Top: {json.dumps(related_queries.get('top', [])[:5], indent=2)}
 5. RECENT NEWS ({len(news_results)} articles):
 {json.dumps([{'title': n['title'], 'date': n.get('date', 'N/A')} for n in news_results], indent=2)}
 """
-                
-                print(f"🤖 STEP 6: Analyzing data with LLM...")
-                
-                prompt = f"""As a market research specialist, analyze this business idea using REAL DATA collected from web searches, Google Trends, and news sources:
-
-BUSINESS IDEA:
-Title: {idea_title}
-Description: {idea_desc}
-Revenue Model: {msg.idea.get('revenue_model', 'No revenue model')}
-
-{real_data_context}
-
-Based on this REAL DATA from actual sources, provide a comprehensive analysis.
-
-Format your response as JSON:
-{{
-  "competitors": [
-    {{
-      "name": "Competitor Name",
-      "description": "What they do",
-      "strengths": "Their advantages",
-      "weaknesses": "Their limitations"
-    }}
-  ],
-  "market_analysis": {{
-    "market_size": "Estimated market size based on research",
-    "growth_potential": "High/Medium/Low with explanation",
-    "key_challenges": ["Challenge 1", "Challenge 2"],
-    "opportunities": ["Opportunity 1", "Opportunity 2"]
-  }},
-  "recommendations": {{
-    "positioning": "How to position this product",
-    "differentiation": "How to stand out from competitors found",
-    "target_audience": "Primary target market"
-  }}
-}}"""
-
-                response = await self.call_asi_one(prompt, 2500)
-                
-                # Parse response
-                cleaned_response = re.sub(r'[\u0000-\u001F\u007F-\u009F]', '', response)
-                json_match = re.search(r'\{[\s\S]*\}', cleaned_response)
-                if json_match:
-                    cleaned_response = json_match.group(0)
-                
-                try:
-                    research_data = json.loads(cleaned_response)
-                except json.JSONDecodeError:
-                    print(f"❌ [{self.name}] JSON parsing failed, using fallback")
-                    research_data = self.get_fallback_research_data()
-                
-                # Build response
-                competitors = [Competitor(**comp) for comp in research_data.get('competitors', [])]
-                market_analysis = MarketAnalysis(**research_data.get('market_analysis', {}))
-                recommendations = Recommendations(**research_data.get('recommendations', {}))
-                
-                research_response = ResearchResponse(
-                    competitors=competitors,
-                    market_analysis=market_analysis,
-                    recommendations=recommendations,
-                    tools_used=tools_data
-                )
-                
-                print(f"\n✅ Research complete! Used {sum([tools_data['web_search_used'], tools_data['trends_analysis_used'], tools_data['news_search_used']])} tools")
-                print(f"{'='*60}\n")
-                
-                self.log_activity('Completed research with real tools', {
-                    'idea_title': idea_title,
-                    'tools_used': tools_data,
-                    'sender': sender
-                })
-                
-                await ctx.send(sender, research_response)
-                
-            except Exception as e:
-                print(f"❌ [{self.name}] Error: {str(e)}")
-                fallback_response = ResearchResponse(
-                    competitors=[Competitor(**comp) for comp in self.get_fallback_research_data()['competitors']],
-                    market_analysis=MarketAnalysis(**self.get_fallback_research_data()['market_analysis']),
-                    recommendations=Recommendations(**self.get_fallback_research_data()['recommendations']),
-                    tools_used={'error': str(e)}
-                )
-                await ctx.send(sender, fallback_response)
         
-        # REST endpoint with same tool-based approach
-        @self.agent.on_rest_post("/research-idea", ResearchRequest, ResearchResponse)
-        async def handle_research_idea_rest(ctx: Context, req: ResearchRequest) -> ResearchResponse:
-            """REST endpoint - uses same tool-based research"""
-            # Reuse the same logic - call the message handler
-            return await handle_research_request(ctx, "rest_client", req)
+        return tools_data, real_data_context
+    
+    async def build_research_prompt(self, req: ResearchRequest, tool_context: Dict[str, Any]) -> RenderedPrompt:
+        """Gather tool data off the event loop and build the analysis prompt around it"""
+        print(f"\n{'='*60}")
+        print(f"🔍 [{self.name}] NEW RESEARCH REQUEST")
+        print(f"{'='*60}")
+        print(f"Idea: {req.idea.get('title', 'Unknown')}")
+        print(f"{'='*60}\n")
+        
+        idea_title = req.idea.get('title', 'Unknown')
+        idea_desc = req.idea.get('description', 'No description')
+        tools_data, real_data_context = await asyncio.to_thread(self.gather_tool_data, idea_title)
+        tool_context['tools_data'] = tools_data
+        
+        print(f"🤖 STEP 6: Analyzing data with LLM...")
+        
+        return self.prompts.render(
+            'research_idea',
+            title=idea_title,
+            description=idea_desc,
+            revenue_model=req.idea.get('revenue_model', 'No revenue model'),
+            real_data_context=real_data_context
+        )
+    
+    def build_research_response(self, research_data: Dict[str, Any], tools_data: Dict[str, Any]) -> ResearchResponse:
+        """Convert parsed research data to response models"""
+        research_response = ResearchResponse(
+            competitors=[Competitor(**comp) for comp in research_data.get('competitors', [])],
+            market_analysis=MarketAnalysis(**research_data.get('market_analysis', {})),
+            recommendations=Recommendations(**research_data.get('recommendations', {})),
+            tools_used=tools_data
+        )
+        
+        if 'error' not in tools_data:
+            print(f"\n✅ Research complete! Used {sum([tools_data.get('web_search_used', False), tools_data.get('trends_analysis_used', False), tools_data.get('news_search_used', False)])} tools")
+            print(f"{'='*60}\n")
+        return research_response
     
     def get_fallback_research_data(self) -> Dict[str, Any]:
         """Fallback data when tools fail"""
@@ -0,0 +1,206 @@
+"""
+Revenue projection engine for the AI Company Finance agent
+Extracts pricing, funnel and growth assumptions from idea and product data and runs a vectorized Monte Carlo
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+REVENUE_SIMULATION_RUNS = int(os.getenv('REVENUE_SIMULATION_RUNS', '10000'))
+REVENUE_PROJECTION_MONTHS = int(os.getenv('REVENUE_PROJECTION_MONTHS', '12'))
+REVENUE_PERCENTILES = [10, 25, 50, 75, 90]
+
+# Stated prices above this per month (per seat or per account) are revenue targets, not prices
+MAX_MONTHLY_PRICE = 2000
+# Launch traffic per go-to-market channel; channels beyond the cap add nothing
+VISITORS_PER_CHANNEL = (500.0, 1500.0, 4000.0)
+MAX_CHANNELS = 6
+
+# (low, most likely, high) assumptions for triangular draws, by customer segment
+SEGMENT_DEFAULTS = {
+    'business': {
+        'monthly_price': (80.0, 150.0, 300.0),
+        'monthly_churn': (0.01, 0.025, 0.05)
+    },
+    'consumer': {
+        'monthly_price': (8.0, 15.0, 30.0),
+        'monthly_churn': (0.03, 0.06, 0.10)
+    }
+}
+SIGNUP_RATE = (0.02, 0.04, 0.08)
+MONTHLY_GROWTH = (0.03, 0.08, 0.15)
+# Share of signups that pay: free tiers convert far less than trials
+PAID_CONVERSION = {
+    'freemium': (0.01, 0.03, 0.05),
+    'trial': (0.05, 0.12, 0.25)
+}
+
+BUSINESS_PATTERN = re.compile(r'\b(enterprise|b2b|business(?:es)?|smbs?|teams?|compan(?:y|ies)|organi[sz]ations?)\b')
+FREEMIUM_PATTERN = re.compile(r'\b(freemium|free (?:tier|plan|version))\b')
+PRICE_PATTERN = re.compile(r'\$\s?(\d[\d,]*(?:\.\d+)?)\s*(k\b|million|m\b|billion)?([^$]{0,24})')
+YEARLY_PATTERN = re.compile(r'\b(year|yearly|annual|annually|annum|yr)\b')
+# Amounts described as revenue, recurring revenue or funding ("$20k MRR", "raise $500k") are not prices
+TARGET_AFTER_PATTERN = re.compile(r'^[^.;]*?\b(mrr|arr|revenue|recurring|sales|gmv|funding|raise|valuation|run[- ]rate)\b')
+TARGET_BEFORE_PATTERN = re.compile(
+    r'\b(raise|raising|raised|funding|valuation|(?:revenue|mrr|arr|sales|gmv) (?:of|at|to|reaching))\s*(?:of\s*)?$'
+)
+TARGET_LOOKBEHIND_CHARS = 24
+
+
+def collect_text(value: Any) -> List[str]:
+    """All string values in nested idea or product data"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in collect_text(item)]
+    if isinstance(value, (list, tuple)):
+        return [text for item in value for text in collect_text(item)]
+    return []
+
+
+def stated_monthly_prices(text: str) -> List[float]:
+    """Dollar prices mentioned in the text, converted to per month"""
+    prices = []
+    for match in PRICE_PATTERN.finditer(text):
+        amount, scale, context = match.groups()
+        if scale and scale != 'k':
+            # "$1 million" is a revenue goal
+            continue
+        before = text[max(0, match.start() - TARGET_LOOKBEHIND_CHARS):match.start()]
+        if TARGET_AFTER_PATTERN.search(context) or TARGET_BEFORE_PATTERN.search(before):
+            continue
+        price = float(amount.replace(',', '')) * (1000 if scale else 1)
+        if YEARLY_PATTERN.search(context):
+            price /= 12
+        if 0 < price <= MAX_MONTHLY_PRICE:
+            prices.append(price)
+    return prices
+
+
+def extract_assumptions(idea_data: Dict[str, Any], product_data: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Build (low, most likely, high) assumptions from the idea and product, noting which were stated"""
+    text = ' '.join(collect_text(idea_data or {}) + collect_text(product_data or {})).lower()
+    segment = 'business' if BUSINESS_PATTERN.search(text) else 'consumer'
+    defaults = SEGMENT_DEFAULTS[segment]
+    pricing = 'freemium' if FREEMIUM_PATTERN.search(text) else 'trial'
+
+    prices = stated_monthly_prices(text)
+    if prices:
+        price = float(np.median(prices))
+        monthly_price = (price * 0.7, price, price * 1.3)
+    else:
+        monthly_price = defaults['monthly_price']
+
+    go_to_market = (product_data or {}).get('go_to_market') or {}
+    channels = go_to_market.get('channels') if isinstance(go_to_market, dict) else None
+    channel_count = min(max(len(channels) if isinstance(channels, list) else 1, 1), MAX_CHANNELS)
+
+    return {
+        'segment': segment,
+        'pricing': pricing,
+        'price_stated': bool(prices),
+        'channels': channel_count,
+        'ranges': {
+            'monthly_price': monthly_price,
+            'monthly_visitors': tuple(visitors * channel_count for visitors in VISITORS_PER_CHANNEL),
+            'signup_rate': SIGNUP_RATE,
+            'paid_conversion': PAID_CONVERSION[pricing],
+            'monthly_growth': MONTHLY_GROWTH,
+            'monthly_churn': defaults['monthly_churn']
+        }
+    }
+
+
+def projection_seed(idea_data: Dict[str, Any], product_data: Dict[str, Any] = None) -> int:
+    """Seed derived from the inputs, so the same idea and product always get the same projection"""
+    canonical = json.dumps([idea_data, product_data], sort_keys=True, default=str)
+    return int(hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:8], 16)
+
+
+class RevenueProjectionEngine:
+    """Monte Carlo revenue projections over a funnel of visitors, signups, paid customers and churn"""
+
+    def __init__(self, runs: int = REVENUE_SIMULATION_RUNS, months: int = REVENUE_PROJECTION_MONTHS):
+        self.runs = max(runs, 100)
+        self.months = max(months, 1)
+        self.projections = 0
+        self.seconds = 0.0
+
+    def simulate(self, ranges: Dict[str, Tuple[float, float, float]], seed: int) -> Dict[str, np.ndarray]:
+        """Draw every assumption once per run and project monthly revenue for all runs at once"""
+        rng = np.random.default_rng(seed)
+        draws = {
+            name: rng.triangular(low, mode, high, size=self.runs) if high > low else np.full(self.runs, mode)
+            for name, (low, mode, high) in ranges.items()
+        }
+        month = np.arange(self.months)
+
+        visitors = draws['monthly_visitors'][:, None] * (1 + draws['monthly_growth'][:, None]) ** month
+        new_customers = visitors * (draws['signup_rate'] * draws['paid_conversion'])[:, None]
+        # Only the month-to-month carry-over is sequential; every step updates all runs at once
+        retention = 1 - draws['monthly_churn']
+        customers = np.empty_like(new_customers)
+        active = np.zeros(self.runs)
+        for m in month:
+            active = active * retention + new_customers[:, m]
+            customers[:, m] = active
+        monthly_revenue = customers * draws['monthly_price'][:, None]
+        return {
+            'customers': customers,
+            'monthly_revenue': monthly_revenue,
+            'total_revenue': monthly_revenue.sum(axis=1)
+        }
+
+    def project(self, idea_data: Dict[str, Any], product_data: Dict[str, Any] = None,
+                seed: Optional[int] = None) -> Dict[str, Any]:
+        """Revenue percentiles over the projection horizon, with the assumptions behind them"""
+        started_at = time.perf_counter()
+        assumptions = extract_assumptions(idea_data, product_data)
+        if seed is None:
+            seed = projection_seed(idea_data, product_data)
+        simulated = self.simulate(assumptions['ranges'], seed)
+
+        total = simulated['total_revenue']
+        percentiles = dict(zip(
+            (f"p{pct}" for pct in REVENUE_PERCENTILES),
+            (round(float(value), 2) for value in np.percentile(total, REVENUE_PERCENTILES))
+        ))
+        spread = (percentiles['p90'] - percentiles['p10']) / percentiles['p50'] if percentiles['p50'] > 0 else float('inf')
+        if spread < 1.5 and assumptions['price_stated']:
+            confidence = 'high'
+        elif spread < 3:
+            confidence = 'medium'
+        else:
+            confidence = 'low'
+
+        elapsed = time.perf_counter() - started_at
+        self.projections += 1
+        self.seconds += elapsed
+        return {
+            'minimum': percentiles['p10'],
+            'maximum': percentiles['p90'],
+            'most_likely': percentiles['p50'],
+            'mean': round(float(total.mean()), 2),
+            'currency': 'USD',
+            'confidence_level': confidence,
+            'percentiles': percentiles,
+            'monthly_revenue_p50': [round(float(value), 2) for value in np.percentile(simulated['monthly_revenue'], 50, axis=0)],
+            'customers_p50_final_month': round(float(np.percentile(simulated['customers'][:, -1], 50)), 1),
+            'assumptions': {
+                'segment': assumptions['segment'],
+                'pricing': assumptions['pricing'],
+                'price_stated': assumptions['price_stated'],
+                'channels': assumptions['channels'],
+                'ranges': {name: [round(value, 4) for value in bounds] for name, bounds in assumptions['ranges'].items()}
+            },
+            'runs': self.runs,
+            'months': self.months,
+            'seed': seed,
+            'elapsed_ms': round(elapsed * 1000, 2)
+        }
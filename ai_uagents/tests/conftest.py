@@ -0,0 +1,9 @@
+"""
+Shared pytest setup for the AI Company uAgents helper modules
+The agents import each other as top-level modules, so the package directory goes on sys.path
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
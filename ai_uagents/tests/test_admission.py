@@ -0,0 +1,103 @@
+"""Tests for workflow admission control"""
+
+import asyncio
+
+import pytest
+
+import admission
+from admission import AdmissionController, OverloadedError
+
+
+def test_admits_up_to_the_limit_then_queues_in_order():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_waiting=2, wait_timeout=5)
+        order = []
+
+        async def workflow(name):
+            async with controller.slot():
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(workflow(name) for name in 'abc'))
+        return controller, order
+
+    controller, order = asyncio.run(scenario())
+    assert order == ['a', 'b', 'c']
+    snapshot = controller.snapshot()
+    assert snapshot['admitted'] == 3
+    assert snapshot['completed'] == 3
+    assert snapshot['running'] == 0
+    assert snapshot['rejected'] == 0
+
+
+def test_rejects_immediately_when_the_wait_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_waiting=1, wait_timeout=5)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError) as error:
+            await controller.acquire()
+        controller.release()
+        await waiter
+        return controller, error.value
+
+    controller, error = asyncio.run(scenario())
+    assert error.retry_after >= 1.0
+    assert controller.rejected == 1
+    assert controller.running == 1
+
+
+def test_times_out_waiting_for_a_slot():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_waiting=5, wait_timeout=0.01)
+        await controller.acquire()
+        with pytest.raises(OverloadedError):
+            await controller.acquire()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.timed_out == 1
+    assert controller.waiting() == 0
+
+
+def test_unbounded_callers_wait_even_when_the_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_waiting=0, wait_timeout=0.01)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire(bounded=False))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        controller.release()
+        await waiter
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.rejected == 0
+    assert controller.running == 1
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_waiting=5, wait_timeout=5)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        controller.release()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.running == 0
+    assert controller.waiting() == 0
+
+
+def test_retry_after_scales_with_backlog():
+    controller = AdmissionController(max_concurrent=2)
+    assert controller.retry_after(0) == admission.ADMISSION_DEFAULT_WORKFLOW_SECONDS
+
+    controller.duration_ewma = 10.0
+    assert controller.retry_after(0) == 10.0
+    assert controller.retry_after(4) == 30.0
+    assert controller.retry_after(4, slots=4) == 20.0
@@ -0,0 +1,59 @@
+"""Tests for step message addressing"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('uagents')
+
+from agent_messaging import MessageTransport, StepReply, build_resolver_rules
+
+
+def test_resolver_rules_route_replica_addresses_to_their_ports():
+    rules = build_resolver_rules({'cto': 'agent1cto', 'cto@8015': 'agent1replica', 'unknown': 'agent1x'})
+    assert rules == {
+        'agent1cto': 'http://localhost:8005/submit',
+        'agent1replica': 'http://localhost:8015/submit'
+    }
+
+
+def test_address_for_needs_an_attached_context():
+    transport = MessageTransport({'cto': 'agent1cto'})
+    assert transport.address_for('cto', 8005) is None
+
+
+def test_address_for_picks_the_replica_address():
+    transport = MessageTransport({'cto': 'agent1cto', 'cto@8015': 'agent1replica'})
+    transport.attach(object())
+    assert transport.address_for('cto', 8005) == 'agent1cto'
+    assert transport.address_for('cto', 8015) == 'agent1replica'
+    # A replica sharing the role's seed can't be told apart over messages
+    assert transport.address_for('cto', 8025) is None
+    assert transport.address_for('cmo', 8004) is None
+
+
+class FakeContext:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, address, message):
+        self.sent.append((address, message))
+
+
+def test_replies_are_only_accepted_from_the_addressed_agent():
+    async def scenario():
+        transport = MessageTransport({'cto': 'agent1cto'})
+        ctx = FakeContext()
+        transport.attach(ctx)
+        request = asyncio.create_task(transport.request('cto', '/x', {}, timeout=5))
+        await asyncio.sleep(0)
+        correlation_id = ctx.sent[0][1].correlation_id
+
+        transport.resolve('agent1intruder', StepReply(correlation_id=correlation_id, success=True, data={'forged': True}))
+        assert not request.done()
+        transport.resolve('agent1cto', StepReply(correlation_id=correlation_id, success=True, data={'ok': True}))
+        return await request, transport.snapshot()
+
+    data, snapshot = asyncio.run(scenario())
+    assert data == {'ok': True}
+    assert (snapshot['replied'], snapshot['unexpected_senders'], snapshot['pending']) == (1, 1, 0)
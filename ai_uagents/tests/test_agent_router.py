@@ -0,0 +1,139 @@
+"""Tests for replica routing"""
+
+import asyncio
+
+import pytest
+import requests
+
+import agent_router
+from agent_router import AgentRouter, AgentUnavailableError, parse_agent_endpoints
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("no JSON body")
+        return self.body
+
+
+def make_router():
+    return AgentRouter({'cto': ['http://localhost:8005', 'http://localhost:8015'], 'empty': []})
+
+
+async def hold(router, role, event):
+    async with router.endpoint(role) as endpoint:
+        await event.wait()
+        return endpoint.url
+
+
+def test_parse_agent_endpoints():
+    endpoints = parse_agent_endpoints("cto=http://localhost:8005/, http://localhost:8015;bad;research= ")
+
+    assert endpoints == {'cto': ['http://localhost:8005', 'http://localhost:8015'], 'research': []}
+    assert 'empty' not in make_router().pools
+
+
+def test_picks_least_outstanding_then_fewest_requests():
+    async def scenario():
+        router = make_router()
+        release = asyncio.Event()
+        first = asyncio.create_task(hold(router, 'cto', release))
+        await asyncio.sleep(0)
+        second_pick = router.pick('cto').url
+        release.set()
+        await first
+        return router, second_pick
+
+    router, second_pick = asyncio.run(scenario())
+    assert second_pick == 'http://localhost:8015'
+    # Both idle now; the one that served fewer requests wins
+    assert router.pick('cto').url == 'http://localhost:8015'
+
+
+def test_prefers_ready_replicas_but_falls_back_to_warming_ones():
+    router = make_router()
+    first, second = router.pools['cto']
+    first.ready = False
+
+    assert router.pick('cto') is second
+    second.ready = False
+    assert router.pick('cto') in (first, second)
+
+
+def test_fails_fast_when_no_replica_is_alive():
+    router = make_router()
+    for endpoint in router.pools['cto']:
+        endpoint.healthy = False
+
+    with pytest.raises(AgentUnavailableError):
+        router.pick('cto')
+    with pytest.raises(Exception, match='No endpoints configured'):
+        router.pick('ceo')
+
+
+def test_refused_connection_takes_endpoint_out_of_rotation():
+    async def scenario():
+        router = make_router()
+        with pytest.raises(requests.ConnectionError):
+            async with router.endpoint('cto'):
+                raise requests.ConnectionError("refused")
+        return router
+
+    endpoint = asyncio.run(scenario()).pools['cto'][0]
+    assert endpoint.healthy is False
+    assert endpoint.errors == 1
+    assert endpoint.outstanding == 0
+
+
+def test_repeated_failures_take_endpoint_out_of_rotation(monkeypatch):
+    monkeypatch.setattr(agent_router, 'AGENT_MAX_FAILURES', 2)
+
+    async def scenario():
+        router = AgentRouter({'cto': ['http://localhost:8005']})
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                async with router.endpoint('cto'):
+                    raise RuntimeError("500")
+            assert router.pools['cto'][0].consecutive_failures >= 1
+        return router
+
+    endpoint = asyncio.run(scenario()).pools['cto'][0]
+    assert endpoint.healthy is False
+
+
+def test_health_check_updates_readiness(monkeypatch):
+    responses = {
+        'http://localhost:8005/ready': FakeResponse(200, {'ready': False, 'checks': {'knowledge_graph': False}}),
+        'http://localhost:8015/ready': FakeResponse(404)
+    }
+
+    def fake_get(url, timeout=None):
+        return responses[url]
+
+    monkeypatch.setattr(agent_router.requests, 'get', fake_get)
+    router = make_router()
+    first, second = router.pools['cto']
+    first.healthy = False
+    first.consecutive_failures = 3
+    asyncio.run(router.check_all())
+
+    assert first.healthy is True and first.ready is False
+    assert first.checks == {'knowledge_graph': False}
+    assert first.consecutive_failures == 0
+    assert second.healthy is True and second.ready is True
+
+
+def test_unanswered_health_check_marks_endpoint_down(monkeypatch):
+    def fake_get(url, timeout=None):
+        raise requests.Timeout("timed out")
+
+    monkeypatch.setattr(agent_router.requests, 'get', fake_get)
+    router = make_router()
+    asyncio.run(router.check_endpoint(router.pools['cto'][0]))
+
+    assert router.pools['cto'][0].healthy is False
+    assert router.snapshot()['cto'][0]['healthy'] is False
@@ -0,0 +1,97 @@
+"""Tests for the content-addressed blob store"""
+
+import os
+import time
+
+import pytest
+
+from blob_store import BlobStore, is_blob_ref, REF_KEY
+from wire_codec import COMPRESSION_GZIP
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / 'blobs'), min_bytes=64, cache_items=2)
+
+
+def blob_paths(store):
+    return [os.path.join(root, name) for root, _, files in os.walk(store.directory) for name in files]
+
+
+def large_value(tag: str, size: int = 200):
+    return {'tag': tag, 'body': 'x' * size}
+
+
+def test_small_values_stay_inline(store):
+    assert store.put({'a': 1}) == {'a': 1}
+    assert store.put(None) is None
+    assert blob_paths(store) == []
+
+
+def test_put_is_content_addressed_and_round_trips(store):
+    first = store.put(large_value('a'))
+    second = store.put({'body': 'x' * 200, 'tag': 'a'})
+
+    assert is_blob_ref(first)
+    assert first == second
+    assert len(blob_paths(store)) == 1
+    assert store.put(first) is first
+
+    # A fresh store has an empty cache, so the value comes from disk
+    reader = BlobStore(store.directory, min_bytes=64)
+    assert reader.resolve(first) == large_value('a')
+    assert reader.resolve({'inline': True}) == {'inline': True}
+
+
+def test_missing_blob_raises(store):
+    with pytest.raises(KeyError):
+        store.get('0' * 64)
+
+
+def test_compressed_blobs_are_readable(tmp_path, monkeypatch):
+    monkeypatch.setattr('blob_store.BLOB_COMPRESS_MIN_BYTES', 0)
+    store = BlobStore(str(tmp_path / 'blobs'), min_bytes=64, compression=COMPRESSION_GZIP)
+    ref = store.put(large_value('gz', 5000))
+
+    assert blob_paths(store)[0].endswith('.json.gz')
+    assert BlobStore(store.directory).get(ref[REF_KEY]) == large_value('gz', 5000)
+
+
+def test_cache_is_bounded(store):
+    for tag in 'abc':
+        store.put(large_value(tag))
+
+    assert store.stats()['cached'] == 2
+    assert store.stats()['blobs'] == 3
+
+
+def test_prune_removes_expired_blobs(store):
+    old = store.put(large_value('old'))
+    store.put(large_value('new'))
+    old_path = store._path(old[REF_KEY])
+    stale = time.time() - 3600
+    os.utime(old_path, (stale, stale))
+
+    assert store.prune(ttl=60, max_bytes=0) == 1
+    assert not os.path.exists(old_path)
+    assert len(blob_paths(store)) == 1
+
+
+def test_prune_evicts_least_recently_used_over_the_cap(store):
+    refs = [store.put(large_value(tag)) for tag in 'abc']
+    for age, ref in zip((300, 200, 100), refs):
+        stamp = time.time() - age
+        os.utime(store._path(ref[REF_KEY]), (stamp, stamp))
+    size = os.path.getsize(store._path(refs[0][REF_KEY]))
+
+    assert store.prune(ttl=3600, max_bytes=size * 2) == 1
+    assert not os.path.exists(store._path(refs[0][REF_KEY]))
+    assert os.path.exists(store._path(refs[2][REF_KEY]))
+
+
+def test_disabled_store_passes_values_through(tmp_path):
+    store = BlobStore(str(tmp_path / 'blobs'), min_bytes=0, enabled=False)
+    value = large_value('a')
+
+    assert store.put(value) is value
+    assert store.prune() == 0
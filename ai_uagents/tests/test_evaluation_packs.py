@@ -0,0 +1,41 @@
+"""Tests for batch evaluation packing"""
+
+from evaluation_packs import split_packs, match_pack_evaluations
+
+
+def evaluation(score, **extra):
+    return dict(viability_score=score, market_potential='high', recommendations='ship', go_decision=True, **extra)
+
+
+def test_split_packs_numbers_items_across_packs():
+    assert split_packs(['a', 'b', 'c'], 2) == [[(0, 'a'), (1, 'b')], [(2, 'c')]]
+    assert split_packs(['a'], 0) == [[(0, 'a')]]
+    assert split_packs([], 5) == []
+
+
+def test_matches_by_index_field_in_any_order():
+    matched = match_pack_evaluations([evaluation(7, index=6), evaluation(5, index=5)], [5, 6])
+    assert matched == {5: evaluation(5), 6: evaluation(7)}
+
+
+def test_falls_back_to_position_for_unknown_or_missing_index():
+    matched = match_pack_evaluations([evaluation(1, index=99), evaluation(2)], [5, 6])
+    assert matched == {5: evaluation(1), 6: evaluation(2)}
+
+
+def test_duplicates_extras_and_junk_are_dropped():
+    data = [evaluation(1, index=5), evaluation(2, index=5), 'junk', evaluation(3), evaluation(4)]
+    matched = match_pack_evaluations(data, [5, 6])
+    # The second index 5 and the entry past the pack size find no free product
+    assert matched == {5: evaluation(1)}
+
+
+def test_non_list_answers_match_nothing():
+    assert match_pack_evaluations({'index': 5}, [5]) == {}
+    assert match_pack_evaluations(None, [5]) == {}
+
+
+def test_input_evaluations_are_not_modified():
+    data = [evaluation(1, index=5)]
+    match_pack_evaluations(data, [5])
+    assert data[0]['index'] == 5
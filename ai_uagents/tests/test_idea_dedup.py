@@ -0,0 +1,29 @@
+"""Tests for idea title deduplication"""
+
+from idea_dedup import normalize_title, is_near_duplicate
+
+
+def test_normalize_title_drops_punctuation_case_and_filler_words():
+    assert normalize_title('The AI Co-Pilot for Lawyers!') == ['co', 'pilot', 'lawyers']
+
+
+def test_normalize_title_keeps_titles_made_only_of_filler_words():
+    assert normalize_title('The AI') == ['the', 'ai']
+
+
+def test_near_duplicate_by_characters():
+    seen = [normalize_title('SmartInvoice: automated invoicing')]
+    # Word sets differ, but the titles read almost the same
+    assert is_near_duplicate('Smart Invoice - Automated Invoicing', seen)
+    assert is_near_duplicate('SmartInvoice automated invoices', seen)
+
+
+def test_near_duplicate_by_word_overlap():
+    seen = [normalize_title('Contract review assistant for small law firms')]
+    assert is_near_duplicate('Assistant for contract review in small law firms', seen)
+
+
+def test_distinct_titles_are_kept():
+    seen = [normalize_title('Contract review assistant'), normalize_title('Farm yield forecaster')]
+    assert not is_near_duplicate('Personal fitness coach', seen)
+    assert not is_near_duplicate('Anything', [])
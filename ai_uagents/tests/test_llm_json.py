@@ -0,0 +1,23 @@
+"""Tests for JSON extraction from LLM completions"""
+
+import json
+
+from llm_json import clean_llm_json
+
+
+def test_extracts_outermost_object_from_prose():
+    response = 'Sure! Here is the plan:\n```json\n{"ideas": [{"title": "A"}], "meta": {"n": 1}}\n```\nGood luck.'
+
+    assert json.loads(clean_llm_json(response)) == {"ideas": [{"title": "A"}], "meta": {"n": 1}}
+
+
+def test_strips_control_characters():
+    response = '{"title": "Line\x00one\x1f", "note": "ok\x85"}'
+
+    assert json.loads(clean_llm_json(response)) == {"title": "Lineone", "note": "ok"}
+
+
+def test_passes_through_text_without_an_object():
+    assert clean_llm_json('no json here') == 'no json here'
+    assert clean_llm_json('} backwards {') == '} backwards {'
+    assert clean_llm_json(None) == ''
@@ -0,0 +1,81 @@
+"""Tests for the priority-aware LLM request scheduler"""
+
+import asyncio
+
+from llm_scheduler import LLMScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BATCH
+
+
+async def grant_order(scheduler: LLMScheduler, requests):
+    """Hold the only slot, queue the requests, then release and record the order they run in"""
+    order = []
+
+    async def worker(name, priority, flow):
+        async with scheduler.slot(priority, flow):
+            order.append(name)
+
+    await scheduler.acquire()
+    tasks = [asyncio.create_task(worker(name, priority, flow)) for name, priority, flow in requests]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_higher_priority_served_first():
+    scheduler = LLMScheduler(max_in_flight=1, starvation_limit=100)
+    order = asyncio.run(grant_order(scheduler, [
+        ('batch', PRIORITY_BATCH, None),
+        ('background', PRIORITY_BACKGROUND, None),
+        ('interactive', PRIORITY_INTERACTIVE, None)
+    ]))
+
+    assert order == ['interactive', 'background', 'batch']
+
+
+def test_flows_round_robin_within_a_class():
+    scheduler = LLMScheduler(max_in_flight=1)
+    order = asyncio.run(grant_order(scheduler, [
+        ('a1', PRIORITY_BATCH, 'a'),
+        ('a2', PRIORITY_BATCH, 'a'),
+        ('a3', PRIORITY_BATCH, 'a'),
+        ('b1', PRIORITY_BATCH, 'b')
+    ]))
+
+    assert order == ['a1', 'b1', 'a2', 'a3']
+
+
+def test_starvation_limit_lets_lower_class_through():
+    scheduler = LLMScheduler(max_in_flight=1, starvation_limit=2)
+    requests = [(f"i{index}", PRIORITY_INTERACTIVE, f"flow{index}") for index in range(4)]
+    order = asyncio.run(grant_order(scheduler, [('batch', PRIORITY_BATCH, None)] + requests))
+
+    assert order.index('batch') == 2
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=1)
+        await scheduler.acquire()
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release()
+        return scheduler.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot['in_flight'] == 0
+    assert snapshot['queued'] == 0
+
+
+def test_snapshot_counts_grants():
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=2)
+        async with scheduler.slot(PRIORITY_BACKGROUND):
+            in_flight = scheduler.snapshot()['in_flight']
+        return in_flight, scheduler.snapshot()
+
+    in_flight, snapshot = asyncio.run(scenario())
+    assert in_flight == 1
+    assert snapshot['in_flight'] == 0
+    assert snapshot['classes']['background']['granted'] == 1
@@ -0,0 +1,60 @@
+"""Tests for compiled prompt templates"""
+
+import pytest
+
+from prompt_templates import PromptRegistry, PromptTemplate
+
+
+def test_render_fills_slots_and_keeps_prefix_static():
+    template = PromptTemplate('idea', '  You are an analyst.  ', 'Idea: {title}\nDetails: {description}')
+    first = template.render(title='Bolt', description='fast')
+    second = template.render(title='Other', description=3)
+
+    assert first.prefix == second.prefix == 'You are an analyst.'
+    assert first.prefix_id == second.prefix_id
+    assert first.text == 'Idea: Bolt\nDetails: fast'
+    assert second.text == 'Idea: Other\nDetails: 3'
+    assert first.full_text() == 'You are an analyst.\n\nIdea: Bolt\nDetails: fast'
+
+
+def test_escaped_braces_stay_literal():
+    template = PromptTemplate('json', 'prefix', 'Return {{"title": "{title}"}}')
+    assert template.slots == {'title'}
+    assert template.render(title='x').text == 'Return {"title": "x"}'
+
+
+def test_slot_values_are_not_formatted_again():
+    template = PromptTemplate('raw', 'prefix', 'Input: {user_input}')
+    assert template.render(user_input='{not_a_slot}').text == 'Input: {not_a_slot}'
+
+
+def test_missing_slot_raises():
+    template = PromptTemplate('idea', 'prefix', '{title} {description}')
+    with pytest.raises(KeyError, match='description'):
+        template.render(title='x')
+
+
+@pytest.mark.parametrize('body', ['{idea[title]}', '{count:>5}', '{title!r}', '{0}'])
+def test_unsupported_slots_are_rejected(body):
+    with pytest.raises(ValueError):
+        PromptTemplate('bad', 'prefix', body)
+
+
+def test_prefix_id_changes_with_prefix():
+    assert PromptTemplate('a', 'one', '{x}').prefix_id != PromptTemplate('a', 'two', '{x}').prefix_id
+
+
+def test_registry_counts_renders():
+    registry = PromptRegistry()
+    registry.register('idea', 'prefix', '{title}')
+    registry.register('unused', 'other prefix', 'static')
+    registry.render('idea', title='a')
+    registry.render('idea', title='b')
+
+    snapshot = registry.snapshot()
+    assert snapshot['idea']['renders'] == 2
+    assert snapshot['idea']['slots'] == ['title']
+    assert snapshot['idea']['prefix_chars'] == len('prefix')
+    assert snapshot['unused']['renders'] == 0
+    with pytest.raises(KeyError):
+        registry.render('missing')
@@ -0,0 +1,84 @@
+"""Tests for the Monte Carlo revenue projection engine"""
+
+import pytest
+
+from revenue_model import (
+    MAX_MONTHLY_PRICE, RevenueProjectionEngine, extract_assumptions, projection_seed, stated_monthly_prices
+)
+
+
+@pytest.mark.parametrize('text, prices', [
+    ('$29/month per seat', [29.0]),
+    ('$1,200 per year', [100.0]),
+    ('plans at $99/month; $5k/year for enterprise', [99.0, pytest.approx(416.67, abs=0.01)]),
+    ('$49 per user per month, targeting $20k mrr', [49.0]),
+])
+def test_stated_prices_are_monthly(text, prices):
+    assert stated_monthly_prices(text) == prices
+
+
+@pytest.mark.parametrize('text', [
+    '$20k mrr within a year',
+    '$100k in annual recurring revenue',
+    'annual revenue of $50k',
+    'we plan to raise $500k',
+    '$1 million in sales',
+    '$2.5m arr',
+])
+def test_revenue_targets_and_funding_are_not_prices(text):
+    assert stated_monthly_prices(text) == []
+
+
+def test_amounts_above_a_per_seat_price_are_ignored():
+    assert stated_monthly_prices(f"${MAX_MONTHLY_PRICE + 1}/month") == []
+    assert stated_monthly_prices('$30k') == []
+
+
+def test_assumptions_from_idea_and_product():
+    assumptions = extract_assumptions(
+        {'title': 'Compliance copilot for SMBs', 'description': 'Freemium plan, $60/month for teams'},
+        {'go_to_market': {'channels': ['seo', 'partners', 'events']}}
+    )
+    assert assumptions['segment'] == 'business'
+    assert assumptions['pricing'] == 'freemium'
+    assert assumptions['price_stated'] is True
+    assert assumptions['channels'] == 3
+    assert assumptions['ranges']['monthly_price'] == pytest.approx((42.0, 60.0, 78.0))
+
+
+def test_assumptions_default_without_stated_price():
+    assumptions = extract_assumptions({'title': 'Habit tracker', 'description': 'Helps people build habits'})
+    assert assumptions['segment'] == 'consumer'
+    assert assumptions['pricing'] == 'trial'
+    assert assumptions['price_stated'] is False
+    assert assumptions['channels'] == 1
+
+
+def test_projection_is_deterministic_for_the_same_inputs():
+    idea = {'title': 'Habit tracker', 'description': '$9/month'}
+    engine = RevenueProjectionEngine(runs=500, months=6)
+    first = engine.project(idea)
+    second = engine.project(idea)
+
+    assert first['seed'] == second['seed'] == projection_seed(idea, None)
+    assert first['percentiles'] == second['percentiles']
+    assert engine.project(idea, seed=first['seed'] + 1)['percentiles'] != first['percentiles']
+    assert engine.projections == 3
+
+
+def test_projection_shape_and_ordering():
+    projection = RevenueProjectionEngine(runs=1000, months=12).project(
+        {'title': 'Team wiki', 'description': 'For teams, $20/month per seat'}
+    )
+    percentiles = projection['percentiles']
+    assert percentiles['p10'] <= percentiles['p25'] <= percentiles['p50'] <= percentiles['p75'] <= percentiles['p90']
+    assert projection['minimum'] == percentiles['p10']
+    assert projection['maximum'] == percentiles['p90']
+    assert len(projection['monthly_revenue_p50']) == 12
+    assert projection['confidence_level'] in ('high', 'medium', 'low')
+    assert projection['runs'] == 1000
+
+
+def test_engine_enforces_minimum_runs_and_months():
+    engine = RevenueProjectionEngine(runs=1, months=0)
+    assert (engine.runs, engine.months) == (100, 1)
@@ -0,0 +1,52 @@
+"""Tests for adaptive max_tokens sizing"""
+
+from token_budget import AdaptiveTokenBudget
+
+
+def test_uses_call_site_value_until_enough_samples():
+    budget = AdaptiveTokenBudget(min_samples=3)
+    budget.observe('/ideas', 100, 1000, False)
+    budget.observe('/ideas', 100, 1000, False)
+
+    assert budget.suggest('/ideas', 1000) == 1000
+    assert budget.suggest('/other', 700) == 700
+
+
+def test_sizes_from_p95_with_headroom_rounded_to_64():
+    budget = AdaptiveTokenBudget(min_samples=3, headroom=1.3, floor=64)
+    for tokens in (200, 300, 400):
+        budget.observe('/ideas', tokens, 2000, False)
+
+    # p95 of [200, 300, 400] is 400; 400 * 1.3 = 520 rounds up to 576
+    assert budget.suggest('/ideas', 2000) == 576
+
+
+def test_truncation_raises_demand():
+    budget = AdaptiveTokenBudget(min_samples=1, truncation_boost=1.5, floor=64)
+    budget.observe('/ideas', 512, 512, True)
+
+    # A truncated completion counts as 1.5x the grant: 768 * 1.3 = 998.4 -> 1024
+    assert budget.suggest('/ideas', 512) == 1024
+    snapshot = budget.snapshot()['endpoints']['/ideas']
+    assert snapshot['total_truncations'] == 1
+    assert snapshot['truncation_rate'] == 1.0
+
+
+def test_floor_ceiling_and_disabled():
+    budget = AdaptiveTokenBudget(min_samples=1, floor=256, ceiling=1024)
+    budget.observe('/short', 10, 500, False)
+    budget.observe('/long', 5000, 5000, False)
+
+    assert budget.suggest('/short', 500) == 256
+    assert budget.suggest('/long', 500) == 1024
+    assert AdaptiveTokenBudget(enabled=False).suggest('/short', 777) == 777
+
+
+def test_histogram_buckets():
+    budget = AdaptiveTokenBudget()
+    budget.observe('/ideas', 100, 1000, False)
+    budget.observe('/ideas', 9000, 9000, False)
+
+    histogram = budget.snapshot()['endpoints']['/ideas']['histogram']
+    assert histogram['<=128'] == 1
+    assert histogram['>8192'] == 1
@@ -0,0 +1,69 @@
+"""Tests for token usage and cost accounting"""
+
+import usage_tracker
+from usage_tracker import UsageTracker, empty_usage_bucket, merge_usage_buckets, estimate_tokens
+
+
+def test_record_uses_reported_usage():
+    tracker = UsageTracker('ceo')
+    entry = tracker.record('/generate-ideas', {
+        'prompt_tokens': 100,
+        'completion_tokens': 40,
+        'prompt_tokens_details': {'cached_tokens': 60}
+    }, max_tokens=500, max_tokens_granted=300, truncated=True)
+
+    assert entry['total_tokens'] == 140
+    assert entry['cached_prompt_tokens'] == 60
+    assert entry['estimated_calls'] == 0
+    assert entry['max_tokens_requested'] == 500
+    assert entry['max_tokens_granted'] == 300
+    assert entry['truncations'] == 1
+
+
+def test_record_estimates_missing_usage():
+    tracker = UsageTracker('ceo')
+    entry = tracker.record('/generate-ideas', None, prompt='x' * 400, completion='y' * 80)
+
+    assert entry['estimated_calls'] == 1
+    assert entry['prompt_tokens'] == 100
+    assert entry['completion_tokens'] == 20
+    assert entry['max_tokens_granted'] == 0
+
+
+def test_stats_by_endpoint_and_workflow():
+    tracker = UsageTracker('cmo')
+    tracker.record('/strategy', {'prompt_tokens': 10, 'completion_tokens': 5}, workflow_id='wf-1')
+    tracker.record('/strategy', {'prompt_tokens': 20, 'completion_tokens': 5}, workflow_id='wf-2')
+    tracker.record('/campaign', None, prompt='abcd', error=True)
+
+    stats = tracker.get_stats()
+    assert stats['totals']['calls'] == 3
+    assert stats['totals']['errors'] == 1
+    assert stats['by_endpoint']['/strategy']['total_tokens'] == 40
+    assert stats['workflows_tracked'] == 2
+
+    workflow = tracker.get_stats('wf-1')
+    assert workflow['workflow_id'] == 'wf-1'
+    assert workflow['totals']['total_tokens'] == 15
+    assert tracker.get_stats('unknown')['totals'] == empty_usage_bucket()
+
+
+def test_workflow_buckets_are_bounded(monkeypatch):
+    monkeypatch.setattr(usage_tracker, 'MAX_TRACKED_WORKFLOWS', 2)
+    tracker = UsageTracker('cto')
+    for workflow_id in ('a', 'b', 'c'):
+        tracker.record('/architecture', {'prompt_tokens': 1}, workflow_id=workflow_id)
+
+    assert tracker.get_stats()['workflows_tracked'] == 2
+    assert tracker.get_stats('a')['totals']['calls'] == 0
+    assert tracker.get_stats('c')['totals']['calls'] == 1
+
+
+def test_merge_skips_non_counters():
+    target = empty_usage_bucket()
+    merge_usage_buckets(target, {'calls': 2, 'cost_usd': 0.5, 'name': 'ceo', 'flag': True})
+
+    assert target['calls'] == 2
+    assert target['cost_usd'] == 0.5
+    assert 'name' not in target and 'flag' not in target
+    assert estimate_tokens('') == 1
@@ -0,0 +1,71 @@
+"""Tests for the wire codecs"""
+
+import pytest
+
+import wire_codec
+from wire_codec import (
+    dumps, loads, encode, decode, compress, decompress, available_codecs, available_compressions,
+    CODEC_JSON, CODEC_MSGPACK, COMPRESSION_NONE, COMPRESSION_GZIP, COMPRESSION_ZSTD
+)
+
+PAYLOAD = {'idea': {'title': 'Café copilot', 'tags': ['ai', 'food']}, 'count': 3, 'score': 0.5, 'none': None}
+
+
+def test_dumps_is_compact_and_sortable():
+    assert dumps({'b': 1, 'a': [1, 2]}, sort_keys=True) == b'{"a":[1,2],"b":1}'
+    assert loads(dumps(PAYLOAD)) == PAYLOAD
+    assert loads(dumps(PAYLOAD).decode('utf-8')) == PAYLOAD
+
+
+def test_dumps_falls_back_for_values_orjson_rejects():
+    value = {1: 'int key', 'big': 2 ** 70}
+
+    assert loads(dumps(value)) == {'1': 'int key', 'big': 2 ** 70}
+
+
+def test_dumps_without_orjson(monkeypatch):
+    monkeypatch.setattr(wire_codec, 'orjson', None)
+
+    assert dumps({'b': 'é', 'a': 1}, sort_keys=True) == '{"a":1,"b":"é"}'.encode('utf-8')
+    assert loads(b'{"a":1}') == {'a': 1}
+
+
+@pytest.mark.parametrize('compression', [COMPRESSION_GZIP, COMPRESSION_ZSTD])
+def test_compression_round_trips(compression):
+    if compression not in available_compressions():
+        pytest.skip(f"{compression} not installed")
+    data = dumps(PAYLOAD) * 50
+
+    assert decompress(compress(data, compression), compression) == data
+
+
+def test_encode_skips_compression_for_small_bodies():
+    body, compression = encode(PAYLOAD, compression=COMPRESSION_GZIP, min_bytes=10 ** 6)
+
+    assert compression == COMPRESSION_NONE
+    assert decode(body) == PAYLOAD
+
+
+def test_encode_compresses_large_bodies():
+    value = {'items': [PAYLOAD] * 200}
+    body, compression = encode(value, compression=COMPRESSION_GZIP, min_bytes=1024)
+
+    assert compression == COMPRESSION_GZIP
+    assert len(body) < len(dumps(value))
+    assert decode(body, compression=compression) == value
+
+
+def test_unknown_compression_is_sent_uncompressed():
+    body, compression = encode(PAYLOAD, compression='brotli', min_bytes=0)
+
+    assert compression == COMPRESSION_NONE
+    assert decode(body) == PAYLOAD
+
+
+def test_msgpack_round_trips_when_installed():
+    if CODEC_MSGPACK not in available_codecs():
+        pytest.skip("msgpack not installed")
+    body, _ = encode(PAYLOAD, codec=CODEC_MSGPACK)
+
+    assert decode(body, codec=CODEC_MSGPACK) == PAYLOAD
+    assert available_codecs()[0] == CODEC_JSON
@@ -0,0 +1,64 @@
+"""Tests for the workflow progress event bus"""
+
+import asyncio
+import json
+
+from workflow_events import WorkflowEventBus, format_sse, WORKFLOW_STARTED, STEP_COMPLETED, WORKFLOW_COMPLETED
+
+
+def test_history_replays_after_an_event_id():
+    bus = WorkflowEventBus()
+    bus.publish('wf', WORKFLOW_STARTED)
+    bus.publish('wf', STEP_COMPLETED, step='ideas', payload={'ideas': 3}, duration_seconds=1.2)
+    bus.publish('wf', WORKFLOW_COMPLETED)
+
+    events = bus.history('wf', after_id=1)
+    assert [event['id'] for event in events] == [2, 3]
+    assert events[0]['step'] == 'ideas'
+    assert events[0]['duration_seconds'] == 1.2
+    assert bus.history('missing') == []
+
+
+def test_resume_resets_history_but_keeps_ids_increasing():
+    bus = WorkflowEventBus()
+    bus.publish('wf', WORKFLOW_STARTED)
+    bus.publish('wf', STEP_COMPLETED, step='ideas')
+    event = bus.publish('wf', WORKFLOW_STARTED)
+
+    assert event['id'] == 3
+    assert [event['id'] for event in bus.history('wf')] == [3]
+
+
+def test_history_is_bounded_by_least_recently_published():
+    bus = WorkflowEventBus(max_workflows=2)
+    bus.publish('a', WORKFLOW_STARTED)
+    bus.publish('b', WORKFLOW_STARTED)
+    bus.publish('a', STEP_COMPLETED)
+    bus.publish('c', WORKFLOW_STARTED)
+
+    assert bus.history('b') == []
+    assert len(bus.history('a')) == 2
+
+
+def test_subscribers_receive_live_events():
+    async def scenario():
+        bus = WorkflowEventBus()
+        queue = bus.subscribe('wf')
+        bus.publish('wf', STEP_COMPLETED, step='cto')
+        bus.publish('other', STEP_COMPLETED)
+        event = await asyncio.wait_for(queue.get(), timeout=1)
+        bus.unsubscribe('wf', queue)
+        bus.publish('wf', WORKFLOW_COMPLETED)
+        return event, queue.qsize()
+
+    event, remaining = asyncio.run(scenario())
+    assert event['step'] == 'cto'
+    assert remaining == 0
+
+
+def test_format_sse():
+    event = {'id': 7, 'type': STEP_COMPLETED, 'workflow_id': 'wf'}
+    lines = format_sse(event).decode().split('\n')
+
+    assert lines[:2] == ['id: 7', f'event: {STEP_COMPLETED}']
+    assert json.loads(lines[2][len('data: '):]) == event
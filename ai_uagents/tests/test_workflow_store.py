@@ -0,0 +1,161 @@
+"""Tests for the SQLite workflow checkpoint store"""
+
+import pytest
+
+import workflow_store
+from workflow_store import WorkflowStore, hash_step_input, STEP_COMPLETED, STEP_DEGRADED, STEP_FAILED, STEP_RUNNING
+
+
+@pytest.fixture
+def store(tmp_path):
+    return WorkflowStore(str(tmp_path / 'workflows.db'))
+
+
+def test_only_completed_steps_are_checkpoints(store):
+    store.create_workflow('wf', 'AI for bakeries', idea_count=2)
+    store.save_step('wf', 'ideas', {'ideas': [1, 2]}, input_hash='h-ideas', duration=1.5)
+    store.save_step('wf', 'research', {'summary': 'fallback'}, status=STEP_DEGRADED)
+    store.mark_step_running('wf', 'product')
+    store.fail_step('wf', 'cmo', 'timeout')
+
+    assert store.get_step_checkpoints('wf') == {'ideas': {'output': {'ideas': [1, 2]}, 'input_hash': 'h-ideas'}}
+
+    workflow = store.get_workflow('wf', include_outputs=True)
+    assert workflow['idea_count'] == 2
+    assert workflow['has_result'] is False
+    assert workflow['steps']['ideas']['output'] == {'ideas': [1, 2]}
+    assert workflow['steps']['research']['status'] == STEP_DEGRADED
+    assert workflow['steps']['product']['status'] == STEP_RUNNING
+    assert workflow['steps']['cmo'] == {
+        'status': STEP_FAILED, 'error': 'timeout', 'duration_seconds': None, 'attempts': 1,
+        'updated_at': workflow['steps']['cmo']['updated_at']
+    }
+
+
+def test_rerunning_a_step_counts_attempts_and_clears_output(store):
+    store.create_workflow('wf', 'idea')
+    store.save_step('wf', 'cto', {'stack': 'old'})
+    store.mark_step_running('wf', 'cto')
+
+    step = store.get_workflow('wf', include_outputs=True)['steps']['cto']
+    assert step['attempts'] == 2
+    assert 'output' not in step
+    assert store.get_step_checkpoints('wf') == {}
+
+
+def test_recreating_a_workflow_keeps_checkpoints(store):
+    store.create_workflow('wf', 'idea')
+    store.save_step('wf', 'ideas', {'ideas': []}, status=STEP_COMPLETED)
+    store.set_workflow_status('wf', 'failed', failed_step='research', error='boom')
+    store.save_result('wf', {'plan': 1})
+
+    store.create_workflow('wf', 'idea')
+    workflow = store.get_workflow('wf')
+    assert workflow['status'] == 'running'
+    assert workflow['failed_step'] is None
+    assert workflow['has_result'] is False
+    assert 'ideas' in store.get_step_checkpoints('wf')
+
+
+def test_results_step_inputs_and_listing(store):
+    store.create_workflow('a', 'first')
+    store.create_workflow('b', 'second', status='queued')
+    store.save_step_inputs('a', {'cmo': {'budget': 100}})
+    store.save_result('a', {'plan': 'done'})
+    store.set_workflow_status('a', 'completed')
+
+    assert store.get_result('a') == {'plan': 'done'}
+    assert store.get_result('b') is None
+    assert store.get_workflow('a')['step_inputs'] == {'cmo': {'budget': 100}}
+    assert [row['workflow_id'] for row in store.list_workflows(['queued', 'completed'])] == ['a', 'b']
+    assert store.get_workflow('missing') is None
+
+
+def test_hash_step_input_is_order_independent():
+    first = hash_step_input('cmo', {'idea': {'title': 'A', 'tags': [1]}, 'budget': 10})
+    second = hash_step_input('cmo', {'budget': 10, 'idea': {'tags': [1], 'title': 'A'}})
+
+    assert first == second
+    assert first != hash_step_input('cto', {'budget': 10, 'idea': {'tags': [1], 'title': 'A'}})
+
+
+def test_step_cache_ttl_hits_and_stats(store, monkeypatch):
+    store.cache_step('cmo', 'h1', {'plan': 'a'})
+    store.cache_step('cmo', 'h2', {'plan': 'b'})
+    store.cache_step('cto', 'h1', {'stack': 'c'})
+
+    assert store.get_cached_step('cmo', 'h1') == {'plan': 'a'}
+    assert store.get_cached_step('cmo', 'h1') == {'plan': 'a'}
+    assert store.get_cached_step('cmo', 'missing') is None
+    assert store.cache_stats() == {'cmo': {'entries': 2, 'hits': 2}, 'cto': {'entries': 1, 'hits': 0}}
+
+    # An hour later the entry is stale for a 60s TTL but still inside a longer one
+    now = workflow_store.time.time()
+    monkeypatch.setattr(workflow_store.time, 'time', lambda: now + 3600)
+    assert store.get_cached_step('cto', 'h1', ttl=60) is None
+    assert store.get_cached_step('cto', 'h1', ttl=7200) == {'stack': 'c'}
+
+
+def test_cache_step_drops_entries_past_the_stale_window(store, monkeypatch):
+    store.cache_step('cmo', 'old', {'plan': 'old'})
+    now = workflow_store.time.time()
+    monkeypatch.setattr(workflow_store.time, 'time', lambda: now + workflow_store.STEP_CACHE_STALE_SECONDS + 1)
+    store.cache_step('cmo', 'new', {'plan': 'new'})
+
+    assert store.cache_stats() == {'cmo': {'entries': 1, 'hits': 0}}
+    assert store.get_cached_step('cmo', 'new') == {'plan': 'new'}
+
+
+def test_pdr_outbox_lifecycle(store):
+    idea, product = {'title': 'A'}, {'product_name': 'B'}
+    assert store.enqueue_pdr('wf', idea, product, 'h1') is True
+    assert store.enqueue_pdr('wf', idea, product, 'h1') is False
+
+    due = store.due_pdrs()
+    assert [pdr['workflow_id'] for pdr in due] == ['wf']
+    assert due[0]['product'] == product
+    assert due[0]['approval_requested_at'] is None
+
+    store.update_pdr('wf', status=workflow_store.PDR_SENDING, attempts=1, pdr_id='7', approval_requested_at=123.0)
+    assert store.due_pdrs() == []
+    assert store.requeue_sending_pdrs() == 1
+
+    pdr = store.get_pdr('wf')
+    assert pdr['status'] == workflow_store.PDR_PENDING
+    assert pdr['pdr_id'] == '7'
+    assert pdr['approval_requested_at'] == 123.0
+
+    store.update_pdr('wf', status=workflow_store.PDR_DELIVERED, result={'marketing_result': {'twitter': 'ok'}})
+    assert store.get_pdr('wf')['result'] == {'marketing_result': {'twitter': 'ok'}}
+    assert store.enqueue_pdr('wf', idea, product, 'h1') is False
+
+
+def test_changed_product_requeues_a_fresh_pdr(store):
+    store.enqueue_pdr('wf', {'title': 'A'}, {'product_name': 'B'}, 'h1')
+    store.update_pdr('wf', status=workflow_store.PDR_DELIVERED, pdr_id='7', approval_requested_at=123.0)
+
+    assert store.enqueue_pdr('wf', {'title': 'A'}, {'product_name': 'C'}, 'h2') is True
+    pdr = store.get_pdr('wf')
+    assert pdr['status'] == workflow_store.PDR_PENDING
+    assert pdr['pdr_id'] is None
+    assert pdr['approval_requested_at'] is None
+    assert pdr['attempts'] == 0
+
+
+def test_batch_status_from_its_workflows(store):
+    assert store.get_batch('b') is None
+    for index in range(3):
+        store.create_workflow(f"b-{index}", f"idea {index}", status='queued', batch_id='b')
+    store.create_workflow('other', 'idea')
+    # Running an item re-registers it without its batch
+    store.create_workflow('b-0', 'idea 0')
+    store.set_workflow_status('b-0', 'completed')
+    store.set_workflow_status('b-1', 'failed')
+
+    batch = store.get_batch('b')
+    assert batch['status'] == 'running'
+    assert (batch['total'], batch['completed'], batch['failed']) == (3, 1, 1)
+    assert batch['workflow_ids'] == ['b-0', 'b-1', 'b-2']
+
+    store.set_workflow_status('b-2', 'completed')
+    assert store.get_batch('b')['status'] == 'completed'
@@ -0,0 +1,114 @@
+"""
+Adaptive max_tokens sizing for AI Company uAgents
+Learns per-endpoint completion lengths and truncation events to size requests
+"""
+
+import math
+import os
+import threading
+from collections import deque
+from typing import Dict, Any, List
+
+ADAPTIVE_MAX_TOKENS = os.getenv('ASI_ONE_ADAPTIVE_MAX_TOKENS', '1').lower() not in ('0', 'false', 'no')
+MAX_TOKENS_FLOOR = int(os.getenv('ASI_ONE_MAX_TOKENS_FLOOR', '256'))
+MAX_TOKENS_CEILING = int(os.getenv('ASI_ONE_MAX_TOKENS_CEILING', '8192'))
+
+# Completion length histogram bucket upper bounds (tokens)
+HISTOGRAM_BUCKETS = [128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 6144, 8192]
+
+
+class EndpointTokenStats:
+    """Sliding window of completion lengths for one endpoint"""
+
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)
+        self.truncated = deque(maxlen=window)
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self.total_calls = 0
+        self.total_truncations = 0
+        self.last_granted = 0
+
+    def percentile(self, pct: float) -> int:
+        """Get a percentile of the observed completion demand"""
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(math.ceil(pct / 100.0 * len(ordered))) - 1)
+        return ordered[max(index, 0)]
+
+
+class AdaptiveTokenBudget:
+    """Sizes max_tokens per endpoint from observed completion lengths"""
+
+    def __init__(self, min_samples: int = 5, headroom: float = 1.3, truncation_boost: float = 1.5,
+                 window: int = 200, floor: int = MAX_TOKENS_FLOOR, ceiling: int = MAX_TOKENS_CEILING,
+                 enabled: bool = ADAPTIVE_MAX_TOKENS):
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self.truncation_boost = truncation_boost
+        self.window = window
+        self.floor = floor
+        self.ceiling = ceiling
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointTokenStats] = {}
+
+    def suggest(self, endpoint: str, requested: int) -> int:
+        """Get the max_tokens to send for an endpoint, starting from the call-site value"""
+        if not self.enabled:
+            return requested
+
+        with self._lock:
+            stats = self._endpoints.get(endpoint or 'unknown')
+            if stats is None or len(stats.samples) < self.min_samples:
+                return requested
+            target = stats.percentile(95) * self.headroom
+
+        # Round up to a multiple of 64 so small fluctuations don't change the request
+        target = int(math.ceil(target / 64.0) * 64)
+        return max(self.floor, min(self.ceiling, target))
+
+    def observe(self, endpoint: str, completion_tokens: int, granted: int, truncated: bool):
+        """Record the outcome of a completion"""
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint or 'unknown', EndpointTokenStats(self.window))
+            # A truncated completion only tells us the demand is above what we granted
+            demand = int(max(completion_tokens, granted) * self.truncation_boost) if truncated else completion_tokens
+            stats.samples.append(demand)
+            stats.truncated.append(bool(truncated))
+            stats.histogram[self._bucket_index(completion_tokens)] += 1
+            stats.total_calls += 1
+            stats.total_truncations += 1 if truncated else 0
+            stats.last_granted = granted
+
+    def _bucket_index(self, tokens: int) -> int:
+        """Find the histogram bucket for a completion length"""
+        for index, upper in enumerate(HISTOGRAM_BUCKETS):
+            if tokens <= upper:
+                return index
+        return len(HISTOGRAM_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get histograms and current sizing per endpoint"""
+        labels: List[str] = [f"<={upper}" for upper in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}"]
+        with self._lock:
+            endpoints = {}
+            for endpoint, stats in self._endpoints.items():
+                window_truncations = sum(1 for flag in stats.truncated if flag)
+                endpoints[endpoint] = {
+                    'samples': len(stats.samples),
+                    'total_calls': stats.total_calls,
+                    'total_truncations': stats.total_truncations,
+                    'truncation_rate': round(window_truncations / len(stats.truncated), 4) if stats.truncated else 0.0,
+                    'p50_demand': stats.percentile(50),
+                    'p95_demand': stats.percentile(95),
+                    'last_granted': stats.last_granted,
+                    'histogram': dict(zip(labels, stats.histogram))
+                }
+        return {
+            'enabled': self.enabled,
+            'floor': self.floor,
+            'ceiling': self.ceiling,
+            'headroom': self.headroom,
+            'endpoints': endpoints
+        }
@@ -39,27 +39,11 @@ class TrendsAnalyzer:
                     'message': 'No data available for these keywords'
                 }
             
-            # Drop 'isPartial' column if exists
-            if 'isPartial' in interest_over_time_df.columns:
-                interest_over_time_df = interest_over_time_df.drop(columns=['isPartial'])
-            
-            # Convert to dict format
-            trends_data = {}
-            for keyword in keywords:
-                if keyword in interest_over_time_df.columns:
-                    trends_data[keyword] = {
-                        'current_value': int(interest_over_time_df[keyword].iloc[-1]),
-                        'average': float(interest_over_time_df[keyword].mean()),
-                        'max': int(interest_over_time_df[keyword].max()),
-                        'min': int(interest_over_time_df[keyword].min()),
-                        'trend': 'rising' if interest_over_time_df[keyword].iloc[-1] > interest_over_time_df[keyword].mean() else 'falling'
-                    }
-            
             return {
                 'status': 'success',
                 'keywords': keywords,
                 'timeframe': timeframe,
-                'trends': trends_data
+                'trends': self.summarize_interest(interest_over_time_df, keywords)
             }
             
         except Exception as e:
@@ -68,6 +52,39 @@ class TrendsAnalyzer:
                 'error': str(e)
             }
     
+    @staticmethod
+    def summarize_interest(interest_over_time_df: pd.DataFrame, keywords: List[str]) -> Dict:
+        """
+        Summarize an interest-over-time DataFrame per keyword
+        
+        Args:
+            interest_over_time_df: DataFrame returned by pytrends interest_over_time()
+            keywords: Keywords to summarize
+            
+        Returns:
+            Dictionary of current/average/max/min values and trend direction per keyword
+        """
+        # Drop 'isPartial' column if exists
+        if 'isPartial' in interest_over_time_df.columns:
+            interest_over_time_df = interest_over_time_df.drop(columns=['isPartial'])
+        
+        # Convert to dict format
+        trends_data = {}
+        for keyword in keywords:
+            if keyword in interest_over_time_df.columns:
+                series = interest_over_time_df[keyword]
+                current = series.iloc[-1]
+                average = float(series.mean())
+                trends_data[keyword] = {
+                    'current_value': int(current),
+                    'average': average,
+                    'max': int(series.max()),
+                    'min': int(series.min()),
+                    'trend': 'rising' if current > average else 'falling'
+                }
+        
+        return trends_data
+    
     def get_related_queries(self, keyword: str) -> Dict:
         """
         Get related queries for a keyword
@@ -34,8 +34,28 @@ class WebScraper:
         try:
             response = self.session.get(url, timeout=timeout)
             response.raise_for_status()
+            return self.parse_html(response.content, url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+        except requests.exceptions.RequestException as e:
+            return {
+                'url': url,
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def parse_html(self, html, url: str = '') -> Dict[str, any]:
+        """
+        Parse a fetched HTML page into text, metadata, headings and links
+        
+        Args:
+            html: Raw HTML (bytes or str)
+            url: URL the page was fetched from
+            
+        Returns:
+            Dictionary with scraped data
+        """
+        try:
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Remove script and style elements
             for script in soup(["script", "style"]):
@@ -77,12 +97,6 @@ class WebScraper:
                 'status': 'success'
             }
             
-        except requests.exceptions.RequestException as e:
-            return {
-                'url': url,
-                'status': 'error',
-                'error': str(e)
-            }
         except Exception as e:
             return {
                 'url': url,
@@ -0,0 +1,138 @@
+"""
+Token usage and cost accounting for AI Company uAgents
+Aggregates ASI:One usage per agent, per endpoint and per workflow ID
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Price per 1K tokens in USD, configurable because ASI:One pricing varies by plan
+PROMPT_COST_PER_1K = float(os.getenv('ASI_ONE_PROMPT_COST_PER_1K', '0.0'))
+COMPLETION_COST_PER_1K = float(os.getenv('ASI_ONE_COMPLETION_COST_PER_1K', '0.0'))
+
+# Keep per-workflow buckets bounded so long-running agents don't grow forever
+MAX_TRACKED_WORKFLOWS = int(os.getenv('USAGE_MAX_TRACKED_WORKFLOWS', '500'))
+
+
+def empty_usage_bucket() -> Dict[str, Any]:
+    """Create an empty usage aggregation bucket"""
+    return {
+        'calls': 0,
+        'errors': 0,
+        'prompt_tokens': 0,
+        'cached_prompt_tokens': 0,
+        'completion_tokens': 0,
+        'total_tokens': 0,
+        'estimated_calls': 0,
+        'max_tokens_requested': 0,
+        'max_tokens_granted': 0,
+        'truncations': 0,
+        'latency_seconds': 0.0,
+        'cost_usd': 0.0
+    }
+
+
+def merge_usage_buckets(target: Dict[str, Any], source: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the counters of one usage bucket into another"""
+    for key, value in source.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            target[key] = target.get(key, 0) + value
+    return target
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate used when the API response has no usage block"""
+    return max(1, len(text or '') // 4)
+
+
+class UsageTracker:
+    """Thread-safe token and cost aggregation for one agent"""
+
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._totals = empty_usage_bucket()
+        self._by_endpoint: Dict[str, Dict[str, Any]] = {}
+        self._by_workflow: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def record(self, endpoint: str, usage: Optional[Dict[str, Any]], prompt: str = '',
+               completion: str = '', max_tokens: int = 0, latency: float = 0.0,
+               workflow_id: Optional[str] = None, error: bool = False,
+               max_tokens_granted: int = None, truncated: bool = False) -> Dict[str, Any]:
+        """Record one ASI:One call and return the normalized usage entry"""
+        estimated = not usage
+        usage = usage or {}
+        prompt_tokens = int(usage.get('prompt_tokens') or (estimate_tokens(prompt) if estimated else 0))
+        completion_tokens = int(usage.get('completion_tokens') or (estimate_tokens(completion) if estimated and completion else 0))
+        total_tokens = int(usage.get('total_tokens') or prompt_tokens + completion_tokens)
+        # Prompt tokens the provider served from its prefix cache, when it reports them
+        cached_prompt_tokens = int((usage.get('prompt_tokens_details') or {}).get('cached_tokens') or 0)
+        cost = (prompt_tokens / 1000.0) * PROMPT_COST_PER_1K + (completion_tokens / 1000.0) * COMPLETION_COST_PER_1K
+
+        entry = {
+            'calls': 1,
+            'errors': 1 if error else 0,
+            'prompt_tokens': prompt_tokens,
+            'cached_prompt_tokens': cached_prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': total_tokens,
+            'estimated_calls': 1 if estimated else 0,
+            'max_tokens_requested': int(max_tokens or 0),
+            'max_tokens_granted': int(max_tokens_granted if max_tokens_granted is not None else max_tokens or 0),
+            'truncations': 1 if truncated else 0,
+            'latency_seconds': round(latency, 4),
+            'cost_usd': cost
+        }
+
+        endpoint = endpoint or 'unknown'
+        with self._lock:
+            merge_usage_buckets(self._totals, entry)
+            merge_usage_buckets(self._by_endpoint.setdefault(endpoint, empty_usage_bucket()), entry)
+
+            if workflow_id:
+                workflow_bucket = self._by_workflow.get(workflow_id)
+                if workflow_bucket is None:
+                    workflow_bucket = {'totals': empty_usage_bucket(), 'by_endpoint': {}}
+                    self._by_workflow[workflow_id] = workflow_bucket
+                    while len(self._by_workflow) > MAX_TRACKED_WORKFLOWS:
+                        self._by_workflow.popitem(last=False)
+                merge_usage_buckets(workflow_bucket['totals'], entry)
+                merge_usage_buckets(workflow_bucket['by_endpoint'].setdefault(endpoint, empty_usage_bucket()), entry)
+
+        return entry
+
+    def get_workflow_stats(self, workflow_id: str) -> Dict[str, Any]:
+        """Get usage for a single workflow"""
+        with self._lock:
+            bucket = self._by_workflow.get(workflow_id)
+            if bucket is None:
+                return {'totals': empty_usage_bucket(), 'by_endpoint': {}}
+            return {
+                'totals': dict(bucket['totals']),
+                'by_endpoint': {name: dict(stats) for name, stats in bucket['by_endpoint'].items()}
+            }
+
+    def get_stats(self, workflow_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get aggregated usage, optionally restricted to one workflow"""
+        if workflow_id:
+            stats = self.get_workflow_stats(workflow_id)
+            stats['agent'] = self.agent_name
+            stats['workflow_id'] = workflow_id
+            return stats
+
+        with self._lock:
+            return {
+                'agent': self.agent_name,
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'totals': dict(self._totals),
+                'by_endpoint': {name: dict(stats) for name, stats in self._by_endpoint.items()},
+                'workflows_tracked': len(self._by_workflow),
+                'pricing': {
+                    'prompt_cost_per_1k': PROMPT_COST_PER_1K,
+                    'completion_cost_per_1k': COMPLETION_COST_PER_1K
+                }
+            }
@@ -0,0 +1,104 @@
+"""
+Wire codecs for AI Company agents
+Compact JSON (orjson when installed), optional msgpack and gzip/zstd compression for large bodies
+"""
+
+import gzip
+import json
+import os
+from typing import Any, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Codecs and compressions understood by encode/decode
+CODEC_JSON = 'json'
+CODEC_MSGPACK = 'msgpack'
+COMPRESSION_NONE = 'none'
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_ZSTD = 'zstd'
+
+# Bodies below this size are not worth compressing
+WIRE_COMPRESS_MIN_BYTES = int(os.getenv('WIRE_COMPRESS_MIN_BYTES', '4096'))
+GZIP_LEVEL = int(os.getenv('WIRE_GZIP_LEVEL', '5'))
+ZSTD_LEVEL = int(os.getenv('WIRE_ZSTD_LEVEL', '3'))
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+def dumps(value: Any, sort_keys: bool = False) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+        except TypeError:
+            # orjson rejects non-str keys and integers beyond 64 bits; the stdlib handles both
+            pass
+    return json.dumps(value, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads(data: bytes) -> Any:
+    """Parse JSON bytes or text"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def available_codecs() -> List[str]:
+    """Codecs usable in this process"""
+    return [CODEC_JSON] + ([CODEC_MSGPACK] if msgpack is not None else [])
+
+
+def available_compressions() -> List[str]:
+    """Compressions usable in this process"""
+    return [COMPRESSION_NONE, COMPRESSION_GZIP] + ([COMPRESSION_ZSTD] if zstandard is not None else [])
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    """Compress bytes with the given method"""
+    if compression == COMPRESSION_GZIP:
+        return gzip.compress(data, compresslevel=GZIP_LEVEL)
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    """Decompress bytes produced by compress"""
+    if compression == COMPRESSION_GZIP:
+        return gzip.decompress(data)
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def encode(value: Any, codec: str = CODEC_JSON, compression: str = COMPRESSION_NONE,
+           min_bytes: int = WIRE_COMPRESS_MIN_BYTES, sort_keys: bool = False) -> Tuple[bytes, str]:
+    """Serialize a value and compress it if large enough; returns the body and the compression applied"""
+    if codec == CODEC_MSGPACK and msgpack is not None:
+        data = msgpack.packb(value, use_bin_type=True)
+    else:
+        data = dumps(value, sort_keys=sort_keys)
+    if compression not in available_compressions() or compression == COMPRESSION_NONE or len(data) < min_bytes:
+        return data, COMPRESSION_NONE
+    return compress(data, compression), compression
+
+
+def decode(data: bytes, codec: str = CODEC_JSON, compression: str = COMPRESSION_NONE) -> Any:
+    """Decompress and parse a body produced by encode"""
+    data = decompress(data, compression)
+    if codec == CODEC_MSGPACK:
+        return msgpack.unpackb(data, raw=False)
+    return loads(data)
@@ -0,0 +1,169 @@
+"""
+Workflow progress events for the AI Company orchestrator
+In-process event bus plus a small aiohttp server that streams events as server-sent events
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from aiohttp import web
+
+ORCHESTRATOR_STREAM_PORT = int(os.getenv('ORCHESTRATOR_STREAM_PORT', '8010'))
+# Workflows whose event history is kept for late subscribers
+WORKFLOW_EVENT_HISTORY = int(os.getenv('WORKFLOW_EVENT_HISTORY', '200'))
+SSE_HEARTBEAT_SECONDS = 15
+
+# Event types
+WORKFLOW_STARTED = 'workflow_started'
+WORKFLOW_COMPLETED = 'workflow_completed'
+WORKFLOW_FAILED = 'workflow_failed'
+STEP_STARTED = 'step_started'
+STEP_COMPLETED = 'step_completed'
+STEP_FAILED = 'step_failed'
+STEP_PARTIAL = 'step_partial'
+BATCH_STARTED = 'batch_started'
+BATCH_ITEM_COMPLETED = 'batch_item_completed'
+BATCH_ITEM_FAILED = 'batch_item_failed'
+BATCH_COMPLETED = 'batch_completed'
+
+TERMINAL_EVENTS = (WORKFLOW_COMPLETED, WORKFLOW_FAILED, BATCH_COMPLETED)
+
+
+class WorkflowEventBus:
+    """Publishes workflow events to live subscribers and keeps a replayable history"""
+
+    def __init__(self, max_workflows: int = WORKFLOW_EVENT_HISTORY):
+        self.max_workflows = max_workflows
+        self._history: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def publish(self, workflow_id: str, event_type: str, step: str = None, payload: Any = None,
+                **extra) -> Dict[str, Any]:
+        """Record an event and deliver it to every subscriber of the workflow"""
+        history = self._history.get(workflow_id)
+        if history is None:
+            history = {'last_id': 0, 'events': []}
+            self._history[workflow_id] = history
+            while len(self._history) > self.max_workflows:
+                self._history.popitem(last=False)
+        else:
+            # Long-running streams such as batches stay in history while they keep publishing
+            self._history.move_to_end(workflow_id)
+            if event_type == WORKFLOW_STARTED:
+                # A resumed run replaces the replay history but keeps event IDs increasing
+                history['events'] = []
+
+        history['last_id'] += 1
+        event = {
+            'id': history['last_id'],
+            'type': event_type,
+            'workflow_id': workflow_id,
+            'step': step,
+            'timestamp': time.time(),
+            'payload': payload
+        }
+        event.update(extra)
+        history['events'].append(event)
+
+        for queue in self._subscribers.get(workflow_id, []):
+            queue.put_nowait(event)
+        return event
+
+    def history(self, workflow_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """Get recorded events for a workflow after a given event ID"""
+        history = self._history.get(workflow_id)
+        if history is None:
+            return []
+        return [event for event in history['events'] if event['id'] > after_id]
+
+    def subscribe(self, workflow_id: str) -> asyncio.Queue:
+        """Register a subscriber queue for live events"""
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(workflow_id, []).append(queue)
+        return queue
+
+    def unsubscribe(self, workflow_id: str, queue: asyncio.Queue):
+        """Remove a subscriber queue"""
+        queues = self._subscribers.get(workflow_id, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self._subscribers.pop(workflow_id, None)
+
+
+def format_sse(event: Dict[str, Any]) -> bytes:
+    """Encode one event in server-sent events wire format"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+class WorkflowEventServer:
+    """aiohttp side server exposing GET /workflow-events/{workflow_id} (or a batch ID) as an SSE stream"""
+
+    def __init__(self, event_bus: WorkflowEventBus, port: int = ORCHESTRATOR_STREAM_PORT):
+        self.event_bus = event_bus
+        self.port = port
+        self.runner: Optional[web.AppRunner] = None
+
+    def create_app(self) -> web.Application:
+        """Create the aiohttp application"""
+        app = web.Application()
+        app.router.add_get('/workflow-events/{workflow_id}', self.handle_workflow_events)
+        return app
+
+    async def start(self):
+        """Start serving on the running event loop"""
+        self.runner = web.AppRunner(self.create_app())
+        await self.runner.setup()
+        await web.TCPSite(self.runner, '0.0.0.0', self.port).start()
+        print(f"📡 Workflow event stream listening on http://localhost:{self.port}/workflow-events/<workflow_id>")
+
+    async def stop(self):
+        """Stop the server"""
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def handle_workflow_events(self, request: web.Request) -> web.StreamResponse:
+        """Replay past events for a workflow, then stream new ones until it finishes"""
+        workflow_id = request.match_info['workflow_id']
+        try:
+            after_id = int(request.headers.get('Last-Event-ID') or request.query.get('after', 0))
+        except ValueError:
+            after_id = 0
+
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'Access-Control-Allow-Origin': '*'
+        })
+        await response.prepare(request)
+
+        # Subscribe before replaying so no event falls between history and live delivery
+        queue = self.event_bus.subscribe(workflow_id)
+        try:
+            last_id = after_id
+            for event in self.event_bus.history(workflow_id, after_id):
+                await response.write(format_sse(event))
+                last_id = event['id']
+                if event['type'] in TERMINAL_EVENTS:
+                    return response
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    await response.write(b": keep-alive\n\n")
+                    continue
+                if event['id'] <= last_id:
+                    continue
+                await response.write(format_sse(event))
+                last_id = event['id']
+                if event['type'] in TERMINAL_EVENTS:
+                    return response
+        except ConnectionResetError:
+            return response
+        finally:
+            self.event_bus.unsubscribe(workflow_id, queue)
@@ -0,0 +1,379 @@
+"""
+Workflow checkpoint store for the AI Company orchestrator
+Persists each workflow step's output in SQLite so failed workflows can resume
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+WORKFLOW_STORE_PATH = os.getenv(
+    'WORKFLOW_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'workflow_store.db')
+)
+
+# How long cached step outputs can be served to other workflows
+STEP_CACHE_TTL_SECONDS = int(os.getenv('STEP_CACHE_TTL_SECONDS', '86400'))
+# Older entries are kept this long as a last resort for steps that run out of deadline budget
+STEP_CACHE_STALE_SECONDS = max(STEP_CACHE_TTL_SECONDS, int(os.getenv('STEP_CACHE_STALE_SECONDS', '604800')))
+
+# PDR outbox statuses
+PDR_PENDING = 'pending'
+PDR_SENDING = 'sending'
+PDR_DELIVERED = 'delivered'
+PDR_FAILED = 'failed'
+
+# Step statuses
+STEP_RUNNING = 'running'
+STEP_COMPLETED = 'completed'
+STEP_DEGRADED = 'degraded'
+STEP_FAILED = 'failed'
+
+
+class WorkflowStore:
+    """SQLite-backed store of workflow inputs, status and per-step outputs"""
+
+    def __init__(self, path: str = WORKFLOW_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS workflows (
+                workflow_id TEXT PRIMARY KEY,
+                user_input TEXT NOT NULL,
+                idea_count INTEGER NOT NULL DEFAULT 3,
+                status TEXT NOT NULL,
+                failed_step TEXT,
+                error TEXT,
+                result TEXT,
+                step_inputs TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS workflow_steps (
+                workflow_id TEXT NOT NULL,
+                step TEXT NOT NULL,
+                status TEXT NOT NULL,
+                output TEXT,
+                error TEXT,
+                duration_seconds REAL,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                input_hash TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (workflow_id, step)
+            );
+            CREATE TABLE IF NOT EXISTS step_cache (
+                step TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                output TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (step, input_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_step_cache_created_at ON step_cache (created_at);
+            CREATE TABLE IF NOT EXISTS pdr_outbox (
+                workflow_id TEXT PRIMARY KEY,
+                idea TEXT NOT NULL,
+                product TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                pdr_id TEXT,
+                approval_requested_at REAL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_pdr_outbox_due ON pdr_outbox (status, next_attempt_at);
+        """)
+        # Stores created by older versions lack the newer columns
+        self._add_missing_columns('workflows', {'result': 'TEXT', 'step_inputs': 'TEXT', 'batch_id': 'TEXT'})
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_workflows_batch_id ON workflows (batch_id)')
+        self._add_missing_columns('workflow_steps', {'input_hash': 'TEXT'})
+        self._add_missing_columns('pdr_outbox', {'approval_requested_at': 'REAL'})
+        self._conn.commit()
+
+    def _add_missing_columns(self, table: str, columns: Dict[str, str]):
+        """Add columns that an existing table is missing"""
+        existing = [row['name'] for row in self._conn.execute(f'PRAGMA table_info({table})')]
+        for name, column_type in columns.items():
+            if name not in existing:
+                self._conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
+
+    def create_workflow(self, workflow_id: str, user_input: str, idea_count: int = 3, status: str = 'running',
+                        batch_id: str = None):
+        """Register a workflow, keeping existing checkpoints (and its batch) if it already exists"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO workflows (workflow_id, user_input, idea_count, status, batch_id, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(workflow_id) DO UPDATE SET status = excluded.status, failed_step = NULL, result = NULL,
+                   error = NULL, batch_id = COALESCE(excluded.batch_id, workflows.batch_id),
+                   updated_at = excluded.updated_at""",
+                (workflow_id, user_input, idea_count, status, batch_id, now, now)
+            )
+            self._conn.commit()
+
+    def set_workflow_status(self, workflow_id: str, status: str, failed_step: str = None, error: str = None):
+        """Update the overall workflow status"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workflows SET status = ?, failed_step = ?, error = ?, updated_at = ? WHERE workflow_id = ?",
+                (status, failed_step, error, time.time(), workflow_id)
+            )
+            self._conn.commit()
+
+    def save_step(self, workflow_id: str, step: str, output: Any, status: str = STEP_COMPLETED,
+                  error: str = None, duration: float = None, input_hash: str = None):
+        """Checkpoint one step's output together with the hash of the input that produced it"""
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO workflow_steps (workflow_id, step, status, output, error, duration_seconds,
+                   input_hash, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(workflow_id, step) DO UPDATE SET status = excluded.status,
+                   output = excluded.output, error = excluded.error,
+                   duration_seconds = excluded.duration_seconds, input_hash = excluded.input_hash,
+                   updated_at = excluded.updated_at""",
+                (workflow_id, step, status, json.dumps(output) if output is not None else None,
+                 error, duration, input_hash, time.time())
+            )
+            self._conn.commit()
+
+    def mark_step_running(self, workflow_id: str, step: str):
+        """Mark a step as running, counting one more attempt"""
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO workflow_steps (workflow_id, step, status, updated_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(workflow_id, step) DO UPDATE SET status = excluded.status, output = NULL,
+                   error = NULL, duration_seconds = NULL, attempts = attempts + 1,
+                   updated_at = excluded.updated_at""",
+                (workflow_id, step, STEP_RUNNING, time.time())
+            )
+            self._conn.commit()
+
+    def fail_step(self, workflow_id: str, step: str, error: str, duration: float = None):
+        """Record a failed step without discarding earlier checkpoints"""
+        self.save_step(workflow_id, step, None, status=STEP_FAILED, error=error, duration=duration)
+
+    def get_step_checkpoints(self, workflow_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get the output and input hash of every completed step"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT step, output, input_hash FROM workflow_steps WHERE workflow_id = ? AND status = ?",
+                (workflow_id, STEP_COMPLETED)
+            ).fetchall()
+        return {
+            row['step']: {'output': json.loads(row['output']), 'input_hash': row['input_hash']}
+            for row in rows if row['output'] is not None
+        }
+
+    def get_cached_step(self, step: str, input_hash: str, ttl: int = STEP_CACHE_TTL_SECONDS) -> Optional[Any]:
+        """Get a cached step output for an input hash if it is still fresh"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM step_cache WHERE step = ? AND input_hash = ? AND created_at >= ?",
+                (step, input_hash, time.time() - ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE step_cache SET hits = hits + 1 WHERE step = ? AND input_hash = ?", (step, input_hash)
+            )
+            self._conn.commit()
+        return json.loads(row['output'])
+
+    def cache_step(self, step: str, input_hash: str, output: Any, ttl: int = STEP_CACHE_TTL_SECONDS):
+        """Cache a step output by input hash and drop entries past the stale window"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO step_cache (step, input_hash, output, created_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(step, input_hash) DO UPDATE SET output = excluded.output,
+                   created_at = excluded.created_at, hits = 0""",
+                (step, input_hash, json.dumps(output), now)
+            )
+            self._conn.execute("DELETE FROM step_cache WHERE created_at < ?", (now - max(ttl, STEP_CACHE_STALE_SECONDS),))
+            self._conn.commit()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get entry and hit counts per cached step"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT step, COUNT(*) AS entries, SUM(hits) AS hits FROM step_cache GROUP BY step"
+            ).fetchall()
+        return {row['step']: {'entries': row['entries'], 'hits': row['hits'] or 0} for row in rows}
+
+    def save_step_inputs(self, workflow_id: str, step_inputs: Dict[str, Dict[str, Any]]):
+        """Store per-step input edits so later resumes keep applying them"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workflows SET step_inputs = ?, updated_at = ? WHERE workflow_id = ?",
+                (json.dumps(step_inputs), time.time(), workflow_id)
+            )
+            self._conn.commit()
+
+    def enqueue_pdr(self, workflow_id: str, idea: Dict[str, Any], product: Dict[str, Any], input_hash: str) -> bool:
+        """Queue PDR creation for a workflow; returns False if this product's PDR is already queued or delivered"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT input_hash, status FROM pdr_outbox WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            if row and row['input_hash'] == input_hash and row['status'] != PDR_FAILED:
+                return False
+            self._conn.execute(
+                """INSERT INTO pdr_outbox (workflow_id, idea, product, input_hash, status, next_attempt_at,
+                   created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(workflow_id) DO UPDATE SET idea = excluded.idea, product = excluded.product,
+                   input_hash = excluded.input_hash, status = excluded.status, attempts = 0,
+                   next_attempt_at = excluded.next_attempt_at, pdr_id = NULL, approval_requested_at = NULL,
+                   result = NULL, error = NULL,
+                   updated_at = excluded.updated_at""",
+                (workflow_id, json.dumps(idea), json.dumps(product), input_hash, PDR_PENDING, now, now, now)
+            )
+            self._conn.commit()
+        return True
+
+    def due_pdrs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get pending PDR deliveries whose next attempt is due, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT * FROM pdr_outbox WHERE status = ? AND next_attempt_at <= ?
+                   ORDER BY next_attempt_at LIMIT ?""",
+                (PDR_PENDING, time.time(), limit)
+            ).fetchall()
+        return [self._pdr_row(row) for row in rows]
+
+    def update_pdr(self, workflow_id: str, **fields):
+        """Update PDR outbox fields (status, attempts, next_attempt_at, pdr_id, approval_requested_at, result, error)"""
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'])
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE pdr_outbox SET {assignments} WHERE workflow_id = ?",
+                list(fields.values()) + [workflow_id]
+            )
+            self._conn.commit()
+
+    def requeue_sending_pdrs(self) -> int:
+        """Return deliveries interrupted by a restart to the pending queue"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE pdr_outbox SET status = ?, updated_at = ? WHERE status = ?",
+                (PDR_PENDING, time.time(), PDR_SENDING)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def get_pdr(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Get the PDR delivery status of a workflow"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM pdr_outbox WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+        return self._pdr_row(row) if row else None
+
+    def _pdr_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Decode a PDR outbox row"""
+        pdr = dict(row)
+        for name in ('idea', 'product', 'result'):
+            pdr[name] = json.loads(pdr[name]) if pdr[name] else None
+        return pdr
+
+    def save_result(self, workflow_id: str, result: Dict[str, Any]):
+        """Store the final business plan of a workflow"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workflows SET result = ?, updated_at = ? WHERE workflow_id = ?",
+                (json.dumps(result), time.time(), workflow_id)
+            )
+            self._conn.commit()
+
+    def get_result(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Get the final business plan of a workflow, if it finished"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+        return json.loads(row['result']) if row and row['result'] else None
+
+    def list_workflows(self, statuses: List[str]) -> List[Dict[str, Any]]:
+        """List workflows in the given statuses, oldest first"""
+        placeholders = ', '.join('?' for _ in statuses)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT workflow_id, user_input, idea_count, status FROM workflows "
+                f"WHERE status IN ({placeholders}) ORDER BY created_at",
+                list(statuses)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get batch progress counts from its workflows, or None if no workflow belongs to the batch"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT workflow_id, status FROM workflows WHERE batch_id = ? ORDER BY rowid", (batch_id,)
+            ).fetchall()
+        if not rows:
+            return None
+        statuses = [row['status'] for row in rows]
+        return {
+            'batch_id': batch_id,
+            'status': 'running' if any(status in ('queued', 'running') for status in statuses) else 'completed',
+            'total': len(rows),
+            'completed': statuses.count('completed'),
+            'failed': statuses.count('failed'),
+            'workflow_ids': [row['workflow_id'] for row in rows]
+        }
+
+    def get_workflow(self, workflow_id: str, include_outputs: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a workflow and the status of each checkpointed step"""
+        with self._lock:
+            workflow = self._conn.execute(
+                "SELECT * FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            if workflow is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT * FROM workflow_steps WHERE workflow_id = ? ORDER BY updated_at", (workflow_id,)
+            ).fetchall()
+
+        steps = {}
+        for row in rows:
+            step = {
+                'status': row['status'],
+                'error': row['error'],
+                'duration_seconds': row['duration_seconds'],
+                'attempts': row['attempts'],
+                'updated_at': row['updated_at']
+            }
+            if include_outputs and row['output'] is not None:
+                step['output'] = json.loads(row['output'])
+            steps[row['step']] = step
+
+        result = dict(workflow)
+        result.pop('result', None)
+        result['step_inputs'] = json.loads(workflow['step_inputs']) if workflow['step_inputs'] else {}
+        result['has_result'] = workflow['result'] is not None
+        result['steps'] = steps
+        return result
+
+
+def hash_step_input(step: str, inputs: Dict[str, Any]) -> str:
+    """Stable SHA-256 of a step name and its input payload"""
+    canonical = json.dumps({'step': step, 'inputs': inputs}, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
@@ -244,6 +244,27 @@ db.serialize(() => {
       FOREIGN KEY (company_id) REFERENCES companies (id)
     )
   `);
+
+  // Product Decision Records created by the orchestrator and approved to trigger marketing
+  db.run(`
+    CREATE TABLE IF NOT EXISTS pdrs (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      idea_json TEXT,
+      product_json TEXT,
+      status TEXT DEFAULT 'draft',
+      approved_at DATETIME,
+      approval_claimed_at DATETIME,
+      idempotency_key TEXT,
+      marketing_posted INTEGER DEFAULT 0,
+      marketing_response TEXT,
+      created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+      updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+  `);
+  // PDR tables created before approval claims and idempotent creates; fails harmlessly once the columns exist
+  db.run(`ALTER TABLE pdrs ADD COLUMN approval_claimed_at DATETIME`, () => {});
+  db.run(`ALTER TABLE pdrs ADD COLUMN idempotency_key TEXT`, () => {});
+  db.run(`CREATE UNIQUE INDEX IF NOT EXISTS idx_pdrs_idempotency_key ON pdrs (idempotency_key)`);
 });
 
 console.log('Database initialized successfully');
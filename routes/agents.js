@@ -4,6 +4,7 @@ const axios = require('axios');
 const CMOAgent = require('../agents/CMOAgent_v2');
 const { postToSocial } = require('../agents/ayrsharePoster');
 const db = require('../database/setup');
+const { claimPdrApproval, completePdrApproval, releasePdrApproval } = require('../services/pdrApproval');
 
 // Initialize only Marketing agent (Node.js) - DeveloperAgent removed since bolt.diy handles website creation
 // Other agents (CEO, Research, Product, CTO, Head of Engineering, Finance) run as uAgents
@@ -237,12 +238,29 @@ router.post('/bolt-prompt', async (req, res) => {
 // Create a new PDR
 router.post('/pdrs', async (req, res) => {
   try {
-    const { idea, product } = req.body;
+    const { idea, product, idempotencyKey } = req.body;
     if (!idea || !product) {
       return res.status(400).json({ success: false, error: 'Idea and product are required' });
     }
 
-    const row = await dbRunAsync(`INSERT INTO pdrs (idea_json, product_json, status) VALUES (?, ?, ?)`, [JSON.stringify(idea), JSON.stringify(product), 'draft']);
+    // Retried creates (e.g. after a client timeout) get the PDR the first attempt made
+    if (idempotencyKey) {
+      const existing = await dbGetAsync(`SELECT id FROM pdrs WHERE idempotency_key = ?`, [idempotencyKey]);
+      if (existing) {
+        console.log('♻️  [PDR] Returning existing PDR for idempotency key:', idempotencyKey);
+        return res.json({ success: true, pdrId: existing.id, existing: true });
+      }
+    }
+
+    let row;
+    try {
+      row = await dbRunAsync(`INSERT INTO pdrs (idea_json, product_json, status, idempotency_key) VALUES (?, ?, ?, ?)`, [JSON.stringify(idea), JSON.stringify(product), 'draft', idempotencyKey || null]);
+    } catch (err) {
+      // A concurrent create with the same key won the unique index
+      if (!idempotencyKey || !/UNIQUE/.test(err.message)) throw err;
+      const existing = await dbGetAsync(`SELECT id FROM pdrs WHERE idempotency_key = ?`, [idempotencyKey]);
+      return res.json({ success: true, pdrId: existing.id, existing: true });
+    }
     res.json({ success: true, pdrId: row.lastID });
   } catch (err) {
     console.error('Error creating PDR:', err);
@@ -270,8 +288,9 @@ router.get('/pdrs/:id', async (req, res) => {
 
 // Approve a PDR and trigger marketing automatically
 router.post('/pdrs/:id/approve', async (req, res) => {
+  let claimed = false;
+  const { id } = req.params;
   try {
-    const { id } = req.params;
     console.log('✅ [PDR_APPROVAL] Approval request received for PDR ID:', id);
     
     const pdr = await dbGetAsync(`SELECT * FROM pdrs WHERE id = ?`, [id]);
@@ -280,14 +299,24 @@ router.post('/pdrs/:id/approve', async (req, res) => {
       return res.status(404).json({ success: false, error: 'PDR not found' });
     }
     
-    if (pdr.status === 'approved') {
-      console.log('⚠️  [PDR_APPROVAL] PDR already approved:', id);
-      return res.json({ success: true, message: 'PDR already approved' });
-    }
-
-    // Mark as approved
+    // Claim the approval so concurrent or retried approvals never post twice; a failed claim is released below
     console.log('📝 [PDR_APPROVAL] Marking PDR as approved...');
-    await dbRunAsync(`UPDATE pdrs SET status = ?, approved_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP WHERE id = ?`, ['approved', id]);
+    const claim = await claimPdrApproval(db, id);
+    if (!claim.claimed) {
+      if (!claim.posted) {
+        console.log('⏳ [PDR_APPROVAL] PDR already approved, marketing still in progress:', id);
+        return res.status(409).json({ success: false, alreadyApproved: true, pending: true, error: 'PDR approval in progress' });
+      }
+      console.log('⚠️  [PDR_APPROVAL] PDR already approved, returning stored marketing results:', id);
+      return res.json({
+        success: true,
+        alreadyApproved: true,
+        message: 'PDR already approved',
+        strategy: {},
+        postResp: claim.postResp
+      });
+    }
+    claimed = true;
     console.log('✅ [PDR_APPROVAL] PDR marked as approved');
 
     // Parse stored idea/product
@@ -319,7 +348,7 @@ router.post('/pdrs/:id/approve', async (req, res) => {
 
     // Save marketing response to PDR record
     console.log('💾 [PDR_APPROVAL] Saving marketing results to PDR...');
-    await dbRunAsync(`UPDATE pdrs SET marketing_posted = ?, marketing_response = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?`, [1, JSON.stringify(marketingResult.postResp || {}), id]);
+    await completePdrApproval(db, id, marketingResult.postResp);
     console.log('✅ [PDR_APPROVAL] Marketing results saved to PDR');
 
     console.log('🎉 [PDR_APPROVAL] PDR approval complete! Marketing posted:', {
@@ -331,6 +360,10 @@ router.post('/pdrs/:id/approve', async (req, res) => {
   } catch (err) {
     console.error('❌ [PDR_APPROVAL] Error approving PDR:', err);
     console.error('Stack trace:', err.stack);
+    if (claimed) {
+      // Let the next approval (e.g. the orchestrator's outbox retry) claim and run marketing again
+      await releasePdrApproval(db, id).catch(releaseErr => console.error('❌ [PDR_APPROVAL] Could not release approval claim:', releaseErr));
+    }
     res.status(500).json({ success: false, error: err.message });
   }
 });
@@ -452,7 +485,13 @@ router.post('/process-complete-workflow', async (req, res) => {
       selected_idea: response.data.data?.idea?.title,
       workflow_status: response.data.data?.workflow_summary?.workflow_status
     });
-    
+
+    // Orchestrator shed the request under load; pass the backoff hint on to the client
+    if (response.data.retry_after) {
+      res.set('Retry-After', String(Math.ceil(response.data.retry_after)));
+      return res.status(503).json(response.data);
+    }
+
     res.json(response.data);
   } catch (error) {
     console.error('❌ [ROUTE] Error in complete workflow:', error.message);
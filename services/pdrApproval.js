@@ -0,0 +1,60 @@
+// PDR approval claims: only one approval at a time runs marketing for a PDR, and a claim whose
+// marketing failed (released) or whose holder died (lease expired) can be claimed again by a retry.
+const PDR_APPROVAL_LEASE_SECONDS = parseInt(process.env.PDR_APPROVAL_LEASE_SECONDS || '900', 10);
+
+function run(db, sql, params = []) {
+  return new Promise((resolve, reject) => {
+    db.run(sql, params, function(err) {
+      if (err) return reject(err);
+      resolve(this);
+    });
+  });
+}
+
+function get(db, sql, params = []) {
+  return new Promise((resolve, reject) => {
+    db.get(sql, params, (err, row) => {
+      if (err) return reject(err);
+      resolve(row);
+    });
+  });
+}
+
+/**
+ * Claim a PDR for approval. Returns { claimed: true } for the caller that should run marketing;
+ * otherwise { claimed: false, posted, postResp } describing the approval that already claimed it.
+ */
+async function claimPdrApproval(db, id, leaseSeconds = PDR_APPROVAL_LEASE_SECONDS) {
+  const claim = await run(db, `
+    UPDATE pdrs SET status = 'approved', approved_at = CURRENT_TIMESTAMP,
+      approval_claimed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ? AND COALESCE(marketing_posted, 0) = 0
+      AND (approval_claimed_at IS NULL OR approval_claimed_at <= datetime('now', ?))
+  `, [id, `-${leaseSeconds} seconds`]);
+  if (claim.changes > 0) {
+    return { claimed: true };
+  }
+  const pdr = await get(db, `SELECT marketing_posted, marketing_response FROM pdrs WHERE id = ?`, [id]);
+  return {
+    claimed: false,
+    posted: !!(pdr && pdr.marketing_posted),
+    postResp: pdr && pdr.marketing_response ? JSON.parse(pdr.marketing_response) : {}
+  };
+}
+
+/** Record the marketing posted for a claimed PDR */
+async function completePdrApproval(db, id, postResp) {
+  await run(db, `UPDATE pdrs SET marketing_posted = 1, marketing_response = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?`, [JSON.stringify(postResp || {}), id]);
+}
+
+/** Give up a claim whose marketing failed so the next approval can retry it */
+async function releasePdrApproval(db, id) {
+  await run(db, `UPDATE pdrs SET approval_claimed_at = NULL, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND COALESCE(marketing_posted, 0) = 0`, [id]);
+}
+
+module.exports = {
+  PDR_APPROVAL_LEASE_SECONDS,
+  claimPdrApproval,
+  completePdrApproval,
+  releasePdrApproval
+};
@@ -0,0 +1,62 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const sqlite3 = require('sqlite3');
+const { claimPdrApproval, completePdrApproval, releasePdrApproval } = require('../services/pdrApproval');
+
+function openDb() {
+  const db = new sqlite3.Database(':memory:');
+  return new Promise((resolve, reject) => {
+    db.serialize(() => {
+      db.run(`
+        CREATE TABLE pdrs (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          idea_json TEXT,
+          product_json TEXT,
+          status TEXT DEFAULT 'draft',
+          approved_at DATETIME,
+          approval_claimed_at DATETIME,
+          marketing_posted INTEGER DEFAULT 0,
+          marketing_response TEXT,
+          created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+          updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+      `);
+      db.run(`INSERT INTO pdrs (idea_json, product_json) VALUES ('{}', '{}')`, err => (err ? reject(err) : resolve(db)));
+    });
+  });
+}
+
+test('a second approval waits while the first holds the claim', async () => {
+  const db = await openDb();
+  assert.deepStrictEqual(await claimPdrApproval(db, 1), { claimed: true });
+  const second = await claimPdrApproval(db, 1);
+  assert.strictEqual(second.claimed, false);
+  assert.strictEqual(second.posted, false);
+});
+
+test('a retry re-claims after marketing failed and the claim was released', async () => {
+  const db = await openDb();
+  assert.strictEqual((await claimPdrApproval(db, 1)).claimed, true);
+  await releasePdrApproval(db, 1);
+
+  assert.strictEqual((await claimPdrApproval(db, 1)).claimed, true);
+  await completePdrApproval(db, 1, { twitter: { status: 'success' } });
+
+  const again = await claimPdrApproval(db, 1);
+  assert.deepStrictEqual(again, { claimed: false, posted: true, postResp: { twitter: { status: 'success' } } });
+});
+
+test('an abandoned claim can be taken once its lease expires', async () => {
+  const db = await openDb();
+  assert.strictEqual((await claimPdrApproval(db, 1)).claimed, true);
+  assert.strictEqual((await claimPdrApproval(db, 1, 3600)).claimed, false);
+  assert.strictEqual((await claimPdrApproval(db, 1, 0)).claimed, true);
+});
+
+test('releasing never reopens a PDR whose marketing was posted', async () => {
+  const db = await openDb();
+  await claimPdrApproval(db, 1);
+  await completePdrApproval(db, 1, {});
+  await releasePdrApproval(db, 1);
+  assert.strictEqual((await claimPdrApproval(db, 1, 0)).claimed, false);
+});